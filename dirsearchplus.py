@@ -2,20 +2,17 @@
 
 import re
 import time
+from collections import defaultdict
+from urllib.parse import urlparse
 from colorama import init, Fore, Style
 
 import lib
-from lib.controller.controller import Controller
-from lib.pass403_optimized import OptimizedArguments as Arguments, OptimizedProgram as Program
-from lib.qc import pass403_qc
-
-import queue
+from lib.connection.cache import get_cache
+from lib.core.pipeline import EventBus, FORBIDDEN, JS_URL, PATH_FOUND, TARGET
 
 
 import sys,os
 
-from pkg_resources import DistributionNotFound, VersionConflict
-
 from lib.core.data import options
 from lib.core.exceptions import FailedDependenciesInstallation
 from lib.core.installation import check_dependencies, install_dependencies
@@ -34,6 +31,9 @@ config = ConfigParser()
 config.read(OPTIONS_FILE)
 
 if config.safe_getboolean("options", "check-dependencies", False):
+    # pkg_resources 导入较慢，只在需要检查依赖时导入
+    from pkg_resources import DistributionNotFound, VersionConflict
+
     try:
         check_dependencies()
     except (DistributionNotFound, VersionConflict):
@@ -57,325 +57,276 @@ if config.safe_getboolean("options", "check-dependencies", False):
 
 ##
 
-def bypass():
-    """优化的403bypass函数"""
-    with open('resources/bypass403_url.txt') as f:
-        bypass403_url = f.read().strip()
+# 每累计这么多个同一目标的403路径就开始一批绕过测试，不必等待目录扫描结束
+BYPASS_BATCH_SIZE = 50
+# 403路径不足一批时，最早的路径等待这么多秒后也开始绕过测试
+BYPASS_FLUSH_DELAY = 3
 
-    # 收集所有需要处理的路径
-    paths_to_process = []
-    while not q.empty():
-        path_403 = q.get()
-        paths_to_process.append(path_403)
+# swagger 相关路径的特征
+SWAGGER_PATTERNS = ('swagger-ui', 'api-docs', 'swagger-resources', 'swagger.json', 'openapi.json')
+
+
+def module_enabled(name):
+    """
+    判断某个模块是否通过命令行参数启用(例如 -b yes)
+
+    参数:
+        name (str): 选项名称
+
+    返回值:
+        bool: 是否启用
+    """
+    return "".join(options.get(name) or ()) == 'yes'
+
+
+def bypass(url, paths, results, families, samples):
+    """
+    对同一目标的一批403路径进行优化的403bypass
+
+    参数:
+        url (str): 目标基础URL
+        paths (list): 以/开头的路径列表
+        results (dict): 目标URL到结果行列表的映射，本批结果追加到其中
+        families (dict): 目标URL到已学习的变异类别集合的映射，学习完成后同一目标不再探测
+        samples (dict): 目标URL到尚未学习的探测结果的映射，在批次之间累计
+    """
+    from lib.pass403_optimized import OptimizedProgram as Program
+
+    adaptive = not options["bypass_exhaustive"]
 
-    if not paths_to_process:
-        return
     current_time = time.strftime("%H:%M:%S")
-    message = f"[{current_time}] 开始处理 {len(paths_to_process)} 个403路径" + '\n'
+    message = f"[{current_time}] 开始处理 {url} 的 {len(paths)} 个403路径" + '\n'
     print(set_color(message, fore="green"), end='')
 
-
     # 使用优化版本处理
     try:
-        argument = Arguments(bypass403_url, None, None, None)
-        program = Program(argument.return_urls(), paths_to_process, max_workers=20)
+        program = Program([url], paths, adaptive=adaptive, results=results, families=families, samples=samples)
         program.initialise()
     except Exception as e:
         print(f"bypass处理出错: {e}")
         # 如果处理失败，尝试逐个处理
-        for path_403 in paths_to_process:
+        for path_403 in paths:
             try:
-                argument = Arguments(bypass403_url, None, path_403, None)
-                program = Program(argument.return_urls(), argument.return_dirs())
+                program = Program([url], [path_403], adaptive=adaptive, results=results, families=families,
+                                  samples=samples)
                 program.initialise()
-            except:
+            except Exception:
                 pass
 
 
-def run_bypass403():
-    size = os.path.getsize('403list.txt')
-    size_js=os.path.getsize('jsfind403list.txt')
-    from lib.core.options import parse_options
-    if (parse_options()['bypass']) == None:
-        pass
-    else:
-        bp403="".join(parse_options()['bypass'])
-        if bp403 =='yes':
-            if size ==0 and size_js ==0:
-                current_time = time.strftime("%H:%M:%S")
-                message = f"[{current_time}] 没有403状态码存在！" + '\n'
-                print(set_color(message, fore="yellow"), end='')
-                # print(Fore.GREEN + Style.BRIGHT + '没有403状态码存在！'+Style.RESET_ALL)
-            else:
-                current_time = time.strftime("%H:%M:%S")
-                message = f"[{current_time}] 开始403bypass！" +'\n'
-                print(set_color(message, fore="green"), end='')
-                # print(Fore.GREEN + Style.BRIGHT+''+Style.RESET_ALL)
-
-                current_time = time.strftime("%H:%M:%S")
-                message = f"[{current_time}] 使用优化的403bypass模式！！" +'\n'
-                print(set_color(message, fore="green"), end='')
-                # print(Fore.CYAN + Style.BRIGHT + ''+Style.RESET_ALL)
-
-                # 处理403list.txt路径
-                with open('403list.txt',) as f1:
-                    list_403=f1.readlines()
-                for path_403 in list_403:
-                    path_403=path_403.replace('\n','').replace('\r','')
-                    q.put(path_403)
-
-                # 使用优化的bypass函数
-                bypass()
-
-                # 处理jsfind403list.txt路径，使用优化模式
-                if size_js > 0:
-                    try:
-                        with open('jsfind403list.txt') as js1:
-                            jsf=js1.readlines()
-
-                        # 收集所有JS发现的URL和路径
-                        js_urls = []
-                        js_paths = []
-
-                        for ff in jsf:
-                            ff = ff.replace('\n', '').replace('\r', '')
-                            num_slashes = ff.count('/')
-                            if num_slashes == 2:
-                                ff = ff + '/'
-                            split_url = ff.split("/")
-                            js_url = "/".join(split_url[:3])
-                            js_path = split_url[3]
-                            if js_path == '':
-                                js_path = '/'
-
-                            if js_url not in js_urls:
-                                js_urls.append(js_url)
-                            js_paths.append(js_path)
-
-                        # 使用优化模式处理JS发现的路径
-                        if js_urls and js_paths:
-                            print(f"开始处理 {len(js_paths)} 个JS发现的403路径")
-                            argument = Arguments(None, None, None, None)
-                            argument.urls = js_urls
-                            argument.dirs = js_paths
-                            program = Program(argument.return_urls(), argument.return_dirs(), max_workers=20)
-                            program.initialise()
-
-                    except Exception as e:
-                        print(f"处理jsfind403list.txt时出错: {str(e)}")
-
-                pass403_qc()
+def add_bypass_stage(bus):
+    """
+    注册403绕过阶段
 
-        else:
-            pass
+    目录扫描和JsFind发现的403路径以 FORBIDDEN 事件到达，按目标分批进行绕过测试：
+    累计 BYPASS_BATCH_SIZE 个路径，或最早的路径已等待 BYPASS_FLUSH_DELAY 秒时开始一批，
+    所有事件处理完成后对结果去重输出。
 
+    参数:
+        bus (EventBus): 事件总线
+    """
+    pending = defaultdict(list)
+    # 每个目标最早的待测路径到达的时间
+    since = {}
+    seen = set()
+    tested = set()
+    # 各批次的结果都留在内存中，所有批次完成后一起去重输出
+    results = {}
+    # 自适应模式学习到的变异类别，同一目标的后续批次直接沿用
+    families = {}
+    # 路径较少的批次的探测结果，累计满样本数后再学习变异类别
+    samples = {}
+
+    def run_batch(url):
+        if not tested:
+            current_time = time.strftime("%H:%M:%S")
+            message = f"[{current_time}] 开始403bypass！使用优化的403bypass模式！！" + '\n'
+            print(set_color(message, fore="green"), end='')
 
-def jsfind():
-    import lib.JSFinder
-    from lib.core.options import parse_options
-    from lib.view.terminal import output
-    from lib.view.colors import set_color
-    import time
-    # current_time = time.strftime("%H:%M:%S")
-    # message = f"[{current_time}] jsfind "
-    # output.new_line(set_color(message, fore="cyan"))
-    if (parse_options()['jsfind']) == None:
-        pass
-    else:
-        jsf="".join(parse_options()['jsfind'])
-        if jsf=='yes':
-            # print(Fore.GREEN + Style.BRIGHT+"开始JsFind！"+Style.RESET_ALL)
+        tested.add(url)
+        since.pop(url, None)
+        bypass(url, pending.pop(url), results, families, samples)
+
+    def flush():
+        now = time.monotonic()
+        for url in list(pending):
+            if len(pending[url]) >= BYPASS_BATCH_SIZE or now - since[url] >= BYPASS_FLUSH_DELAY:
+                run_batch(url)
+
+    def handle(event):
+        url, path = event.data
+        url = url.rstrip("/")
+        path = "/" + path.lstrip("/")
+
+        if (url, path) in seen:
+            return
+
+        seen.add((url, path))
+        since.setdefault(url, time.monotonic())
+        pending[url].append(path)
+        flush()
+
+    def finish():
+        for url in list(pending):
+            run_batch(url)
+
+        if not tested:
             current_time = time.strftime("%H:%M:%S")
-            message = f"[{current_time}] 开始JsFind！"
-            output.new_line(set_color(message, fore="green", style="bright"))
-            url="".join(parse_options()['urls'])
-            urls = lib.JSFinder.find_by_url(url)
-            lib.JSFinder.giveresult(urls, url)
-        else:
-            pass
+            message = f"[{current_time}] 没有403状态码存在！" + '\n'
+            print(set_color(message, fore="yellow"), end='')
+            return
+
+        from lib.qc import pass403_qc
+
+        pass403_qc(results)
 
-def ehole():
+    bus.add_stage("403bypass", (FORBIDDEN,), handle, finish, tick=flush)
+
+
+def jsfind(url, bus):
+    """
+    对目标进行JsFind，探测到的URL实时发布到事件总线
+
+    参数:
+        url (str): 扫描目标URL
+        bus (EventBus): 事件总线
+    """
+    import lib.JSFinder
+
+    current_time = time.strftime("%H:%M:%S")
+    message = f"[{current_time}] 开始JsFind！"
+    output.new_line(set_color(message, fore="green", style="bright"))
+
+    def publish(found_url, status_code):
+        bus.publish(JS_URL, (found_url, status_code))
+
+        if status_code == 403:
+            parsed = urlparse(found_url)
+            bus.publish(FORBIDDEN, (f"{parsed.scheme}://{parsed.netloc}", parsed.path or "/"))
+
+    urls = lib.JSFinder.find_by_url(url)
+    lib.JSFinder.giveresult(urls, url, callback=publish)
+
+
+def ehole(url, controller):
     """
     主函数，用于启动ehole指纹识别功能
 
-    该函数解析命令行选项，检查是否启用指纹识别功能，
-    如果启用则调用lib.ehole.ehole模块的start_ehole方法启动识别过程
+    检查是否启用指纹识别功能，如果启用则调用lib.ehole.ehole模块的start_ehole方法输出识别结果
 
     参数:
-        无
+        url (str): 扫描目标URL
+        controller (Controller): 目录扫描控制器，其中保存了扫描期间在内存中完成的指纹识别结果
 
     返回值:
         无
     """
-    from lib.core.options import parse_options
-    from lib.view.terminal import output
-    from lib.view.colors import set_color
-    import time
-    import subprocess
-    # 解析命令行选项并检查zwsb参数是否设置
-    if (parse_options()['zwsb']) == None:
-        pass
-    else:
-        # 将zwsb参数值连接成字符串并检查是否为'yes'
-        zwsb="".join(parse_options()['zwsb'])
-        if zwsb=='yes':
-            # 打印指纹识别启动信息并调用ehole主程序
-            current_time = time.strftime("%H:%M:%S")
-            message = f"[{current_time}]  指纹识别！"
-            output.new_line(set_color(message, fore="green", style="bright"))
-            # 调用 lib/ehole/ehole.py 的 start_ehole() 方法
-            import lib.ehole.ehole
-            current_time = time.strftime("%H:%M:%S")
-            message = f"[{current_time}]  正在启动指纹识别..！"
-            output.new_line(set_color(message, fore="green",style="bright"))
-            lib.ehole.ehole.start_ehole()
-        else:
-            pass
+    if not module_enabled('zwsb'):
+        return
+
+    # 打印指纹识别启动信息并调用ehole主程序
+    current_time = time.strftime("%H:%M:%S")
+    message = f"[{current_time}]  指纹识别！"
+    output.new_line(set_color(message, fore="green", style="bright"))
+    # 调用 lib/ehole/ehole.py 的 start_ehole() 方法
+    import lib.ehole.ehole
+    current_time = time.strftime("%H:%M:%S")
+    message = f"[{current_time}]  正在启动指纹识别..！"
+    output.new_line(set_color(message, fore="green",style="bright"))
+    lib.ehole.ehole.start_ehole(url, getattr(controller, "fingerprints", None))
+
+
+def is_swagger_path(url):
+    """
+    判断URL是否为 swagger 相关路径
+
+    参数:
+        url (str): URL
 
+    返回值:
+        bool: 是否为 swagger 相关路径
+    """
+    return any(pattern in url.lower() for pattern in SWAGGER_PATTERNS)
 
 
-def hhh():
-    open("403list.txt", 'w').close()
-    open('jsfind403list.txt','w').close()
+def add_swagger_stage(bus):
+    """
+    注册Swagger接口扫描阶段
 
-def swagger_scan():
-    import lib.core.options
+    目录扫描和JsFind发现的状态码为200的 swagger 相关路径到达后立即扫描，
+    所有事件处理完成后保存Excel文件。
+
+    参数:
+        bus (EventBus): 事件总线
+    """
     from script import swagger
     import argparse
 
-    # 只调用一次 parse_options() 并存储结果
-    parsed_options = lib.core.options.parse_options()
+    # 创建 swagger.py 需要的参数对象
+    args = argparse.Namespace()
+    args.target_url = None
+    args.url_file = None
+    args.debug = False
+    args.force_domain = False
+    args.custom_path_prefix = ''
+    args.header_list = []
+    # 获取 dirsearch 的 headers 并传递给 swagger 扫描
+    args.custom_headers = options.get('headers') or {}
 
-    # 检查 -swagger 参数是否为 yes
-    if parsed_options.get('swagger') is None:
-        return
+    swagger_paths = []
 
-    swagger_opt = "".join(parsed_options['swagger'])
-    if swagger_opt.lower() != 'yes':
-        return
+    def handle(event):
+        if event.type == PATH_FOUND:
+            swagger_url, status_code = event.data.url, event.data.status
+        else:
+            swagger_url, status_code = event.data
 
-    # 查找所有可能的 swagger 相关路径
-    swagger_paths = []
-    try:
-        # 从扫描结果中读取所有找到的路径
-        if os.path.exists('dir_file_path.txt'):
-            with open('dir_file_path.txt', 'r') as f:
-                report_path = f.read().strip()
-
-            # 尝试读取报告文件中的路径
-            if os.path.exists(report_path):
-                with open(report_path, 'r') as f:
-                    content = f.read()
-                    # 检测 swagger 相关路径
-                    swagger_patterns = ['swagger-ui', 'api-docs', 'swagger-resources', 'swagger.json', 'openapi.json']
-                    for line in content.split('\n'):
-                        # 跳过空行
-                        if not line.strip():
-                            continue
-
-                        # 跳过注释行（以#开头）
-                        if line.strip().startswith('#'):
-                            continue
-
-                        # 检查行是否包含任何swagger模式
-                        if any(pattern in line.lower() for pattern in swagger_patterns):
-                            try:
-                                # 按空白字符分割行
-                                parts = line.strip().split()
-
-                                # 检查第一部分是否为状态码
-                                if len(parts) >= 1:
-                                    # 尝试解析状态码
-                                    try:
-                                        status_code = int(parts[0])
-                                        # 只包含200状态码的路径
-                                        if status_code != 200:
-                                            print(f"跳过非200状态码路径: {line.strip()}")
-                                            continue
-                                    except ValueError:
-                                        # 如果第一部分不是状态码，则跳过此行
-                                        print(f"无法从行解析状态码: {line.strip()}")
-                                        continue
-
-                                # 完整URL应该是第三个元素或最后一个元素
-                                # 根据报告的格式而定
-                                if len(parts) >= 3:
-                                    # URL可能是第三部分，或者如果有空格在URL中可能是最后一部分
-                                    # 让我们找到第一个以'http'开头的部分
-                                    url_part = None
-                                    for part in parts:
-                                        if part.startswith('http'):
-                                            url_part = part
-                                            break
-
-                                    if url_part:
-                                        swagger_paths.append(url_part)
-                                    else:
-                                        # 回退：使用最后一部分作为URL
-                                        swagger_paths.append(parts[-1])
-                                else:
-                                    # 简单情况：直接使用整行作为URL
-                                    swagger_paths.append(line.strip())
-                            except Exception as e:
-                                print(f"从行提取URL时出错: {line}。错误: {e}")
-                                pass
-    except Exception as e:
-        print(f"读取swagger路径时出错: {e}")
-        pass
-
-    # 如果找到了 swagger 路径，调用 swagger.py 进行扫描
-    if swagger_paths:
-        print(Fore.GREEN + Style.BRIGHT + f'找到 {len(swagger_paths)} 个swagger相关路径，开始swagger扫描...' + Style.RESET_ALL)
-
-        # 创建 swagger.py 需要的参数对象
-        args = argparse.Namespace()
-        args.target_url = None
-        args.url_file = None
-        args.debug = False
-        args.force_domain = False
-        args.custom_path_prefix = ''
-        args.header_list = []
-        # 获取 dirsearch 的 headers 并传递给 swagger 扫描
-        args.custom_headers = parsed_options.get('headers', {})
-
-        # 对每个找到的 swagger 路径进行扫描
-        for swagger_url in swagger_paths:
-            print(Fore.GREEN + f'扫描swagger路径: {swagger_url}' + Style.RESET_ALL)
-            swagger.run(swagger_url, args)
+        # 只扫描200状态码的 swagger 相关路径
+        if status_code != 200 or not is_swagger_path(swagger_url) or swagger_url in swagger_paths:
+            return
+
+        if not swagger_paths:
+            print(Fore.GREEN + Style.BRIGHT + '找到swagger相关路径，开始swagger扫描...' + Style.RESET_ALL)
+
+        swagger_paths.append(swagger_url)
+        print(Fore.GREEN + f'扫描swagger路径: {swagger_url}' + Style.RESET_ALL)
+        swagger.run(swagger_url, args)
+
+    def finish():
+        if not swagger_paths:
+            print(Fore.YELLOW + '未找到swagger相关路径。' + Style.RESET_ALL)
+            return
+
+        print(Fore.GREEN + Style.BRIGHT + f'共扫描 {len(swagger_paths)} 个swagger相关路径' + Style.RESET_ALL)
 
         # 扫描完成后保存Excel文件
         try:
-            base_name = "ScanReport"
-            # 尝试从第一个swagger路径中提取域名作为文件名
-            if swagger_paths:
-                try:
-                    from urllib.parse import urlparse
-                    domain = urlparse(swagger_paths[0]).netloc
-                    safe_domain = re.sub(r'[.:\\/*?"<>|]', '_', domain)
-                    base_name = safe_domain
-                except Exception:
-                    pass
+            # 从第一个swagger路径中提取域名作为文件名
+            domain = urlparse(swagger_paths[0]).netloc
+            base_name = re.sub(r'[.:\\/*?"<>|]', '_', domain) or "ScanReport"
             swagger.save_workbook(base_name)
         except Exception as e:
             print(f"保存swagger扫描结果到Excel时出错: {e}")
-    else:
-        print(Fore.YELLOW + '未找到swagger相关路径。' + Style.RESET_ALL)
 
-def packer_fuzzer():
+    bus.add_stage("swagger", (PATH_FOUND, JS_URL), handle, finish)
+
+
+def packer_fuzzer(url):
+    """
+    调用 Packer-Fuzzer 对目标进行扫描
+
+    参数:
+        url (str): 扫描目标URL
+    """
     import os
     import sys
     import subprocess
     import time
-    from lib.core.options import parse_options
     current_time = time.strftime("%H:%M:%S")
     message = f"[{current_time}] packer_fuzzer ----------------------------------"
     output.new_line(set_color(message, fore="cyan"))
     # 检查 -p/--packer-fuzzer 参数
-    if (parse_options()['packer_fuzzer']) == None:
-        return
-
-    packer_opt = "".join(parse_options()['packer_fuzzer'])
-    if packer_opt.lower() != 'yes':
+    if not module_enabled('packer_fuzzer'):
         return
     message = f"[{current_time}] 开始Packer-Fuzzer扫描！"
     print(set_color(message, fore="blue"), end='')
@@ -383,167 +334,177 @@ def packer_fuzzer():
     # current_time = time.strftime("%H:%M:%S")
 
     try:
-        # 检查 resources/bypass403_url.txt 文件是否存在并读取URL
-        if os.path.exists('resources/bypass403_url.txt'):
-            with open('resources/bypass403_url.txt', 'r') as f:
-                url = f.read().strip()
-
-            if url:
-                # print(f"扫描URL: {url}")
-                message = f"\n[{current_time}] 扫描URL: {url}"
+        url = url.strip()
+
+        if url:
+            # print(f"扫描URL: {url}")
+            message = f"\n[{current_time}] 扫描URL: {url}"
+            print(set_color(message, fore="blue"), end='')
+            # 检查是否已经安装了 Packer-Fuzzer
+            # 更新路径为 script/Packer-Fuzzer
+            packer_fuzzer_base_dir = os.path.join(os.getcwd(), 'lib')
+            packer_fuzzer_dir = os.path.join(packer_fuzzer_base_dir, 'Packer-Fuzzer')
+
+            if not os.path.exists(packer_fuzzer_dir):
+                # print(Fore.YELLOW + "未找到Packer-Fuzzer。正在从GitHub克隆..." + Style.RESET_ALL)
+                message = f"[{current_time}] 未找到Packer-Fuzzer  -- .... -- 正在从GitHub克隆...！"
                 print(set_color(message, fore="blue"), end='')
-                # 检查是否已经安装了 Packer-Fuzzer
-                # 更新路径为 script/Packer-Fuzzer
-                packer_fuzzer_base_dir = os.path.join(os.getcwd(), 'lib')
-                packer_fuzzer_dir = os.path.join(packer_fuzzer_base_dir, 'Packer-Fuzzer')
-
-                if not os.path.exists(packer_fuzzer_dir):
-                    # print(Fore.YELLOW + "未找到Packer-Fuzzer。正在从GitHub克隆..." + Style.RESET_ALL)
-                    message = f"[{current_time}] 未找到Packer-Fuzzer  -- .... -- 正在从GitHub克隆...！"
-                    print(set_color(message, fore="blue"), end='')
-                    # 确保 script 目录存在
-                    if not os.path.exists(packer_fuzzer_base_dir):
-                        os.makedirs(packer_fuzzer_base_dir)
-                    # 克隆 Packer-Fuzzer 仓库到 script 目录
-                    subprocess.run([
-                        'git', 'clone', 'https://github.com/rtcatc/Packer-Fuzzer.git'
-                    ], cwd=packer_fuzzer_base_dir, check=True)
-
-                # 使用项目根目录下的.venv虚拟环境
-                project_root = os.getcwd()
-                current_time = time.strftime("%H:%M:%S")
-                message =  f"\n[{current_time}] 使用项目根目录下的.venv虚拟环境: {project_root}" + Style.RESET_ALL
-                print(set_color(message, fore="blue"), end='')
-                message = f"\n[{current_time}] ---------------------------------------------------------------" + Style.RESET_ALL
+                # 确保 script 目录存在
+                if not os.path.exists(packer_fuzzer_base_dir):
+                    os.makedirs(packer_fuzzer_base_dir)
+                # 克隆 Packer-Fuzzer 仓库到 script 目录
+                subprocess.run([
+                    'git', 'clone', 'https://github.com/rtcatc/Packer-Fuzzer.git'
+                ], cwd=packer_fuzzer_base_dir, check=True)
+
+            # 使用项目根目录下的.venv虚拟环境
+            project_root = os.getcwd()
+            current_time = time.strftime("%H:%M:%S")
+            message =  f"\n[{current_time}] 使用项目根目录下的.venv虚拟环境: {project_root}" + Style.RESET_ALL
+            print(set_color(message, fore="blue"), end='')
+            message = f"\n[{current_time}] ---------------------------------------------------------------" + Style.RESET_ALL
+            print(set_color(message, fore="blue"), end='')
+            # print(Fore.GREEN + f"使用项目根目录下的.venv虚拟环境: {project_root}" + Style.RESET_ALL)
+            if sys.platform == "win32":
+                venv_python = os.path.join(project_root, '.venv', 'Scripts', 'python.exe')
+                venv_pip = os.path.join(project_root, '.venv', 'Scripts', 'pip.exe')
+            else:
+                venv_python = os.path.join(project_root, '.venv', 'bin', 'python')
+                venv_pip = os.path.join(project_root, '.venv', 'bin', 'pip')
+
+            # 检查项目虚拟环境是否存在
+            if not os.path.exists(os.path.join(project_root, '.venv')):
+                message = f"{[current_time]} 项目虚拟环境(.venv)不存在，请先创建项目虚拟环境"
                 print(set_color(message, fore="blue"), end='')
-                # print(Fore.GREEN + f"使用项目根目录下的.venv虚拟环境: {project_root}" + Style.RESET_ALL)
-                if sys.platform == "win32":
-                    venv_python = os.path.join(project_root, '.venv', 'Scripts', 'python.exe')
-                    venv_pip = os.path.join(project_root, '.venv', 'Scripts', 'pip.exe')
-                else:
-                    venv_python = os.path.join(project_root, '.venv', 'bin', 'python')
-                    venv_pip = os.path.join(project_root, '.venv', 'bin', 'pip')
-
-                # 检查项目虚拟环境是否存在
-                if not os.path.exists(os.path.join(project_root, '.venv')):
-                    message = f"{[current_time]} 项目虚拟环境(.venv)不存在，请先创建项目虚拟环境"
-                    print(set_color(message, fore="blue"), end='')
-                    # print(Fore.RED + "" + Style.RESET_ALL)
-                    return
-
-                # 确保 Packer-Fuzzer 的报告目录存在
-                reports_dir = os.path.join(packer_fuzzer_dir, 'reports')
-                res_dir = os.path.join(reports_dir, 'res')
-                if not os.path.exists(reports_dir):
-                    os.makedirs(reports_dir)
-                if not os.path.exists(res_dir):
-                    os.makedirs(res_dir)
-
-                # 优化依赖检查逻辑 - 只在必要时安装依赖
-                requirements_file = os.path.join(packer_fuzzer_dir, 'requirements.txt')
-                installed_flag = os.path.join(packer_fuzzer_dir, '.installed')
-
-                # 检查是否需要安装依赖
-                need_install = False
-                if not os.path.exists(installed_flag):
-                    # 从未安装过依赖
+                # print(Fore.RED + "" + Style.RESET_ALL)
+                return
+
+            # 确保 Packer-Fuzzer 的报告目录存在
+            reports_dir = os.path.join(packer_fuzzer_dir, 'reports')
+            res_dir = os.path.join(reports_dir, 'res')
+            if not os.path.exists(reports_dir):
+                os.makedirs(reports_dir)
+            if not os.path.exists(res_dir):
+                os.makedirs(res_dir)
+
+            # 优化依赖检查逻辑 - 只在必要时安装依赖
+            requirements_file = os.path.join(packer_fuzzer_dir, 'requirements.txt')
+            installed_flag = os.path.join(packer_fuzzer_dir, '.installed')
+
+            # 检查是否需要安装依赖
+            need_install = False
+            if not os.path.exists(installed_flag):
+                # 从未安装过依赖
+                need_install = True
+            elif os.path.exists(requirements_file) and os.path.exists(installed_flag):
+                # 检查 requirements.txt 是否比标记文件更新
+                if os.path.getmtime(requirements_file) > os.path.getmtime(installed_flag):
                     need_install = True
-                elif os.path.exists(requirements_file) and os.path.exists(installed_flag):
-                    # 检查 requirements.txt 是否比标记文件更新
-                    if os.path.getmtime(requirements_file) > os.path.getmtime(installed_flag):
-                        need_install = True
-
-                if need_install:
-                    # print(Fore.GREEN + "正在项目虚拟环境中安装Packer-Fuzzer依赖..." + Style.RESET_ALL)
-                    message = f"\n[{current_time}] 正在项目虚拟环境中安装Packer-Fuzzer依赖..."
-                    print(set_color(message, fore="blue"), end='')
-                    # 使用项目根目录下的虚拟环境pip来安装Packer-Fuzzer目录中的requirements.txt
-                    subprocess.run([
-                        venv_pip, 'install', '-r', os.path.join(packer_fuzzer_dir, 'requirements.txt')
-                    ], cwd=project_root, check=True)
-
-                    # 创建或更新标记文件
-                    with open(installed_flag, 'w') as f:
-                        f.write(str(time.time()))
-                else:
-                    # print(Fore.GREEN + "Packer-Fuzzer依赖已安装，跳过安装步骤" + Style.RESET_ALL)
-                    message = f"\n[{current_time}] Packer-Fuzzer依赖已安装，跳过安装步骤"
-                    print(set_color(message, fore="blue"), end='')
-
-                # 设置环境变量以解决编码问题
-                env = os.environ.copy()
-                env['PYTHONIOENCODING'] = 'utf-8'
-                if sys.platform == "win32":
-                    env['PYTHONLEGACYWINDOWSFSENCODING'] = '1'
-
-                # 运行 Packer-Fuzzer 扫描，使用 errors='ignore' 或 errors='replace' 来处理编码问题
-                message = f"\n[{current_time}] 正在运行Packer-Fuzzer扫描..."
+
+            if need_install:
+                # print(Fore.GREEN + "正在项目虚拟环境中安装Packer-Fuzzer依赖..." + Style.RESET_ALL)
+                message = f"\n[{current_time}] 正在项目虚拟环境中安装Packer-Fuzzer依赖..."
                 print(set_color(message, fore="blue"), end='')
-                # print(Fore.GREEN + "" + Style.RESET_ALL)
-                result = subprocess.run([
-                    venv_python, 'PackerFuzzer.py', '-u', url,'-t','adv'
-                ], cwd=packer_fuzzer_dir,  # 使用完整的 Packer-Fuzzer 目录路径
-                   capture_output=True, text=True, env=env,
-                   errors='replace', encoding='utf-8')  # 添加 encoding='utf-8' 参数
-
-                # 查找生成的HTML报告
-                import glob
-                # 更新报告路径为 script/Packer-Fuzzer/reports
-                report_files = glob.glob(os.path.join(packer_fuzzer_dir, 'reports', '*.html'))
-                if report_files:
-                    latest_report = max(report_files, key=os.path.getctime)
-                    message = f"\n[{current_time}]  Packer-Fuzzer扫描报告已找到:"
-                    print(set_color(message, fore="blue"), end='')
-                    # print(Fore.GREEN + "\nPacker-Fuzzer扫描报告已找到:" + Style.RESET_ALL)
-                    message = f"[{current_time}] 报告路径: {latest_report}"
-                    print(set_color(message, fore="blue"), end='')
-                    message = f"\n [{current_time}] 您可以在浏览器中打开此HTML报告查看详细的扫描结果。"
-                    print(set_color(message, fore="blue"), end='')
-                    # print(Fore.CYAN + "\n您可以在浏览器中打开此HTML报告查看详细的扫描结果。" + Style.RESET_ALL)
-                    message = f"[{current_time}] 报告包含检测到的漏洞、API端点和其他发现的信息。"
-                    print(set_color(message, fore="blue"), end='')
-                    # print(Fore.CYAN + "报告包含检测到的漏洞、API端点和其他发现的信息。" + Style.RESET_ALL)
-                else:
-                    # print(Fore.YELLOW + "\n未找到HTML报告。检查Packer-Fuzzer是否成功完成。" + Style.RESET_ALL)
-                    message = f"\n[{current_time}] 未找到HTML报告。检查Packer-Fuzzer是否成功完成。"
-                    print(set_color(message, fore="yellow"), end='')
-                # 输出结果
-                # print(Fore.GREEN + "\nPacker-Fuzzer扫描结果:" + Style.RESET_ALL)
-                message = f"\n[{current_time}] Packer-Fuzzer扫描结果:"
-                print(set_color(message, fore="green"), end='')
-                # print(f"[{current_time}]"+ result.stdout)
-                message = f"\n[{current_time}]" + result.stdout + ""
-                print(set_color(message, fore="green"), end='')
-
-                if result.stderr:
-                    pass
-                    # print(Fore.RED + "Packer-Fuzzer:" + Style.RESET_ALL)
-                    message = f"\n[{current_time}] Packer-Fuzzer"
-                    print(set_color(message, fore="yellow"), end='')
-
-                    print(set_color(f"\n[{current_time}]" + result.stderr, fore="green"), end='')
-                    # print(result.stderr)
+                # 使用项目根目录下的虚拟环境pip来安装Packer-Fuzzer目录中的requirements.txt
+                subprocess.run([
+                    venv_pip, 'install', '-r', os.path.join(packer_fuzzer_dir, 'requirements.txt')
+                ], cwd=project_root, check=True)
+
+                # 创建或更新标记文件
+                with open(installed_flag, 'w') as f:
+                    f.write(str(time.time()))
             else:
-                # print(Fore.RED + "resources/bypass403_url.txt中未找到URL" + Style.RESET_ALL)
-                message = f"[{current_time}] bypass403_url.txt中未找到URL"
-                print(set_color(message, fore="red"), end='')
+                # print(Fore.GREEN + "Packer-Fuzzer依赖已安装，跳过安装步骤" + Style.RESET_ALL)
+                message = f"\n[{current_time}] Packer-Fuzzer依赖已安装，跳过安装步骤"
+                print(set_color(message, fore="blue"), end='')
+
+            # 设置环境变量以解决编码问题
+            env = os.environ.copy()
+            env['PYTHONIOENCODING'] = 'utf-8'
+            if sys.platform == "win32":
+                env['PYTHONLEGACYWINDOWSFSENCODING'] = '1'
+
+            # 传入共享响应缓存的位置，Packer-Fuzzer 直接复用已下载的页面和JS文件
+            cache = get_cache()
+            if cache:
+                env['DIRSEARCH_RESPONSE_CACHE'] = cache.path
+                env['DIRSEARCH_RESPONSE_CACHE_MODULE'] = lib.connection.cache.__file__
+                env['DIRSEARCH_RESPONSE_CACHE_TTL'] = str(cache.ttl)
+                env['DIRSEARCH_RESPONSE_CACHE_SIZE'] = str(options["response_cache_size"])
+                env['DIRSEARCH_RESPONSE_CACHE_RUN'] = cache.run
+
+            # 传入共享传输层的位置和重试、速率限制设置，Packer-Fuzzer 的请求使用相同的连接和重试策略
+            from lib.connection import transport
+
+            env['DIRSEARCH_TRANSPORT_MODULE'] = transport.__file__
+            env['DIRSEARCH_TRANSPORT_RETRIES'] = str(options["max_retries"])
+            env['DIRSEARCH_TRANSPORT_MAX_RATE'] = str(options["max_rate"])
+            env['DIRSEARCH_TRANSPORT_TIMEOUT'] = str(options["timeout"])
+
+            # 运行 Packer-Fuzzer 扫描，使用 errors='ignore' 或 errors='replace' 来处理编码问题
+            message = f"\n[{current_time}] 正在运行Packer-Fuzzer扫描..."
+            print(set_color(message, fore="blue"), end='')
+            # print(Fore.GREEN + "" + Style.RESET_ALL)
+            result = subprocess.run([
+                venv_python, 'PackerFuzzer.py', '-u', url,'-t','adv'
+            ], cwd=packer_fuzzer_dir,  # 使用完整的 Packer-Fuzzer 目录路径
+               capture_output=True, text=True, env=env,
+               errors='replace', encoding='utf-8')  # 添加 encoding='utf-8' 参数
+
+            # 查找生成的HTML报告
+            import glob
+            # 更新报告路径为 script/Packer-Fuzzer/reports
+            report_files = glob.glob(os.path.join(packer_fuzzer_dir, 'reports', '*.html'))
+            if report_files:
+                latest_report = max(report_files, key=os.path.getctime)
+                message = f"\n[{current_time}]  Packer-Fuzzer扫描报告已找到:"
+                print(set_color(message, fore="blue"), end='')
+                # print(Fore.GREEN + "\nPacker-Fuzzer扫描报告已找到:" + Style.RESET_ALL)
+                message = f"[{current_time}] 报告路径: {latest_report}"
+                print(set_color(message, fore="blue"), end='')
+                message = f"\n [{current_time}] 您可以在浏览器中打开此HTML报告查看详细的扫描结果。"
+                print(set_color(message, fore="blue"), end='')
+                # print(Fore.CYAN + "\n您可以在浏览器中打开此HTML报告查看详细的扫描结果。" + Style.RESET_ALL)
+                message = f"[{current_time}] 报告包含检测到的漏洞、API端点和其他发现的信息。"
+                print(set_color(message, fore="blue"), end='')
+                # print(Fore.CYAN + "报告包含检测到的漏洞、API端点和其他发现的信息。" + Style.RESET_ALL)
+            else:
+                # print(Fore.YELLOW + "\n未找到HTML报告。检查Packer-Fuzzer是否成功完成。" + Style.RESET_ALL)
+                message = f"\n[{current_time}] 未找到HTML报告。检查Packer-Fuzzer是否成功完成。"
+                print(set_color(message, fore="yellow"), end='')
+            # 输出结果
+            # print(Fore.GREEN + "\nPacker-Fuzzer扫描结果:" + Style.RESET_ALL)
+            message = f"\n[{current_time}] Packer-Fuzzer扫描结果:"
+            print(set_color(message, fore="green"), end='')
+            # print(f"[{current_time}]"+ result.stdout)
+            message = f"\n[{current_time}]" + result.stdout + ""
+            print(set_color(message, fore="green"), end='')
+
+            if result.stderr:
+                pass
+                # print(Fore.RED + "Packer-Fuzzer:" + Style.RESET_ALL)
+                message = f"\n[{current_time}] Packer-Fuzzer"
+                print(set_color(message, fore="yellow"), end='')
+
+                print(set_color(f"\n[{current_time}]" + result.stderr, fore="green"), end='')
+                # print(result.stderr)
         else:
-            message = f"[{current_time}] 未找到bypass403_url.txt"
+            message = f"[{current_time}] 未找到扫描目标URL"
             print(set_color(message, fore="red"), end='')
-            # print(Fore.RED + "未找到resources/bypass403_url.txt" + Style.RESET_ALL)
     except Exception as e:
         message = f"[{current_time}] Packer-Fuzzer扫描期间出错: {str(e)}"
         print(set_color(message, fore="red"), end='')
         # print(Fore.RED + f"Packer-Fuzzer扫描期间出错: {str(e)}" + Style.RESET_ALL)
 
 
-def subfinder_scan():
+def subfinder_scan(url):
     """
     调用 subfinder 子域名扫描模块
+
+    参数:
+        url (str): 扫描目标URL
     """
-    import os
     import time
-    from lib.core.options import parse_options
     from lib.view.colors import set_color
     
     current_time = time.strftime("%H:%M:%S")
@@ -551,38 +512,31 @@ def subfinder_scan():
     print(set_color(message, fore="blue"))
     
     try:
-        # 检查 resources/bypass403_url.txt 文件是否存在并读取URL
-        if os.path.exists('resources/bypass403_url.txt'):
-            with open('resources/bypass403_url.txt', 'r') as f:
-                url = f.read().strip()
-
-            if url:
-                url = url.replace("https://", "").replace("http://", "")
-                url = url.rstrip("/")
-                message = f"[{current_time}]扫描目标: {url}"
-                print(set_color(message, fore="blue"))
-                # 导入并调用 subfinder 模块
-                from lib.subfinderX.subfinder import run_subfinder
-                
-                # 调用 subfinder 进行扫描
-                run_subfinder(
-                    domain=url,
-                    deep=5,
-                    dict_file="test.txt",
-                    enable_http=True,
-                    random_check=True
-                )
-                
-                current_time = time.strftime("%H:%M:%S")
-                message = f"[{current_time}] SubFinder扫描完成"
-                print(set_color(message, fore="green"))
-            else:
-                current_time = time.strftime("%H:%M:%S")
-                message = f"[{current_time}] bypass403_url.txt中未找到有效URL"
-                print(set_color(message, fore="red"))
+        url = url.strip()
+
+        if url:
+            url = url.replace("https://", "").replace("http://", "")
+            url = url.rstrip("/")
+            message = f"[{current_time}]扫描目标: {url}"
+            print(set_color(message, fore="blue"))
+            # 导入并调用 subfinder 模块
+            from lib.subfinderX.subfinder import run_subfinder
+            
+            # 调用 subfinder 进行扫描
+            run_subfinder(
+                domain=url,
+                deep=5,
+                dict_file="test.txt",
+                enable_http=True,
+                random_check=True
+            )
+            
+            current_time = time.strftime("%H:%M:%S")
+            message = f"[{current_time}] SubFinder扫描完成"
+            print(set_color(message, fore="green"))
         else:
             current_time = time.strftime("%H:%M:%S")
-            message = f"[{current_time}] 未找到 resources/bypass403_url.txt文件"
+            message = f"[{current_time}] 未找到有效的扫描目标URL"
             print(set_color(message, fore="red"))
             
     except Exception as e:
@@ -591,17 +545,96 @@ def subfinder_scan():
         print(set_color(message, fore="red"))
 
 
+def cache_report():
+    """
+    输出共享响应缓存在各阶段的命中率和节省的流量
+    """
+    cache = get_cache()
+    if not cache:
+        return
+
+    for stage, stats in cache.stats().items():
+        if not stats["requests"]:
+            continue
+
+        current_time = time.strftime("%H:%M:%S")
+        hit_rate = stats["hits"] / stats["requests"] * 100
+        message = (
+            f"[{current_time}] 响应缓存 {stage}: 命中 {stats['hits']}/{stats['requests']} "
+            f"({hit_rate:.1f}%)，节省 {stats['bytes_saved'] / 1024:.1f} KB"
+        )
+        output.new_line(set_color(message, fore="cyan"))
+
+
+def transport_report():
+    """
+    输出共享传输层在各阶段的请求数、失败和重试次数，以及建立的连接数
+    """
+    from lib.connection.transport import get_transport
+
+    transport = get_transport()
+    stats = transport.stats()
+    if not stats:
+        return
+
+    for stage, stage_stats in sorted(stats.items()):
+        current_time = time.strftime("%H:%M:%S")
+        message = (
+            f"[{current_time}] 传输层 {stage}: 请求 {stage_stats['requests']}，失败 {stage_stats['errors']}，"
+            f"重试 {stage_stats['retries']}，平均耗时 {stage_stats['elapsed'] / stage_stats['requests'] * 1000:.1f} ms"
+        )
+        output.new_line(set_color(message, fore="cyan"))
+
+    current_time = time.strftime("%H:%M:%S")
+    requests = sum(stage_stats["requests"] for stage_stats in stats.values())
+    message = f"[{current_time}] 传输层: 共 {requests} 个请求，建立 {transport.connections()} 个连接"
+    output.new_line(set_color(message, fore="cyan"))
+
+
+def compile_wordlists():
+    """
+    子命令 compile-wordlists：预编译字典缓存
+
+    字典和展开选项(-w/-e/-f/-O/--prefixes/--suffixes/大小写等)的取值方式与扫描时相同，
+    之后使用相同字典和选项的扫描直接映射缓存文件，不必重新展开字典。
+
+    用法:
+        python dirsearchplus.py compile-wordlists -w db/dicc.txt -e php,jsp
+    """
+    from lib.core.dictionary import Dictionary
+    from lib.core.options import parse_options
+    from lib.core.wordlist_cache import cache_path
+
+    del sys.argv[1]
+    options.update(parse_options(require_urls=False))
+    options["wordlist_cache"] = True
+
+    start = time.perf_counter()
+    dictionary = Dictionary(files=options["wordlists"])
+    path = cache_path(options["wordlists"])
+    elapsed = time.perf_counter() - start
+
+    if not os.path.isfile(path):
+        output.error(f"Couldn't write the wordlist cache to {path}")
+        exit(1)
+
+    print(f"字典条目数: {len(dictionary)}，缓存文件: {path} ({os.path.getsize(path) / 1024:.1f} KB)，耗时 {elapsed:.2f}s")
+
+
 def run():
     """
     主函数，负责执行一系列安全扫描和检测功能
 
-    该函数按顺序调用多个安全检测模块，包括漏洞扫描、JS文件分析、
-    403绕过测试、指纹识别、打包器模糊测试和Swagger接口扫描等功能。
+    目录扫描、JS文件分析、403绕过测试、打包器模糊测试、子域名扫描和Swagger接口扫描
+    通过进程内的事件总线连接：上游发现的路径、403页面和JS中的URL以事件形式发布，
+    下游阶段在各自线程中边接收边处理，例如目录扫描进行的同时就开始403绕过。
+    所有阶段结束后输出指纹识别结果。
     """
-    current_time = time.strftime("%H:%M:%S")
+    if sys.argv[1:2] == ["compile-wordlists"]:
+        compile_wordlists()
+        return
 
-    # 执行基础初始化操作
-    hhh()
+    current_time = time.strftime("%H:%M:%S")
 
     # 导入并解析命令行选项配置
     from lib.core.options import parse_options
@@ -609,33 +642,49 @@ def run():
     # 更新全局选项配置
     options.update(parse_options())
 
-    # 初始化并运行主控制器
-    Controller()
+    bus = EventBus()
 
-    # 执行JavaScript文件查找和分析
-    print(set_color(f"[{current_time}] 执行JavaScript文件查找和分析 ", fore="blue"))
-    jsfind()
+    # 按事件的生产、消费顺序注册，结束时依次等待各阶段处理完剩余事件
+    if module_enabled('jsfind'):
+        print(set_color(f"[{current_time}] 执行JavaScript文件查找和分析 ", fore="blue"))
+        bus.add_stage("jsfind", (TARGET,), lambda event: jsfind(event.data, bus))
 
-    # 运行403 Forbidden状态码绕过测试
-    print(set_color(f"[{current_time}] 运行403 Forbidden状态码绕过测试 ", fore="blue"))
-    run_bypass403()
+    if module_enabled('bypass'):
+        print(set_color(f"[{current_time}] 运行403 Forbidden状态码绕过测试 ", fore="blue"))
+        add_bypass_stage(bus)
 
-    # 执行EHole指纹识别工具
-    print(set_color(f"[{current_time}] 执行EHole指纹识别工具 ", fore="blue"))
-    ehole()
+    if module_enabled('swagger'):
+        print(set_color(f"[{current_time}] Swagger接口扫描 ", fore="blue"))
+        add_swagger_stage(bus)
 
-    # 运行打包器模糊测试
-    print(set_color(f"[{current_time}] 运行打包器模糊测试 ", fore="blue"))
-    packer_fuzzer()
+    if module_enabled('packer_fuzzer'):
+        print(set_color(f"[{current_time}] 运行打包器模糊测试 ", fore="blue"))
+        bus.add_stage("packer_fuzzer", (TARGET,), lambda event: packer_fuzzer(event.data))
 
-    # 运行SubFinder子域名扫描
     print(set_color(f"[{current_time}] SubFinder子域名扫描 ", fore="blue"))
-    subfinder_scan()
+    bus.add_stage("subfinder", (TARGET,), lambda event: subfinder_scan(event.data))
+
+    bus.start()
+
+    targets = list(options["urls"] or ())
+    for url in targets:
+        bus.publish(TARGET, url)
+
+    # 初始化并运行主控制器，扫描结果实时发布到事件总线
+    from lib.controller.controller import Controller
+
+    controller = Controller(bus)
+
+    bus.close()
+
+    # 执行EHole指纹识别工具
+    if targets:
+        current_time = time.strftime("%H:%M:%S")
+        print(set_color(f"[{current_time}] 执行EHole指纹识别工具 ", fore="blue"))
+        ehole(targets[0], controller)
 
-    # 执行Swagger接口扫描
-    print(set_color(f"[{current_time}] Swagger接口扫描 ", fore="blue"))
-    swagger_scan()
+    cache_report()
+    transport_report()
 
 if __name__ == "__main__":
-    q = queue.Queue()
     run()
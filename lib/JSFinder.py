@@ -1,4 +1,4 @@
-import requests, argparse, sys, re, csv, os
+import argparse, sys, re, csv, os
 import urllib3
 import time
 from urllib.parse import urlparse
@@ -8,6 +8,8 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 from concurrent.futures import ThreadPoolExecutor
 
+from lib.connection.cache import cached_fetch
+from lib.connection.transport import get_transport
 from lib.view.terminal import output
 from lib.view.colors import set_color
 
@@ -147,7 +149,10 @@ def Extract_html(URL):
         }
     # "Cookie": args.cookie}
     try:
-        raw = requests.get(URL, headers=header, timeout=3, verify=False)
+        raw = cached_fetch(
+            "GET", URL, lambda: get_transport().request("GET", URL, stage="jsfind", headers=header, timeout=3),
+            headers=header, stage="jsfind",
+        )
         raw = raw.content.decode("utf-8", "ignore")
         return raw
     except:
@@ -438,13 +443,14 @@ def find_by_file(file_path, js=False):
     return urls
 
 
-def giveresult(urls, domian):
+def giveresult(urls, domian, callback=None):
     """
     处理和输出结果，包括状态码检测和文件保存
 
     Args:
         urls (list): URL列表
         domian (str): 域名
+        callback (callable, optional): 每探测到一个存活URL时调用，参数为 (url, status_code)
 
     Returns:
         None
@@ -471,7 +477,10 @@ def giveresult(urls, domian):
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36'}
-            res = requests.get(url, headers=headers, verify=False, timeout=2)
+            res = cached_fetch(
+                "GET", url, lambda: get_transport().request("GET", url, stage="jsfind", headers=headers, timeout=2),
+                headers=headers, stage="jsfind",
+            )
             status_code = res.status_code
             soup = BeautifulSoup(res.content, 'html.parser')
             title_tag = soup.find('title')
@@ -496,12 +505,8 @@ def giveresult(urls, domian):
             if not any(url.endswith(ext) for ext in Exclusions):
 
                 sss.append({"URL": url, "Code": str(status_code), "title": str(title)})
-                if status_code == 403:
-                    try:
-                        with open('jsfind403list.txt', 'a+') as f:
-                            f.write(str(url) + '\n')
-                    except:
-                        pass
+                if callback:
+                    callback(url, status_code)
 
     def main():
         """
@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,re
+import os
 from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
 from .common import readConfig
 from .common.utils import Utils
 from .Database import DatabaseType
 from .common.CreatLog import creatLog
 from .common.cmdline import CommandLines
+from .common.apiExtractor import ApiExtractor,initWorker,extractWorker
 
 
 class Apicollect():
@@ -15,119 +17,61 @@ class Apicollect():
     def __init__(self, projectTag, options):
         self.options = options
         self.projectTag = projectTag
-        self.regxs = [r'\w\.get\(\"(.*?)\"\,',
-                      r'\w\.post\(\"(.*?)\"\,',
-                      r'\w\.post\(\"(.*?)\"',
-                      r'\w\.get\(\"(.*?)\"',
-                      r'\w\+\"(.*?)\"\,',
-                      r'\:{url\:\"(.*?)\"\,',
-                      r'return\s.*?\[\".\"\]\.post\(\"(.*?)\"',
-                      r'return\s.*?\[\".\"\]\.get\(\"(.*?)\"']
-        self.baseUrlRegxs = [r'url.?\s?\:\s?\"(.*?)\"',
-                             r'url.?\s?\+\s?\"(.*?)\"',
-                             r'url.?\s?\=\s?\"(.*?)\"',
-                             r'host\s?\:\s?\"(.*?)\"']
         self.baseUrlPaths = []
-        self.apiPaths = []
-        self.completeUrls = []
+        # (API路径, 来源JS文件在 jsFiles 中的序号)
+        self.apiPaths = set()
+        self.apiHits = 0
+        self.jsFiles = []
+        self.completeUrls = set()
         self.apiExts = readConfig.ReadConfig().getValue('blacklist', 'apiExts')[0]
+        self.processes = int(readConfig.ReadConfig().getValue('apiCollect', 'processes')[0]) or os.cpu_count() or 1
+        self.processBytes = int(readConfig.ReadConfig().getValue('apiCollect', 'processBytes')[0])
         self.log = creatLog().get_logger()
 
-    def apiCollect(self, filePath):
-        with open(filePath, "r", encoding="utf-8",errors="ignore") as jsPath:
-            apiStr = jsPath.read()
-            for regx in self.regxs:
-                apiLists = re.findall(regx, apiStr)
-                for apiPath in apiLists:
-                    if apiPath != '' and '/' in apiPath:
-                        for apiExt in self.apiExts.split(","):
-                            if apiExt not in apiPath:
-                                flag = 1
-                            else:
-                                flag = 0
-                                break
-                        if flag:
-                            if "?" in apiPath:
-                                apiPath = apiPath.split("?")[0]
-                                self.apiPaths.append(apiPath + "§§§" + filePath)
-                            else:
-                                self.apiPaths.append(apiPath + "§§§" + filePath)
-                        else:
-                            try:
-                                self.apiTwiceCollect(apiPath, filePath)
-                                self.log.debug("api二次提取模块正常")
-                            except Exception as e:
-                                self.log.error("[Err] %s" % e)
+    def listFiles(self):
+        """
+        列出项目目录中需要提取的JS文件
 
-    def apiViolentCollect(self, filePath):
-        violentRe = r'(?isu)"([^"]+)'
-        with open(filePath, "r", encoding="utf-8",errors="ignore") as jsPath:
-            self.log.info(Utils().tellTime() + Utils().getMyWord("{api_violent_file}") + Utils().getFilename(filePath))
-            apiStr = jsPath.read()
-            apiLists = re.findall(violentRe, apiStr)
-            for apiPath in apiLists:
-                if apiPath != '' and '/' in apiPath and apiPath != "/":
-                    for apiExt in self.apiExts.split(","):
-                        if apiExt not in apiPath:
-                            flag = 1
-                        else:
-                            flag = 0
-                            break
-                    if flag:
-                        if "?" in apiPath:
-                            apiPath = apiPath.split("?")[0]
-                            self.apiPaths.append(apiPath + "§§§" + filePath)
-                        else:
-                            self.apiPaths.append(apiPath + "§§§" + filePath)
+        :return: 文件路径列表
+        """
+        projectPath = DatabaseType(self.projectTag).getPathfromDB()
+        filePaths = []
+        for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
+            for filename in filenames:
+                if not DatabaseType.isDatabaseFile(self.projectTag, filename):
+                    filePaths.append(os.path.join(parent, filename))
+        return filePaths
 
-    def apiTwiceCollect(self, api_str, filePath):
-        for regx in self.regxs:
-            apiLists = re.findall(regx, api_str)
-            for apiPath in apiLists:
-                apiPaths = []
-                if apiPath != '' and '/' in apiPath:
-                    for api_ext in self.apiExts.split(","):
-                        if api_ext not in apiPath:
-                            flag = 1
-                        else:
-                            flag = 0
-                            break
-                    if flag:
-                        self.apiPaths.append(apiPath + "§§§" + filePath)
+    def extractFiles(self, filePaths, baseUrl):
+        """
+        提取所有文件，每个文件只读取一次；文件总大小超过 processBytes 时使用进程池
 
-    def getBaseurl(self, filePath):
-        baseURL = CommandLines().cmd().baseurl
-        if baseURL == None:
-            if "/" not in self.baseUrlPaths:
-                self.baseUrlPaths.append("/")  # 加入一个默认的
-            with open(filePath, "r", encoding="utf-8",errors="ignore") as js_path:
-                baseUrlStr = js_path.read()
-                for baseurlRegx in self.baseUrlRegxs:
-                    baseurLists = re.findall(baseurlRegx, baseUrlStr)
-                    for baseurlPath in baseurLists:
-                        if baseurlPath != '' and '/' in baseurlPath and baseurlPath != "/" and len(baseurlPath) > 3 and len(
-                                baseurlPath) < 20:
-                            for apiExt in self.apiExts.split(","):
-                                if apiExt not in baseurlPath:
-                                    flag = 1
-                                else:
-                                    flag = 0
-                                    break
-                            if flag:
-                                if baseurlPath[0] == "/":
-                                    baseurlPath = baseurlPath[1:]
-                                if "?" in baseurlPath:
-                                    baseurlPath = baseurlPath.split("?")[0]
-                                    self.baseUrlPaths.append(baseurlPath)
-                                else:
-                                    self.baseUrlPaths.append(baseurlPath)
+        :param filePaths: 文件路径列表
+        :param baseUrl: 是否提取baseurl
+        :return: 生成 (文件路径, extract 的结果, 错误信息)
+        """
+        totalBytes = 0
+        for filePath in filePaths:
+            try:
+                totalBytes += os.path.getsize(filePath)
+            except OSError:
+                pass
+        if self.processes > 1 and len(filePaths) > 1 and totalBytes >= self.processBytes:
+            workers = min(self.processes, len(filePaths))
+            with ProcessPoolExecutor(workers, initializer=initWorker, initargs=(self.apiExts, baseUrl)) as pool:
+                chunksize = max(1, len(filePaths) // (workers * 4))
+                for filePath, (result, error) in zip(filePaths, pool.map(extractWorker, filePaths, chunksize=chunksize)):
+                    yield filePath, result, error
         else:
-            baseURLs = baseURL.split(',')
-            self.baseUrlPaths = baseURLs
+            extractor = ApiExtractor(self.apiExts, baseUrl)
+            for filePath in filePaths:
+                try:
+                    yield filePath, extractor.extractFile(filePath), None
+                except Exception as e:
+                    yield filePath, None, str(e)
 
     def apiComplete(self):
         self.baseUrlPaths = list(set(self.baseUrlPaths))  # list去重
-        self.apiPaths = list(set(self.apiPaths))
         if self.options.apihost != None:
             url = self.options.apihost
         else:
@@ -145,24 +89,16 @@ class Apicollect():
         self.baseUrlPaths.insert(0,"/")
         self.baseUrlDevelop()
         for baseurl in self.baseUrlPaths:
-            for apiPath in self.apiPaths:
-                if baseurl == "/":
-                    completeUrl1 = url + apiPath
-                    completeUrl2 = hostURL + apiPath
-                    self.completeUrls.append(completeUrl1)
-                    self.completeUrls.append(completeUrl2)
-                else:
-                    completeUrl1 = url + baseurl + apiPath
-                    completeUrl2 = hostURL + baseurl + apiPath
-                    self.completeUrls.append(completeUrl1)
-                    self.completeUrls.append(completeUrl2)
-        self.completeUrls = list(set(self.completeUrls))
+            if baseurl == "/":
+                baseurl = ""
+            for apiPath, fileId in self.apiPaths:
+                self.completeUrls.add((url + baseurl + apiPath, fileId))
+                self.completeUrls.add((hostURL + baseurl + apiPath, fileId))
         fileext = ""
         if self.options.filenameextension != None:
             fileext = self.options.filenameextension
-        for completeUrl in self.completeUrls:
-            filePath = completeUrl.split("§§§")[1]
-            completeApiPath = completeUrl.split("§§§")[0]
+        records = []
+        for completeApiPath, fileId in self.completeUrls:
             if completeApiPath[-1] == "/":
                 completeApiPath = completeApiPath[:-1] + fileext
             else:
@@ -172,49 +108,43 @@ class Apicollect():
                 while("//" in completeApiPath_tmp):
                     completeApiPath_tmp = completeApiPath_tmp.replace("//", "/")
                 completeApiPath = completeApiPath.split("://", 1)[0] + "://" + completeApiPath_tmp
-            if DatabaseType(self.projectTag).apiHaveOrNot(completeApiPath):
-                DatabaseType(self.projectTag).apiRecordToDB(filePath, completeApiPath)
+            records.append((self.jsFiles[fileId], completeApiPath))
+        DatabaseType(self.projectTag).apiRecordManyToDB(records)
         self.log.info(Utils().tellTime() + Utils().getMyWord("{total_api_num}") + str(len(self.completeUrls)))
 
     def apireCoverStart(self):
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
-            for filename in filenames:
-                if filename != self.projectTag + ".db":
-                    filePath = os.path.join(parent, filename)
-                    try:
-                        self.apiCollect(filePath)
-                        self.getBaseurl(filePath)
-                        self.log.debug("api收集和baseurl提取成功")
-                    except Exception as e:
-                        self.log.error("[Err] %s" % e)
-        if len(self.apiPaths) < 30:  #提取结果过少时暴力破解
+        baseURL = CommandLines().cmd().baseurl
+        if baseURL == None:
+            self.baseUrlPaths.append("/")  # 加入一个默认的
+        else:
+            self.baseUrlPaths = baseURL.split(',')
+        # 每个文件只读取一次，暴力提取模式的结果同时提取，按需使用
+        self.jsFiles = self.listFiles()
+        violentPaths = {}
+        for fileId, (filePath, result, error) in enumerate(self.extractFiles(self.jsFiles, baseURL == None)):
+            if error is not None:
+                self.log.error("[Err] %s" % error)
+                continue
+            apiPaths, baseUrls, violent, hits = result
+            self.apiPaths.update((apiPath, fileId) for apiPath in apiPaths)
+            self.apiHits += hits
+            self.baseUrlPaths.extend(baseUrls)
+            violentPaths[fileId] = violent
+            self.log.debug("api收集和baseurl提取成功")
+        if self.apiHits < 30:  #提取结果过少时暴力破解
             self.log.info(Utils().tellTime() + Utils().getMyWord("{total_api_auto}"))
-            for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
-                for filename in filenames:
-                    if filename != self.projectTag + ".db":
-                        filePath = os.path.join(parent, filename)
-                        try:
-                            self.apiViolentCollect(filePath)
-                            self.log.debug("自动api暴力提取模块正常")
-                        except Exception as e:
-                            self.log.error("[Err] %s" % e)
+            open_violent = "Y"
         else:
-            self.log.info(Utils().tellTime() + Utils().getMyWord("{total_api_1}") + str(len(self.apiPaths)) + Utils().getMyWord("{total_api_2}"))
+            self.log.info(Utils().tellTime() + Utils().getMyWord("{total_api_1}") + str(self.apiHits) + Utils().getMyWord("{total_api_2}"))
             if self.options.silent != None:
                 open_violent = "Y"
             else:
                 open_violent = input(Utils().tellTime() + Utils().getMyWord("{open_violent_input}"))
-            if open_violent == "Y" or open_violent == "y":
-                for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
-                    for filename in filenames:
-                        if filename != self.projectTag + ".db":
-                            filePath = os.path.join(parent, filename)
-                            try:
-                                self.apiViolentCollect(filePath)
-                                self.log.debug("手动api暴力提取模块正常")
-                            except Exception as e:
-                                self.log.error("[Err] %s" % e)
+        if open_violent == "Y" or open_violent == "y":
+            for fileId, violent in violentPaths.items():
+                self.log.info(Utils().tellTime() + Utils().getMyWord("{api_violent_file}") + Utils().getFilename(self.jsFiles[fileId]))
+                self.apiPaths.update((apiPath, fileId) for apiPath in violent)
+            self.log.debug("api暴力提取模块正常")
         self.apiComplete()
 
     def baseUrlDevelop(self):
@@ -230,12 +160,8 @@ class Apicollect():
                     print(", ".join(self.baseUrlPaths))
                     creatLog().get_logger().info(Utils().tellTime() + Utils().getMyWord("{api_top5_list}"))
                     output = []
-                    for api in self.apiPaths[:5]:
-                        if "§§§" in api:
-                            api = api.split("§§§")[0]
-                            output.append(api)
-                        else:
-                            output.append(api)
+                    for api, fileId in list(self.apiPaths)[:5]:
+                        output.append(api)
                     print(", ".join(output))
                     baseurls = input("[!] " + Utils().getMyWord("{new_base_dir}"))
                     if "," in baseurls:
@@ -251,10 +177,6 @@ class Apicollect():
                 print(", ".join(self.baseUrlPaths))
                 creatLog().get_logger().info(Utils().tellTime() + Utils().getMyWord("{api_top5_list}"))
                 output = []
-                for api in self.apiPaths[:5]:
-                    if "§§§" in api:
-                        api = api.split("§§§")[0]
-                        output.append(api)
-                    else:
-                        output.append(api)
+                for api, fileId in list(self.apiPaths)[:5]:
+                    output.append(api)
                 print(", ".join(output))
@@ -19,10 +19,22 @@ import string
 import copy
 import base64
 import codecs
-from typing import List, Dict, Any, Tuple
-import requests
-import urllib3
+import hashlib
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Iterator
+from requests.models import PreparedRequest
+from .common import readConfig
 from .common.CreatLog import creatLog
+from .common.probeClient import ProbeClient, UserAgents
+
+
+# 每个路径最多发送的变体请求数
+MAX_VARIANTS = 30
+# 请求参数放在请求体中的方法，其余方法放在查询字符串中
+BODY_METHODS = ("POST", "PUT", "PATCH")
+# 响应内容中表示请求被WAF拦截的关键字
+WAF_INDICATORS = ('waf', 'firewall', 'blocked', 'forbidden', 'access denied')
 
 
 class BehavioralDiffEngine:
@@ -53,24 +65,16 @@ class BehavioralDiffEngine:
                 
         if self.options is None:
             self.options = DefaultOptions()
-            
-        # 初始化UserAgent列表
-        self.UserAgent = ["Mozilla/5.0 (Windows NT 6.1; WOW64; rv:34.0) Gecko/20100101 Firefox/34.0",
-                          "Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; en) Opera 9.50",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/534.57.2 (KHTML, like Gecko) Version/5.1.7 Safari/534.57.2",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.71 Safari/537.36",
-                          "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11",
-                          "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-US) AppleWebKit/534.16 (KHTML, like Gecko) Chrome/10.0.648.133 Safari/534.16",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64; Trident/7.0; rv:11.0) like Gecko",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/536.11 (KHTML, like Gecko) Chrome/20.0.1132.11 TaoBrowser/2.0 Safari/536.11",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Maxthon/4.4.3.4000 Chrome/30.0.1599.101 Safari/537.36",
-                          "Mozilla/4.0 (compatible; MSIE 7.0; Windows NT 5.1; Trident/4.0; SV1; QQDownload 732; .NET4.0C; .NET4.0E; SE 2.X MetaSr 1.0)",
-                          "Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; SV1; QQDownload 732; .NET4.0C; .NET4.0E; LBBROWSER)",
-                          "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-us) AppleWebKit/534.50 (KHTML, like Gecko) Version/5.1 Safari/534.50",
-                          "Mozilla/5.0 (compatible; MSIE 9.0; Windows NT 6.1; Trident/5.0",
-                          "Opera/9.80 (Windows NT 6.1; U; en) Presto/2.8.131 Version/11.11",
-                          "Mozilla/4.0 (compatible; MSIE 7.0; Windows NT 5.1; TencentTraveler 4.0)"]
-        
+
+        # 变体请求经共用的 ProbeClient 发送：连接复用、同主机并发限制、请求缓存与全局预算
+        self.client = ProbeClient(self.options)
+        self.threads = int(readConfig.ReadConfig().getValue('behavioralDiff', 'threads')[0])
+        self.uniform_after = int(readConfig.ReadConfig().getValue('behavioralDiff', 'uniformAfter')[0])
+
+        # 初始化UserAgent列表，未指定User-Agent的变体统一使用其中一个，避免随机UA本身造成响应差异
+        self.UserAgent = UserAgents
+        self.user_agent = random.choice(self.UserAgent)
+
     def generate_encoding_variants(self, path: str, params: Dict[str, Any] = None) -> List[Tuple[str, Dict[str, Any]]]:
         """
         生成路径和参数的不同编码变体
@@ -409,15 +413,17 @@ class BehavioralDiffEngine:
             params: 请求参数
             
         Returns:
-            Dict: 响应数据
+            Dict: 响应数据，包含预先计算的响应内容摘要 digest、响应头摘要 headers_digest 和 WAF 拦截标记 waf_blocked
         """
-        urllib3.disable_warnings()
         headers = headers or {}
         params = params or {}
+        method = method.upper()
+        if method not in ("GET", "DELETE", "HEAD", "OPTIONS") + BODY_METHODS:
+            method = "GET"  # 默认使用GET
         
         # 设置默认User-Agent
         if 'User-Agent' not in headers:
-            headers['User-Agent'] = random.choice(self.UserAgent)
+            headers['User-Agent'] = self.user_agent
             
         # 设置默认Content-Type
         if 'Content-Type' not in headers:
@@ -439,77 +445,23 @@ class BehavioralDiffEngine:
             except:
                 pass
                 
-        ssl_flag = int(getattr(self.options, 'ssl_flag', "0"))
-        proxy_data = {'http': getattr(self.options, 'proxy', None), 
-                      'https': getattr(self.options, 'proxy', None)}
-        
-        s = requests.Session()
-        s.keep_alive = False
-        
         try:
-            if method.upper() == "GET":
-                if ssl_flag == 1:
-                    response = s.get(url, headers=headers, params=params, timeout=6, 
-                                   proxies=proxy_data, verify=False)
-                else:
-                    response = s.get(url, headers=headers, params=params, timeout=6, 
-                                   proxies=proxy_data)
-            elif method.upper() == "POST":
-                if ssl_flag == 1:
-                    response = s.post(url, headers=headers, data=params, timeout=6, 
-                                    proxies=proxy_data, verify=False)
-                else:
-                    response = s.post(url, headers=headers, data=params, timeout=6, 
-                                    proxies=proxy_data)
-            elif method.upper() == "PUT":
-                if ssl_flag == 1:
-                    response = s.put(url, headers=headers, data=params, timeout=6, 
-                                   proxies=proxy_data, verify=False)
-                else:
-                    response = s.put(url, headers=headers, data=params, timeout=6, 
-                                   proxies=proxy_data)
-            elif method.upper() == "DELETE":
-                if ssl_flag == 1:
-                    response = s.delete(url, headers=headers, params=params, timeout=6, 
-                                      proxies=proxy_data, verify=False)
-                else:
-                    response = s.delete(url, headers=headers, params=params, timeout=6, 
-                                      proxies=proxy_data)
-            elif method.upper() == "HEAD":
-                if ssl_flag == 1:
-                    response = s.head(url, headers=headers, params=params, timeout=6, 
-                                    proxies=proxy_data, verify=False)
-                else:
-                    response = s.head(url, headers=headers, params=params, timeout=6, 
-                                    proxies=proxy_data)
-            elif method.upper() == "OPTIONS":
-                if ssl_flag == 1:
-                    response = s.options(url, headers=headers, params=params, timeout=6, 
-                                       proxies=proxy_data, verify=False)
-                else:
-                    response = s.options(url, headers=headers, params=params, timeout=6, 
-                                       proxies=proxy_data)
-            elif method.upper() == "PATCH":
-                if ssl_flag == 1:
-                    response = s.patch(url, headers=headers, data=params, timeout=6, 
-                                     proxies=proxy_data, verify=False)
-                else:
-                    response = s.patch(url, headers=headers, data=params, timeout=6, 
-                                     proxies=proxy_data)
+            # 参数编码方式与 requests 的 params / data 相同；请求计入全局预算，用尽时按请求失败处理
+            if method in BODY_METHODS:
+                response = self.client.fetch(method, url, data=params, headers=headers, vary=("user-agent",))
             else:
-                # 默认使用GET
-                if ssl_flag == 1:
-                    response = s.get(url, headers=headers, params=params, timeout=6, 
-                                   proxies=proxy_data, verify=False)
-                else:
-                    response = s.get(url, headers=headers, params=params, timeout=6, 
-                                   proxies=proxy_data)
-                    
+                request = PreparedRequest()
+                request.prepare_url(url, params)
+                response = self.client.fetch(method, request.url, headers=headers, vary=("user-agent",))
+            content = response.text
             return {
                 'status_code': response.status_code,
                 'headers': dict(response.headers),
-                'content': response.text,
-                'content_length': len(response.text),
+                'content': content,
+                'content_length': len(content),
+                'digest': hashlib.sha1(content.encode('utf-8', 'replace')).hexdigest(),
+                'headers_digest': hash(frozenset(response.headers.items())),
+                'waf_blocked': any(indicator in content.lower() for indicator in WAF_INDICATORS),
                 'url': url,
                 'method': method
             }
@@ -520,103 +472,137 @@ class BehavioralDiffEngine:
                 'url': url,
                 'method': method
             }
-        
-    def send_requests_and_analyze(self, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+
+    def iter_variants(self, path: str, params: Dict[str, Any] = None) -> Iterator[Tuple]:
         """
-        发送多种变体请求并分析响应差异
+        按固定顺序逐类生成请求变体，只有在前面的变体都已取出后才生成下一类
         
         Args:
             path: 请求路径
             params: 请求参数
             
         Returns:
-            Dict[str, Any]: 分析结果
+            Iterator[Tuple]: (路径, 参数[, 方法[, 请求头]]) 元组
         """
-        results = {
-            'path': path,
-            'responses': [],
-            'differences': [],
-            'potential_issues': []
-        }
-        
         params = params or {}
-        
-        # 生成所有变体
-        encoding_variants = self.generate_encoding_variants(path, params)
-        param_variants = self.generate_parameter_variants(params)
-        disturbance_variants = self.generate_pseudo_random_disturbances(path, params)
-        method_variants = self.generate_http_method_variants(path)
-        header_variants = self.generate_header_variants()
-        cookie_variants = self.generate_cookie_variants()
-        traversal_variants = self.generate_path_traversal_variants(path)
-        multipart_variants = self.generate_multipart_form_data(params)
-        
-        # 收集所有请求变体
-        requests_to_send = []
-        
+
         # 路径和参数编码变体
-        requests_to_send.extend(encoding_variants)
-        
+        yield from self.generate_encoding_variants(path, params)
+
         # 参数顺序变体
-        for param_variant in param_variants:
-            requests_to_send.append((path, copy.deepcopy(param_variant)))
-            
+        for param_variant in self.generate_parameter_variants(params):
+            yield (path, param_variant)
+
         # 扰动变体
-        requests_to_send.extend(disturbance_variants)
-        
+        yield from self.generate_pseudo_random_disturbances(path, params)
+
         # 方法变体（只选取一部分避免过多请求）
-        for method in method_variants[:3]:  # 限制方法数量
-            requests_to_send.append((path, copy.deepcopy(params), method))
-            
+        for method in self.generate_http_method_variants(path)[:3]:
+            yield (path, copy.deepcopy(params), method)
+
         # 头部变体（只选取一部分）
-        for header_variant in header_variants[:3]:
-            requests_to_send.append((path, copy.deepcopy(params), "GET", copy.deepcopy(header_variant)))
-            
+        for header_variant in self.generate_header_variants()[:3]:
+            yield (path, copy.deepcopy(params), "GET", header_variant)
+
         # Cookie变体
-        for cookie_variant in cookie_variants[:2]:
+        for cookie_variant in self.generate_cookie_variants()[:2]:
             header_with_cookie = copy.deepcopy(self.headers or {})
             if cookie_variant:
                 header_with_cookie['Cookie'] = cookie_variant
-            requests_to_send.append((path, copy.deepcopy(params), "GET", header_with_cookie))
-            
+            yield (path, copy.deepcopy(params), "GET", header_with_cookie)
+
         # 路径遍历变体
-        for traversal_path in traversal_variants:
-            requests_to_send.append((traversal_path, copy.deepcopy(params)))
-            
+        for traversal_path in self.generate_path_traversal_variants(path):
+            yield (traversal_path, copy.deepcopy(params))
+
         # multipart变体
-        for multipart_param in multipart_variants:
-            requests_to_send.append((path, copy.deepcopy(multipart_param)))
+        for multipart_param in self.generate_multipart_form_data(params):
+            yield (path, multipart_param)
+
+    def send_variant(self, request_item: Tuple) -> Dict:
+        """
+        发送一个请求变体
         
-        # 发送请求并收集响应
-        responses = []
-        for request_item in requests_to_send[:30]:  # 限制请求数量避免过多请求
-            try:
-                if len(request_item) == 2:
-                    req_path, req_params = request_item
-                    url = self.base_url + req_path
-                    response = self.send_request(url, "GET", copy.deepcopy(self.headers), req_params)
-                elif len(request_item) == 3:
-                    req_path, req_params, method = request_item
-                    url = self.base_url + req_path
-                    response = self.send_request(url, method, copy.deepcopy(self.headers), req_params)
-                elif len(request_item) == 4:
-                    req_path, req_params, method, headers = request_item
-                    url = self.base_url + req_path
-                    response = self.send_request(url, method, headers, req_params)
-                else:
-                    continue
-                    
-                responses.append(response)
-            except Exception as e:
-                url = self.base_url + path
-                if len(request_item) >= 1 and isinstance(request_item[0], str):
-                    url = self.base_url + request_item[0]
-                    
-                resp_data = {
-                    'url': url,
-                    'error': str(e)
-                }
-                responses.append(resp_data)
+        Args:
+            request_item: iter_variants 生成的元组
+            
+        Returns:
+            Dict: 响应数据
+        """
+        try:
+            if len(request_item) == 2:
+                req_path, req_params = request_item
+                return self.send_request(self.base_url + req_path, "GET", copy.deepcopy(self.headers), req_params)
+            req_path, req_params, method = request_item[:3]
+            headers = request_item[3] if len(request_item) == 4 else copy.deepcopy(self.headers)
+            return self.send_request(self.base_url + req_path, method, headers, req_params)
+        except Exception as e:
+            return {
+                'url': self.base_url + request_item[0],
+                'error': str(e)
+            }
+
+    def send_variants(self, request_items: List[Tuple]) -> List[Dict]:
+        """
+        并发发送一组请求变体，同一主机的并发请求数由 ProbeClient 限制
+        
+        Args:
+            request_items: 请求变体列表
+            
+        Returns:
+            List[Dict]: 与 request_items 顺序一致的响应列表
+        """
+        if len(request_items) <= 1 or self.threads <= 1:
+            return [self.send_variant(item) for item in request_items]
+        with ThreadPoolExecutor(min(self.threads, len(request_items))) as pool:
+            return list(pool.map(self.send_variant, request_items))
+
+    def _is_uniform(self, responses: List[Dict]) -> bool:
+        """
+        判断路径对所有变体的响应是否完全一致(状态码与响应内容摘要均相同)
+
+        部分变体在本地就无法构造出合法的URL，发送失败的变体不参与比较，但至少一半的变体需要得到响应。
+        
+        Args:
+            responses: 响应列表
+            
+        Returns:
+            bool: 完全一致返回True
+        """
+        valid_responses = [r for r in responses if 'error' not in r]
+        if not valid_responses or len(valid_responses) * 2 < len(responses):
+            return False
+        return len(set((r['status_code'], r['digest']) for r in valid_responses)) == 1
+
+    def send_requests_and_analyze(self, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        发送多种变体请求并分析响应差异
+        
+        先并发发送前 uniformAfter 个变体，若响应完全一致(如统一的404页面或前端路由的首页)则不再发送其余变体，
+        否则并发发送其余变体。每个路径最多发送 MAX_VARIANTS 个变体。
+        
+        Args:
+            path: 请求路径
+            params: 请求参数
+            
+        Returns:
+            Dict[str, Any]: 分析结果
+        """
+        results = {
+            'path': path,
+            'responses': [],
+            'differences': [],
+            'potential_issues': [],
+            'uniform': False
+        }
+        
+        variants = itertools.islice(self.iter_variants(path, params), MAX_VARIANTS)
+        responses = self.send_variants(list(itertools.islice(variants, self.uniform_after or MAX_VARIANTS)))
+        if self.uniform_after and len(responses) >= self.uniform_after and self._is_uniform(responses):
+            results['uniform'] = True
+            self.log.debug(f"路径 {path} 的前 {len(responses)} 个变体响应完全一致，跳过其余变体")
+        else:
+            responses.extend(self.send_variants(list(variants)))
                 
         results['responses'] = responses
         
@@ -667,7 +653,10 @@ class BehavioralDiffEngine:
                 'description': f'响应内容长度存在显著差异，最小: {min(content_lengths)}, 最大: {max(content_lengths)}'
             })
             
-        # 比较响应头差异
+        # 比较响应头差异，所有响应头完全相同时跳过
+        if len(set(r.get('headers_digest') for r in valid_responses)) == 1:
+            return differences
+
         header_keys = set()
         for r in valid_responses:
             if 'headers' in r:
@@ -703,13 +692,11 @@ class BehavioralDiffEngine:
         # WAF绕过检测 - 查找某些变体可以绕过WAF的情况
         valid_responses = [r for r in responses if 'error' not in r]
         
-        waf_indicators = ['waf', 'firewall', 'blocked', 'forbidden', 'access denied']
         blocked_responses = []
         allowed_responses = []
         
         for r in valid_responses:
-            content_lower = r.get('content', '').lower()
-            is_blocked = any(indicator in content_lower for indicator in waf_indicators)
+            is_blocked = r.get('waf_blocked', False)
             # 检查状态码是否表示被阻止
             status_code_blocked = r.get('status_code') in [403, 406, 429]
             
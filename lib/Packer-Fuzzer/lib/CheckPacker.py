@@ -1,8 +1,9 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import requests, sqlite3, warnings, os
+import sqlite3, warnings, os
 from lib.common.utils import Utils
+from lib.common.responseCache import ResponseCache
 from lib.Database import DatabaseType
 
 # 使用Packer-Fuzzer自带的日志系统
@@ -35,7 +36,7 @@ class CheckPacker():
         flag = 0
         for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
             for filename in filenames:
-                if filename != self.projectTag + ".db":
+                if not DatabaseType.isDatabaseFile(self.projectTag, filename):
                     filePath = os.path.join(parent, filename)
                     jsOpen = open(filePath, 'r', encoding='UTF-8',errors="ignore")  # 防编码报错
                     jsFile = jsOpen.readlines()
@@ -50,10 +51,7 @@ class CheckPacker():
         url = self.url
         sslFlag = int(self.options.ssl_flag)
         try:
-            if sslFlag == 1:
-                demo = requests.get(url=url, headers=headers, proxies=self.proxy_data,verify=False).text
-            else:
-                demo = requests.get(url=url, headers=headers, proxies=self.proxy_data).text
+            demo = ResponseCache.get(url, headers=headers, proxies=self.proxy_data, verify=sslFlag != 1).text
             return 1 if any(i in demo for i in self.fingerprint_html) else 0
         except Exception as e:
             # 使用Packer-Fuzzer自带的日志系统输出错误信息
@@ -5,6 +5,7 @@ import os
 from lib.ParseJs import ParseJs
 from lib.vulnTest import vulnTest
 from lib.common.utils import Utils
+from lib.common import readConfig
 from lib.getApiText import ApiText
 from lib.ApiCollect import Apicollect
 from lib.Database import DatabaseType
@@ -19,6 +20,7 @@ from lib.LoadExtensions import loadExtensions
 from lib.BehavioralDiffEngine import BehavioralDiffEngine
 from lib.ParameterPollutionDetector import ParameterPollutionDetector
 from lib.BehavioralApiDiscovery import BehavioralApiDiscovery
+from lib.common.scheduler import TestScheduler
 from lib.reports.CreatWord import Docx_replace
 from lib.common.CreatLog import creatLog,log_name,logs
 
@@ -77,63 +79,130 @@ class Project():
             creatLog().get_logger().info(Utils().tellTime() + Utils().getMyWord("{fuzzer_param}"))
             FuzzerParam(projectTag).FuzzerCollect()
         creatLog().get_logger().info(Utils().tellTime() + Utils().getMyWord("{response_end}"))
-        # 运行行为差异分析
+        # 行为差异分析、参数污染检测、行为API发现与漏洞检测共用一个调度器并发执行
+        scheduler = TestScheduler()
+        self.behavioralDiff(scheduler)
+        self.parameterPollution(projectTag, scheduler)
+        self.apiDiscovery(projectTag, scheduler)
+        vulnTest(projectTag,self.options).testStart(self.url, scheduler)
+        if self.options.type == "adv":
+            vulnTest(projectTag,self.options).advtestStart(self.options, scheduler)
+        scheduler.close()
+        vulnTest(projectTag,self.options).requestReport()
+        if self.options.ext == "on":
+            creatLog().get_logger().info("[+] " + Utils().getMyWord("{ext_start}"))
+            loadExtensions(projectTag,self.options).runExt()
+            creatLog().get_logger().info("[-] " + Utils().getMyWord("{ext_end}"))
+        vuln_num = Docx_replace(projectTag).vuln_judge()
+        co_vuln_num = vuln_num[1] + vuln_num[2] + vuln_num[3]
+        creatLog().get_logger().info("[!] " + Utils().getMyWord("{co_discovery}") + str(co_vuln_num) + Utils().getMyWord("{effective_vuln}") + ": " + Utils().getMyWord("{r_l_h}") + str(vuln_num[1]) + Utils().getMyWord("{ge}") + ", " + Utils().getMyWord("{r_l_m}") + str(vuln_num[2]) + Utils().getMyWord("{ge}") + ", " + Utils().getMyWord("{r_l_l}") + str(vuln_num[3]) + Utils().getMyWord("{ge}"))
+        CreateReport(projectTag).create_repoter()
+        creatLog().get_logger().info("[-] " + Utils().getMyWord("{all_end}"))
+
+    def behavioralDiff(self, scheduler):
+        """
+        行为差异分析，每个关键路径作为一个调度任务
+
+        :param scheduler: TestScheduler
+        """
         creatLog().get_logger().info(Utils().tellTime() + "[*] 开始行为差异分析...")
         try:
             bde = BehavioralDiffEngine(self.url, options=self.options)
-            # 对一些关键路径进行分析
-            key_paths = [
-                "/api", "/admin", "/login", "/register", "/upload", 
-                "/user", "/users", "/profile", "/settings", "/dashboard",
-                "/config", "/admin/config", "/admin/settings", "/admin/users",
-                "/api/v1", "/api/v2", "/v1/api", "/v2/api", 
-                "/auth", "/authentication", "/oauth", "/sso",
-                "/backup", "/backups", "/debug", "/logs", 
-                "/test", "/testing", "/dev", "/development"
-            ]
-            for path in key_paths:
-                try:
-                    result = bde.send_requests_and_analyze(path)
-                    if result['differences'] or result['potential_issues']:
-                        creatLog().get_logger().info(f"[!] 在路径 {path} 发现行为差异")
-                        for diff in result['differences']:
-                            creatLog().get_logger().info(f"  [-] 差异: {diff['description']}")
-                        for issue in result['potential_issues']:
-                            creatLog().get_logger().info(f"  [-] 潜在问题 ({issue['severity']}): {issue['description']}")
-                except Exception as e:
-                    creatLog().get_logger().warning(f"[!] 行为差异分析在路径 {path} 出错: {str(e)}")
         except Exception as e:
             creatLog().get_logger().warning(f"[!] 行为差异分析模块初始化失败: {str(e)}")
-            
-        # 运行参数污染检测
+            return
+        # 对一些关键路径进行分析
+        key_paths = [
+            "/api", "/admin", "/login", "/register", "/upload", 
+            "/user", "/users", "/profile", "/settings", "/dashboard",
+            "/config", "/admin/config", "/admin/settings", "/admin/users",
+            "/api/v1", "/api/v2", "/v1/api", "/v2/api", 
+            "/auth", "/authentication", "/oauth", "/sso",
+            "/backup", "/backups", "/debug", "/logs", 
+            "/test", "/testing", "/dev", "/development"
+        ]
+        for path in key_paths:
+            scheduler.submit("BehavioralDiffEngine", self.diffPath, bde, path, url=self.url)
+
+    def diffPath(self, bde, path):
+        try:
+            result = bde.send_requests_and_analyze(path)
+            if result['differences'] or result['potential_issues']:
+                creatLog().get_logger().info(f"[!] 在路径 {path} 发现行为差异")
+                for diff in result['differences']:
+                    creatLog().get_logger().info(f"  [-] 差异: {diff['description']}")
+                for issue in result['potential_issues']:
+                    creatLog().get_logger().info(f"  [-] 潜在问题 ({issue['severity']}): {issue['description']}")
+        except Exception as e:
+            creatLog().get_logger().warning(f"[!] 行为差异分析在路径 {path} 出错: {str(e)}")
+
+    def parameterPollution(self, projectTag, scheduler):
+        """
+        参数污染检测，每个候选接口作为一个调度任务
+
+        :param projectTag: 项目标识
+        :param scheduler: TestScheduler
+        """
         creatLog().get_logger().info(Utils().tellTime() + "[*] 开始参数污染检测...")
         try:
             ppd = ParameterPollutionDetector(self.url, options=self.options)
-            # 对一些关键路径进行参数污染检测
-            key_paths = [
-                "/api", "/login", "/user", "/profile", "/admin",
-                "/api/v1", "/api/v2", "/v1/api", "/v2/api"
-            ]
-            test_params = {
-                "id": "1",
-                "user": "test",
-                "action": "view"
-            }
-            
-            for path in key_paths:
-                try:
-                    result = ppd.detect_parameter_pollution(path, test_params)
-                    if result['vulnerabilities']:
-                        creatLog().get_logger().info(f"[!] 在路径 {path} 发现参数污染漏洞")
-                        report = ppd.format_vulnerability_report(result)
-                        creatLog().get_logger().info(f"  [-] 检测报告:\n{report}")
-                except Exception as e:
-                    creatLog().get_logger().warning(f"[!] 参数污染检测在路径 {path} 出错: {str(e)}")
         except Exception as e:
             creatLog().get_logger().warning(f"[!] 参数污染检测模块初始化失败: {str(e)}")
-        
-        # 运行行为API发现
+            return
+        for path, method in self.pollutionEndpoints(projectTag):
+            scheduler.submit("ParameterPollutionDetector", self.pollutePath, ppd, path, method, url=self.url)
+
+    def pollutionEndpoints(self, projectTag):
+        """
+        逐个产生参数污染检测的候选接口：先是API收集阶段确认可访问的接口，再补充一些关键路径
+
+        :param projectTag: 项目标识
+        :return: 生成 (路径或完整URL, 请求方法)
+        """
+        maxEndpoints = int(readConfig.ReadConfig().getValue('parameterPollution', 'maxEndpoints')[0])
+        count = 0
+        # success为1的接口用GET请求，为2的接口用POST请求
+        for paths, method in ((DatabaseType(projectTag).sucesssPathFromDB, "GET"),
+                              (DatabaseType(projectTag).wrongMethodFromDB, "POST")):
+            for path in paths():
+                if maxEndpoints and count >= maxEndpoints:
+                    return
+                count += 1
+                yield path, method
+        # 对一些关键路径进行参数污染检测
+        key_paths = [
+            "/api", "/login", "/user", "/profile", "/admin",
+            "/api/v1", "/api/v2", "/v1/api", "/v2/api"
+        ]
+        for path in key_paths:
+            yield path, "GET"
+
+    def pollutePath(self, ppd, path, method="GET"):
+        test_params = {
+            "id": "1",
+            "user": "test",
+            "action": "view"
+        }
+        try:
+            result = ppd.detect_parameter_pollution(path, test_params, method)
+            if result['vulnerabilities']:
+                creatLog().get_logger().info(f"[!] 在路径 {path} 发现参数污染漏洞")
+                report = ppd.format_vulnerability_report(result)
+                creatLog().get_logger().info(f"  [-] 检测报告:\n{report}")
+        except Exception as e:
+            creatLog().get_logger().warning(f"[!] 参数污染检测在路径 {path} 出错: {str(e)}")
+
+    def apiDiscovery(self, projectTag, scheduler):
+        """
+        行为API发现，只分析已保存的数据，作为一个调度任务
+
+        :param projectTag: 项目标识
+        :param scheduler: TestScheduler
+        """
         creatLog().get_logger().info(Utils().tellTime() + "[*] 开始行为API发现...")
+        scheduler.submit("BehavioralApiDiscovery", self.discoverApis, projectTag)
+
+    def discoverApis(self, projectTag):
         try:
             # 获取JS文件内容
             js_contents = []
@@ -160,16 +229,3 @@ class Project():
             
         except Exception as e:
             creatLog().get_logger().warning(f"[!] 行为API发现模块执行失败: {str(e)}")
-        
-        vulnTest(projectTag,self.options).testStart(self.url)
-        if self.options.type == "adv":
-            vulnTest(projectTag,self.options).advtestStart(self.options)
-        if self.options.ext == "on":
-            creatLog().get_logger().info("[+] " + Utils().getMyWord("{ext_start}"))
-            loadExtensions(projectTag,self.options).runExt()
-            creatLog().get_logger().info("[-] " + Utils().getMyWord("{ext_end}"))
-        vuln_num = Docx_replace(projectTag).vuln_judge()
-        co_vuln_num = vuln_num[1] + vuln_num[2] + vuln_num[3]
-        creatLog().get_logger().info("[!] " + Utils().getMyWord("{co_discovery}") + str(co_vuln_num) + Utils().getMyWord("{effective_vuln}") + ": " + Utils().getMyWord("{r_l_h}") + str(vuln_num[1]) + Utils().getMyWord("{ge}") + ", " + Utils().getMyWord("{r_l_m}") + str(vuln_num[2]) + Utils().getMyWord("{ge}") + ", " + Utils().getMyWord("{r_l_l}") + str(vuln_num[3]) + Utils().getMyWord("{ge}"))
-        CreateReport(projectTag).create_repoter()
-        creatLog().get_logger().info("[-] " + Utils().getMyWord("{all_end}"))
\ No newline at end of file
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import sqlite3, os, time
+import sqlite3, os, time, atexit, threading, weakref
 from html import escape
 from urllib.parse import quote
 from urllib.parse import urlparse
@@ -10,15 +10,58 @@ from lib.common.CreatLog import creatLog
 from lib.common.readConfig import ReadConfig
 
 
+# 项目数据库查询所需的索引，已存在的旧数据库在首次连接时补建
+PROJECT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS api_tree_path ON api_tree (path)",
+    "CREATE INDEX IF NOT EXISTS api_tree_success ON api_tree (success)",
+    "CREATE INDEX IF NOT EXISTS js_file_name ON js_file (name)",
+    "CREATE INDEX IF NOT EXISTS js_file_local ON js_file (local)",
+)
+
+
+class ThreadConnections():
+    """
+    一个线程打开的项目数据库连接。
+
+    保存在线程局部数据中，线程结束(如检测任务的线程池关闭)后随线程局部数据被回收，回收时关闭其中的连接。
+
+    Attributes:
+        conns (dict): 数据库路径到连接的映射。
+        close (weakref.finalize): 关闭全部连接，只会执行一次。
+    """
+
+    def __init__(self):
+        self.conns = {}
+        self.close = weakref.finalize(self, ThreadConnections.closeAll, self.conns)
+
+    @staticmethod
+    def closeAll(conns):
+        for conn in conns.values():
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        conns.clear()
+
+
 class DatabaseType():
     """
     数据库操作类，用于管理主数据库和项目数据库的创建、读取与更新。
 
+    项目数据库的连接按线程复用（WAL模式），线程结束后关闭，所有语句均为参数化语句，
+    批量写入在同一个事务中通过 executemany 完成。
+
     Attributes:
         projectTag (str): 项目的唯一标识符。
         log (Logger): 日志记录器实例。
     """
 
+    _projectPaths = {}
+    _local = threading.local()
+    # 各线程的连接集合，只保存弱引用，线程结束后自动移除
+    _threadConnections = weakref.WeakSet()
+    _lock = threading.Lock()
+
     def __init__(self, project_tag):
         """
         初始化DatabaseType对象。
@@ -29,6 +72,92 @@ class DatabaseType():
         self.projectTag = project_tag
         self.log = creatLog().get_logger()
 
+    @staticmethod
+    def isDatabaseFile(projectTag, filename):
+        """
+        判断项目目录中的文件是否属于项目数据库（含WAL模式产生的附属文件）。
+
+        Args:
+            projectTag (str): 项目的标签名称。
+            filename (str): 文件名。
+
+        Returns:
+            bool: 属于项目数据库返回True。
+        """
+        dbName = projectTag + ".db"
+        return filename in (dbName, dbName + "-wal", dbName + "-shm", dbName + "-journal")
+
+    @staticmethod
+    def createIndexes(conn):
+        """
+        为项目数据库创建查询所需的索引，数据表尚未创建时跳过。
+
+        Args:
+            conn (sqlite3.Connection): 项目数据库连接。
+        """
+        try:
+            for sql in PROJECT_INDEXES:
+                conn.execute(sql)
+        except sqlite3.OperationalError:
+            pass
+
+    def getConnection(self, projectDBPath=None):
+        """
+        获取当前线程的项目数据库连接，同一线程内重复调用返回同一个连接，线程结束后连接被关闭。
+
+        Args:
+            projectDBPath (str, optional): 项目数据库路径，默认根据项目标签从主数据库查询。
+
+        Returns:
+            sqlite3.Connection: 自动提交模式的数据库连接。
+        """
+        if projectDBPath is None:
+            projectDBPath = self.getPathfromDB() + self.projectTag + ".db"
+        projectDBPath = os.path.abspath(os.sep.join(projectDBPath.split('/')))
+        local = getattr(DatabaseType._local, "connections", None)
+        if local is None:
+            local = DatabaseType._local.connections = ThreadConnections()
+            with DatabaseType._lock:
+                DatabaseType._threadConnections.add(local)
+        conn = local.conns.get(projectDBPath)
+        if conn is None:
+            conn = sqlite3.connect(projectDBPath, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            DatabaseType.createIndexes(conn)
+            local.conns[projectDBPath] = conn
+        return conn
+
+    @classmethod
+    def closeConnections(cls):
+        """
+        关闭所有仍在运行的线程打开的项目数据库连接，程序退出时自动调用。
+        """
+        with cls._lock:
+            connections = list(cls._threadConnections)
+        for local in connections:
+            local.close()
+        cls._local = threading.local()
+
+    def executeMany(self, sql, rows):
+        """
+        在同一个事务中批量执行参数化语句。
+
+        Args:
+            sql (str): 带有占位符的SQL语句。
+            rows (list[tuple]): 每条语句的参数。
+        """
+        if not rows:
+            return
+        conn = self.getConnection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(sql, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
     def createDatabase(self):
         """
         创建主数据库（main.db）及其中的project表。如果数据库已存在则跳过创建过程。
@@ -110,20 +239,21 @@ class DatabaseType():
                              response_b TEXT                            ,
                              response_h TEXT                            ,
                              des        TEXT                            );''')
-            cursor.execute("insert into info values('time', '%s')" % (unixTime))
-            cursor.execute("insert into info values('url', '%s')" % (url))
-            cursor.execute("insert into info values('host','%s')" % (domain))
-            cursor.execute("insert into info values('type', '%s')" % (typeValue))
-            cursor.execute("insert into info values('tag', '%s')" % (self.projectTag))
+                DatabaseType.createIndexes(connect)
+            cursor.executemany("insert into info values(?, ?)", [
+                ("time", str(unixTime)),
+                ("url", url),
+                ("host", domain),
+                ("type", typeValue),
+                ("tag", self.projectTag),
+            ])
             cursor.execute("insert into info (name) VALUES ('clone')")
             connect.commit()
             connect.close()
             conn2 = sqlite3.connect(os.getcwd() + os.sep + "main.db")
             cursor2 = conn2.cursor()
             conn2.isolation_level = None
-            sql = "INSERT into project (tag,host,time) VALUES ('" + self.projectTag + "', '" + domain + "', " + str(
-                unixTime) + ")"
-            cursor2.execute(sql)
+            cursor2.execute("INSERT into project (tag,host,time) VALUES (?, ?, ?)", (self.projectTag, domain, unixTime))
             conn2.commit()
             conn2.close()
             self.log.debug("数据库创建成功")
@@ -132,24 +262,28 @@ class DatabaseType():
 
     def getPathfromDB(self):
         """
-        从主数据库中获取指定项目的存储路径。
+        从主数据库中获取指定项目的存储路径，查询结果按项目缓存。
 
         Returns:
             str: 项目对应的文件夹路径；若未找到对应项目，则返回默认路径。
         """
+        projectPath = DatabaseType._projectPaths.get(self.projectTag)
+        if projectPath:
+            return projectPath
         path = os.getcwd() + os.sep + "main.db"
         conn = sqlite3.connect(path)
         cursor = conn.cursor()
         conn.isolation_level = None
-        cursor.execute("select host from project where tag = '" + self.projectTag + "'")
+        cursor.execute("select host from project where tag = ?", (self.projectTag,))
         result = cursor.fetchone()
         conn.close()
         if result:
             host = result[0]  # 第一个结果
             projectPath = "tmp" + os.sep + self.projectTag + "_" + host + os.sep
+            DatabaseType._projectPaths[self.projectTag] = projectPath
             return projectPath
         else:
-            # 如果没有找到项目，返回默认路径
+            # 如果没有找到项目，返回默认路径（不缓存，项目可能稍后才创建）
             return "tmp" + os.sep + self.projectTag + "_unknown" + os.sep
 
     def getJsUrlFromDB(self, localFileName, projectPath):
@@ -163,14 +297,9 @@ class DatabaseType():
         Returns:
             str: 对应的远程JS文件路径。
         """
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select path from js_file where local = '" + localFileName + "'")
-        remotePath = cursor.fetchone()[0]  # 第一个即可
-        conn.close()
-        return remotePath
+        conn = self.getConnection(projectPath + self.projectTag + ".db")
+        row = conn.execute("select path from js_file where local = ?", (localFileName,)).fetchone()
+        return row[0]  # 第一个即可
 
     def getJsIDFromDB(self, localFileName, projectPath):
         """
@@ -183,14 +312,9 @@ class DatabaseType():
         Returns:
             int: 对应的JS文件ID。
         """
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select id from js_file where local = '" + localFileName + "'")
-        jsFileID = cursor.fetchone()[0]  # 第一个即可
-        conn.close()
-        return jsFileID
+        conn = self.getConnection(projectPath + self.projectTag + ".db")
+        row = conn.execute("select id from js_file where local = ?", (localFileName,)).fetchone()
+        return row[0]  # 第一个即可
 
     def apiRecordToDB(self, js_path, api_path):
         """
@@ -200,18 +324,37 @@ class DatabaseType():
             js_path (str): JS文件的路径。
             api_path (str): 解析得到的API路径。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-        cursor = connect.cursor()
+        projectPath = self.getPathfromDB()
         localFileName = js_path.split(os.sep)[-1]
-        jsFileID = DatabaseType(self.projectTag).getJsIDFromDB(localFileName, projectPath)
-        connect.isolation_level = None
-        sql = "insert into api_tree(path,name,from_js) values(\"" + api_path + "\",\"" + api_path.split("/")[
-            -1] + "\"," + str(jsFileID) + ")"
-        cursor.execute(sql)
-        connect.commit()
-        connect.close()
+        jsFileID = self.getJsIDFromDB(localFileName, projectPath)
+        self.getConnection().execute("insert into api_tree(path,name,from_js) values(?,?,?)",
+                                     (api_path, api_path.split("/")[-1], jsFileID))
+
+    def apiRecordManyToDB(self, records):
+        """
+        批量记录API路径，数据库中已存在的和重复的路径会被跳过，所有记录在一个事务中写入。
+
+        Args:
+            records (Iterable[tuple[str, str]]): (JS文件路径, API路径) 组成的序列。
+
+        Returns:
+            int: 实际写入的API数量。
+        """
+        conn = self.getConnection()
+        knownPaths = set(row[0] for row in conn.execute("select path from api_tree"))
+        jsFileIDs = dict(conn.execute("select local, min(id) from js_file group by local"))
+        rows = []
+        for js_path, api_path in records:
+            if api_path in knownPaths:
+                continue
+            jsFileID = jsFileIDs.get(js_path.split(os.sep)[-1])
+            if jsFileID is None:
+                self.log.debug("未找到API所属的JS文件: " + js_path)
+                continue
+            knownPaths.add(api_path)
+            rows.append((api_path, api_path.split("/")[-1], jsFileID))
+        self.executeMany("insert into api_tree(path,name,from_js) values(?,?,?)", rows)
+        return len(rows)
 
     # 判断API在数据库内是否已经存在
     def apiHaveOrNot(self, api_path):
@@ -224,18 +367,21 @@ class DatabaseType():
         Returns:
             bool: 若不存在返回True，否则返回False。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select path from api_tree where path = \"" + api_path + "\"")
-        row = cursor.fetchone()
-        conn.close()
-        if row == None:
-            return True
-        else:
-            return False
+        row = self.getConnection().execute("select 1 from api_tree where path = ? limit 1", (api_path,)).fetchone()
+        return row is None
+
+    def selectPaths(self, sql, params=()):
+        """
+        执行查询并返回第一列组成的列表。
+
+        Args:
+            sql (str): 查询语句。
+            params (tuple): 查询参数。
+
+        Returns:
+            list[str]: 查询结果。
+        """
+        return ["".join(row) for row in self.getConnection().execute(sql, params)]
 
     # 获取数据库里面的path
     def apiPathFromDB(self):
@@ -245,39 +391,17 @@ class DatabaseType():
         Returns:
             list[str]: 所有API路径组成的列表。
         """
-        apis = []
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select path from api_tree")
-        rows = cursor.fetchall()
-        conn.close()
-        for row in rows:
-            # print("".join(row))
-            api = "".join(row)
-            apis.append(api)
-        return apis
+        return self.selectPaths("select path from api_tree")
 
     def insertResultFrom(self, res):
         """
-        更新API扫描状态至数据库。
+        批量更新API扫描状态至数据库。
 
         Args:
             res (dict): 键为API路径，值为其扫描状态码。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        for path, suc in res.items():
-            # print(path, suc)
-            sql = "UPDATE api_tree SET success=" + str(suc) + " WHERE path=\"" + path + '\"'
-            cursor.execute(sql)
-            # conn.commit()
-        conn.close()
+        self.executeMany("UPDATE api_tree SET success=? WHERE path=?",
+                         [(suc, path) for path, suc in res.items()])
 
     def getURLfromDB(self):
         """
@@ -286,19 +410,35 @@ class DatabaseType():
         Returns:
             str: 原始URL字符串；如果没有找到则返回空字符串。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select vaule from info where name = 'url'")
-        result = cursor.fetchone()
-        conn.close()
+        result = self.getConnection().execute("select vaule from info where name = 'url'").fetchone()
         if result:
             return result[0]  # 返回第一个结果
         else:
             return ""  # 如果没有结果，返回空字符串
 
+    def getInfo(self, name):
+        """
+        读取项目数据库info表中的一项。
+
+        Args:
+            name (str): 项名称。
+
+        Returns:
+            str: 对应的值；不存在时返回None。
+        """
+        result = self.getConnection().execute("select vaule from info where name = ?", (name,)).fetchone()
+        return result[0] if result else None
+
+    def setInfo(self, name, value):
+        """
+        写入项目数据库info表中的一项，已存在时覆盖。
+
+        Args:
+            name (str): 项名称。
+            value (str): 值。
+        """
+        self.getConnection().execute("insert or replace into info(name, vaule) values(?, ?)", (name, value))
+
     # 获取success为1的路径
     def sucesssPathFromDB(self):
         """
@@ -307,19 +447,7 @@ class DatabaseType():
         Returns:
             list[str]: 成功路径列表。
         """
-        paths = []
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select path from api_tree where success=1")
-        rows = cursor.fetchall()
-        conn.close()
-        for row in rows:
-            api = "".join(row)
-            paths.append(api)
-        return paths
+        return self.selectPaths("select path from api_tree where success=1")
 
     # 获取sucess为2的路径 post请求
     def wrongMethodFromDB(self):
@@ -329,19 +457,7 @@ class DatabaseType():
         Returns:
             list[str]: 需要重新测试的路径列表。
         """
-        paths = []
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select path from api_tree where success=2")
-        rows = cursor.fetchall()
-        conn.close()
-        for row in rows:
-            api = "".join(row)
-            paths.append(api)
-        return paths
+        return self.selectPaths("select path from api_tree where success=2")
 
     # 获取sucess为1和2的所有存在路径
     def allPathFromDB(self):
@@ -351,19 +467,85 @@ class DatabaseType():
         Returns:
             list[str]: 包含所有有效路径的列表。
         """
-        paths = []
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        cursor.execute("select path from api_tree where success=1 or success=2")
-        rows = cursor.fetchall()
-        conn.close()
-        for row in rows:
-            api = "".join(row)
-            paths.append(api)
-        return paths
+        return self.selectPaths("select path from api_tree where success=1 or success=2")
+
+    def allApiFromDB(self):
+        """
+        提取success为1和2的所有有效API的完整记录。
+
+        Returns:
+            list[tuple]: api_tree表中的记录(id, path, name, option, result, success, from_js)。
+        """
+        return self.getConnection().execute("select * from api_tree where success = 1 or success = 2").fetchall()
+
+    def apiByNameFromDB(self, name):
+        """
+        按接口名称查询API记录。
+
+        Args:
+            name (str): 接口名称，即路径的最后一段。
+
+        Returns:
+            list[tuple]: api_tree表中的记录。
+        """
+        return self.getConnection().execute("select * from api_tree where name = ?", (name,)).fetchall()
+
+    def apiByOptionFromDB(self, option):
+        """
+        按参数模板查询API记录。
+
+        Args:
+            option (str): 参数模板。
+
+        Returns:
+            list[tuple]: api_tree表中的记录。
+        """
+        return self.getConnection().execute("select * from api_tree where option = ?", (option,)).fetchall()
+
+    def apiIdFromDB(self, api_path):
+        """
+        查询API路径对应的API ID及其所属JS文件ID。
+
+        Args:
+            api_path (str): API路径。
+
+        Returns:
+            tuple[int, int]: (api_id, from_js)；路径不存在时返回None。
+        """
+        row = self.getConnection().execute("select id,from_js from api_tree where path = ? limit 1",
+                                           (api_path,)).fetchone()
+        return (int(row[0]), int(row[1])) if row else None
+
+    def apiOptionFromDB(self, api_id):
+        """
+        查询API的参数模板。
+
+        Args:
+            api_id (int): API ID。
+
+        Returns:
+            list[str]: 参数模板列表，API不存在时为空。
+        """
+        return [row[0] for row in self.getConnection().execute("select option from api_tree where id = ?", (api_id,))]
+
+    def updateApiOption(self, api_id, option):
+        """
+        更新API的参数模板。
+
+        Args:
+            api_id (int): API ID。
+            option (str): 参数模板。
+        """
+        self.getConnection().execute("UPDATE api_tree SET option=? WHERE id=?", (option, api_id))
+
+    def updateApiOptions(self, options):
+        """
+        批量更新API的参数模板。
+
+        Args:
+            options (list[tuple[int, str]]): (API ID, 参数模板) 组成的列表。
+        """
+        self.executeMany("UPDATE api_tree SET option=? WHERE id=?", [(option, api_id) for api_id, option in options])
 
     #更新请求类型 POST或GET
     def updatePathsMethod(self,code):
@@ -373,47 +555,38 @@ class DatabaseType():
         Args:
             code (int): 状态码，1表示将success=2改为1，其他情况相反。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
         if code == 1:
             sql = "UPDATE api_tree SET success = 1 WHERE success = 2"
         else:
             sql = "UPDATE api_tree SET success = 2 WHERE success = 1"
-        cursor.execute(sql)
-        conn.close()
+        self.getConnection().execute(sql)
 
     # 将结果写入数据库
     def insertTextFromDB(self, res):
         """
-        将API响应内容写入数据库，同时过滤掉无效或黑名单扩展的内容。
+        批量将API响应内容写入数据库，同时将无效或扩展名在黑名单中的API标记为失败。
 
         Args:
             res (dict): 键为API路径，值为其响应文本。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
+        blacks = ReadConfig()
+        blacks.getValue("blacklist", "apiExts")
+        black_ext = set("".join(blacks.res).split(","))
+        texts = []
+        failed = []
         for url, text in res.items():
-            blacks = ReadConfig()
-            blacks.getValue("blacklist", "apiExts")
-            black_ext = "".join(blacks.res).split(",")
             try:
-                for ext in black_ext:
-                    if ("<html" not in text) and ("PNG" not in text) and (len(text) != 0) and (url.split("/")[-1] != "favicon.ico")\
-                            and (("." + str(url.split("/")[-1].split(".")[-1])) != ext):
-                        sql = "UPDATE api_tree SET result=\'" + escape(text) + "\' WHERE path=\"" + url + '\"'
-                    else:
-                        sql = "UPDATE api_tree SET success=0 WHERE path=\"" + url + '\"'
-                cursor.execute(sql)
-                self.log.debug("数据库插入成功")
+                filename = url.split("/")[-1]
+                if ("<html" not in text) and ("PNG" not in text) and (len(text) != 0) and (filename != "favicon.ico")\
+                        and (("." + filename.split(".")[-1]) not in black_ext):
+                    texts.append((escape(text), url))
+                else:
+                    failed.append((url,))
             except Exception as e:
                 self.log.debug("插入时有些例外")
-        conn.close()
+        self.executeMany("UPDATE api_tree SET result=? WHERE path=?", texts)
+        self.executeMany("UPDATE api_tree SET success=0 WHERE path=?", failed)
+        self.log.debug("数据库插入成功")
 
     def insertCorsInfoIntoDB(self, request_b, response_h):
         """
@@ -423,18 +596,28 @@ class DatabaseType():
             request_b (dict): 请求头信息字典。
             response_h (dict): 响应头信息字典。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
         request_b = "Origin: " + request_b['Origin']
         # response_h = "Access-Control-Allow-Origin: " + response_h['Access-Control-Allow-Origin'] +", Access-Control-Allow-Methods: " + response_h['Access-Control-Allow-Methods'] + ", Access-Control-Allow-Credentials: " + response_h['Access-Control-Allow-Credentials']
         response_h = "Access-Control-Allow-Origin: " + response_h['Access-Control-Allow-Origin']  + ", Access-Control-Allow-Credentials: " + response_h['Access-Control-Allow-Credentials']
 
-        sql = "insert into vuln(sure,api_id,js_id,type,request_b,response_h) VALUES(1,7777777,7777777,'CORS',\"" + request_b + "\",\'" + response_h + "\');"
-        cursor.execute(sql)
-        conn.close()
+        self.getConnection().execute(
+            "insert into vuln(sure,api_id,js_id,type,request_b,response_h) VALUES(1,7777777,7777777,'CORS',?,?)",
+            (request_b, response_h))
+
+    def insertVulnIntoDB(self, vulnType, api_id, js_id, request_b, response_h):
+        """
+        记录漏洞检测结果到vuln表。
+
+        Args:
+            vulnType (str): 漏洞类型。
+            api_id (int): API ID。
+            js_id (int): JS文件ID。
+            request_b (str): 请求体内容。
+            response_h (str): 响应体内容。
+        """
+        self.getConnection().execute(
+            "insert into vuln(api_id,js_id,request_b,response_b,type,sure) values (?,?,?,?,?,1)",
+            (int(api_id), int(js_id), str(request_b), str(response_h), vulnType))
 
     # 将弱口令成功的写入数据库
     def insertWeakPassInfoIntoDB(self, api_id,js_id,request_b, response_h):
@@ -447,16 +630,7 @@ class DatabaseType():
             request_b (str): 请求体内容。
             response_h (str): 响应体内容。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        sql = "insert into vuln(api_id,js_id,request_b,response_b,type,sure) values ('%d','%d','%s','%s','passWord',1)" % (
-                        api_id, js_id, request_b, response_h)
-        cursor.execute(sql)
-        conn.close()
-
+        self.insertVulnIntoDB("passWord", api_id, js_id, request_b, response_h)
 
     def insertBacInfoIntoDB(self, api_id,js_id,request_b, response_h):
         """
@@ -468,15 +642,7 @@ class DatabaseType():
             request_b (str): 请求体内容。
             response_h (str): 响应体内容。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        sql = "insert into vuln(api_id,js_id,request_b,response_b,type,sure) values ('%d','%d','%s','%s','BAC',1)" % (
-                        api_id, js_id, request_b, response_h)
-        cursor.execute(sql)
-        conn.close()
+        self.insertVulnIntoDB("BAC", api_id, js_id, request_b, response_h)
 
     def insertUploadInfoIntoDB(self, api_id,js_id,request_b, response_h):
         """
@@ -488,15 +654,7 @@ class DatabaseType():
             request_b (str): 请求体内容。
             response_h (str): 响应体内容。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        sql = "insert into vuln(api_id,js_id,request_b,response_b,type,sure) values ('%d','%d','%s','%s','upLoad',1)" % (
-                        api_id, js_id, request_b, response_h)
-        cursor.execute(sql)
-        conn.close()
+        self.insertVulnIntoDB("upLoad", api_id, js_id, request_b, response_h)
 
     def insertSQLInfoIntoDB(self, api_id, js_id, request_b, response_h):
         """
@@ -508,12 +666,30 @@ class DatabaseType():
             request_b (str): 请求体内容。
             response_h (str): 响应体内容。
         """
-        projectPath = DatabaseType(self.projectTag).getPathfromDB()
-        projectDBPath = projectPath + self.projectTag + ".db"
-        conn = sqlite3.connect(projectDBPath)
-        cursor = conn.cursor()
-        conn.isolation_level = None
-        sql = "insert into vuln(api_id,js_id,request_b,response_b,type,sure) values ('%d','%d','%s','%s','SQL',1)" % (
-            api_id, js_id, request_b, response_h)
-        cursor.execute(sql)
-        conn.close()
+        self.insertVulnIntoDB("SQL", api_id, js_id, request_b, response_h)
+
+    def insertUnAuthInfoIntoDB(self, records):
+        """
+        批量记录未授权访问漏洞检测结果到vuln表。
+
+        Args:
+            records (list[tuple]): (api_id, js_id, 响应内容, 确定程度) 组成的列表，确定程度1为确定、2为疑似。
+        """
+        self.executeMany("insert into vuln(api_id,js_id,response_b,sure,type) values (?,?,?,?,'unAuth')", records)
+
+    def insertInfoLeakIntoDB(self, js_id, response_b, response_h, des):
+        """
+        记录JS文件中的敏感信息泄露到vuln表。
+
+        Args:
+            js_id (int): JS文件ID。
+            response_b (str): 泄露的信息。
+            response_h (str): 信息所在位置的上下文。
+            des (str): 信息类型的描述。
+        """
+        self.getConnection().execute(
+            "insert into vuln(api_id,js_id,response_b,response_h,sure,type,des) values (7777777,?,?,?,1,'INFO',?)",
+            (js_id, str(response_b), str(response_h), str(des)))
+
+
+atexit.register(DatabaseType.closeConnections)
@@ -1,10 +1,14 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,requests,sqlite3,warnings,random
+import os,warnings,random,threading
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 from lib.common import readConfig
+from lib.Database import DatabaseType
 from lib.common.utils import Utils
+from lib.common.responseCache import ResponseCache
+from lib.common.transport import SharedTransport
 from lib.common.CreatLog import creatLog
 
 
@@ -15,6 +19,10 @@ class DownloadJs():
     用于处理JS文件的下载、过滤黑名单域名和文件名，并将相关信息存储到数据库中
     """
 
+    _lock = threading.Lock()
+    _hostLimits = {}
+    _contentHashes = {}
+
     def __init__(self, jsRealPaths, options):
         """
         初始化DownloadJs类
@@ -27,6 +35,9 @@ class DownloadJs():
         self.jsRealPaths = jsRealPaths
         self.blacklist_domains = readConfig.ReadConfig().getValue('blacklist', 'domain')[0]
         self.blacklistFilenames = readConfig.ReadConfig().getValue('blacklist', 'filename')[0]
+        self.threads = int(readConfig.ReadConfig().getValue('download', 'threads')[0])
+        self.hostThreads = int(readConfig.ReadConfig().getValue('download', 'hostThreads')[0])
+        self.timeout = int(readConfig.ReadConfig().getValue('download', 'timeout')[0])
         self.options = options
         self.proxy_data = {'http': self.options.proxy,'https': self.options.proxy}
         self.UserAgent = ["Mozilla/5.0 (Windows NT 6.1; WOW64; rv:34.0) Gecko/20100101 Firefox/34.0",
@@ -53,33 +64,67 @@ class DownloadJs():
         根据配置文件中的黑名单域名和文件名列表，过滤掉匹配的JS文件路径
         :return: 过滤后的JS文件路径列表
         """
-        newList = self.jsRealPaths[:]  # 防止遍历不全
-        for jsRealPath in newList:  # 遍历js路径
-            res = urlparse(jsRealPath)
-            jsRealPathDomain = res.netloc.lower()  # js的主域名
+        blacklistDomains = self.blacklist_domains.split(",")
+        blacklistFilenames = self.blacklistFilenames.split(",")
+        jsRealPaths = []
+        for jsRealPath in self.jsRealPaths:  # 遍历js路径
+            jsRealPathDomain = urlparse(jsRealPath).netloc.lower()  # js的主域名
             jsRealPathFilename = Utils().getFilename(jsRealPath).lower()  # 获取js名称
-            for blacklistDomain in self.blacklist_domains.split(","):  # 遍历黑名单列表
-                if blacklistDomain in jsRealPathDomain:
-                    flag = 1
-                    break
-                else:
-                    flag = 0
-            if flag:  # 判断js路径中是否存在黑名单
-                self.jsRealPaths.remove(jsRealPath)  # 如果有就进行删除
-            for blacklistFilename in self.blacklistFilenames.split(","):
-                if blacklistFilename in jsRealPathFilename:
-                    flag = 1
-                    break
-                else:
-                    flag = 0
-            if flag:
-                if jsRealPath in self.jsRealPaths:
-                    self.jsRealPaths.remove(jsRealPath)
+            if any(blacklistDomain in jsRealPathDomain for blacklistDomain in blacklistDomains):
+                continue
+            if any(blacklistFilename in jsRealPathFilename for blacklistFilename in blacklistFilenames):
+                continue
+            jsRealPaths.append(jsRealPath)
+        self.jsRealPaths = jsRealPaths
         return self.jsRealPaths
 
+    def getSession(self):
+        """
+        获取所有下载任务共用的会话，连接按主机复用
+
+        :return: requests.Session
+        """
+        return SharedTransport.getSession(self.threads)
+
+    def getHostLimit(self, url):
+        """
+        获取目标主机的并发限制
+
+        :param url: 请求URL
+        :return: 该主机的信号量
+        """
+        host = urlparse(url).netloc
+        with DownloadJs._lock:
+            if host not in DownloadJs._hostLimits:
+                DownloadJs._hostLimits[host] = threading.BoundedSemaphore(self.hostThreads)
+            return DownloadJs._hostLimits[host]
+
+    def fetchJs(self, jsRealPath, localPath, header):
+        """
+        下载单个JS文件并分块写入磁盘
+
+        :param jsRealPath: JS文件URL
+        :param localPath: 保存路径
+        :param header: 请求头
+        :return: 文件内容的sha256，下载失败时为None
+        """
+        sslFlag = int(self.options.ssl_flag)  # 根据SSL标志选择是否验证证书
+        try:
+            with self.getHostLimit(jsRealPath):
+                return ResponseCache.download(self.getSession(), jsRealPath, localPath, headers=header,
+                                              proxies=self.proxy_data, verify=sslFlag != 1, timeout=self.timeout)
+        except Exception as e:
+            self.log.error("[Err] %s" % e)
+            if os.path.exists(localPath):
+                os.remove(localPath)
+            return None
+
     def downloadJs(self, tag, host, spiltId):
         """
-        下载JS文件并存储到本地和数据库
+        并发下载JS文件并存储到本地和数据库
+
+        黑名单过滤和按URL、文件名去重在下载前完成，内容相同的文件只保留第一个，
+        下载结果在一个事务中批量写入数据库。
 
         :param tag: 标签标识符
         :param host: 主机地址
@@ -101,57 +146,47 @@ class DownloadJs():
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 self.options.head.split(':')[0]: self.options.head.split(':')[1]
             }
-        self.jsRealPaths = list(set(self.jsRealPaths)) # list清单去重
         try:
-            self.jsRealPaths = self.jsBlacklist()  # 不能放for循环内
+            self.jsBlacklist()
             self.log.debug("js黑名单函数正常")
         except Exception as e:
             self.log.error("[Err] %s" % e)
+        self.jsRealPaths = list(dict.fromkeys(self.jsRealPaths))  # list清单去重，保持原有顺序
 
-        # 遍历JS文件路径并下载
+        PATH = "tmp/" + tag + "_" + host + "/" + tag + ".db"
+        database = DatabaseType(tag)
+        conn = database.getConnection(PATH)
+        knownNames = set(row[0] for row in conn.execute("select name from js_file"))
+        downloads = []
         for jsRealPath in self.jsRealPaths:
             jsFilename = Utils().getFilename(jsRealPath)
-            jsTag = Utils().creatTag(6)
-            PATH = "tmp/" + tag + "_" + host + "/" + tag + ".db"
-            conn = sqlite3.connect(os.sep.join(PATH.split('/')))
-            cursor = conn.cursor()
-            conn.isolation_level = None
-            checkSql = "select * from js_file where name = '" + jsFilename + "'"
-
-            # 根据spiltId构造不同的SQL语句
-            if spiltId == 0:
-                sql = "insert into js_file(name,path,local) values('%s','%s','%s')" % (
-                    jsFilename, jsRealPath, jsTag + "." + jsFilename)
-            else:
-                sql = "insert into js_file(name,path,local,spilt) values('%s','%s','%s',%d)" % (
-                    jsFilename, jsRealPath, jsTag + "." + jsFilename, spiltId)
-
-            cursor.execute(checkSql)
-            res = cursor.fetchall()
-
-            # 检查文件是否已存在
-            if len(res) > 0:
+            if jsFilename in knownNames:  # 检查文件是否已存在
                 self.log.info(Utils().tellTime() + Utils().getMyWord("{have_it}") + jsFilename)
-                conn.close()
-            else:
-                cursor.execute(sql)
-                conn.commit()
+                continue
+            knownNames.add(jsFilename)
+            localName = Utils().creatTag(6) + "." + jsFilename
+            downloads.append((jsRealPath, jsFilename, localName))
+
+        # 遍历JS文件路径并发下载
+        projectPath = "tmp" + os.sep + tag + "_" + host + os.sep
+        with ThreadPoolExecutor(self.threads) as pool:
+            futures = []
+            for jsRealPath, jsFilename, localName in downloads:
                 self.log.info(Utils().tellTime() + Utils().getMyWord("{downloading}") + jsFilename)
-
-                # 根据SSL标志选择是否验证证书
-                sslFlag = int(self.options.ssl_flag)
-                if sslFlag == 1:
-                    jsFileData = requests.get(url=jsRealPath, headers=header, proxies=self.proxy_data, verify=False).content
-                else:
-                    jsFileData = requests.get(url=jsRealPath, proxies=self.proxy_data, headers=header).content
-
-                # 写入文件并更新数据库状态
-                with open("tmp" + os.sep + tag + "_" + host + os.sep + jsTag + "." + jsFilename, "wb") as js_file:
-                    js_file.write(jsFileData)
-                    js_file.close()
-                    cursor.execute("UPDATE js_file SET success = 1 WHERE local='%s';" % (jsTag + "." + jsFilename))
-                    conn.commit()
-                conn.close()
+                futures.append(pool.submit(self.fetchJs, jsRealPath, projectPath + localName, header))
+            digests = [future.result() for future in futures]
+
+        rows = []
+        contentHashes = DownloadJs._contentHashes.setdefault(tag, set())
+        for (jsRealPath, jsFilename, localName), digest in zip(downloads, digests):
+            if digest in contentHashes:  # 内容与已下载的文件相同
+                os.remove(projectPath + localName)
+                self.log.info(Utils().tellTime() + Utils().getMyWord("{have_it}") + jsFilename)
+                continue
+            if digest is not None:
+                contentHashes.add(digest)
+            rows.append((jsFilename, jsRealPath, localName, spiltId or None, 1 if digest is not None else None))
+        database.executeMany("insert into js_file(name,path,local,spilt,success) values(?,?,?,?,?)", rows)
 
     def creatInsideJs(self, tag, host, scriptInside, url):
         """
@@ -167,22 +202,14 @@ class DownloadJs():
             jsFilename = "7777777.script.inside.html.js" #随便来一个
             jsTag = Utils().creatTag(6)
             PATH = "tmp/" + tag + "_" + host + "/" + tag + ".db"
-            conn = sqlite3.connect(os.sep.join(PATH.split('/')))
-            cursor = conn.cursor()
-            conn.isolation_level = None
-            sql = "insert into js_file(name,path,local) values('%s','%s','%s')" % (
-                        jsFilename, jsRealPath, jsTag + "." + jsFilename)
-            cursor.execute(sql)
-            conn.commit()
+            conn = DatabaseType(tag).getConnection(PATH)
+            conn.execute("insert into js_file(name,path,local) values(?,?,?)", (jsFilename, jsRealPath, jsTag + "." + jsFilename))
             self.log.info(Utils().tellTime() + Utils().getMyWord("{downloading}") + jsFilename)
 
             # 将script内容写入文件并更新数据库
             with open("tmp" + os.sep + tag + "_" + host + os.sep + jsTag + "." + jsFilename, "wb") as js_file:
                 js_file.write(str.encode(scriptInside))
-                js_file.close()
-                cursor.execute("UPDATE js_file SET success = 1 WHERE local='%s';" % (jsTag + "." + jsFilename))
-                conn.commit()
-            conn.close()
+            conn.execute("UPDATE js_file SET success = 1 WHERE local=?", (jsTag + "." + jsFilename,))
         except Exception as e:
             self.log.error("[Err] %s" % e)
 
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,re,sqlite3,random,json,time
+import os,re,random,json,time
 from time import sleep
 from tqdm import trange
 from urllib.parse import urlparse
@@ -66,20 +66,14 @@ class FuzzerParam():
         whole_post_str = ""
         whole_get_str = ""
         projectPath = DatabaseType(self.projectTag).getPathfromDB()
+        api_list = DatabaseType(self.projectTag).allApiFromDB()
         for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
-            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-            cursor = connect.cursor()
-            connect.isolation_level = None
-            sql = "select * from api_tree where success = 1 or success = 2"
-            cursor.execute(sql)
-            api_list = cursor.fetchall()
             for api in api_list:
                 api_post_list= ""
                 api_get_list = ""
                 api_id = "§§§" + str(api[0]) + "§§§\n"
                 for filename in filenames:
-                    if filename != self.projectTag + ".db":
+                    if not DatabaseType.isDatabaseFile(self.projectTag, filename):
                         filePath = os.path.join(parent, filename)
                         with open(filePath, "r", encoding="utf-8",errors="ignore") as f:
                             js_strs = f.readlines()
@@ -163,12 +157,7 @@ class FuzzerParam():
                     str = "\t{\n\t\t\"name\":\"" + result_post[0][c] + "\",\n" + "\t\t\"default\":\"" + default_value + "\"\n\t}\n\t,\n"
                     replace_str_post = replace_str_post + str
                 templates_post_str = templates_post_str.replace("{result_post}", replace_str_post[:-2])
-                projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                cursor = connect.cursor()
-                connect.isolation_level = None
-                sql = "UPDATE api_tree set option='%s' where id='%s'"%(templates_post_str,result_id)
-                cursor.execute(sql)
+                DatabaseType(self.projectTag).updateApiOption(result_id, templates_post_str)
 
         l = 0
         m = 1
@@ -199,18 +188,12 @@ class FuzzerParam():
                             default_value = FuzzerParam(self.projectTag).creatNum(3)
                     str = "\t{\n\t\t\"name\":\"" + result_get[0][c] + "\",\n" + "\t\t\"default\":\"" + default_value + "\"\n\t}\n\t,\n"
                     replace_str_get = replace_str_get + str
-                projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                cursor = connect.cursor()
-                connect.isolation_level = None
-                sql = "select option from api_tree where id='%s'"%(result_id)
-                cursor.execute(sql)
-                options = cursor.fetchall()
+                database = DatabaseType(self.projectTag)
+                options = database.apiOptionFromDB(result_id)
                 for option in options:
-                    if option[0]:
-                        templates_get_str = option[0]
+                    if option:
+                        templates_get_str = option
                         templates_get_str = templates_get_str.replace("{result_get}", replace_str_get[:-2])
-                        sql = "UPDATE api_tree set option='%s' where id='%s'" % (templates_get_str, result_id)
                     else:
                         templates_get_str = """
         {
@@ -223,23 +206,17 @@ class FuzzerParam():
             ]
         }"""
                         templates_get_str = templates_get_str.replace("{result_get}", replace_str_get[:-2])
-                        sql = "UPDATE api_tree set option='%s' where id='%s'" % (templates_get_str, result_id)
-                    cursor.execute(sql)
+                    database.updateApiOption(result_id, templates_get_str)
                 else:
                     for option in options:
-                        if option[0]:
-                            templates_get_str = option[0]
+                        if option:
+                            templates_get_str = option
                             templates_get_str = templates_get_str.replace("{result_get}", "")
-                            sql = "UPDATE api_tree set option='%s' where id='%s'" % (templates_get_str, result_id)
-                    cursor.execute(sql)
-
-        projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-        connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-        cursor = connect.cursor()
-        connect.isolation_level = None
-        sql = "select * from api_tree where success = 1 or success = 2"
-        cursor.execute(sql)
-        api_list = cursor.fetchall()
+                    if options:
+                        database.updateApiOption(result_id, templates_get_str)
+
+        database = DatabaseType(self.projectTag)
+        api_list = database.allApiFromDB()
         templates_post_new_str = """
 {
     "type": "post",
@@ -251,23 +228,19 @@ class FuzzerParam():
     ]
 }
 """
+        updates = []
         for api in api_list:
             if api[3]:
                 option = api[3]
                 option = option.replace("{result_get}","")
-                sql = "UPDATE api_tree set option='%s' where id='%s'" % (option, api[0])
-                cursor.execute(sql)
+                updates.append((api[0], option))
             else:
-                sql = "UPDATE api_tree set option='%s' where id='%s'" % (templates_post_new_str, api[0])
-                cursor.execute(sql)
-
-        sql = "select * from api_tree where success = 1 or success = 2"
-        cursor.execute(sql)
-        api_list = cursor.fetchall()
-        sql = "select * from api_tree where option='%s'" %(templates_post_new_str)
-        cursor.execute(sql)
+                updates.append((api[0], templates_post_new_str))
+        database.updateApiOptions(updates)
+
+        api_list = database.allApiFromDB()
         #总共需要暴力提取的数量，可以用这快做进度条
-        num_vio = cursor.fetchall()
+        num_vio = database.apiByOptionFromDB(templates_post_new_str)
         # print(len(num_vio))
         num = len(num_vio)
 
@@ -309,12 +282,7 @@ class FuzzerParam():
                                 str = "\t{\n\t\t\"name\":\"" + result_post[0][j] + "\",\n" + "\t\t\"default\":\"" + default_value + "\"\n\t}\n\t,\n"
                                 replace_str_post = replace_str_post + str
                             templates_post_str = templates_post_str.replace("{result_post}", replace_str_post[:-2])
-                            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                            cursor = connect.cursor()
-                            connect.isolation_level = None
-                            sql = "UPDATE api_tree set option='%s' where id='%s'" % (templates_post_str, result_id)
-                            cursor.execute(sql)
+                            database.updateApiOption(result_id, templates_post_str)
                         break
                 l = 0
                 m = 1
@@ -334,19 +302,11 @@ class FuzzerParam():
                                 default_value = result_get[1][j]
                                 str = "\t{\n\t\t\"name\":\"" + result_get[0][j] + "\",\n" + "\t\t\"default\":\"" + default_value + "\"\n\t}\n\t,\n"
                                 replace_str_get = replace_str_get + str
-                            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                            cursor = connect.cursor()
-                            connect.isolation_level = None
-                            sql = "select option from api_tree where id='%s'" % (result_id)
-                            cursor.execute(sql)
-                            options = cursor.fetchall()
-                            for option in options:
-                                new_str = json.loads(option[0].replace("{result_get}",""))
+                            for option in database.apiOptionFromDB(result_id):
+                                new_str = json.loads(option.replace("{result_get}",""))
                                 if new_str["post"]:
-                                    templates_get_str = option[0]
+                                    templates_get_str = option
                                     templates_get_str = templates_get_str.replace("{result_get}", replace_str_get[:-2])
-                                    sql = "UPDATE api_tree set option='%s' where id='%s'" % (templates_get_str, result_id)
                                 else:
                                     templates_get_str = """
     {
@@ -359,36 +319,21 @@ class FuzzerParam():
         ]
     }"""
                                     templates_get_str = templates_get_str.replace("{result_get}", replace_str_get[:-2])
-                                    sql = "UPDATE api_tree set option='%s' where id='%s'" % (templates_get_str, result_id)
-                                cursor.execute(sql)
+                                database.updateApiOption(result_id, templates_get_str)
                         else:
-                            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                            cursor = connect.cursor()
-                            connect.isolation_level = None
-                            sql = "select option from api_tree where id='%s'" % (result_id)
-                            cursor.execute(sql)
-                            options = cursor.fetchall()
-                            for option in options:
-                                new_str = json.loads(option[0].replace("{result_get}", ""))
+                            for option in database.apiOptionFromDB(result_id):
+                                new_str = json.loads(option.replace("{result_get}", ""))
                                 new_str = json.dumps(new_str).replace("\'","\"")
-                                sql = "UPDATE api_tree set option='%s' where id='%s'" % (new_str, result_id)
-                                cursor.execute(sql)
+                                database.updateApiOption(result_id, new_str)
 
                         break
 
-        projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-        connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-        cursor = connect.cursor()
-        connect.isolation_level = None
-        sql = "select * from api_tree where success = 1 or success = 2"
-        cursor.execute(sql)
-        api_list = cursor.fetchall()
-        for api in api_list:
+        updates = []
+        for api in database.allApiFromDB():
             option = api[3]
             option = option.replace("{result_get}","").replace("{result_post}","")
-            sql = "UPDATE api_tree set option='%s' where id='%s'" % (option, api[0])
-            cursor.execute(sql)
+            updates.append((api[0], option))
+        database.updateApiOptions(updates)
 
     def result_method_1(self, str):
         """
@@ -20,10 +20,18 @@ import random
 import string
 import copy
 import json
-from typing import List, Dict, Any, Tuple
-import requests
-import urllib3
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Iterator
+from .common import readConfig
 from .common.CreatLog import creatLog
+from .common.probeClient import ProbeClient, UserAgents
+
+
+# 变体参数中需要与原参数形成重复key的标记前缀
+REPEAT_MARKERS = ("_hpp_repeat_", "_form_repeat_", "_array_repeat_")
+# 响应内容中可能表示越权获取到特权信息的关键字
+PRIVILEGED_INDICATORS = ('admin', 'root', 'password', 'secret', 'token')
 
 
 class ParameterPollutionDetector:
@@ -56,12 +64,15 @@ class ParameterPollutionDetector:
         if self.options is None:
             self.options = DefaultOptions()
             
-        # 初始化UserAgent列表
-        self.UserAgent = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        ]
+        # 变体请求经共用的 ProbeClient 并发发送：连接复用、同主机并发限制、请求缓存与全局预算
+        self.client = ProbeClient(self.options)
+        self.threads = int(readConfig.ReadConfig().getValue('parameterPollution', 'threads')[0])
+        # (路径, 方法, 参数) -> 基线响应
+        self._baselines = {}
+
+        # 初始化UserAgent列表，所有变体使用同一个User-Agent，避免随机UA本身造成响应差异
+        self.UserAgent = UserAgents
+        self.user_agent = random.choice(self.UserAgent)
 
     def generate_url_parameter_pollution_variants(self, path: str, params: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
         """
@@ -250,6 +261,46 @@ class ParameterPollutionDetector:
             
         return variants
 
+    def encode_params(self, params: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """
+        将变体参数展开为有序的 (key, value) 列表，处理参数污染标记
+        
+        带 _hpp_repeat_ / _form_repeat_ / _array_repeat_ 前缀的参数去掉前缀后追加在末尾，
+        与原参数形成重复key；列表值展开为多个同名参数
+        
+        Args:
+            params: 变体参数
+            
+        Returns:
+            List[Tuple[str, str]]: 参数列表
+        """
+        pairs = []
+        repeats = []
+        for key, value in (params or {}).items():
+            target = pairs
+            for marker in REPEAT_MARKERS:
+                if key.startswith(marker):
+                    key = key[len(marker):]
+                    target = repeats
+                    break
+            for item in (value if isinstance(value, list) else [value]):
+                target.append((str(key), str(item)))
+        return pairs + repeats
+
+    def endpoint_url(self, path: str) -> str:
+        """
+        API收集得到的完整URL直接使用，其余路径拼接在基础URL之后
+        
+        Args:
+            path: 路径或完整URL
+            
+        Returns:
+            str: 请求URL
+        """
+        if path.startswith(("http://", "https://")):
+            return path
+        return self.base_url + path
+
     def send_request(self, url: str, method: str = "GET", headers: Dict = None, params: Dict = None) -> Dict:
         """
         发送单个HTTP请求（增强版，支持参数污染特殊处理）
@@ -261,38 +312,15 @@ class ParameterPollutionDetector:
             params: 请求参数
             
         Returns:
-            Dict: 响应数据
+            Dict: 响应数据，包含预先计算的响应内容摘要 digest 和特权信息标记 privileged
         """
-        urllib3.disable_warnings()
         headers = headers or {}
-        original_params = params or {}
-        
-        # 处理特殊的参数污染标记
-        processed_params = {}
-        repeat_params = {}  # 存储需要重复的参数
-        
-        for key, value in original_params.items():
-            if key.startswith("_hpp_repeat_"):
-                # 处理URL参数重复key
-                original_key = key[len("_hpp_repeat_"):]
-                processed_params[original_key] = original_params.get(original_key, "")
-                repeat_params[original_key] = value
-            elif key.startswith("_form_repeat_"):
-                # 处理表单重复key
-                original_key = key[len("_form_repeat_"):]
-                processed_params[original_key] = original_params.get(original_key, "")
-                repeat_params[original_key] = value
-            elif key.startswith("_array_repeat_"):
-                # 处理数组重复key
-                original_key = key[len("_array_repeat_"):]
-                processed_params[original_key] = original_params.get(original_key, "")
-                repeat_params[original_key] = value
-            else:
-                processed_params[key] = value
+        method = method.upper()
+        pairs = self.encode_params(params)
         
         # 设置默认User-Agent
         if 'User-Agent' not in headers:
-            headers['User-Agent'] = random.choice(self.UserAgent)
+            headers['User-Agent'] = self.user_agent
             
         # 设置默认Content-Type
         if 'Content-Type' not in headers:
@@ -313,72 +341,27 @@ class ParameterPollutionDetector:
                 headers[key.strip()] = value.strip()
             except:
                 pass
-                
-        ssl_flag = int(getattr(self.options, 'ssl_flag', "0"))
-        proxy_data = {'http': getattr(self.options, 'proxy', None), 
-                      'https': getattr(self.options, 'proxy', None)}
-        
-        s = requests.Session()
-        s.keep_alive = False
         
         try:
-            # 特殊处理GET请求中的重复参数
-            if method.upper() == "GET":
-                # 构造带有重复参数的URL
-                if repeat_params:
-                    # 手动构建查询字符串以支持重复参数
-                    query_parts = []
-                    for key, value in processed_params.items():
-                        if isinstance(value, list):
-                            for item in value:
-                                query_parts.append(f"{urllib.parse.quote(str(key))}={urllib.parse.quote(str(item))}")
-                        else:
-                            query_parts.append(f"{urllib.parse.quote(str(key))}={urllib.parse.quote(str(value))}")
-                            
-                    # 添加重复参数
-                    for key, value in repeat_params.items():
-                        query_parts.append(f"{urllib.parse.quote(str(key))}={urllib.parse.quote(str(value))}")
-                    
-                    query_string = "&".join(query_parts)
-                    if "?" in url:
-                        full_url = f"{url}&{query_string}"
-                    else:
-                        full_url = f"{url}?{query_string}"
-                else:
-                    full_url = url
-                    
-                if ssl_flag == 1:
-                    response = s.get(full_url, headers=headers, timeout=6, 
-                                   proxies=proxy_data, verify=False)
-                else:
-                    response = s.get(full_url, headers=headers, timeout=6, 
-                                   proxies=proxy_data)
-                                   
-            elif method.upper() == "POST":
-                # POST请求中处理重复参数
-                data_to_send = processed_params.copy()
-                # 对于POST请求，重复参数会在requests内部正确处理
-                
-                if ssl_flag == 1:
-                    response = s.post(url, headers=headers, data=data_to_send, timeout=6, 
-                                    proxies=proxy_data, verify=False)
-                else:
-                    response = s.post(url, headers=headers, data=data_to_send, timeout=6, 
-                                    proxies=proxy_data)
+            # 重复参数在POST请求中按表单编码放入请求体，其余方法手动构建查询字符串以保留重复key；
+            # 请求计入全局请求预算，用尽时按请求失败处理
+            if method == "POST":
+                response = self.client.fetch(method, url, data=pairs, headers=headers)
             else:
-                # 其他方法使用默认处理
-                if ssl_flag == 1:
-                    response = s.get(url, headers=headers, params=processed_params, timeout=6, 
-                                   proxies=proxy_data, verify=False)
-                else:
-                    response = s.get(url, headers=headers, params=processed_params, timeout=6, 
-                                   proxies=proxy_data)
-                    
+                method = "GET"
+                full_url = url
+                if pairs:
+                    query_string = urllib.parse.urlencode(pairs, safe='/', quote_via=urllib.parse.quote)
+                    full_url = f"{url}{'&' if '?' in url else '?'}{query_string}"
+                response = self.client.fetch(method, full_url, headers=headers)
+            content = response.text
             return {
                 'status_code': response.status_code,
                 'headers': dict(response.headers),
-                'content': response.text,
-                'content_length': len(response.text),
+                'content': content,
+                'content_length': len(content),
+                'digest': hashlib.sha1(content.encode('utf-8', 'replace')).hexdigest(),
+                'privileged': any(indicator in content.lower() for indicator in PRIVILEGED_INDICATORS),
                 'url': url,
                 'method': method
             }
@@ -390,13 +373,83 @@ class ParameterPollutionDetector:
                 'method': method
             }
 
-    def detect_parameter_pollution(self, path: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    def iter_variants(self, path: str, params: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
         """
-        执行完整的参数污染检测
+        依次生成各类参数污染变体，各类变体开头的原始参数由基线请求代替，不再重复生成
+        
+        Args:
+            path: 请求路径
+            params: 请求参数
+            
+        Returns:
+            Iterator[Tuple[str, Dict[str, Any]]]: (测试类型, 参数) 元组
+        """
+        families = [
+            # 1. URL参数重复key行为检测
+            ("url_pollution", self.generate_url_parameter_pollution_variants),
+            # 2. JSON重复字段行为检测
+            ("json_collision", self.generate_json_field_collision_variants),
+            # 3. 表单key重复行为检测
+            ("form_collision", self.generate_form_key_collision_variants),
+            # 4. 数组展开解析差异检测
+            ("array_expansion", self.generate_array_expansion_variants),
+            # 5. Spring MVC参数绑定漏洞检测
+            ("spring_binding", self.generate_spring_mvc_binding_variants),
+        ]
+        for test_type, generate in families:
+            for test_path, test_params in generate(path, params)[1:]:
+                yield test_type, test_params
+
+    def baseline(self, path: str, params: Dict[str, Any], method: str = "GET") -> Dict:
+        """
+        获取 (路径, 方法, 参数) 的基线响应，每个组合只请求一次，各类变体共用
         
         Args:
             path: 请求路径
             params: 请求参数
+            method: HTTP方法
+            
+        Returns:
+            Dict: 基线响应数据
+        """
+        key = (path, method.upper(), tuple(self.encode_params(params)))
+        response = self._baselines.get(key)
+        if response is None:
+            # 同时进行的相同请求由 ProbeClient 合并为一次
+            response = self._baselines.setdefault(key, self.send_variant(path, method, "baseline", params))
+        return response
+
+    def send_variant(self, path: str, method: str, test_type: str, test_params: Dict[str, Any]) -> Dict:
+        """
+        发送一个参数污染变体
+        
+        Args:
+            path: 请求路径
+            method: HTTP方法
+            test_type: 测试类型
+            test_params: 变体参数
+            
+        Returns:
+            Dict: 响应数据
+        """
+        try:
+            response = self.send_request(self.endpoint_url(path), method, copy.deepcopy(self.headers), test_params)
+        except Exception as e:
+            response = {'error': str(e)}
+        response['test_type'] = test_type
+        response['params'] = test_params
+        return response
+
+    def detect_parameter_pollution(self, path: str, params: Dict[str, Any] = None, method: str = "GET") -> Dict[str, Any]:
+        """
+        执行完整的参数污染检测
+        
+        基线请求每个 (路径, 方法) 只发送一次，各类变体经共用的 ProbeClient 并发发送后分别与基线比较
+        
+        Args:
+            path: 请求路径或API收集得到的完整URL
+            params: 请求参数
+            method: HTTP方法，GET 或 POST
             
         Returns:
             Dict[str, Any]: 检测结果
@@ -411,44 +464,22 @@ class ParameterPollutionDetector:
         params = params or {}
         
         # 生成所有类型的参数污染变体
-        all_variants = []
-        
-        # 1. URL参数重复key行为检测
-        url_variants = self.generate_url_parameter_pollution_variants(path, params)
-        all_variants.extend([("url_pollution", v) for v in url_variants])
-        
-        # 2. JSON重复字段行为检测
-        json_variants = self.generate_json_field_collision_variants(path, params)
-        all_variants.extend([("json_collision", v) for v in json_variants])
-        
-        # 3. 表单key重复行为检测
-        form_variants = self.generate_form_key_collision_variants(path, params)
-        all_variants.extend([("form_collision", v) for v in form_variants])
-        
-        # 4. 数组展开解析差异检测
-        array_variants = self.generate_array_expansion_variants(path, params)
-        all_variants.extend([("array_expansion", v) for v in array_variants])
+        all_variants = list(self.iter_variants(path, params))
         
-        # 5. Spring MVC参数绑定漏洞检测
-        spring_variants = self.generate_spring_mvc_binding_variants(path, params)
-        all_variants.extend([("spring_binding", v) for v in spring_variants])
-        
-        # 发送所有变体请求
-        responses = []
-        for test_type, (test_path, test_params) in all_variants:
-            try:
-                url = self.base_url + test_path
-                response = self.send_request(url, "GET", copy.deepcopy(self.headers), test_params)
-                response['test_type'] = test_type
-                response['params'] = test_params
-                responses.append(response)
-            except Exception as e:
-                error_resp = {
-                    'error': str(e),
-                    'test_type': test_type,
-                    'params': test_params
-                }
-                responses.append(error_resp)
+        # 基线与各变体并发发送
+        def send(item):
+            test_type, test_params = item
+            return self.send_variant(path, method, test_type, test_params)
+
+        if self.threads > 1 and all_variants:
+            with ThreadPoolExecutor(min(self.threads, len(all_variants) + 1)) as pool:
+                baseline_future = pool.submit(self.baseline, path, params, method)
+                responses = list(pool.map(send, all_variants))
+                baseline = baseline_future.result()
+        else:
+            baseline = self.baseline(path, params, method)
+            responses = [send(item) for item in all_variants]
+        responses.insert(0, baseline)
                 
         results['responses'] = responses
         
@@ -456,12 +487,15 @@ class ParameterPollutionDetector:
         valid_responses = [r for r in responses if 'error' not in r]
         
         if len(valid_responses) > 1:
-            # 按测试类型分组响应
+            # 按测试类型分组响应，每组都以基线响应开头
+            baseline_group = [baseline] if 'error' not in baseline else []
             grouped_responses = {}
             for resp in valid_responses:
+                if resp is baseline:
+                    continue
                 test_type = resp.get('test_type', 'unknown')
                 if test_type not in grouped_responses:
-                    grouped_responses[test_type] = []
+                    grouped_responses[test_type] = list(baseline_group)
                 grouped_responses[test_type].append(resp)
             
             # 分析每种测试类型的响应差异
@@ -479,33 +513,30 @@ class ParameterPollutionDetector:
                             'description': f'在{test_type}测试中发现状态码差异: {sorted(unique_status_codes)}'
                         })
                     
-                    # 比较内容长度
-                    content_lengths = [r.get('content_length', 0) for r in type_responses]
-                    length_diff = max(content_lengths) - min(content_lengths)
-                    if length_diff > 100:  # 差异超过100字节
-                        results['vulnerabilities'].append({
-                            'type': 'content_length_difference',
-                            'test_type': test_type,
-                            'severity': 'medium',
-                            'description': f'在{test_type}测试中发现内容长度显著差异: {min(content_lengths)} -> {max(content_lengths)}'
-                        })
-                        
-                    # 检查是否可能存在越权等安全问题
-                    privileged_indicators = ['admin', 'root', 'password', 'secret', 'token']
-                    for resp in type_responses:
-                        content = resp.get('content', '').lower()
-                        if any(indicator in content for indicator in privileged_indicators):
+                    # 比较内容长度，响应内容摘要全部相同时无需比较
+                    if len(set(r['digest'] for r in type_responses)) > 1:
+                        content_lengths = [r.get('content_length', 0) for r in type_responses]
+                        length_diff = max(content_lengths) - min(content_lengths)
+                        if length_diff > 100:  # 差异超过100字节
                             results['vulnerabilities'].append({
-                                'type': 'privilege_disclosure',
+                                'type': 'content_length_difference',
                                 'test_type': test_type,
-                                'severity': 'high',
-                                'description': f'在{test_type}测试中发现可能的特权信息泄露'
+                                'severity': 'medium',
+                                'description': f'在{test_type}测试中发现内容长度显著差异: {min(content_lengths)} -> {max(content_lengths)}'
                             })
-                            break
+                        
+                    # 检查是否可能存在越权等安全问题
+                    if any(r['privileged'] for r in type_responses):
+                        results['vulnerabilities'].append({
+                            'type': 'privilege_disclosure',
+                            'test_type': test_type,
+                            'severity': 'high',
+                            'description': f'在{test_type}测试中发现可能的特权信息泄露'
+                        })
         
         # 添加详细的测试信息
         results['details'] = {
-            'total_tests': len(all_variants),
+            'total_tests': len(responses),
             'successful_requests': len(valid_responses),
             'error_requests': len(responses) - len(valid_responses)
         }
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 #import sys; print("运行脚本的Python路径：", sys.executable); exit()
-import re,requests,warnings,sqlite3,os
+import re,warnings,os
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from lib.common.utils import Utils
 from lib.Database import DatabaseType
 from lib.DownloadJs import DownloadJs
 from lib.common.CreatLog import creatLog
+from lib.common.responseCache import ResponseCache
 from lib.common.cmdline import CommandLines
 
 
@@ -68,10 +69,7 @@ class ParseJs():  # 获取js进行提取
         self.log.info(Utils().tellTime() + Utils().getMyWord("{target_url}") + url)
         self.log.info(Utils().tellTime() + Utils().getMyWord("{pares_js}"))
         sslFlag = int(self.options.ssl_flag)
-        if sslFlag == 1:
-            demo = requests.get(url=url, headers=headers, proxies=self.proxy_data,verify=False).text
-        else:
-            demo = requests.get(url=url, headers=headers,proxies=self.proxy_data).text
+        demo = ResponseCache.get(url, headers=headers, proxies=self.proxy_data, verify=sslFlag != 1).text
         demo = demo.replace("<!--", "").replace("-->", "")  # 删去html注释
         soup = BeautifulSoup(demo, "html.parser")
 
@@ -91,21 +89,15 @@ class ParseJs():  # 获取js进行提取
                     domain = str(domain).replace(":", "_")
                 PATH = "tmp/" + self.projectTag + "_" + domain +'/' + self.projectTag + ".db"
 
-                conn = sqlite3.connect(os.sep.join(PATH.split('/')))
-                cursor = conn.cursor()
-                conn.isolation_level = None
+                conn = DatabaseType(self.projectTag).getConnection(PATH)
                 if "#" in self.url:
                     inurl = self.url.split("#")[0] + "/§§§"
                 else:
                     inurl = self.url + "/§§§"
-                sql = "insert into js_file(name,path,local) values('%s','%s','%s')" % (jsTag + ".js" , inurl , jsTag + ".js")
-                cursor.execute(sql)
+                conn.execute("insert into js_file(name,path,local) values(?,?,?)", (jsTag + ".js", inurl, jsTag + ".js"))
                 with open("tmp" + os.sep + self.projectTag + "_" + domain + os.sep + jsTag + ".js", "wb") as js_file:
                     js_file.write(jsPathInScript)
-                    js_file.close()
-                    cursor.execute("UPDATE js_file SET success = 1 WHERE local='%s';" % (jsTag + ".js"))
-                    conn.commit()
-                conn.close()
+                conn.execute("UPDATE js_file SET success = 1 WHERE local=?", (jsTag + ".js",))
 
         # 检查是否存在通过link引入的js文件（虽然少见但需要兼容）
         for item in soup.find_all("link"):  # 防止使用link标签情况
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import deno_vm, os, re, sqlite3
+import os, re
 from urllib.parse import urlparse
 from .common.utils import Utils
 from .Database import DatabaseType
 from .DownloadJs import DownloadJs
 from .common.groupBy import GroupBy
 from .common.CreatLog import creatLog
+from .common.chunkMap import ChunkMap
 
 
 class RecoverSpilt():
@@ -44,56 +45,28 @@ class RecoverSpilt():
         self.options = options
         self.log = creatLog().get_logger()
 
-    def jsCodeCompile(self, jsCode, jsFilePath):
+    def jsCodeCompile(self, jsCode, jsFilePath, variable=None):
         """
-        编译JavaScript代码以恢复分割的文件路径
+        计算代码分割表达式以恢复分割的文件路径
 
         Args:
-            jsCode (str): 要编译的JavaScript代码
+            jsCode (str): 拼接chunk文件名的JavaScript表达式
             jsFilePath (str): JavaScript文件路径
+            variable (str): chunk id 的变量名，未知时从表达式中推断
 
         Returns:
             int: 成功返回None，失败返回0
         """
         try:
             self.log.info(Utils().tellTime() + Utils().getMyWord("{get_codesplit}"))
-            variable = re.findall(r'\[.*?\]', jsCode)
-            if "[" and "]" in variable[0]:
-                variable = variable[0].replace("[", "").replace("]", "")
-            jsCodeFunc = "function js_compile(%s){js_url=" % (variable) + jsCode + "\nreturn js_url}"
-            pattern_jscode = re.compile(r"\(\{\}\[(.*?)\]\|\|.\)", re.DOTALL)
-            flag_code = pattern_jscode.findall(jsCodeFunc)
-            if flag_code:
-                jsCodeFunc = jsCodeFunc.replace("({}[%s]||%s)" % (flag_code[0], flag_code[0]), flag_code[0])
-            pattern1 = re.compile(r"\{(.*?)\:")
-            pattern2 = re.compile(r"\,(.*?)\:")
-            nameList1 = pattern1.findall(jsCode)
-            nameList2 = pattern2.findall(jsCode)
-            nameList = nameList1 + nameList2
-            nameList = list(set(nameList))
-            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-            cursor = connect.cursor()
-            connect.isolation_level = None
+            conn = DatabaseType(self.projectTag).getConnection()
             localFile = jsFilePath.split(os.sep)[-1]
-            sql = "insert into js_split_tree(jsCode,js_name) values('%s','%s')" % (jsCode, localFile)
-            cursor.execute(sql)
-            connect.commit()
-            cursor.execute("select id from js_split_tree where js_name='%s'" % (localFile))
-            jsSplitId = cursor.fetchone()[0]
-            cursor.execute("select path from js_file where local='%s'" % (localFile))
-            jsUrlPath = cursor.fetchone()[0]
-            connect.close()
-
-            # 使用deno_vm执行JavaScript代码来获取实际文件路径
-            with deno_vm.VM() as vm:
-                vm.run(jsCodeFunc)
-                for name in nameList:
-                    if "\"" in name:
-                        name = name.replace("\"", "")
-                    if "undefined" not in vm.call("js_compile", name):
-                        jsFileName = vm.call("js_compile", name)
-                        self.jsFileNames.append(jsFileName)
+            cursor = conn.execute("insert into js_split_tree(jsCode,js_name) values(?,?)", (jsCode, localFile))
+            jsSplitId = cursor.lastrowid
+            jsUrlPath = conn.execute("select path from js_file where local=?", (localFile,)).fetchone()[0]
+
+            # 常见的映射表形式静态求值，其余交给共用的 deno_vm 批量计算
+            self.jsFileNames.extend(ChunkMap.resolve(jsCode, variable))
             self.log.info(Utils().tellTime() + Utils().getMyWord("{run_codesplit_s}") + str(len(self.jsFileNames)))
             self.getRealFilePath(jsSplitId, self.jsFileNames, jsUrlPath)
             self.log.debug("jscodecomplie模块正常")
@@ -108,19 +81,14 @@ class RecoverSpilt():
         Args:
             jsFilePath (str): JavaScript文件路径
         """
-        jsOpen = open(jsFilePath, 'r', encoding='UTF-8',errors="ignore")  # 防编码报错
-        jsFile = jsOpen.readlines()
-        jsFile = str(jsFile)  # 二次转换防报错
-        if "document.createElement(\"script\");" in jsFile:
+        with open(jsFilePath, 'r', encoding='UTF-8', errors="ignore") as jsOpen:  # 防编码报错
+            jsFile = jsOpen.read()
+        expressions = ChunkMap.findExpressions(jsFile)
+        if expressions:
             self.log.info(
                 Utils().tellTime() + Utils().getMyWord("{maybe_have_codesplit}") + Utils().getFilename(jsFilePath))
-            pattern = re.compile(r"\w\.p\+\"(.*?)\.js", re.DOTALL)
-            if pattern:
-                jsCodeList = pattern.findall(jsFile)
-                for jsCode in jsCodeList:
-                    if len(jsCode) < 30000:
-                        jsCode = "\"" + jsCode + ".js\""
-                        self.jsCodeCompile(jsCode, jsFilePath)
+            for jsCode, variable in expressions:
+                self.jsCodeCompile(jsCode, jsFilePath, variable)
 
     def getRealFilePath(self, jsSplitId, jsFileNames, jsUrlpath):
         """
@@ -171,7 +139,7 @@ class RecoverSpilt():
         self.log.info(Utils().tellTime() + Utils().getMyWord("{check_codesplit_twice}"))
         for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
             for filename in filenames:
-                if filename != self.projectTag + ".db":
+                if not DatabaseType.isDatabaseFile(self.projectTag, filename):
                     tmpName = filename.split(".")
                     if len(tmpName) == 4:
                         localFileName = "." + tmpName[-2] + ".js"
@@ -229,7 +197,7 @@ class RecoverSpilt():
         # 遍历项目路径下的所有文件进行代码分割检查
         for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
             for filename in filenames:
-                if filename != self.projectTag + ".db":
+                if not DatabaseType.isDatabaseFile(self.projectTag, filename):
                     filePath = os.path.join(parent, filename)
                     self.checkCodeSpilting(filePath)
         try:
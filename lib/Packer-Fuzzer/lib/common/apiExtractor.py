@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import re
+
+
+# 提取API路径的正则，结果与依次对全文执行 re.findall 相同
+API_REGXS = [r'\w\.get\(\"(.*?)\"\,',
+             r'\w\.post\(\"(.*?)\"\,',
+             r'\w\.post\(\"(.*?)\"',
+             r'\w\.get\(\"(.*?)\"',
+             r'\w\+\"(.*?)\"\,',
+             r'\:{url\:\"(.*?)\"\,',
+             r'return\s.*?\[\".\"\]\.post\(\"(.*?)\"',
+             r'return\s.*?\[\".\"\]\.get\(\"(.*?)\"']
+BASEURL_REGXS = [r'url.?\s?\:\s?\"(.*?)\"',
+                 r'url.?\s?\+\s?\"(.*?)\"',
+                 r'url.?\s?\=\s?\"(.*?)\"',
+                 r'host\s?\:\s?\"(.*?)\"']
+VIOLENT_REGX = r'(?isu)"([^"]+)'
+# return\s.*?[...] 形式的正则的后半部分，见 ReturnMatcher
+RETURN_TAILS = {6: r'\[\".\"\]\.post\(\"(.*?)\"',
+                7: r'\[\".\"\]\.get\(\"(.*?)\"'}
+# 上面各正则可能开始匹配的位置，只在这些位置上尝试匹配
+ANCHOR_REGX = r'(?=\w\.(?:get|post)\(\"|\w\+\"|\:\{url\:\"|return\s|url|host)'
+
+
+class ReturnMatcher():
+    """
+    匹配 return\s.*?TAIL 形式的正则
+
+    直接用正则匹配时每个 return 都会向后扫描到行尾，压缩后只有一行的JS文件中耗时与 return 数量成正比。
+    懒惰匹配的结果就是 return 之后同一行内第一个满足 TAIL 的位置，因此改为查找 TAIL，
+    查找结果在后续的 return 之间复用，整个文件只扫描一遍，结果与原正则相同。
+    """
+
+    def __init__(self, tail):
+        self.tail = re.compile(tail)
+        self.reset()
+
+    def reset(self):
+        """开始匹配一个新的文件"""
+        self.searchFrom = None
+        self.found = None
+        self.newlineFrom = None
+        self.newline = -1
+
+    def match(self, text, pos):
+        """
+        :param text: JS文件内容
+        :param pos: 匹配位置，对同一文件须递增
+        :return: TAIL 的匹配对象，其 group(1) 与 end() 即原正则的结果；不匹配时为None
+        """
+        start = pos + 7
+        if not text.startswith("return", pos) or start > len(text) or not text[pos + 6].isspace():
+            return None
+        if self.searchFrom is None or (self.found is not None and self.found.start() < start):
+            self.found = self.tail.search(text, start)
+            self.searchFrom = start
+        if self.found is None:
+            return None
+        if self.newlineFrom is None or (self.newline != -1 and self.newline < start):
+            self.newline = text.find("\n", start)
+            self.newlineFrom = start
+        if self.newline != -1 and self.newline < self.found.start():
+            return None
+        return self.found
+
+
+class ApiExtractor():
+    """
+    单次遍历的API路径提取器
+
+    每个JS文件只读取一次：先用一个组合的锚点正则找出所有可能的匹配位置，
+    再在这些位置上按原有的各条正则依次匹配，同时提取API路径、baseurl 和暴力提取模式的候选路径。
+    各正则仍保持 re.findall 的不重叠语义，提取结果与逐条正则扫描全文相同。
+    """
+
+    def __init__(self, apiExts, baseUrl=True):
+        """
+        :param apiExts: 逗号分隔的排除关键字，路径中包含任意一个即不作为API
+        :param baseUrl: 是否提取baseurl，命令行已指定baseurl时不需要
+        """
+        self.apiRegxs = [re.compile(regx) for regx in API_REGXS]
+        self.baseUrlRegxs = [re.compile(regx) for regx in BASEURL_REGXS] if baseUrl else []
+        self.returnMatchers = [ReturnMatcher(tail) for tail in RETURN_TAILS.values()]
+        matchers = [regx.match for regx in self.apiRegxs]
+        for index, matcher in zip(RETURN_TAILS, self.returnMatchers):
+            matchers[index] = matcher.match
+        self.matchers = matchers + [regx.match for regx in self.baseUrlRegxs]
+        self.anchor = re.compile(ANCHOR_REGX)
+        self.violent = re.compile(VIOLENT_REGX)
+        self.excluded = re.compile("|".join(re.escape(apiExt) for apiExt in apiExts.split(",")))
+
+    def extract(self, text):
+        """
+        从JS文件内容中提取API路径
+
+        :param text: JS文件内容
+        :return: (API路径集合, baseurl列表, 暴力提取的路径集合, 提取到的API路径数量)
+                 数量按出现次数计算，与提取结果去重前的数量一致
+        """
+        apiPaths = set()
+        baseUrls = []
+        hits = 0
+        for matcher in self.returnMatchers:
+            matcher.reset()
+        ends = [0] * len(self.matchers)
+        matches = [[] for _ in self.matchers]
+        for anchor in self.anchor.finditer(text):
+            pos = anchor.start()
+            for index, matcher in enumerate(self.matchers):
+                if pos < ends[index]:
+                    continue
+                match = matcher(text, pos)
+                if match is not None:
+                    ends[index] = match.end()
+                    matches[index].append(match.group(1))
+        apiCount = len(self.apiRegxs)
+        for found in matches[:apiCount]:
+            for apiPath in found:
+                if apiPath != '' and '/' in apiPath:
+                    if self.excluded.search(apiPath) is None:
+                        if "?" in apiPath:
+                            apiPath = apiPath.split("?")[0]
+                        apiPaths.add(apiPath)
+                        hits += 1
+                    else:
+                        hits += self.extractTwice(apiPath, apiPaths)
+        for found in matches[apiCount:]:
+            for baseurlPath in found:
+                if '/' in baseurlPath and baseurlPath != "/" and 3 < len(baseurlPath) < 20 \
+                        and self.excluded.search(baseurlPath) is None:
+                    if baseurlPath[0] == "/":
+                        baseurlPath = baseurlPath[1:]
+                    baseUrls.append(baseurlPath.split("?")[0])
+        violentPaths = set()
+        for apiPath in self.violent.findall(text):
+            if '/' in apiPath and apiPath != "/" and self.excluded.search(apiPath) is None:
+                violentPaths.add(apiPath.split("?")[0])
+        return apiPaths, baseUrls, violentPaths, hits
+
+    def extractTwice(self, apiStr, apiPaths):
+        """
+        对含有排除关键字的匹配结果再提取一次
+
+        :param apiStr: 第一次匹配到的内容
+        :param apiPaths: 提取结果集合
+        :return: 提取到的API路径数量
+        """
+        hits = 0
+        for regx in self.apiRegxs:
+            for apiPath in regx.findall(apiStr):
+                if '/' in apiPath and self.excluded.search(apiPath) is None:
+                    apiPaths.add(apiPath)
+                    hits += 1
+        return hits
+
+    def extractFile(self, filePath):
+        """
+        :param filePath: JS文件路径
+        :return: 同 extract
+        """
+        with open(filePath, "r", encoding="utf-8", errors="ignore") as jsFile:
+            return self.extract(jsFile.read())
+
+
+_worker = None
+
+
+def initWorker(apiExts, baseUrl):
+    """进程池中每个工作进程只编译一次正则"""
+    global _worker
+    _worker = ApiExtractor(apiExts, baseUrl)
+
+
+def extractWorker(filePath):
+    """
+    在工作进程中提取一个文件，异常以字符串形式返回给主进程记录
+
+    :param filePath: JS文件路径
+    :return: (extract 的结果, None) 或 (None, 错误信息)
+    """
+    try:
+        return _worker.extractFile(filePath), None
+    except Exception as e:
+        return None, str(e)
@@ -1,19 +1,124 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import re,os,re
-from urllib.parse import urlparse
+import re,os,json,shutil,hashlib
+from concurrent.futures import ProcessPoolExecutor
 from lib.common import readConfig
-from lib.common.utils import Utils
 from lib.Database import DatabaseType
-from lib.common.cmdline import CommandLines
+from lib.common.CreatLog import creatLog
+
+
+# 每次读取的字符数，文件按块流式处理，不整体读入内存
+CHUNK_SIZE = 1 << 20
+# 需要插入换行与缩进的字符
+TOKENS = re.compile(r"[{};]")
+# info表中记录已美化文件内容哈希的项
+BEAUTIFIED_INFO = "beautified"
+
+
+def fileHash(filePath):
+    """
+    计算文件内容的sha1
+
+    Args:
+        filePath (str): 文件路径
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = hashlib.sha1()
+    with open(filePath, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def beautifyFile(filePath):
+    """
+    美化单个JavaScript文件，结果先写入临时文件再替换原文件
+
+    每遇到左花括号缩进加一并换行，右花括号缩进减一并换行，分号后换行；
+    每个以分号结尾的片段按片段结束时的缩进对齐，输出与逐字符处理的实现完全相同。
+    文件按块读取，缩进和未结束的片段跨块保留，因此可以处理任意大小的文件。
+
+    Args:
+        filePath (str): 要美化的JavaScript文件路径
+
+    Returns:
+        str: 美化后文件内容的sha1
+    """
+    indent = 0
+    tabs = [""]
+    # 每个分号处的缩进
+    marks = []
+
+    def tab(level):
+        if level <= 0:
+            return ""
+        while len(tabs) <= level:
+            tabs.append(tabs[-1] + "\t")
+        return tabs[level]
+
+    def replace(match):
+        nonlocal indent
+        char = match.group()
+        if char == ";":
+            marks.append(indent)
+            return char
+        indent += 1 if char == "{" else -1
+        return char + "\n" + tab(indent)
+
+    digest = hashlib.sha1()
+    tmpPath = filePath + ".tmp"
+
+    def write(text):
+        block = text.encode("utf-8", errors="ignore")
+        digest.update(block)
+        target.write(block)
+
+    pending = ""
+    with open(filePath, encoding="utf-8", errors="ignore") as source, open(tmpPath, "wb") as target:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), ""):
+            marks.clear()
+            pieces = TOKENS.sub(replace, chunk).split(";")
+            if len(pieces) == 1:
+                pending += pieces[0]
+                continue
+            output = [tab(marks[0]), pending, pieces[0]]
+            for mark, piece in zip(marks[1:], pieces[1:-1]):
+                output.append(";\n")
+                output.append(tab(mark))
+                output.append(piece)
+            output.append(";\n")
+            write("".join(output))
+            pending = pieces[-1]
+        write(tab(indent) + pending)
+    os.replace(tmpPath, filePath)
+    return digest.hexdigest()
+
+
+def beautifyWorker(filePath):
+    """
+    在工作进程中美化一个文件，异常以字符串形式返回给主进程记录
+
+    Args:
+        filePath (str): 文件路径
+
+    Returns:
+        tuple: (美化后内容的sha1, None) 或 (None, 错误信息)
+    """
+    try:
+        return beautifyFile(filePath), None
+    except Exception as e:
+        return None, str(e)
 
 
 class BeautyJs():
     """
     JavaScript代码美化类
 
-    用于格式化JavaScript文件，使其具有更好的可读性
+    用于格式化JavaScript文件，使其具有更好的可读性。文件按块流式处理，多个文件在进程池中并行美化；
+    已美化过的文件按内容哈希记录在项目数据库中，再次执行时跳过，内容相同的文件只美化一次。
     """
 
     def __init__(self,projectTag):
@@ -24,6 +129,9 @@ class BeautyJs():
             projectTag (str): 项目标识标签
         """
         self.projectTag = projectTag
+        self.processes = int(readConfig.ReadConfig().getValue('beautyJs', 'processes')[0]) or os.cpu_count() or 1
+        self.processBytes = int(readConfig.ReadConfig().getValue('beautyJs', 'processBytes')[0])
+        self.log = creatLog().get_logger()
 
     def beauty_js(self,filePath):
         """
@@ -35,32 +143,30 @@ class BeautyJs():
             filePath (str): 要美化的JavaScript文件路径
 
         Returns:
-            None
+            str: 美化后文件内容的sha1
+        """
+        return beautifyFile(filePath)
+
+    def beautifyAll(self, filePaths):
         """
-        # 读取文件内容并按分号分割成行
-        lines = open(filePath, encoding="utf-8",errors="ignore").read().split(";")
-        indent = 0
-        formatted = []
-
-        # 遍历每一行进行格式化处理
-        for line in lines:
-            newline = []
-            for char in line:
-                newline.append(char)
-                # 遇到左花括号增加缩进并换行
-                if char == '{':
-                    indent += 1
-                    newline.append("\n")
-                    newline.append("\t" * indent)
-                # 遇到右花括号减少缩进并换行
-                if char == "}":
-                    indent -= 1
-                    newline.append("\n")
-                    newline.append("\t" * indent)
-            formatted.append("\t" * indent + "".join(newline))
-
-        # 将格式化后的内容写回原文件
-        open(filePath, "w", encoding="utf-8",errors="ignore").writelines(";\n".join(formatted))
+        美化多个文件，文件总大小达到 processBytes 时使用进程池
+
+        Args:
+            filePaths (list[str]): 文件路径列表
+
+        Returns:
+            Iterator[tuple]: (文件路径, 美化后内容的sha1, 错误信息)
+        """
+        totalBytes = sum(os.path.getsize(filePath) for filePath in filePaths)
+        if self.processes > 1 and len(filePaths) > 1 and totalBytes >= self.processBytes:
+            workers = min(self.processes, len(filePaths))
+            with ProcessPoolExecutor(workers) as pool:
+                for filePath, (digest, error) in zip(filePaths, pool.map(beautifyWorker, filePaths)):
+                    yield filePath, digest, error
+        else:
+            for filePath in filePaths:
+                digest, error = beautifyWorker(filePath)
+                yield filePath, digest, error
 
     def rewrite_js(self):
         """
@@ -73,13 +179,31 @@ class BeautyJs():
         """
         # 获取项目路径
         projectPath = DatabaseType(self.projectTag).getPathfromDB()
+        beautified = set(json.loads(DatabaseType(self.projectTag).getInfo(BEAUTIFIED_INFO) or "[]"))
 
-        # 遍历项目目录下的所有文件
+        # 按内容分组，已美化过的跳过，内容相同的文件只美化第一个
+        groups = {}
         for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
             for filename in filenames:
                 # 排除数据库文件
-                if filename != self.projectTag + ".db":
+                if not DatabaseType.isDatabaseFile(self.projectTag, filename):
                     filePath = os.path.join(parent, filename)
-                    # 对文件进行美化处理
-                    BeautyJs(self.projectTag).beauty_js(filePath)
-
+                    try:
+                        digest = fileHash(filePath)
+                    except OSError as e:
+                        self.log.error("[Err] %s" % e)
+                        continue
+                    if digest not in beautified:
+                        groups.setdefault(digest, []).append(filePath)
+
+        # 对文件进行美化处理
+        sources = [filePaths[0] for filePaths in groups.values()]
+        for filePaths, (filePath, digest, error) in zip(groups.values(), self.beautifyAll(sources)):
+            if error is not None:
+                self.log.error("[Err] %s" % error)
+                continue
+            for duplicate in filePaths[1:]:
+                shutil.copyfile(filePath, duplicate)
+            beautified.add(digest)
+        DatabaseType(self.projectTag).setInfo(BEAUTIFIED_INFO, json.dumps(sorted(beautified)))
+        self.log.debug("JS美化模块正常")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import re,atexit,hashlib,threading
+
+
+# webpack4 运行时: o.p+"js/"+({about:"about"}[e]||e)+"."+{about:"31a5e9f2"}[e]+".js"
+WEBPACK4_PATTERN = re.compile(r"\w\.p\+\"(.*?)\.js", re.DOTALL)
+WEBPACK4_MARKER = "document.createElement(\"script\");"
+# webpack5 运行时: o.u=e=>"js/"+e+"."+{123:"31a5e9f2"}[e]+".js" 或 o.u=function(e){return ...}
+WEBPACK5_PATTERN = re.compile(r"\w\.u\s*=\s*(?:function\s*\(\s*(\w+)\s*\)\s*\{\s*return\s*|\(?\s*(\w+)\s*\)?\s*=>\s*)")
+# 超过该长度的表达式不处理
+EXPRESSION_LIMIT = 30000
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_$][\w$]*)
+      | (?P<punct>\|\||[-+(){}\[\]:,!])
+    )""", re.VERBOSE | re.DOTALL)
+
+# 未定义值，与字符串拼接时得到 "undefined"
+UNDEFINED = None
+
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+
+class ChunkMapError(Exception):
+    """表达式超出静态求值支持的范围"""
+
+
+class ChunkMap():
+    """
+    webpack 异步chunk文件名的恢复引擎
+
+    运行时中的文件名表达式由字符串、chunk id 和 {id:"hash"}[e] 形式的映射表拼接而成，
+    常见形式直接在Python中静态求值；无法解析的表达式交给整个运行期间共用的 deno_vm，
+    一次调用批量计算所有chunk的文件名。结果按表达式的哈希缓存。
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+    _vm = None
+    _vmLock = threading.Lock()
+    stats = {"static": 0, "vm": 0, "cached": 0}
+
+    @staticmethod
+    def findExpressions(jsText):
+        """
+        从JS文件中找出拼接chunk文件名的表达式
+
+        :param jsText: JS文件内容
+        :return: [(表达式, chunk id 的变量名)]，变量名未知时为None
+        """
+        expressions = []
+        if WEBPACK4_MARKER in jsText:
+            for jsCode in WEBPACK4_PATTERN.findall(jsText):
+                if len(jsCode) < EXPRESSION_LIMIT:
+                    expressions.append(("\"" + jsCode + ".js\"", None))
+        for match in WEBPACK5_PATTERN.finditer(jsText):
+            try:
+                end = ChunkMap.parse(jsText, match.end())[1]
+            except ChunkMapError:
+                continue
+            jsCode = jsText[match.end():end].strip()
+            # 只处理拼接出 .js 文件名的表达式
+            if len(jsCode) < EXPRESSION_LIMIT and jsCode[-4:-1] == ".js":
+                expressions.append((jsCode, match.group(1) or match.group(2)))
+        return expressions
+
+    @classmethod
+    def resolve(cls, jsCode, variable=None):
+        """
+        计算表达式对应的所有chunk文件名
+
+        :param jsCode: 文件名表达式
+        :param variable: chunk id 的变量名，未知时从表达式中推断
+        :return: 文件名列表
+        """
+        key = hashlib.sha1(jsCode.encode("utf-8", "ignore")).hexdigest()
+        with cls._lock:
+            if key in cls._cache:
+                cls.stats["cached"] += 1
+                return list(cls._cache[key])
+        try:
+            fileNames = cls.evaluate(jsCode)
+            stat = "static"
+        except ChunkMapError:
+            fileNames = cls.vmEvaluate(jsCode, variable)
+            stat = "vm"
+        with cls._lock:
+            cls._cache[key] = tuple(fileNames)
+            cls.stats[stat] += 1
+        return fileNames
+
+    @staticmethod
+    def tokenize(text, pos):
+        match = TOKEN_PATTERN.match(text, pos)
+        if match is None or match.end() == pos:
+            return None, None, pos
+        return match.lastgroup, match.group(match.lastgroup), match.end()
+
+    @staticmethod
+    def parse(text, pos=0):
+        """
+        解析 项(+项)* 形式的表达式，遇到不属于表达式的内容即停止
+
+        项可以是字符串、数字、变量、(表达式)、(表达式||表达式)、{键:值,...}[变量]
+
+        :param text: 源码
+        :param pos: 起始位置
+        :return: (语法树, 结束位置)
+        """
+        terms = []
+        while True:
+            term, pos = ChunkMap.parseTerm(text, pos)
+            terms.append(term)
+            kind, value, end = ChunkMap.tokenize(text, pos)
+            if value != "+":
+                return ("concat", terms), pos
+            pos = end
+
+    @staticmethod
+    def parseTerm(text, pos):
+        kind, value, pos = ChunkMap.tokenize(text, pos)
+        if kind == "string":
+            return ("literal", ChunkMap.unquote(value)), pos
+        if kind == "number":
+            return ("literal", value), pos
+        if kind == "name":
+            if value == "undefined":
+                return ("literal", UNDEFINED), pos
+            return ("var", value), pos
+        if value == "(":
+            left, pos = ChunkMap.parse(text, pos)
+            kind, value, pos = ChunkMap.tokenize(text, pos)
+            if value == "||":
+                right, pos = ChunkMap.parse(text, pos)
+                kind, value, pos = ChunkMap.tokenize(text, pos)
+                left = ("or", left, right)
+            if value != ")":
+                raise ChunkMapError("unclosed parenthesis")
+            return left, pos
+        if value == "{":
+            table, pos = ChunkMap.parseObject(text, pos)
+            kind, value, pos = ChunkMap.tokenize(text, pos)
+            if value != "[":
+                raise ChunkMapError("object literal without lookup")
+            kind, name, pos = ChunkMap.tokenize(text, pos)
+            if kind != "name":
+                raise ChunkMapError("unsupported lookup key")
+            kind, value, pos = ChunkMap.tokenize(text, pos)
+            if value != "]":
+                raise ChunkMapError("unclosed lookup")
+            return ("lookup", table, name), pos
+        raise ChunkMapError("unsupported token %r" % value)
+
+    @staticmethod
+    def parseObject(text, pos):
+        table = {}
+        kind, value, end = ChunkMap.tokenize(text, pos)
+        if value == "}":
+            return table, end
+        while True:
+            kind, key, pos = ChunkMap.tokenize(text, pos)
+            if kind == "string":
+                key = ChunkMap.unquote(key)
+            elif kind == "number":
+                # JS中数字键与对应的字符串键等价
+                key = ChunkMap.normalizeKey(key)
+            elif kind != "name":
+                raise ChunkMapError("unsupported object key")
+            kind, value, pos = ChunkMap.tokenize(text, pos)
+            if value != ":":
+                raise ChunkMapError("expected ':'")
+            kind, value, pos = ChunkMap.tokenize(text, pos)
+            if kind == "string":
+                value = ChunkMap.unquote(value)
+            elif kind == "punct" and value == "!":
+                # 压缩后的布尔值 !0 / !1
+                kind, number, pos = ChunkMap.tokenize(text, pos)
+                if kind != "number":
+                    raise ChunkMapError("unsupported object value")
+                value = "false" if float(number) else "true"
+            elif kind != "number":
+                raise ChunkMapError("unsupported object value")
+            table[key] = value
+            kind, value, pos = ChunkMap.tokenize(text, pos)
+            if value == "}":
+                return table, pos
+            if value != ",":
+                raise ChunkMapError("expected ','")
+
+    @staticmethod
+    def normalizeKey(key):
+        number = float(key)
+        return str(int(number)) if number.is_integer() else str(number)
+
+    @staticmethod
+    def unquote(literal):
+        body = literal[1:-1]
+        if "\\" not in body:
+            return body
+
+        def replace(match):
+            escape = match.group(1)
+            if escape[0] in "ux" and len(escape) > 1:
+                return chr(int(escape[1:], 16))
+            return ESCAPES.get(escape, escape)
+
+        return re.sub(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", replace, body, flags=re.DOTALL)
+
+    @staticmethod
+    def evaluate(jsCode):
+        """
+        静态求值：对表达式中各映射表出现过的每个chunk id计算文件名
+
+        :param jsCode: 文件名表达式
+        :return: 文件名列表，含 undefined 的结果被丢弃
+        """
+        tree, end = ChunkMap.parse(jsCode)
+        if jsCode[end:].strip():
+            raise ChunkMapError("trailing code")
+        names = []
+        variables = set()
+        ChunkMap.collect(tree, names, variables)
+        if len(variables) > 1:
+            raise ChunkMapError("more than one variable")
+        fileNames = []
+        for name in names:
+            fileName = ChunkMap.toString(ChunkMap.compute(tree, name))
+            if "undefined" not in fileName:
+                fileNames.append(fileName)
+        return fileNames
+
+    @staticmethod
+    def collect(node, names, variables):
+        if node[0] == "concat":
+            for term in node[1]:
+                ChunkMap.collect(term, names, variables)
+        elif node[0] == "or":
+            ChunkMap.collect(node[1], names, variables)
+            ChunkMap.collect(node[2], names, variables)
+        elif node[0] == "lookup":
+            variables.add(node[2])
+            for key in node[1]:
+                if key not in names:
+                    names.append(key)
+        elif node[0] == "var":
+            variables.add(node[1])
+
+    @staticmethod
+    def compute(node, chunkId):
+        if node[0] == "literal":
+            return node[1]
+        if node[0] == "var":
+            return chunkId
+        if node[0] == "lookup":
+            return node[1].get(chunkId, UNDEFINED)
+        if node[0] == "or":
+            left = ChunkMap.compute(node[1], chunkId)
+            return left if left not in (UNDEFINED, "") else ChunkMap.compute(node[2], chunkId)
+        values = [ChunkMap.compute(term, chunkId) for term in node[1]]
+        if len(values) == 1:
+            return values[0]
+        return "".join(ChunkMap.toString(value) for value in values)
+
+    @staticmethod
+    def toString(value):
+        return "undefined" if value is UNDEFINED else value
+
+    @classmethod
+    def getVM(cls):
+        """
+        获取整个运行期间共用的 deno_vm 实例，首次使用时创建
+
+        :return: deno_vm.VM
+        """
+        if cls._vm is None:
+            import deno_vm
+            vm = deno_vm.VM()
+            vm.create()
+            vm.run("function js_compile_batch(names){return names.map(function(name){return String(js_compile(name))})}")
+            atexit.register(vm.destroy)
+            cls._vm = vm
+        return cls._vm
+
+    @classmethod
+    def vmEvaluate(cls, jsCode, variable=None):
+        """
+        使用 deno_vm 求值，所有chunk id 在一次调用中计算
+
+        :param jsCode: 文件名表达式
+        :param variable: chunk id 的变量名，未知时取第一个 [...] 中的内容
+        :return: 文件名列表
+        """
+        if variable is None:
+            lookups = re.findall(r'\[(.*?)\]', jsCode)
+            variable = lookups[0] if lookups else "e"
+        jsCodeFunc = "function js_compile(%s){js_url=" % (variable) + jsCode + "\nreturn js_url}"
+        pattern_jscode = re.compile(r"\(\{\}\[(.*?)\]\|\|.\)", re.DOTALL)
+        flag_code = pattern_jscode.findall(jsCodeFunc)
+        if flag_code:
+            jsCodeFunc = jsCodeFunc.replace("({}[%s]||%s)" % (flag_code[0], flag_code[0]), flag_code[0])
+        nameList = re.findall(r"\{(.*?)\:", jsCode) + re.findall(r"\,(.*?)\:", jsCode)
+        names = []
+        for name in nameList:
+            name = name.replace("\"", "")
+            if name not in names:
+                names.append(name)
+        with cls._vmLock:
+            vm = cls.getVM()
+            vm.run(jsCodeFunc)
+            results = vm.call("js_compile_batch", names)
+        return [fileName for fileName in results if "undefined" not in fileName]
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import json,random,threading,urllib3
+from collections import namedtuple,OrderedDict
+from contextlib import nullcontext
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from lib.common import readConfig
+from lib.common.CreatLog import creatLog
+from lib.common.transport import SharedTransport
+
+
+UserAgents = ["Mozilla/5.0 (Windows NT 6.1; WOW64; rv:34.0) Gecko/20100101 Firefox/34.0",
+              "Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; en) Opera 9.50",
+              "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/534.57.2 (KHTML, like Gecko) Version/5.1.7 Safari/534.57.2",
+              "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.71 Safari/537.36",
+              "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11",
+              "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-US) AppleWebKit/534.16 (KHTML, like Gecko) Chrome/10.0.648.133 Safari/534.16",
+              "Mozilla/5.0 (Windows NT 6.1; WOW64; Trident/7.0; rv:11.0) like Gecko",
+              "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/536.11 (KHTML, like Gecko) Chrome/20.0.1132.11 TaoBrowser/2.0 Safari/536.11",
+              "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Maxthon/4.4.3.4000 Chrome/30.0.1599.101 Safari/537.36",
+              "Mozilla/4.0 (compatible; MSIE 7.0; Windows NT 5.1; Trident/4.0; SV1; QQDownload 732; .NET4.0C; .NET4.0E; SE 2.X MetaSr 1.0)",
+              "Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; SV1; QQDownload 732; .NET4.0C; .NET4.0E; LBBROWSER)",
+              "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-us) AppleWebKit/534.50 (KHTML, like Gecko) Version/5.1 Safari/534.50",
+              "Mozilla/5.0 (compatible; MSIE 9.0; Windows NT 6.1; Trident/5.0",
+              "Opera/9.80 (Windows NT 6.1; U; en) Presto/2.8.131 Version/11.11",
+              "Mozilla/4.0 (compatible; MSIE 7.0; Windows NT 5.1; TencentTraveler 4.0)"]
+
+# 一次探测的结果，请求失败时 status 为 None
+ProbeResult = namedtuple("ProbeResult", ["url", "method", "status", "text", "data"])
+
+# 参与请求缓存键计算的请求头，User-Agent 等其余请求头不影响响应内容
+MEMO_HEADERS = ("content-type", "cookie", "authorization")
+
+
+class RequestBudgetExceeded(Exception):
+    """本次运行的请求数已达到全局预算"""
+
+
+class RequestBudget():
+    """
+    本次运行的全局请求预算
+
+    每发出一个请求(包括共享传输层的重试)消耗一次，达到上限后 take 抛出 RequestBudgetExceeded；上限为0时不限制。
+    """
+
+    _limit = 0
+    _used = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def setLimit(cls, limit):
+        """
+        :param limit: 请求数上限，0表示不限制
+        """
+        with cls._lock:
+            cls._limit = int(limit)
+            cls._used = 0
+
+    @classmethod
+    def take(cls):
+        with cls._lock:
+            if cls._limit and cls._used >= cls._limit:
+                raise RequestBudgetExceeded("request budget of %d exhausted" % cls._limit)
+            cls._used += 1
+
+    @classmethod
+    def tryTake(cls):
+        """
+        为一次重试消耗预算，预算用尽时不抛出异常
+
+        :return: 是否还有预算
+        """
+        with cls._lock:
+            if cls._limit and cls._used >= cls._limit:
+                return False
+            cls._used += 1
+            return True
+
+    @classmethod
+    def exhausted(cls):
+        with cls._lock:
+            return bool(cls._limit) and cls._used >= cls._limit
+
+    @classmethod
+    def used(cls):
+        return cls._used
+
+
+class _Flight():
+    """正在进行中的请求，相同请求的其他调用者等待它完成"""
+
+    __slots__ = ("event", "response", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class ProbeClient():
+    """
+    API探测模块共用的HTTP客户端
+
+    所有探测请求共用一个保持连接的会话，每次探测只发送一个请求，
+    状态码和响应内容从同一个响应中读取；并发数和超时时间由 config.ini 的 [probe] 配置。
+    本次运行中 方法+URL+请求体+相关请求头 相同的请求只发送一次，结果由各探测和漏洞检测模块共享。
+    """
+
+    _lock = threading.Lock()
+    # 请求缓存，按最近使用顺序淘汰
+    _memo = OrderedDict()
+    _inflight = {}
+    _memoLock = threading.Lock()
+    _memoStats = {"requests": 0, "sent": 0}
+    memoize = True
+    # 同一主机同时进行的请求数上限，0表示不限制，由 TestScheduler 设置
+    hostThreads = 0
+    _hostLimits = {}
+
+    def __init__(self, options):
+        """
+        :param options: 命令行选项，使用其中的 proxy、cookie、head、contenttype、ssl_flag
+        """
+        urllib3.disable_warnings()  # 禁止跳出来对warning
+        self.options = options
+        self.threads = int(readConfig.ReadConfig().getValue('probe', 'threads')[0])
+        self.timeout = int(readConfig.ReadConfig().getValue('probe', 'timeout')[0])
+        self.memoSize = int(readConfig.ReadConfig().getValue('probe', 'memoSize')[0])
+        self.proxy_data = {'http': self.options.proxy, 'https': self.options.proxy}
+        self.verify = int(self.options.ssl_flag) != 1  # 根据SSL标志选择是否验证证书
+        self.log = creatLog().get_logger()
+
+    def getSession(self):
+        """
+        获取所有探测模块共用的会话
+
+        :return: requests.Session
+        """
+        return SharedTransport.getSession(self.threads)
+
+    def getHostLimit(self, url):
+        """
+        获取目标主机的并发限制
+
+        :param url: 请求URL
+        :return: 该主机的信号量，不限制时为空的上下文
+        """
+        cls = ProbeClient
+        if not cls.hostThreads:
+            return nullcontext()
+        host = urlparse(url).netloc
+        with cls._lock:
+            if host not in cls._hostLimits:
+                cls._hostLimits[host] = threading.BoundedSemaphore(cls.hostThreads)
+            return cls._hostLimits[host]
+
+    def headers(self, contenttype='application/x-www-form-urlencoded'):
+        """
+        构造请求头，命令行指定的Content-Type优先
+
+        :param contenttype: 默认的Content-Type
+        :return: 请求头字典
+        """
+        if self.options.contenttype != None:
+            contenttype = self.options.contenttype
+        headers = {
+            'User-Agent': random.choice(UserAgents),
+            'Content-Type': contenttype,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        }
+        if self.options.cookie != None:
+            headers['Cookie'] = self.options.cookie
+        headers[self.options.head.split(':')[0]] = self.options.head.split(':')[1]
+        return headers
+
+    def request(self, method, url, data=None, contenttype='application/x-www-form-urlencoded', allow_redirects=True,
+                retries=None):
+        """
+        发送一次探测请求
+
+        :param method: 请求方法
+        :param url: 请求URL
+        :param data: 请求体
+        :param contenttype: 默认的Content-Type
+        :param allow_redirects: 是否跟随跳转
+        :param retries: 重试次数，默认只重试幂等方法；发送测试载荷时传入0
+        :return: ProbeResult
+        """
+        try:
+            response = self.fetch(method, url, data, self.headers(contenttype), allow_redirects=allow_redirects,
+                                  retries=retries)
+            return ProbeResult(url, method, response.status_code, response.text, data)
+        except RequestBudgetExceeded:
+            return ProbeResult(url, method, None, None, data)
+        except Exception as e:
+            self.log.error("[Err] %s" % e)
+            return ProbeResult(url, method, None, None, data)
+
+    @staticmethod
+    def memoKey(method, url, data=None, headers=None, vary=()):
+        """
+        计算请求缓存键
+
+        :param method: 请求方法
+        :param url: 请求URL
+        :param data: 请求体
+        :param headers: 请求头
+        :param vary: 除 MEMO_HEADERS 外同样参与缓存键计算的请求头(小写)
+        :return: 缓存键
+        """
+        if isinstance(data, (dict, list)):
+            body = json.dumps(data, sort_keys=True, default=str)
+        elif isinstance(data, bytes):
+            body = data.decode("latin-1")
+        else:
+            body = "" if data is None else str(data)
+        vary = sorted((name.lower(), str(value)) for name, value in (headers or {}).items()
+                      if name.lower() in MEMO_HEADERS or name.lower() in vary)
+        return (method.upper(), url, body, tuple(vary))
+
+    def fetch(self, method, url, data=None, headers=None, timeout=None, allow_redirects=True, vary=(), retries=None):
+        """
+        发送请求，本次运行中已发送过的相同请求直接返回之前的响应
+
+        相同的请求正在进行时等待其完成并共享结果；请求失败时不缓存，异常抛给所有等待的调用者。
+        实际发出请求前消耗全局请求预算，预算用尽时抛出 RequestBudgetExceeded；
+        共享传输层的每次重试同样消耗预算，预算用尽后不再重试。
+
+        :param method: 请求方法
+        :param url: 请求URL
+        :param data: 请求体
+        :param headers: 请求头
+        :param timeout: 超时时间(秒)，默认使用 [probe] 的配置
+        :param allow_redirects: 是否跟随跳转
+        :param vary: 除 MEMO_HEADERS 外同样区分缓存的请求头(小写)，如专门比较不同User-Agent的请求
+        :param retries: 重试次数，默认只重试幂等方法；发送测试载荷时传入0，避免载荷被重复发送
+        :return: requests.Response
+        """
+        cls = ProbeClient
+        def send():
+            with self.getHostLimit(url):
+                return SharedTransport.request(method, url, headers=headers, data=data,
+                                               timeout=timeout or self.timeout, proxies=self.proxy_data,
+                                               verify=self.verify, allow_redirects=allow_redirects,
+                                               retries=retries, canRetry=RequestBudget.tryTake)
+
+        key = cls.memoKey(method, url, data, headers, vary) + (allow_redirects,)
+        with cls._memoLock:
+            if not cls.memoize:
+                RequestBudget.take()
+                cls._memoStats["sent"] += 1
+                flight = None
+            elif key in cls._memo:
+                cls._memoStats["requests"] += 1
+                cls._memo.move_to_end(key)
+                return cls._memo[key]
+            else:
+                flight = cls._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    RequestBudget.take()
+                    flight = cls._inflight[key] = _Flight()
+                    cls._memoStats["sent"] += 1
+            cls._memoStats["requests"] += 1
+        if flight is None:
+            return send()
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+        try:
+            flight.response = send()
+            with cls._memoLock:
+                cls._memo[key] = flight.response
+                while len(cls._memo) > self.memoSize:
+                    cls._memo.popitem(last=False)
+            return flight.response
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with cls._memoLock:
+                del cls._inflight[key]
+            flight.event.set()
+
+    @classmethod
+    def memoStats(cls):
+        """
+        请求缓存的统计数据
+
+        :return: {"requests": 请求次数, "sent": 实际发出的请求数, "saved": 节省的请求数}
+        """
+        with cls._memoLock:
+            stats = dict(cls._memoStats)
+        stats["saved"] = stats["requests"] - stats["sent"]
+        return stats
+
+    @classmethod
+    def resetMemo(cls):
+        """清空请求缓存与统计数据"""
+        with cls._memoLock:
+            cls._memo.clear()
+            cls._memoStats.update(requests=0, sent=0)
+
+    def get(self, url, retries=None):
+        return self.request("GET", url, retries=retries)
+
+    def post(self, url, data, contenttype='application/x-www-form-urlencoded', allow_redirects=True):
+        return self.request("POST", url, data, contenttype, allow_redirects)
+
+    def map(self, func, items, callback=None):
+        """
+        使用线程池并发执行探测
+
+        :param func: 对每一项执行的函数
+        :param items: 待探测的项目
+        :param callback: 每完成一项后调用，用于更新进度
+        :return: 与 items 顺序一致的结果列表
+        """
+        def task(item):
+            result = func(item)
+            if callback is not None:
+                callback(result)
+            return result
+
+        with ThreadPoolExecutor(self.threads) as pool:
+            return list(pool.map(task, items))
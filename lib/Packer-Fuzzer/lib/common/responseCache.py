@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import os,threading,hashlib
+import importlib.util
+from lib.common.transport import SharedTransport
+
+
+CHUNK_SIZE = 64 * 1024
+# 超过该大小的文件不写入共享缓存
+CACHE_ITEM_LIMIT = 8 * 1024 * 1024
+
+
+class ResponseCache():
+    """
+    dirsearch 共享响应缓存的接入层
+
+    由 dirsearch 启动时，通过环境变量传入缓存模块与缓存文件的位置，
+    目录扫描、JsFind 等阶段已经下载过的页面和JS文件直接从缓存读取；
+    单独运行 Packer-Fuzzer 时环境变量不存在，所有请求照常发出。
+    """
+
+    _cache = None
+    _loaded = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def getCache(cls):
+        """
+        加载共享缓存，未启用时返回None
+
+        :return: dirsearch 的 ResponseCache 实例或None
+        """
+        if cls._loaded:
+            return cls._cache
+        with cls._lock:
+            if not cls._loaded:
+                cls._cache = cls.loadCache()
+                cls._loaded = True
+        return cls._cache
+
+    @staticmethod
+    def loadCache():
+        path = os.environ.get("DIRSEARCH_RESPONSE_CACHE")
+        module_path = os.environ.get("DIRSEARCH_RESPONSE_CACHE_MODULE")
+        if not path or not module_path or not os.path.exists(module_path):
+            return None
+        try:
+            # 按文件路径加载，避免与 Packer-Fuzzer 自身的 lib 包重名
+            spec = importlib.util.spec_from_file_location("dirsearch_response_cache", module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module.ResponseCache(
+                path,
+                ttl=int(os.environ.get("DIRSEARCH_RESPONSE_CACHE_TTL", 300)),
+                max_size=int(os.environ.get("DIRSEARCH_RESPONSE_CACHE_SIZE", 256)) * 1024 * 1024,
+                run=os.environ.get("DIRSEARCH_RESPONSE_CACHE_RUN"),
+            )
+        except Exception:
+            return None
+
+    @classmethod
+    def get(cls, url, headers=None, proxies=None, verify=True, stage="packer_fuzzer"):
+        """
+        发起GET请求，启用共享缓存时优先从缓存读取
+
+        :param url: 请求URL
+        :param headers: 请求头
+        :param proxies: 代理设置
+        :param verify: 是否校验证书
+        :param stage: 统计命中率使用的阶段名称
+        :return: 响应对象，提供 status_code/headers/content/text
+        """
+        fetcher = lambda: SharedTransport.request("GET", url, headers=headers, proxies=proxies, verify=verify)
+        cache = cls.getCache()
+        if cache is None:
+            return fetcher()
+        return cache.fetch("GET", url, fetcher, headers=headers, stage=stage)
+
+    @classmethod
+    def download(cls, session, url, path, headers=None, proxies=None, verify=True, timeout=None, stage="packer_fuzzer"):
+        """
+        下载文件并分块写入磁盘，启用共享缓存时优先从缓存读取
+
+        :param session: 发起请求使用的 requests.Session
+        :param url: 请求URL
+        :param path: 保存路径
+        :param headers: 请求头
+        :param proxies: 代理设置
+        :param verify: 是否校验证书
+        :param timeout: 超时时间(秒)
+        :param stage: 统计命中率使用的阶段名称
+        :return: 文件内容的sha256
+        """
+        cache = cls.getCache()
+        if cache is not None:
+            cached = cache.lookup("GET", url, headers, stage)
+            if cached is not None:
+                with open(path, "wb") as f:
+                    f.write(cached.content)
+                return hashlib.sha256(cached.content).hexdigest()
+        digest = hashlib.sha256()
+        # 较小的文件同时保留在内存中写入缓存，超过上限的只写磁盘
+        chunks = [] if cache is not None else None
+        size = 0
+        with session.get(url, headers=headers, proxies=proxies, verify=verify, timeout=timeout, stream=True) as response:
+            with open(path, "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    if chunks is not None:
+                        size += len(chunk)
+                        if size <= CACHE_ITEM_LIMIT:
+                            chunks.append(chunk)
+                        else:
+                            chunks = None
+            if chunks is not None:
+                cache.put("GET", url, response.status_code, response.headers, b"".join(chunks), request_headers=headers)
+        return digest.hexdigest()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import threading
+from collections import defaultdict
+from contextlib import nullcontext
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from lib.common import readConfig
+from lib.common.CreatLog import creatLog
+from lib.common.probeClient import ProbeClient,RequestBudget,RequestBudgetExceeded
+
+
+class TestScheduler():
+    """
+    漏洞检测任务调度器
+
+    各检测模块按 (模块, 接口) 拆分为任务，提交到同一个有界线程池中执行，
+    同一主机的并发任务数与经 ProbeClient 发出的并发请求数均受 hostThreads 限制，所有模块共用一个全局请求预算；
+    依赖响应时间的检测(时间盲注)在单独的低并发通道中执行，避免计时受其他请求影响。
+    检测结果由各任务完成时直接写入项目数据库。线程数等参数由 config.ini 的 [scheduler] 配置。
+    """
+
+    def __init__(self):
+        self.threads = int(readConfig.ReadConfig().getValue('scheduler', 'threads')[0])
+        self.hostThreads = int(readConfig.ReadConfig().getValue('scheduler', 'hostThreads')[0])
+        self.timeThreads = int(readConfig.ReadConfig().getValue('scheduler', 'timeThreads')[0])
+        RequestBudget.setLimit(int(readConfig.ReadConfig().getValue('scheduler', 'budget')[0]))
+        # 任务内部还会并发请求(如 ApiText)，请求层面同样限制单主机并发
+        ProbeClient.hostThreads = self.hostThreads
+        self.log = creatLog().get_logger()
+        self.lanes = {
+            "default": ThreadPoolExecutor(self.threads),
+            "time": ThreadPoolExecutor(self.timeThreads),
+        }
+        self._hostLimits = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._budgetWarned = False
+        # 模块名 -> [完成的任务数, 失败的任务数]
+        self.stats = defaultdict(lambda: [0, 0])
+
+    def getHostLimit(self, url):
+        """
+        获取目标主机的并发限制
+
+        :param url: 任务访问的URL
+        :return: threading.BoundedSemaphore
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            limit = self._hostLimits.get(host)
+            if limit is None:
+                limit = self._hostLimits[host] = threading.BoundedSemaphore(self.hostThreads)
+        return limit
+
+    def submit(self, module, func, *args, url=None, lane="default", callback=None):
+        """
+        提交一个检测任务
+
+        :param module: 模块名称，用于统计与日志
+        :param func: 任务函数
+        :param args: 任务函数的参数
+        :param url: 任务访问的URL，用于主机并发限制；不访问网络的任务为None
+        :param lane: 执行通道，default 或 time
+        :param callback: 任务成功后以返回值调用，用于写入结果
+        :return: concurrent.futures.Future
+        """
+        with self._lock:
+            self._pending += 1
+        return self.lanes[lane].submit(self._run, module, func, args, url, callback)
+
+    def _run(self, module, func, args, url, callback):
+        failed = 1
+        try:
+            # 预算用尽后不再启动新的任务
+            if RequestBudget.exhausted():
+                raise RequestBudgetExceeded("request budget of %d exhausted" % RequestBudget.used())
+            with self.getHostLimit(url) if url else nullcontext():
+                result = func(*args)
+            if callback is not None:
+                callback(result)
+            failed = 0
+            return result
+        except RequestBudgetExceeded as e:
+            with self._lock:
+                warned, self._budgetWarned = self._budgetWarned, True
+            if not warned:
+                self.log.warning("[!] 已达到请求预算，剩余的检测任务不再发送请求: %s" % e)
+        except Exception as e:
+            self.log.error("[Err] %s: %s" % (module, e))
+        finally:
+            with self._lock:
+                self.stats[module][0] += 1
+                self.stats[module][1] += failed
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.notify_all()
+
+    def join(self):
+        """
+        等待所有任务(包括任务执行中提交的后续任务)完成
+        """
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+        for module, (done, failed) in sorted(self.stats.items()):
+            if failed:
+                self.log.debug("%s模块完成 %d 个任务, 其中 %d 个失败" % (module, done, failed))
+            else:
+                self.log.debug("%s模块正常" % module)
+
+    def close(self):
+        """
+        等待所有任务完成并关闭线程池
+        """
+        self.join()
+        for pool in self.lanes.values():
+            pool.shutdown()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8 -*-
+
+import os,threading,requests
+import importlib.util
+from http.cookiejar import DefaultCookiePolicy
+
+
+class SharedTransport():
+    """
+    dirsearch 共享传输层的接入层
+
+    由 dirsearch 启动时，通过环境变量传入传输层模块的位置和扫描的重试次数、速率限制，
+    所有请求共用一组连接池，重试退避、单主机速率限制与 dirsearch 各阶段一致；
+    单独运行 Packer-Fuzzer 时环境变量不存在，使用一个普通的连接池会话。
+    """
+
+    _transport = None
+    _session = None
+    _loaded = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def getTransport(cls):
+        """
+        加载共享传输层，未由 dirsearch 启动时返回None
+
+        :return: dirsearch 的 Transport 实例或None
+        """
+        if cls._loaded:
+            return cls._transport
+        with cls._lock:
+            if not cls._loaded:
+                cls._transport = cls.loadTransport()
+                cls._loaded = True
+        return cls._transport
+
+    @staticmethod
+    def loadTransport():
+        module_path = os.environ.get("DIRSEARCH_TRANSPORT_MODULE")
+        if not module_path or not os.path.exists(module_path):
+            return None
+        try:
+            # 按文件路径加载，避免与 Packer-Fuzzer 自身的 lib 包重名
+            spec = importlib.util.spec_from_file_location("dirsearch_transport", module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module.Transport(
+                retries=int(os.environ.get("DIRSEARCH_TRANSPORT_RETRIES", 1)),
+                max_rate=int(os.environ.get("DIRSEARCH_TRANSPORT_MAX_RATE", 0)),
+                timeout=float(os.environ.get("DIRSEARCH_TRANSPORT_TIMEOUT", 10)),
+            )
+        except Exception:
+            return None
+
+    @classmethod
+    def getSession(cls, threads=10):
+        """
+        获取所有模块共用的会话，Cookie由请求头统一传入，不保存响应中的Cookie
+
+        :param threads: 单独运行时每个主机的连接池大小
+        :return: requests.Session
+        """
+        if cls._session is None:
+            transport = cls.getTransport()
+            with cls._lock:
+                if cls._session is None and transport is not None:
+                    cls._session = transport.session()
+                elif cls._session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=threads, pool_maxsize=threads)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def request(cls, method, url, retries=None, canRetry=None, **kwargs):
+        """
+        发送请求，由 dirsearch 启动时经过共享传输层的重试和速率限制
+
+        默认只有幂等方法会重试，发送测试载荷的请求应传入 retries=0，避免载荷被重复发送。
+
+        :param method: 请求方法
+        :param url: 请求URL
+        :param retries: 重试次数，默认使用共享传输层对该方法的设置；单独运行时不重试
+        :param canRetry: 每次重试前调用，返回False时不再重试，用于把重试计入请求预算
+        :param kwargs: 传给 requests 的其他参数
+        :return: requests.Response
+        """
+        transport = cls.getTransport()
+        if transport is None:
+            return cls.getSession().request(method, url, **kwargs)
+        return transport.request(method, url, session=cls.getSession(), stage="packer_fuzzer",
+                                 retries=retries, can_retry=canRetry, **kwargs)
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import urllib3,requests,random,time
+import urllib3,random,time
 from threading import Thread
 from lib.common.CreatLog import creatLog
+from lib.common.transport import SharedTransport
 from concurrent.futures import ThreadPoolExecutor,ALL_COMPLETED,wait
 
 
@@ -93,8 +94,7 @@ class WebRequest(object):
 
             }
 
-        s = requests.Session()
-        s.keep_alive = False
+        s = SharedTransport.getSession()
 
         try:
             # 模式1：仅获取状态码
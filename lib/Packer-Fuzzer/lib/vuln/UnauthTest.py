@@ -1,7 +1,7 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import os,re,sqlite3
+import os,re
 from lib.common import readConfig
 from lib.Database import DatabaseType
 from lib.common.CreatLog import creatLog
@@ -18,14 +18,9 @@ class UnAuthTest():
 
     def apiUnAuthTest(self):
         try:
-            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-            cursor = connect.cursor()
-            connect.isolation_level = None
-            sql = "select * from api_tree where success = 1 or success = 2"
-            cursor.execute(sql)
-            apiTreeInfo = cursor.fetchall()
-            for apiInfo in apiTreeInfo:
+            database = DatabaseType(self.projectTag)
+            records = []
+            for apiInfo in database.allApiFromDB():
                 for resultFilter in self.resultFilters.split(","):
                     try:
                         if resultFilter not in apiInfo[4]:
@@ -38,23 +33,14 @@ class UnAuthTest():
                 if flag:
                     # print(apiInfo[4])
                     self.api_UnAuth_result.append(apiInfo[4])
-                    sql = "select from_js from api_tree where id=('%s')" % apiInfo[0]
-                    cursor.execute(sql)
-                    js_id = cursor.fetchone()
                     for unauth_not_sure in self.unauth_not_sure.split(","):
                         if unauth_not_sure not in apiInfo[4]:
                             flag = 1
                         else:
                             flag = 0
                             break
-                    if flag:
-                        sql = "insert into vuln(api_id,js_id,response_b,sure,type) values ('%s','%s','%s','%s','unAuth')" % (
-                            apiInfo[0], js_id[0], apiInfo[4], 1)
-                    else:
-                        sql = "insert into vuln(api_id,js_id,response_b,sure,type) values ('%s','%s','%s','%s','unAuth')" % (
-                            apiInfo[0], js_id[0], apiInfo[4], 2)
-                    cursor.execute(sql)
-
-            connect.close()
+                    # apiInfo[6] 即接口所属的from_js
+                    records.append((apiInfo[0], apiInfo[6], apiInfo[4], 1 if flag else 2))
+            database.insertUnAuthInfoIntoDB(records)
         except Exception as e:
             self.log.error("[Err] %s" % e)
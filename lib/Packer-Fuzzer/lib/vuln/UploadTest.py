@@ -1,12 +1,13 @@
 # !/usr/bin/env python3
 # -*- encoding: utf-8 -*-
 
-import random,time,os,sqlite3,requests
+import random,time,os
 from tqdm import tqdm,trange
 from urllib.parse import quote
 from lib.common import readConfig
 from lib.Database import DatabaseType
 from lib.common.CreatLog import creatLog
+from lib.common.transport import SharedTransport
 
 
 class getoutofloop(Exception): pass
@@ -42,13 +43,7 @@ class UploadTest():
     def uploadTest(self):
         try:
             for uploadtest in self.uploadtest_list.split(","):
-                projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                cursor = connect.cursor()
-                connect.isolation_level = None
-                sql = "select * from api_tree where name = '%s'"%(uploadtest)
-                cursor.execute(sql)
-                apiTreeInfo = cursor.fetchall()
+                apiTreeInfo = DatabaseType(self.projectTag).apiByNameFromDB(uploadtest)
                 for apiInfo in apiTreeInfo:
                     up_list = []
                     api_path = apiInfo[1]
@@ -102,9 +97,9 @@ class UploadTest():
                 files = {"file": (
                     "{}.{}".format(random.randint(1,100), ext), (b"\x89\x50\x4E\x47\x0D\x0A\x1A\x0A\x00\x00\x00\x0D\x49\x48\xD7"+rands))}
                 if sslFlag == 1:
-                    resp = requests.post(path, files=files, headers=self.header, proxies=self.proxy_data,verify=False)
+                    resp = SharedTransport.request("POST", path, files=files, headers=self.header, proxies=self.proxy_data,verify=False)
                 else:
-                    resp = requests.post(path, files=files, headers=self.header, proxies=self.proxy_data)
+                    resp = SharedTransport.request("POST", path, files=files, headers=self.header, proxies=self.proxy_data,verify=True)
                 # 如果上传失败了就继续上传
                 # 全部走一遍报错
                 for fail in str(self.upload_fail).split(","):
@@ -118,19 +113,10 @@ class UploadTest():
                             req_body = resp.request.body
                             resp_text = resp.text
                             # 写入数据库
-                            projectDBPath = DatabaseType(self.projectTag).getPathfromDB() + self.projectTag + ".db"
-                            connect = sqlite3.connect(os.sep.join(projectDBPath.split('/')))
-                            cursor = connect.cursor()
-                            connect.isolation_level = None
-                            sql = "select id,from_js from api_tree where path=\"" + path + "\""
-                            cursor.execute(sql)
-                            apiTreeInfo = cursor.fetchall()
-                            if len(apiTreeInfo) != 0:
-                                #print(apiTreeInfo)
+                            apiInfo = DatabaseType(self.projectTag).apiIdFromDB(path)
+                            if apiInfo:
                                 try:
-                                    api_id = int(apiTreeInfo[0][0])  # 对应路径的api_id
-                                    from_js = int(apiTreeInfo[0][1])  # 对应路径的from_js
-                                # 数据库连接
+                                    api_id, from_js = apiInfo  # 对应路径的api_id和from_js
                                     DatabaseType(self.projectTag).insertUploadInfoIntoDB(api_id, from_js, quote(req_body),quote(resp_text))
                                 except Exception as e:
                                     self.log.error("[Err] %s" % e)
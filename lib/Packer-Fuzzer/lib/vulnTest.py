@@ -14,6 +14,8 @@ from .vuln.UploadTest import UploadTest
 from .vuln.UnauthTest import UnAuthTest
 from .vuln.PasswordTest import PasswordTest
 from .vuln.SSRFTest import SSRFTest
+from .common.probeClient import ProbeClient
+from .common.scheduler import TestScheduler
 
 
 class vulnTest():
@@ -29,89 +31,82 @@ class vulnTest():
         self.options = options
         self.log = creatLog().get_logger()
 
-    def testStart(self, url):
+    def testStart(self, url, scheduler=None):
         """
         启动基础漏洞检测流程，包括未授权访问、信息泄露和CORS配置错误等检测项。
 
         :param url: 待检测的目标URL地址
+        :param scheduler: 共用的 TestScheduler，为None时自行创建并等待所有检测完成
         """
+        runner = scheduler or TestScheduler()
         # 执行未授权访问测试
         self.log.info(Utils().tellTime() + Utils().getMyWord("{unauth_test}"))
-        try:
-            UnAuthTest(self.projectTag).apiUnAuthTest()
-            self.log.debug("UnAuthTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
+        runner.submit("UnAuthTest", lambda: UnAuthTest(self.projectTag).apiUnAuthTest())
 
         # 执行敏感信息泄露测试
         self.log.info(Utils().tellTime() + Utils().getMyWord("{info_test}"))
-        try:
-            InfoTest(self.projectTag).startInfoTest()
-            self.log.debug("InfoTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
+        runner.submit("InfoTest", lambda: InfoTest(self.projectTag).startInfoTest())
 
         # 执行跨域资源共享（CORS）策略检测
         self.log.info(Utils().tellTime() + Utils().getMyWord("{cors_test}"))
-        try:
-            cors = CorsTest(url, self.options)
-            cors.testStart()
-            if cors.flag == 1:
-                DatabaseType(self.projectTag).insertCorsInfoIntoDB(cors.header, cors.res)
-            self.log.debug("CorsTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
+        runner.submit("CorsTest", self.corsTest, url, url=url)
 
         # 执行SSRF漏洞测试
         self.log.info(Utils().tellTime() + "[*] 开始SSRF漏洞检测...")
-        try:
-            ssrf_test = SSRFTest(self.projectTag, self.options)
-            ssrf_result = ssrf_test.test_ssrf_vulnerability(url)
-            if ssrf_result['vulnerable']:
-                self.log.warning("[SSRF] 检测到潜在的SSRF漏洞")
-            self.log.debug("SSRFTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
-
-    def advtestStart(self, options):
+        runner.submit("SSRFTest", self.ssrfTest, url, url=url)
+
+        if scheduler is None:
+            runner.close()
+
+    def corsTest(self, url):
+        cors = CorsTest(url, self.options)
+        cors.testStart()
+        if cors.flag == 1:
+            DatabaseType(self.projectTag).insertCorsInfoIntoDB(cors.header, cors.res)
+
+    def ssrfTest(self, url):
+        ssrf_result = SSRFTest(self.projectTag, self.options).test_ssrf_vulnerability(url)
+        if ssrf_result['vulnerable']:
+            self.log.warning("[SSRF] 检测到潜在的SSRF漏洞")
+
+    def advtestStart(self, options, scheduler=None):
         """
         启动高级漏洞检测流程，包括弱密码、水平越权、文件上传及SQL注入等检测项。
 
+        水平越权与SQL注入按接口拆分为独立的任务并发执行。
+
         :param options: 高级测试所需的额外配置参数
+        :param scheduler: 共用的 TestScheduler，为None时自行创建并等待所有检测完成
         """
+        runner = scheduler or TestScheduler()
         # 弱密码与暴力破解测试
-        try:
-            self.log.info(Utils().tellTime() + Utils().getMyWord("{password_test}"))
-            passwordtest = PasswordTest(self.projectTag)
-            passwordtest.passwordTest()
-            passwordtest.vulntestStart(options)
-            self.log.debug("passwordTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
+        self.log.info(Utils().tellTime() + Utils().getMyWord("{password_test}"))
+        runner.submit("PasswordTest", self.passwordTest, options)
 
         # 水平权限绕过测试
-        try:
-            self.log.info(Utils().tellTime() + Utils().getMyWord("{bac_test}"))
-            bactest = BacTest(self.projectTag, self.options)
-            bactest.bacTest()
-            self.log.debug("BacTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
+        self.log.info(Utils().tellTime() + Utils().getMyWord("{bac_test}"))
+        runner.submit("BacTest", BacTest(self.projectTag, self.options).schedule, runner)
 
         # 文件上传功能模糊测试
-        try:
-            self.log.info(Utils().tellTime() + Utils().getMyWord("{upload_test}"))
-            uploadtest = UploadTest(self.projectTag, self.options)
-            uploadtest.uploadTest()
-            self.log.debug("UploadTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
-
-        # SQL注入漏洞检测
-        try:
-            self.log.info(Utils().tellTime() + Utils().getMyWord("{sql_test}"))
-            sqltest = SqlTest(self.projectTag, self.options)
-            sqltest.sqlTest()
-            self.log.debug("SqlTest模块正常")
-        except Exception as e:
-            self.log.error("[Err] %s" % e)
\ No newline at end of file
+        self.log.info(Utils().tellTime() + Utils().getMyWord("{upload_test}"))
+        runner.submit("UploadTest", lambda: UploadTest(self.projectTag, self.options).uploadTest())
+
+        # SQL注入漏洞检测，时间盲注在 time 通道中执行
+        self.log.info(Utils().tellTime() + Utils().getMyWord("{sql_test}"))
+        runner.submit("SqlTest", SqlTest(self.projectTag, self.options).schedule, runner)
+
+        if scheduler is None:
+            runner.close()
+
+    def passwordTest(self, options):
+        passwordtest = PasswordTest(self.projectTag)
+        passwordtest.passwordTest()
+        passwordtest.vulntestStart(options)
+
+    def requestReport(self):
+        """
+        输出本次运行的请求缓存统计：探测与漏洞检测模块共发起的请求数、实际发出的请求数及节省的请求数。
+        """
+        stats = ProbeClient.memoStats()
+        self.log.info(Utils().tellTime() + "[*] 请求缓存: 共 %d 次请求, 实际发送 %d 次, 节省 %d 次"
+                      % (stats["requests"], stats["sent"], stats["saved"]))
@@ -0,0 +1,448 @@
+"""
+各扫描阶段共享的磁盘响应缓存
+
+本模块只依赖标准库，Packer-Fuzzer 子进程(lib/Packer-Fuzzer/lib/common/responseCache.py)
+会按文件路径直接加载它，与主进程读写同一个缓存文件。
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+from collections import defaultdict
+
+# 参与缓存键计算的请求头，其余请求头(User-Agent等)不影响响应内容
+VARY_HEADERS = ("authorization", "cookie")
+
+# 临时性错误的响应不缓存
+UNCACHEABLE_STATUS = (429, 500, 502, 503, 504)
+
+# 统计数据的保留时间(秒)
+STATS_RETENTION = 24 * 60 * 60
+
+CHARSET_REGEX = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class CachedResponse:
+    """
+    缓存中的响应，提供与 requests.Response 相同的常用属性
+
+    参数:
+        url (str): 最终URL
+        status_code (int): 状态码
+        headers (dict): 响应头
+        content (bytes): 响应体
+    """
+
+    __slots__ = ("url", "status_code", "headers", "content")
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        从 requests.Response 构造
+
+        参数:
+            response (requests.Response): 原始响应
+
+        返回:
+            CachedResponse: 缓存响应
+        """
+        return cls(response.url, response.status_code, dict(response.headers), response.content)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def __bool__(self):
+        # 与 requests.Response 一致，4xx/5xx 响应为假
+        return self.ok
+
+    @property
+    def encoding(self):
+        for key, value in self.headers.items():
+            if key.lower() == "content-type":
+                match = CHARSET_REGEX.search(value)
+                if match:
+                    return match.group(1)
+
+        return "utf-8"
+
+    @property
+    def text(self):
+        try:
+            return self.content.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _Flight:
+    """正在进行中的请求，相同请求的其他调用者等待它完成"""
+
+    __slots__ = ("event", "response", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    基于 SQLite 的响应缓存
+
+    以 请求方法 + URL + 相关请求头 的哈希为键保存状态码、响应头和压缩后的响应体，
+    条目超过有效期后失效，总大小超过上限时按最近访问时间淘汰。
+    同一进程内相同的并发请求只会发出一次，其余调用者共享结果。
+
+    参数:
+        path (str): 缓存文件路径
+        ttl (int): 条目有效期(秒)
+        max_size (int): 缓存总大小上限(字节)
+        run (str, optional): 本次扫描的标识，同一次扫描的各进程共用，用于汇总命中率
+    """
+
+    def __init__(self, path, ttl=300, max_size=256 * 1024 * 1024, run=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.run = run or uuid.uuid4().hex
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._stats = defaultdict(lambda: {"requests": 0, "hits": 0, "bytes_saved": 0})
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                created REAL,
+                accessed REAL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+            CREATE TABLE IF NOT EXISTS stats (
+                run TEXT,
+                stage TEXT,
+                requests INTEGER,
+                hits INTEGER,
+                bytes_saved INTEGER,
+                updated REAL,
+                PRIMARY KEY (run, stage)
+            );
+            """
+        )
+        now = time.time()
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - ttl,))
+        conn.execute("DELETE FROM stats WHERE updated < ?", (now - STATS_RETENTION,))
+        self._size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        atexit.register(self.save_stats)
+
+    def _connection(self):
+        # sqlite3 连接不能跨线程使用，每个线程各自持有一个
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    @staticmethod
+    def key(method, url, headers=None):
+        """
+        计算缓存键
+
+        参数:
+            method (str): 请求方法
+            url (str): 请求URL
+            headers (dict, optional): 请求头
+
+        返回:
+            str: 缓存键
+        """
+        vary = {}
+        for name, value in (headers or {}).items():
+            if name.lower() in VARY_HEADERS:
+                vary[name.lower()] = value
+
+        material = json.dumps([method.upper(), url, sorted(vary.items())])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, method, url, headers=None):
+        """
+        读取缓存，不存在或已过期时返回 None
+
+        参数:
+            method (str): 请求方法
+            url (str): 请求URL
+            headers (dict, optional): 请求头
+
+        返回:
+            CachedResponse: 缓存的响应
+        """
+        return self._get(self.key(method, url, headers))
+
+    def lookup(self, method, url, headers=None, stage="default"):
+        """
+        读取缓存并计入命中统计，未命中时由调用方自行请求并调用 put 写入
+
+        参数:
+            method (str): 请求方法
+            url (str): 请求URL
+            headers (dict, optional): 请求头
+            stage (str): 调用方阶段名称
+
+        返回:
+            CachedResponse: 缓存的响应，未命中时为 None
+        """
+        response = self.get(method, url, headers)
+        self._record(stage, response)
+        return response
+
+    def _get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT url, status, headers, body, created FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+
+        url, status, headers, body, created = row
+        now = time.time()
+        if created < now - self.ttl:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+
+        conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return CachedResponse(url, status, json.loads(headers), zlib.decompress(body))
+
+    def put(self, method, url, status, headers, body, request_headers=None):
+        """
+        写入缓存
+
+        参数:
+            method (str): 请求方法
+            url (str): 请求URL
+            status (int): 状态码
+            headers (dict): 响应头
+            body (bytes): 响应体
+            request_headers (dict, optional): 请求头
+        """
+        self._put(
+            self.key(method, url, request_headers),
+            CachedResponse(url, status, dict(headers), body),
+        )
+
+    def _put(self, key, response):
+        if response.status_code in UNCACHEABLE_STATUS:
+            return
+
+        compressed = zlib.compress(response.content)
+        size = len(compressed)
+        # 单个条目过大时不缓存，避免挤掉其他条目
+        if size > self.max_size // 10:
+            return
+
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, response.url, response.status_code, json.dumps(response.headers), compressed, size, now, now),
+        )
+
+        with self._lock:
+            self._size += size
+            evict = self._size > self.max_size
+
+        if evict:
+            self._evict()
+
+    def _evict(self):
+        # 其他进程也会写入，先重新统计实际大小
+        conn = self._connection()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = self.max_size * 0.9
+
+        if total > target:
+            conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+            total = sum(size for _, size in rows)
+            expired = []
+            for key, size in rows:
+                if total <= target:
+                    break
+                expired.append((key,))
+                total -= size
+
+            conn.executemany("DELETE FROM responses WHERE key = ?", expired)
+
+        with self._lock:
+            self._size = total
+
+    def fetch(self, method, url, fetcher, headers=None, stage="default"):
+        """
+        通过缓存获取响应
+
+        命中时直接返回缓存；未命中时调用 fetcher 发出请求并写入缓存。
+        相同的请求正在进行时等待其完成并共享结果，不会重复请求。
+
+        参数:
+            method (str): 请求方法
+            url (str): 请求URL
+            fetcher (callable): 发出实际请求的函数，返回 requests.Response
+            headers (dict, optional): 请求头
+            stage (str): 调用方阶段名称，用于统计命中率
+
+        返回:
+            CachedResponse: 响应
+        """
+        key = self.key(method, url, headers)
+        response = self._get(key)
+        if response is not None:
+            self._record(stage, response)
+            return response
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error:
+                raise flight.error
+
+            self._record(stage, flight.response)
+            return flight.response
+
+        try:
+            response = CachedResponse.from_response(fetcher())
+            self._put(key, response)
+            flight.response = response
+            self._record(stage)
+            return response
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+
+    def _record(self, stage, hit=None):
+        with self._lock:
+            stats = self._stats[stage]
+            stats["requests"] += 1
+            if hit is not None:
+                stats["hits"] += 1
+                stats["bytes_saved"] += len(hit.content)
+
+    def save_stats(self):
+        """
+        保存本进程的命中统计，供主进程汇总
+        """
+        with self._lock:
+            rows = [
+                (self.run, stage, stats["requests"], stats["hits"], stats["bytes_saved"], time.time())
+                for stage, stats in self._stats.items()
+            ]
+
+        if rows:
+            self._connection().executemany("INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def stats(self):
+        """
+        汇总本次扫描中所有进程的命中统计
+
+        返回:
+            dict: 阶段名称到 {"requests", "hits", "bytes_saved"} 的映射
+        """
+        self.save_stats()
+        rows = self._connection().execute(
+            "SELECT stage, requests, hits, bytes_saved FROM stats WHERE run = ? ORDER BY stage", (self.run,)
+        ).fetchall()
+
+        return {
+            stage: {"requests": requests, "hits": hits, "bytes_saved": bytes_saved}
+            for stage, requests, hits, bytes_saved in rows
+        }
+
+
+def get_cache():
+    """
+    获取全局共享的响应缓存，未启用(--response-cache-ttl 0)时返回 None
+
+    返回:
+        ResponseCache: 缓存实例
+    """
+    global _cache
+
+    # 延迟导入，保证本模块可以被 Packer-Fuzzer 按文件路径单独加载
+    from lib.core.data import options
+    from lib.core.settings import RESPONSE_CACHE_FILE
+
+    if not options["response_cache_ttl"]:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    RESPONSE_CACHE_FILE,
+                    ttl=options["response_cache_ttl"],
+                    max_size=options["response_cache_size"] * 1024 * 1024,
+                )
+
+    return _cache
+
+
+def cached_fetch(method, url, fetcher, headers=None, stage="default"):
+    """
+    启用缓存时通过缓存获取响应，否则直接调用 fetcher
+
+    参数:
+        method (str): 请求方法
+        url (str): 请求URL
+        fetcher (callable): 发出实际请求的函数，返回 requests.Response
+        headers (dict, optional): 请求头
+        stage (str): 调用方阶段名称
+
+    返回:
+        CachedResponse | requests.Response: 响应
+    """
+    cache = get_cache()
+    if cache is None:
+        return fetcher()
+
+    return cache.fetch(method, url, fetcher, headers, stage)
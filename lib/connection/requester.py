@@ -1,29 +1,23 @@
 ##
 # 导入标准库和第三方模块
 ##
-import sys, argparse, validators, os, tldextract
-from colorama import init, Fore, Style
-from pyfiglet import Figlet
-
 import http.client
+import logging
 import socket
 import random
 import re
 import requests
-import threading
 import time
 
-from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase, HTTPBasicAuth, HTTPDigestAuth
 from urllib3 import disable_warnings
-from requests_ntlm import HttpNtlmAuth
 from urllib.parse import urlparse
 
 # 导入项目内部模块
 from lib.core.data import options
 from lib.core.decorators import cached
 from lib.core.exceptions import RequestException
-from lib.core.logger import logger
+from lib.core.logger import log_event, logger
 from lib.core.settings import (
     RATE_UPDATE_DELAY,
     READ_RESPONSE_ERROR_REGEX,
@@ -33,6 +27,7 @@ from lib.core.settings import (
 from lib.core.structures import CaseInsensitiveDict
 from lib.connection.dns import cached_getaddrinfo
 from lib.connection.response import Response
+from lib.connection.transport import get_transport
 from lib.utils.common import safequote
 from lib.utils.file import FileUtils
 from lib.utils.mimetype import guess_mimetype
@@ -69,21 +64,21 @@ class Requester:
     Attributes:
         _url (str): 目标 URL 基础路径
         _proxy_cred (str): 代理认证凭据
-        _rate (int): 当前请求速率计数
         headers (CaseInsensitiveDict): HTTP 请求头字典
         agents (list): 用户代理列表
-        session (requests.Session): requests 库会话对象
+        transport (Transport): 各阶段共享的传输层，提供连接池和速率限制
+        session (requests.Session): 挂载共享连接池的会话
     """
 
     def __init__(self):
         """初始化 Requester 实例"""
         self._url = None
         self._proxy_cred = None
-        self._rate = 0
         self.headers = CaseInsensitiveDict(options["headers"])
         self.agents = []
-        self.session = requests.Session()
-        self.session.verify = False
+        self.transport = get_transport()
+        # 目录扫描的会话保留响应设置的Cookie
+        self.session = self.transport.session(keep_cookies=True)
         self.session.cert = (
             options["cert_file"],
             options["key_file"],
@@ -97,12 +92,6 @@ class Requester:
         if options["data"] and "content-type" not in self.headers:
             self.set_header("content-type", guess_mimetype(options["data"]))
 
-        # 配置 HTTP 和 HTTPS 协议适配器，设置最大连接池大小
-        for scheme in ("http://", "https://"):
-            self.session.mount(
-                scheme, HTTPAdapter(max_retries=0, pool_maxsize=options["thread_count"])
-            )
-
     def _fetch_agents(self):
         """从文件中读取并设置用户代理列表"""
         self.agents = FileUtils.get_lines(
@@ -150,6 +139,9 @@ class Requester:
             elif type == "digest":
                 self.session.auth = HTTPDigestAuth(user, password)
             else:
+                # requests_ntlm 导入较慢，只在使用NTLM认证时导入
+                from requests_ntlm import HttpNtlmAuth
+
                 self.session.auth = HttpNtlmAuth(user, password)
 
     def set_proxy(self, proxy):
@@ -162,17 +154,17 @@ class Requester:
         if not proxy:
             return
 
-        logger.debug(f"Attempting to set proxy: {proxy}")
+        logger.debug("Attempting to set proxy: %s", proxy)
 
         # 如果没有协议前缀，默认使用 http 协议
         if not proxy.startswith(PROXY_SCHEMES):
             proxy = f"http://{proxy}"
-            logger.debug(f"Proxy scheme added: {proxy}")
+            logger.debug("Proxy scheme added: %s", proxy)
 
         # 如果存在代理认证凭据并且 URL 中不含认证信息，则插入认证凭据
         if self._proxy_cred and "@" not in proxy:
             proxy = proxy.replace("://", f"://{self._proxy_cred}@", 1)
-            logger.debug(f"Proxy credentials added: {proxy}")
+            logger.debug("Proxy credentials added: %s", proxy)
 
         # 同时为 HTTP 和 HTTPS 设置代理
         self.session.proxies = {
@@ -180,11 +172,11 @@ class Requester:
             "https": proxy
         }
 
-        logger.debug(f"Proxy set successfully for both HTTP and HTTPS: {proxy}")
+        logger.debug("Proxy set successfully for both HTTP and HTTPS: %s", proxy)
 
         # 对于 SOCKS4a 代理提供额外调试信息
         if "socks4a" in proxy.lower():
-            logger.info(f"Using SOCKS4a proxy: {proxy}. Note: SOCKS4a may require additional configuration.")
+            logger.info("Using SOCKS4a proxy: %s. Note: SOCKS4a may require additional configuration.", proxy)
 
     def set_proxy_auth(self, credential):
         """
@@ -209,19 +201,17 @@ class Requester:
         Raises:
             RequestException: 当请求失败时抛出异常
         """
-        # 控制请求频率不超过最大限制
-        while self.is_rate_exceeded():
-            time.sleep(0.1)
-
-        self.increase_rate()
-
         err_msg = None
 
         # 对特殊字符进行安全编码防止被错误转义
         url = safequote(self._url + path if self._url else path)
 
         # 循环重试直到达到最大尝试次数
-        for _ in range(options["max_retries"] + 1):
+        for attempt in range(options["max_retries"] + 1):
+            # 控制同一主机的请求频率不超过最大限制，限制由所有阶段共享
+            self.transport.acquire(url)
+            start = time.perf_counter()
+
             try:
                 try:
                     # 尝试选择一个代理服务器
@@ -253,20 +243,32 @@ class Requester:
                 )
 
                 response = Response(response)
+                self.transport.record("dirsearch", time.perf_counter() - start, retry=attempt > 0)
 
-                # 构造日志消息记录请求详情
-                log_msg = f'"{options["http_method"]} {response.url}" {response.status} - {response.length}B'
-
-                if response.redirect:
-                    log_msg += f" - LOCATION: {response.redirect}"
-
-                logger.info(log_msg)
+                # 记录请求详情，LogRecord 在日志线程中构造
+                log_event(
+                    logging.INFO,
+                    '"%s %s" %s - %sB%s',
+                    options["http_method"],
+                    response.url,
+                    response.status,
+                    response.length,
+                    f" - LOCATION: {response.redirect}" if response.redirect else "",
+                    event="request",
+                    method=options["http_method"],
+                    url=response.url,
+                    status=response.status,
+                    length=response.length,
+                    redirect=response.redirect,
+                )
 
                 return response
 
             except Exception as e:
-                logger.exception(e)
-                logger.debug(f"Detailed error information: {str(type(e))}: {str(e)}")
+                self.transport.record("dirsearch", time.perf_counter() - start, error=True, retry=attempt > 0)
+
+                # 堆栈在日志线程中格式化，重复的错误会被限流
+                log_event(logging.ERROR, "Request failed: %s", url, exc_info=e, event="request_error", url=url)
 
                 # 分析具体异常类型并构造对应错误信息
                 if isinstance(e, socket.gaierror):
@@ -300,24 +302,6 @@ class Requester:
 
         raise RequestException(err_msg)
 
-    def is_rate_exceeded(self):
-        """
-        判断当前请求速率是否超过设定上限
-
-        Returns:
-            bool: True 表示已超出限制，False 表示未超出
-        """
-        return self._rate >= options["max_rate"] > 0
-
-    def decrease_rate(self):
-        """减少当前请求速率计数"""
-        self._rate -= 1
-
-    def increase_rate(self):
-        """增加当前请求速率计数并在一秒后自动减一"""
-        self._rate += 1
-        threading.Timer(1, self.decrease_rate).start()
-
     @property
     @cached(RATE_UPDATE_DELAY)
     def rate(self):
@@ -325,6 +309,6 @@ class Requester:
         获取当前请求速率（带缓存）
 
         Returns:
-            int: 当前每秒请求数量
+            int: 最近一秒内所有阶段发出的请求数量
         """
-        return self._rate
+        return self.transport.limiter.rate()
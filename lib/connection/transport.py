@@ -0,0 +1,408 @@
+"""
+各扫描阶段共享的HTTP传输层
+
+目录扫描、403绕过、JsFind、指纹识别和Swagger扫描都从这里获取会话和发送请求：
+所有会话挂载同一组连接池适配器，同一主机的连接在各阶段之间复用；
+不校验证书的HTTPS连接共用一个TLS上下文，不必为每个新连接重新创建上下文和加载系统证书；
+代理选择、失败重试与退避、单主机请求速率限制和请求统计也只在这里实现一次。
+
+本模块只依赖标准库和 requests，Packer-Fuzzer 子进程(lib/Packer-Fuzzer/lib/common/transport.py)
+会按文件路径直接加载它，在子进程中使用相同的连接和重试策略。
+"""
+
+import random
+import ssl
+import threading
+import time
+
+from collections import defaultdict, deque
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlparse
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.ssl_ import create_urllib3_context
+
+# 这些状态码表示服务端暂时无法处理，退避后重试
+RETRY_STATUS = (429, 502, 503, 504)
+
+# 未指定重试次数时只重试这些幂等方法，POST 等请求重发可能重复产生副作用
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE")
+
+# 退避时间上限(秒)，Retry-After 超过上限时按上限等待
+MAX_BACKOFF = 10
+
+# 连接池大小的下限，403绕过等阶段的单主机并发数可能大于目录扫描的线程数
+MIN_POOL_MAXSIZE = 50
+
+PROXY_SCHEMES = ("http://", "https://", "socks5://", "socks5h://", "socks4://", "socks4a://")
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+class SharedAdapter(HTTPAdapter):
+    """
+    共享连接池的适配器
+
+    不校验证书且没有客户端证书的HTTPS连接使用同一个TLS上下文，
+    连接池被淘汰时把其中新建的连接数计入统计。
+
+    参数:
+        ssl_context (ssl.SSLContext): 不校验证书时使用的TLS上下文
+        on_dispose (callable): 连接池被淘汰时的回调，参数为连接池
+    """
+
+    def __init__(self, ssl_context, on_dispose, **kwargs):
+        self.ssl_context = ssl_context
+        self.on_dispose = on_dispose
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pools.dispose_func = self._dispose
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        manager.pools.dispose_func = self._dispose
+        return manager
+
+    def _dispose(self, pool):
+        self.on_dispose(pool)
+        pool.close()
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+
+        # 客户端证书会被加载到上下文中，只共享不带客户端证书的上下文
+        if (
+            host_params["scheme"] == "https"
+            and pool_kwargs["cert_reqs"] == "CERT_NONE"
+            and not pool_kwargs.get("cert_file")
+        ):
+            pool_kwargs["ssl_context"] = self.ssl_context
+
+        return host_params, pool_kwargs
+
+    def pools(self):
+        """
+        当前所有的连接池，包括经过代理的连接池
+
+        返回:
+            list: urllib3 连接池
+        """
+        managers = [self.poolmanager] + list(self.proxy_manager.values())
+        return [manager.pools[key] for manager in managers for key in manager.pools.keys()]
+
+
+class RateLimiter:
+    """
+    单主机请求速率限制
+
+    记录每个主机最近一秒内的请求时间，达到上限时等待最早的请求移出窗口。
+
+    参数:
+        max_rate (int): 每个主机每秒的请求数上限，0表示不限制
+    """
+
+    def __init__(self, max_rate=0):
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._windows = defaultdict(deque)
+
+    def acquire(self, host):
+        """
+        等待直到可以向主机发出请求，并记录这次请求
+
+        参数:
+            host (str): 主机(含端口)
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                window = self._windows[host]
+                while window and window[0] <= now - 1:
+                    window.popleft()
+
+                if not self.max_rate or len(window) < self.max_rate:
+                    window.append(now)
+                    return
+
+                delay = window[0] + 1 - now
+
+            time.sleep(delay)
+
+    def rate(self):
+        """
+        最近一秒内所有主机的请求数
+
+        返回:
+            int: 每秒请求数
+        """
+        with self._lock:
+            threshold = time.monotonic() - 1
+            return sum(sum(1 for moment in window if moment > threshold) for window in self._windows.values())
+
+
+class Transport:
+    """
+    共享的HTTP传输层
+
+    参数:
+        pool_maxsize (int): 每个主机的连接池大小
+        pool_connections (int): 保留连接池的主机数
+        retries (int): 幂等请求连接失败、超时或返回 RETRY_STATUS 时的重试次数
+        backoff (float): 退避基数(秒)，第n次重试前等待 backoff * 2^n 秒
+        max_rate (int): 每个主机每秒的请求数上限，0表示不限制
+        proxies (list, optional): 代理列表，每次请求随机选择一个
+        proxy_auth (str, optional): 代理认证凭据 user:password
+        timeout (float): 默认超时时间(秒)
+    """
+
+    def __init__(
+        self,
+        pool_maxsize=25,
+        pool_connections=100,
+        retries=1,
+        backoff=0.2,
+        max_rate=0,
+        proxies=None,
+        proxy_auth=None,
+        timeout=7.5,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.proxies = proxies if proxies is not None else []
+        self.proxy_auth = proxy_auth
+        self.timeout = timeout
+        self.limiter = RateLimiter(max_rate)
+        self._lock = threading.Lock()
+        self._session = None
+        self._disposed_connections = 0
+        self._stats = defaultdict(lambda: {"requests": 0, "errors": 0, "retries": 0, "elapsed": 0.0})
+
+        # 与 verify=False 时 urllib3 为每个连接创建的上下文相同，但只创建一次
+        self.ssl_context = create_urllib3_context(cert_reqs=ssl.CERT_NONE)
+        self.adapter = SharedAdapter(
+            self.ssl_context,
+            self._count_disposed,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+        )
+
+    def _count_disposed(self, pool):
+        with self._lock:
+            self._disposed_connections += pool.num_connections
+
+    def session(self, headers=None, keep_cookies=False):
+        """
+        创建挂载共享连接池的会话
+
+        会话自身的请求头、认证和Cookie由调用方设置，连接在所有会话之间复用。
+
+        参数:
+            headers (dict, optional): 会话的默认请求头
+            keep_cookies (bool): 是否保存响应设置的Cookie，默认不保存，Cookie只来自请求头
+
+        返回:
+            requests.Session: 会话
+        """
+        session = requests.Session()
+        session.verify = False
+        if not keep_cookies:
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+
+        if headers:
+            session.headers.update(headers)
+
+        return session
+
+    def default_session(self):
+        """
+        没有自己的请求头和认证的调用方共用的会话
+
+        返回:
+            requests.Session: 会话
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self.session()
+
+        return self._session
+
+    def proxy(self):
+        """
+        随机选择一个代理，没有协议的代理按HTTP代理处理，并加入代理认证凭据
+
+        返回:
+            str: 代理URL，没有配置代理时返回None
+        """
+        try:
+            proxy = random.choice(self.proxies)
+        except IndexError:
+            return None
+
+        if not proxy.startswith(PROXY_SCHEMES):
+            proxy = f"http://{proxy}"
+
+        if self.proxy_auth and "@" not in proxy:
+            proxy = proxy.replace("://", f"://{self.proxy_auth}@", 1)
+
+        return proxy
+
+    def acquire(self, url):
+        """
+        等待目标主机的速率限制
+
+        参数:
+            url (str): 请求URL
+        """
+        self.limiter.acquire(urlparse(url).netloc)
+
+    def record(self, stage, elapsed=0.0, error=False, retry=False):
+        """
+        记录一次请求
+
+        参数:
+            stage (str): 调用方阶段名称
+            elapsed (float): 请求耗时(秒)
+            error (bool): 请求是否失败
+            retry (bool): 是否为重试
+        """
+        with self._lock:
+            stats = self._stats[stage]
+            stats["requests"] += 1
+            stats["elapsed"] += elapsed
+            if error:
+                stats["errors"] += 1
+            if retry:
+                stats["retries"] += 1
+
+    def delay(self, attempt, response=None):
+        """
+        第 attempt 次重试前的等待时间，响应带有 Retry-After 秒数时以它为准
+
+        参数:
+            attempt (int): 已重试次数
+            response (requests.Response, optional): 触发重试的响应
+
+        返回:
+            float: 等待秒数
+        """
+        retry_after = response.headers.get("retry-after", "") if response is not None else ""
+        if retry_after.isdigit():
+            return min(int(retry_after), MAX_BACKOFF)
+
+        return min(self.backoff * 2 ** attempt, MAX_BACKOFF)
+
+    def request(self, method, url, session=None, stage="default", retries=None, can_retry=None, **kwargs):
+        """
+        发送请求，连接失败、超时或返回 RETRY_STATUS 时退避重试
+
+        参数:
+            method (str): 请求方法
+            url (str): 请求URL
+            session (requests.Session, optional): 使用的会话，默认为共用会话
+            stage (str): 调用方阶段名称，用于统计
+            retries (int, optional): 重试次数，默认幂等方法为传输层的设置，其他方法不重试
+            can_retry (callable, optional): 每次重试前调用，返回False时不再重试，用于把重试计入调用方的请求预算
+            **kwargs: 传给 requests.Session.request 的其他参数
+
+        返回:
+            requests.Response: 响应
+
+        异常:
+            requests.RequestException: 重试后仍然失败
+        """
+        session = session or self.default_session()
+        if retries is None:
+            retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        kwargs.setdefault("timeout", self.timeout)
+        # REQUESTS_CA_BUNDLE 等环境变量会覆盖会话的 verify=False，需要在每个请求中指定
+        kwargs.setdefault("verify", False)
+
+        if "proxies" not in kwargs and self.proxies:
+            proxy = self.proxy()
+            kwargs["proxies"] = {"http": proxy, "https": proxy}
+
+        for attempt in range(retries + 1):
+            self.acquire(url)
+            response = None
+            start = time.perf_counter()
+
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.record(stage, time.perf_counter() - start, error=True, retry=attempt > 0)
+                if attempt == retries or (can_retry and not can_retry()):
+                    raise
+            else:
+                self.record(stage, time.perf_counter() - start, retry=attempt > 0)
+                if (
+                    response.status_code not in RETRY_STATUS
+                    or attempt == retries
+                    or (can_retry and not can_retry())
+                ):
+                    return response
+
+                response.close()
+
+            time.sleep(self.delay(attempt, response))
+
+    def connections(self):
+        """
+        已建立的连接数(包括已关闭的)
+
+        返回:
+            int: 连接数
+        """
+        with self._lock:
+            disposed = self._disposed_connections
+
+        return disposed + sum(pool.num_connections for pool in self.adapter.pools())
+
+    def stats(self):
+        """
+        各阶段的请求统计
+
+        返回:
+            dict: 阶段名称到 {"requests", "errors", "retries", "elapsed"} 的映射
+        """
+        with self._lock:
+            return {stage: dict(stats) for stage, stats in self._stats.items()}
+
+    def close(self):
+        """关闭所有连接池"""
+        self.adapter.close()
+
+
+def get_transport():
+    """
+    获取全局共享的传输层，连接池大小、重试次数、速率限制、代理和超时取自扫描选项
+
+    返回:
+        Transport: 传输层实例
+    """
+    global _transport
+
+    # 延迟导入，保证本模块可以被 Packer-Fuzzer 按文件路径单独加载
+    from lib.core.data import options
+
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport(
+                    pool_maxsize=max(options["thread_count"], MIN_POOL_MAXSIZE),
+                    retries=options["max_retries"],
+                    max_rate=options["max_rate"],
+                    proxies=options["proxies"],
+                    proxy_auth=options["proxy_auth"],
+                    timeout=options["timeout"],
+                )
+
+    return _transport
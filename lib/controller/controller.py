@@ -1,10 +1,16 @@
 import os
 import gc
+import logging
+import signal
 import time
 import re
 
+from collections import deque
 from urllib.parse import urlparse
 
+import requests
+
+from lib.connection.cache import get_cache
 from lib.connection.dns import cache_dns
 from lib.connection.requester import Requester
 from lib.core.data import blacklists, options
@@ -19,15 +25,26 @@ from lib.core.exceptions import (
     UnpicklingError,
 )
 from lib.core.fuzzer import Fuzzer
-from lib.core.logger import enable_logging, logger
+from lib.core.logger import enable_logging, log_event
+from lib.core.pipeline import FORBIDDEN, PATH_FOUND
+from lib.core.session import (
+    Result,
+    SessionJournal,
+    is_session_journal,
+    load_session,
+    wordlist_identity,
+)
+from lib.ehole.ehole import fingerprint_root
+from lib.ehole.finger import get_engine, get_title, is_favicon
 from lib.core.settings import (
     BANNER,
     DEFAULT_HEADERS,
-    DEFAULT_SESSION_FILE,
     EXTENSION_RECOGNITION_REGEX,
     MAX_CONSECUTIVE_REQUEST_ERRORS,
+    MAX_RESPONSE_SIZE,
     NEW_LINE,
     SCRIPT_PATH,
+    SESSIONS_PATH,
     STANDARD_PORTS,
     PAUSING_WAIT_TIMEOUT,
     UNKNOWN,
@@ -44,7 +61,7 @@ from lib.reports.xml_report import XMLReport
 from lib.reports.sqlite_report import SQLiteReport
 from lib.utils.common import get_valid_filename, lstrip_once
 from lib.utils.file import FileUtils
-from lib.utils.pickle import pickle, unpickle
+from lib.utils.pickle import unpickle
 from lib.utils.schemedet import detect_scheme
 from lib.view.colors import set_color
 from lib.view.terminal import output
@@ -57,12 +74,19 @@ class Controller:
     负责初始化配置、处理会话恢复与保存、设置请求对象和字典、运行扫描任务等核心功能。
     """
 
-    def __init__(self):
+    def __init__(self, bus=None):
         """
         初始化控制器实例。
 
         根据是否提供会话文件决定是从旧会话加载还是进行全新设置，并启动主运行循环。
+
+        参数:
+            bus (EventBus, optional): 事件总线，扫描结果会实时发布给下游阶段
         """
+        self.bus = bus
+        # 已识别过根目录和网站图标的目标
+        self.fingerprinted_targets = set()
+
         if options["session_file"]:
             self._import(options["session_file"])
             self.old_session = True
@@ -70,12 +94,15 @@ class Controller:
             self.setup()
             self.old_session = False
 
+        self.open_journal()
         self.run()
 
     def _import(self, session_file):
         """
         从指定的会话文件中导入之前的状态信息。
 
+        会话日志格式见 lib/core/session.py，同时兼容旧版本整体pickle的会话文件。
+
         参数:
             session_file (str): 会话文件路径
 
@@ -83,33 +110,152 @@ class Controller:
             UnpicklingError: 当会话文件格式无效或版本过旧时抛出
         """
         try:
-            with open(session_file, "rb") as fd:
-                indict, last_output, opt = unpickle(fd)
-                options.update(opt)
+            if is_session_journal(session_file):
+                session = load_session(session_file)
+            else:
+                session = None
+                with open(session_file, "rb") as fd:
+                    indict, last_output, opt = unpickle(fd)
+                    options.update(opt)
         except UnpicklingError:
             output.error(
                 f"{session_file} is not a valid session file or it's in an old format"
             )
             exit(1)
 
+        # 会话文件中保存的选项不应覆盖本次指定的会话文件路径
+        options["session_file"] = session_file
+
+        if session:
+            self.resume(session)
+            return
+
         self.__dict__ = {**indict, **vars(self)}
+        # 兼容没有指纹识别结果的旧会话文件
+        self.__dict__.setdefault("fingerprints", {})
+        self.directories = deque(self.directories)
+        # 旧会话中的结果带有完整响应体，只保留报告需要的字段
+        self.results = [Result.from_response(result) for result in self.results]
         print(last_output)
 
-    def _export(self, session_file):
+    def resume(self, session):
         """
-        将当前状态导出到会话文件以供后续恢复使用。
+        按会话日志恢复扫描状态。
+
+        字典不保存在会话中，按保存时的选项重新生成后移动到记录的位置；
+        字典文件在此期间被修改时，当前目录从头开始扫描。
 
         参数:
-            session_file (str): 目标会话文件路径
+            session (SessionState): 从会话日志中读取的状态
         """
-        # Save written output
-        last_output = output.buffer.rstrip()
+        options.update(session.options, session_file=options["session_file"])
+        blacklists.update(get_blacklists())
+
+        self.setup_requester()
+        self.dictionary = Dictionary(files=options["wordlists"])
+        self.results = session.results
+        self.targets = session.state["targets"]
+        self.start_time = time.time() - session.state["elapsed"]
+        self.passed_urls = session.passed_urls
+        self.directories = deque(session.state["directories"])
+        self.report = None
+        self.batch = False
+        self.jobs_processed = session.state["jobs"]
+        self.errors = session.state["errors"]
+        self.consecutive_errors = 0
+        self.fingerprints = session.fingerprints
 
-        # Can't pickle Fuzzer class due to _thread.lock objects
-        del self.fuzzer
+        if options["log_file"]:
+            enable_logging()
+
+        output.header(BANNER)
+        output.config(len(self.dictionary))
+
+        if (
+            session.header["wordlists"] == wordlist_identity(options["wordlists"])
+            and session.header["size"] == len(self.dictionary)
+        ):
+            self.dictionary.seek(session.state["cursor"])
+        else:
+            output.warning(
+                "The wordlist has changed since the session was saved, the current directory will be rescanned"
+            )
 
-        with open(session_file, "wb") as fd:
-            pickle((vars(self), last_output, options), fd)
+        if session.header["report"]:
+            self.create_report(session.header["report"])
+
+        if options["log_file"]:
+            output.log_file(options["log_file"])
+
+    def open_journal(self):
+        """
+        创建会话日志，扫描期间由后台线程定期写入进度。
+
+        未指定会话文件时在 sessions 目录下自动创建，扫描正常结束后删除；
+        收到 SIGTERM/SIGHUP 时写入剩余记录后退出，之后可以用 --session 继续扫描。
+        """
+        session_file = options["session_file"] or FileUtils.build_path(
+            SESSIONS_PATH, time.strftime("%y-%m-%d_%H-%M-%S") + f"_{os.getpid()}.session"
+        )
+        self.journal = SessionJournal(session_file)
+
+        try:
+            self.journal.open(
+                {
+                    "wordlists": wordlist_identity(options["wordlists"]),
+                    "size": len(self.dictionary),
+                    "report": self.report.output_file if self.report else None,
+                    "options": options,
+                },
+                self.session_state,
+                self.results,
+                self.passed_urls,
+                self.fingerprints,
+            )
+        except OSError:
+            output.error(f"Couldn't create session file at {session_file}")
+            exit(1)
+
+        # 保存原来的处理函数，会话日志关闭后恢复，之后阶段收到信号时按原方式退出
+        self.signal_handlers = {}
+        for name in ("SIGTERM", "SIGHUP"):
+            if hasattr(signal, name):
+                signum = getattr(signal, name)
+                self.signal_handlers[signum] = signal.signal(signum, self.handle_signal)
+
+        output.session_file(session_file)
+
+    def close_journal(self, remove=False):
+        """
+        关闭会话日志，并恢复 SIGTERM/SIGHUP 原来的处理函数。
+
+        参数:
+            remove (bool): 是否删除会话文件
+        """
+        for signum, handler in self.signal_handlers.items():
+            # 非 Python 设置的处理函数返回 None，恢复为默认处理
+            signal.signal(signum, signal.SIG_DFL if handler is None else handler)
+        self.signal_handlers.clear()
+
+        self.journal.close(remove=remove)
+
+    def session_state(self):
+        """
+        当前扫描进度的快照，由会话日志的后台线程调用。
+
+        工作线程取出的路径可能还未请求完成，恢复位置回退线程数个路径。
+
+        返回:
+            dict: 可JSON序列化的进度信息
+        """
+        return {
+            "targets": list(self.targets),
+            "directories": list(self.directories),
+            "cursor": max(0, self.dictionary.index - options["thread_count"]),
+            "jobs": self.jobs_processed,
+            "errors": self.errors,
+            "elapsed": time.time() - self.start_time,
+        }
 
     def setup(self):
         """
@@ -139,24 +285,20 @@ class Controller:
             if options["cookie"]:
                 options["headers"]["cookie"] = options["cookie"]
 
-        self.requester = Requester()
+        self.setup_requester()
         self.dictionary = Dictionary(files=options["wordlists"])
         self.results = []
         self.targets = options["urls"]
         self.start_time = time.time()
+        # 待扫描目录队列，passed_urls 是加入过队列的目录URL索引，用于去重
         self.passed_urls = set()
-        self.directories = []
+        self.directories = deque()
         self.report = None
         self.batch = False
         self.jobs_processed = 0
         self.errors = 0
         self.consecutive_errors = 0
-
-        if options["auth"]:
-            self.requester.set_auth(options["auth_type"], options["auth"])
-
-        if options["proxy_auth"]:
-            self.requester.set_proxy_auth(options["proxy_auth"])
+        self.fingerprints = {}
 
         if options["log_file"]:
             options["log_file"] = FileUtils.get_abs_path(options["log_file"])
@@ -198,6 +340,18 @@ class Controller:
         if options["log_file"]:
             output.log_file(options["log_file"])
 
+    def setup_requester(self):
+        """
+        创建请求对象并配置认证信息。
+        """
+        self.requester = Requester()
+
+        if options["auth"]:
+            self.requester.set_auth(options["auth_type"], options["auth"])
+
+        if options["proxy_auth"]:
+            self.requester.set_proxy_auth(options["proxy_auth"])
+
     def run(self):
         """
         主执行循环，依次处理所有目标URL。
@@ -212,9 +366,7 @@ class Controller:
         match_callbacks = (
             self.match_callback, self.reset_consecutive_errors
         )
-        not_found_callbacks = (
-            self.update_progress_bar, self.reset_consecutive_errors
-        )
+        not_found_callbacks = (self.reset_consecutive_errors,)
         error_callbacks = (self.raise_error, self.append_error_log)
 
         while self.targets:
@@ -252,6 +404,7 @@ class Controller:
                     output.error(str(e))
 
             except QuitInterrupt as e:
+                self.close_journal()
                 output.error(e.args[0])
                 exit(0)
 
@@ -261,11 +414,10 @@ class Controller:
         message = set_color("Task Completed", fore="yellow", style="bright")
         output.warning(f"[{current_time}] {message}")
 
-        if options["session_file"]:
-            try:
-                os.remove(options["session_file"])
-            except Exception:
-                output.error("Failed to delete old session file, remove it to free some space")
+        try:
+            self.close_journal(remove=True)
+        except Exception:
+            output.error("Failed to delete old session file, remove it to free some space")
 
     def start(self):
         """
@@ -286,15 +438,26 @@ class Controller:
                     output.warning(msg)
 
                 self.fuzzer.set_base_path(current_directory)
+                output.set_progress(self.get_progress)
                 self.fuzzer.start()
+                index = self.fuzzer.scanners["default"]["index"].response
+                self.cache_response(index)
+                self.fingerprint(index)
+                self.fingerprint_target()
                 self.process()
 
             except KeyboardInterrupt:
                 pass
 
+            except QuitInterrupt:
+                # 在移出当前目录之前写入会话，恢复时从该目录继续
+                self.close_journal()
+                raise
+
             finally:
+                output.set_progress(None)
                 self.dictionary.reset()
-                self.directories.pop(0)
+                self.directories.popleft()
 
                 self.jobs_processed += 1
                 self.old_session = False
@@ -427,12 +590,6 @@ class Controller:
                 )
 
             output_file = FileUtils.get_abs_path((FileUtils.build_path(directory_path, filename)))
-            try:
-                with open('dir_file_path.txt','w') as f:
-                    f.write(output_file)
-                #print(output_file)
-            except:
-                pass
             if FileUtils.exists(output_file):
                 i = 2
                 while FileUtils.exists(f"{output_file}_{i}"):
@@ -451,6 +608,15 @@ class Controller:
         if not output_file:
             return
 
+        self.create_report(output_file)
+
+    def create_report(self, output_file):
+        """
+        按输出格式创建报告对象。
+
+        参数:
+            output_file (str): 报告文件路径
+        """
         if options["output_format"] == "plain":
             self.report = PlainTextReport(output_file)
         elif options["output_format"] == "json":
@@ -494,14 +660,15 @@ class Controller:
             )
 
         output.status_report(response, options["full_url"])
+        self.cache_response(response)
+        self.fingerprint(response)
 
-        # 如果状态码是403，写入到403list.txt文件
-        if response.status == 403:
-            try:
-                with open('403list.txt', 'a+') as f:
-                    f.write(response.full_path + '\n')
-            except Exception:
-                pass
+        if self.bus:
+            self.bus.publish(PATH_FOUND, response)
+
+            # 403路径交给403绕过阶段，扫描过程中即可开始测试
+            if response.status == 403:
+                self.bus.publish(FORBIDDEN, (self.url, response.full_path))
 
         if response.status in options["recursion_status_codes"] and any(
             (
@@ -527,17 +694,107 @@ class Controller:
             self.requester.request(response.full_path, proxy=options["replay_proxy"])
 
         if self.report:
-            self.results.append(response)
-            self.report.save(self.results)
+            result = Result.from_response(response)
+
+            if self.journal.add_result(result):
+                self.results.append(result)
+                self.report.save(self.results)
+
+    def cache_response(self, response):
+        """
+        将已获取到的响应写入共享响应缓存，后续阶段请求相同URL时不必重新下载。
+
+        只缓存完整读取的文本响应。重定向响应不缓存，因为其他阶段的请求会跟随重定向；
+        使用 --auth 认证时也不缓存，避免把需要认证的内容提供给未认证的请求。
+
+        参数:
+            response: HTTP响应对象
+        """
+        cache = get_cache()
+        if (
+            not cache
+            or options["auth"]
+            or response.redirect
+            or not response.content
+            or len(response.body) >= MAX_RESPONSE_SIZE
+        ):
+            return
+
+        cache.put(
+            options["http_method"],
+            response.url,
+            response.status,
+            response.headers,
+            response.body,
+            options["headers"],
+        )
 
-    def update_progress_bar(self, response):
+    def fingerprint(self, response):
         """
-        更新进度条显示信息。
+        对已获取到的响应进行指纹识别，不会产生额外请求。
 
-        计算已完成/剩余的工作量比例，并刷新终端界面中的进度展示。
+        仅在启用指纹识别(-z yes)时生效，结果保存在 self.fingerprints 中供后续阶段输出。
 
         参数:
-            response: HTTP响应对象（仅作为回调参数传递）
+            response: HTTP响应对象
+        """
+        if "".join(options["zwsb"] or ()) != "yes" or response.url in self.fingerprints:
+            return
+
+        # 图标的哈希规则由 fingerprint_target 匹配并归属于目标
+        if is_favicon(response):
+            return
+
+        cms = get_engine().match_response(response)
+        if not cms:
+            return
+
+        self.fingerprints[response.url] = {
+            "cms": cms,
+            "status": response.status,
+            "length": response.length,
+            "title": get_title(response.content),
+        }
+        self.journal.record("fingerprint", [response.url, self.fingerprints[response.url]])
+
+    def fingerprint_target(self):
+        """
+        对当前目标的根目录和网站图标识别一次指纹。
+
+        图标只有在目录扫描碰巧命中时才能匹配图标规则，且命中会归属于图标URL，
+        因此每个目标单独获取一次图标(经过响应缓存)，命中与根目录的结果合并后归属于目标URL。
+        仅在启用指纹识别(-z yes)时生效。
+        """
+        if "".join(options["zwsb"] or ()) != "yes" or self.url in self.fingerprinted_targets:
+            return
+
+        self.fingerprinted_targets.add(self.url)
+
+        try:
+            results = fingerprint_root(self.url)
+        except requests.RequestException as e:
+            log_event(
+                logging.WARNING, "Fingerprint failed: %s", self.url, exc_info=e, event="fingerprint_error", url=self.url
+            )
+            return
+
+        for url, result in results.items():
+            if not result["cms"]:
+                continue
+
+            known = self.fingerprints.setdefault(url, result)
+            if known is not result:
+                known["cms"] += [cms for cms in result["cms"] if cms not in known["cms"]]
+            self.journal.record("fingerprint", [url, known])
+
+    def get_progress(self):
+        """
+        获取进度条显示信息，由终端刷新线程按固定间隔调用。
+
+        计算已完成/剩余的工作量比例。
+
+        返回:
+            tuple: output.last_path 所需的参数
         """
         jobs_count = (
             # Jobs left for unscanned targets
@@ -548,7 +805,7 @@ class Controller:
             + self.jobs_processed
         )
 
-        output.last_path(
+        return (
             self.dictionary.index,
             len(self.dictionary),
             self.jobs_processed + 1,
@@ -582,7 +839,7 @@ class Controller:
         参数:
             exception: 异常对象，其traceback会被记录下来
         """
-        logger.exception(exception)
+        log_event(logging.ERROR, "%s", exception, exc_info=exception, event="error")
 
     def handle_pause(self):
         """
@@ -590,6 +847,8 @@ class Controller:
 
         提供交互式菜单让用户选择继续、跳转下一个目录、切换目标或退出程序。
         """
+        # 暂停期间不再绘制进度条，避免覆盖交互提示
+        output.set_progress(None)
         output.warning(
             "CTRL+C detected: Pausing threads, please wait...", do_save=False
         )
@@ -622,20 +881,21 @@ class Controller:
                 option = input()
 
                 if option.lower() == "s":
-                    msg = f'Save to file [{options["session_file"] or DEFAULT_SESSION_FILE}]: '
+                    msg = f"Save to file [{self.journal.path}]: "
 
                     output.in_line(msg)
 
-                    session_file = (
-                        input() or options["session_file"] or DEFAULT_SESSION_FILE
-                    )
+                    session_file = input() or self.journal.path
 
-                    self._export(session_file)
+                    self.journal.save(session_file)
                     raise QuitInterrupt(f"Session saved to: {session_file}")
                 elif option.lower() == "q":
+                    # 恢复的会话保留原文件，自动创建的会话日志删除
+                    self.close_journal(remove=not options["session_file"])
                     raise QuitInterrupt("Canceled by the user")
 
             elif option.lower() == "c":
+                output.set_progress(self.get_progress)
                 self.fuzzer.resume()
                 return
 
@@ -646,6 +906,16 @@ class Controller:
             elif option.lower() == "s" and len(self.targets) > 1:
                 raise SkipTargetInterrupt("Target skipped by the user")
 
+    def handle_signal(self, signum, frame):
+        """
+        收到 SIGTERM/SIGHUP 时结束扫描，会话日志在退出前写入。
+
+        参数:
+            signum (int): 信号编号
+            frame: 当前栈帧
+        """
+        raise QuitInterrupt(f"Session saved to: {self.journal.path}")
+
     def is_timed_out(self):
         """
         检查是否已超出最大允许运行时间限制。
@@ -680,6 +950,9 @@ class Controller:
 
         参数:
             path (str): 待加入的相对路径字符串
+
+        返回:
+            bool: 目录加入了队列返回True，已扫描过或被排除时返回False
         """
         """Add directory to the recursion queue"""
 
@@ -687,7 +960,7 @@ class Controller:
         if any(
             "/" + dir in path for dir in options["exclude_subdirs"]
         ):
-            return
+            return False
 
         url = self.url + path
 
@@ -695,10 +968,12 @@ class Controller:
             path.count("/") - self.base_path.count("/") > options["recursion_depth"] > 0
             or url in self.passed_urls
         ):
-            return
+            return False
 
         self.directories.append(path)
         self.passed_urls.add(url)
+        self.journal.record("passed", url)
+        return True
 
     @locked
     def recur(self, path):
@@ -711,7 +986,7 @@ class Controller:
         返回:
             list[str]: 新增进队列的目录路径集合
         """
-        dirs_count = len(self.directories)
+        added = []
         path = clean_path(path)
 
         if options["force_recursive"] and not path.endswith("/"):
@@ -721,16 +996,18 @@ class Controller:
             i = 0
             for _ in range(path.count("/")):
                 i = path.index("/", i) + 1
-                self.add_directory(path[:i])
+                if self.add_directory(path[:i]):
+                    added.append(path[:i])
         elif (
             options["recursive"]
             and path.endswith("/")
             and re.search(EXTENSION_RECOGNITION_REGEX, path[:-1]) is None
+            and self.add_directory(path)
         ):
-            self.add_directory(path)
+            added.append(path)
 
         # Return newly added directories
-        return self.directories[dirs_count:]
+        return added
 
     def recur_for_redirect(self, path, redirect_path):
         """
@@ -40,6 +40,8 @@ options = {
     "lowercase": False,
     # 是否启用首字母大写转换
     "capitalization": False,
+    # 是否使用预编译字典缓存
+    "wordlist_cache": True,
     # 并发线程数
     "thread_count": 25,
     # 是否递归扫描目录
@@ -130,6 +132,14 @@ options = {
     "exit_on_error": False,
     # 是否启用爬虫模式
     "crawl": False,
+    # 是否启用指纹识别(是/否)
+    "zwsb": None,
+    # 403绕过时发送全部变异请求，不做自适应裁剪
+    "bypass_exhaustive": False,
+    # 共享响应缓存的有效期(秒)，0 表示关闭
+    "response_cache_ttl": 300,
+    # 共享响应缓存的大小上限(MB)
+    "response_cache_size": 256,
     # 输出完整 URL 路径而非相对路径
     "full_url": False,
     # 显示完整的重定向历史记录
@@ -138,6 +148,8 @@ options = {
     "color": True,
     # 是否静默模式运行（减少输出）
     "quiet": False,
+    # 内存中保留的最近输出行数
+    "output_history": 1000,
     # 输出文件路径
     "output_file": None,
     # 输出格式（例如 json, xml, plain 等）
@@ -149,5 +161,9 @@ options = {
     # 是否自动保存报告
     "autosave_report": True,
     # 日志文件最大尺寸（单位未知，通常为字节）
-    "log_file_size": 0
+    "log_file_size": 0,
+    # 日志级别(debug, info, warning, error)
+    "log_level": "info",
+    # 日志格式(jsonl 每行一条JSON记录，text 为纯文本)
+    "log_format": "jsonl",
 }
@@ -9,6 +9,7 @@ from lib.core.settings import (
     EXTENSION_RECOGNITION_REGEX,
 )
 from lib.core.structures import OrderedSet
+from lib.core.wordlist_cache import load_wordlist
 from lib.parse.url import clean_path
 from lib.utils.common import lstrip_once
 from lib.utils.file import FileUtils
@@ -55,11 +56,18 @@ class Dictionary:
         """
         初始化Dictionary实例。
 
+        启用字典缓存(wordlist_cache)时，扫描字典从预编译缓存中映射，缓存不存在时生成后写入缓存；
+        黑名单很小，总是直接生成。
+
         参数:
             **kwargs: 可变关键字参数，传递给generate方法以生成路径项。
         """
         self._index = 0
-        self._items = self.generate(**kwargs)
+
+        if options["wordlist_cache"] and not kwargs.get("is_blacklist"):
+            self._items = load_wordlist(kwargs.get("files", []), lambda: self.generate(**kwargs))
+        else:
+            self._items = self.generate(**kwargs)
 
     @property
     def index(self):
@@ -108,9 +116,9 @@ class Dictionary:
         序列化对象状态。
 
         返回:
-            tuple: 包含_items和_index的元组。
+            tuple: 包含_items和_index的元组，预编译字典转换为列表。
         """
-        return (self._items, self._index)
+        return (list(self._items), self._index)
 
     def __setstate__(self, state):
         """
@@ -265,3 +273,12 @@ class Dictionary:
         """
         self._index = 0
 
+    def seek(self, index):
+        """
+        将内部索引移动到指定位置，用于从会话中恢复进度。
+
+        参数:
+            index (int): 新的索引值。
+        """
+        self._index = max(0, min(index, len(self._items)))
+
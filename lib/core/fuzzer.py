@@ -1,10 +1,11 @@
+import logging
 import re
 import threading
 import time
 
 from lib.core.data import blacklists, options
 from lib.core.exceptions import RequestException
-from lib.core.logger import logger
+from lib.core.logger import log_event
 from lib.core.scanner import Scanner
 from lib.core.settings import (
     DEFAULT_TEST_PREFIXES,
@@ -30,6 +31,7 @@ class Fuzzer:
 
     def __init__(self, requester, dictionary, **kwargs):
         self._threads = []
+        # 当前目录已扫描路径的64位哈希，比保存完整路径字符串占用更少的内存
         self._scanned = set()
         self._requester = requester
         self._dictionary = dictionary
@@ -152,6 +154,8 @@ class Fuzzer:
         """
         self.setup_scanners()
         self.setup_threads()
+        # 每个目录开始时清空，集合大小不超过单个目录的请求数
+        self._scanned.clear()
 
         self._running_threads_count = len(self._threads)
         self._is_running = True
@@ -202,11 +206,12 @@ class Fuzzer:
             path (str): 需要扫描的目标路径。
             scanners (generator): 提供Scanner实例的可迭代对象。
         """
-        # 防止重复扫描相同路径
-        if path in self._scanned:
+        # 防止重复扫描相同路径(例如爬虫发现的路径与字典重复)
+        key = hash(path)
+        if key in self._scanned:
             return
         else:
-            self._scanned.add(path)
+            self._scanned.add(key)
 
         response = self._requester.request(path)
 
@@ -229,10 +234,10 @@ class Fuzzer:
             self.exc = e
 
         if options["crawl"]:
-            logger.info(f'THREAD-{threading.get_ident()}: crawling "/{path}"')
+            log_event(logging.INFO, 'crawling "/%s"', path, event="crawl", path=path)
             for path_ in Crawler.crawl(response):
                 if self._dictionary.is_valid(path_):
-                    logger.info(f'THREAD-{threading.get_ident()}: found new path "/{path_}" in /{path}')
+                    log_event(logging.INFO, 'found new path "/%s" in /%s', path_, path, event="crawl_found", path=path_)
                     self.scan(path_, self.get_scanners_for(path_))
 
     def is_excluded(self, resp):
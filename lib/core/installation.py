@@ -1,6 +1,5 @@
 import subprocess
 import sys
-import pkg_resources
 
 from lib.core.exceptions import FailedDependenciesInstallation
 from lib.core.settings import SCRIPT_PATH
@@ -30,8 +29,10 @@ def get_dependencies():
 def check_dependencies():
     """
     检查当前环境中是否已安装所有必需的依赖包
-    使用pkg_resources模块验证依赖包是否满足要求
+    使用pkg_resources模块验证依赖包是否满足要求，pkg_resources 导入较慢，只在检查时导入
     """
+    import pkg_resources
+
     pkg_resources.require(get_dependencies())
 
 
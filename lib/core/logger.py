@@ -1,7 +1,14 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+
+from logging.handlers import QueueHandler, RotatingFileHandler
 
 from lib.core.data import options
+from lib.core.settings import LOG_BATCH_SIZE, LOG_RATE_LIMIT, LOG_RATE_WINDOW
 
 
 logger = logging.getLogger(__name__)
@@ -9,14 +16,238 @@ logger.setLevel(logging.DEBUG)
 # 默认禁用日志记录器
 logger.disabled = True
 
+# LogRecord 自带的属性，其余属性是结构化字段
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "suppressed"}
+
+_queue = None
+_writer = None
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    JSONL格式化器，每条日志输出为一行JSON
+
+    除时间、级别和消息外，结构化字段原样写入，异常堆栈写入 exc 字段。
+    只在日志线程中使用，时间的秒级部分在同一秒内复用。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._second = None
+        self._time_prefix = None
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+
+        if second != self._second:
+            self._second = second
+            self._time_prefix = time.strftime(self.default_time_format, self.converter(record.created))
+
+        return self.default_msec_format % (self._time_prefix, record.msecs)
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    文本格式化器，在消息后注明被限流丢弃的同类日志条数
+    """
+
+    def format(self, record):
+        message = super().format(record)
+
+        if getattr(record, "suppressed", 0):
+            message += f" ({record.suppressed} similar messages suppressed)"
+
+        return message
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    对重复的警告和错误日志限流
+
+    同一消息模板和异常类型在 window 秒内最多记录 limit 条，其余丢弃并计数，
+    下一个窗口中第一条被记录的日志带上 suppressed 字段。INFO 及以下级别不限流。
+
+    参数:
+        limit (int): 每个窗口内记录的条数
+        window (float): 窗口长度(秒)
+    """
+
+    def __init__(self, limit=LOG_RATE_LIMIT, window=LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._buckets = {}
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+
+        exc_type = record.exc_info[0] if record.exc_info else None
+        key = (record.msg if isinstance(record.msg, str) else type(record.msg), exc_type)
+        now = time.monotonic()
+        # [窗口开始时间, 已记录条数, 丢弃条数]
+        bucket = self._buckets.get(key)
+
+        if bucket is None or now - bucket[0] >= self.window:
+            record.suppressed = bucket[2] if bucket else 0
+            self._buckets[key] = [now, 1, 0]
+            return True
+
+        if bucket[1] < self.limit:
+            bucket[1] += 1
+            record.suppressed = 0
+            return True
+
+        bucket[2] += 1
+        return False
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    只把日志记录放入队列的处理器
+
+    QueueHandler 默认在调用线程中格式化消息和异常堆栈，这里推迟到日志线程中完成，
+    放入队列也不需要处理器的锁。
+    """
+
+    def handle(self, record):
+        self.queue.put_nowait(record)
+        return True
+
+
+class LogWriter:
+    """
+    日志线程，从队列中批量取出日志，限流、格式化后写入轮转日志文件，每批只 flush 一次
+
+    参数:
+        log_queue (queue.SimpleQueue): 日志队列，元素为 LogRecord 或 log_event 放入的元组
+        handler (RotatingFileHandler): 日志文件处理器
+    """
+
+    def __init__(self, log_queue, handler):
+        self.queue = log_queue
+        self.handler = handler
+        self.filter = RateLimitFilter()
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """
+        写完队列中剩余的日志后结束日志线程
+        """
+        if self._thread.is_alive():
+            self.queue.put_nowait(None)
+            self._thread.join()
+        self.handler.close()
+
+    @staticmethod
+    def to_record(item):
+        if isinstance(item, logging.LogRecord):
+            return item
+
+        created, thread_name, level, msg, args, exc_info, fields = item
+        # 只设置格式化用到的属性，不执行 LogRecord.__init__ 中的调用位置和进程信息收集
+        record = logging.LogRecord.__new__(logging.LogRecord)
+        record.__dict__.update(fields)
+        record.__dict__.update(
+            name=logger.name,
+            levelno=level,
+            levelname=logging.getLevelName(level),
+            msg=msg,
+            args=args,
+            exc_info=(type(exc_info), exc_info, exc_info.__traceback__) if exc_info else None,
+            exc_text=None,
+            stack_info=None,
+            created=created,
+            msecs=created % 1 * 1000,
+            threadName=thread_name,
+        )
+        return record
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+
+            try:
+                while batch[-1] is not None and len(batch) < LOG_BATCH_SIZE:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            self.write([item for item in batch if item is not None])
+
+            if batch[-1] is None:
+                return
+
+    def write(self, items):
+        handler = self.handler
+
+        for item in items:
+            record = self.to_record(item)
+            if not self.filter.filter(record):
+                continue
+
+            try:
+                line = handler.format(record) + handler.terminator
+                if handler.maxBytes > 0 and handler.stream.tell() + len(line) >= handler.maxBytes:
+                    handler.doRollover()
+                handler.stream.write(line)
+            except Exception:
+                handler.handleError(record)
+
+        handler.flush()
+
+
+def log_event(level, msg, *args, exc_info=None, **fields):
+    """
+    记录一条结构化日志，供请求等高频调用的位置使用
+
+    调用线程中只检查级别并把参数放入队列，LogRecord 的构造、消息格式化和异常堆栈格式化
+    都在日志线程中完成。未启用日志或级别不够时几乎没有开销。
+
+    参数:
+        level (int): 日志级别
+        msg (str): 消息模板，使用 % 格式化
+        *args: 消息参数
+        exc_info (BaseException): 需要记录堆栈的异常
+        **fields: 写入JSONL记录的结构化字段
+    """
+    if _queue is None or not logger.isEnabledFor(level):
+        return
+
+    _queue.put_nowait(
+        (time.time(), threading.current_thread().name, level, msg, args, exc_info, fields)
+    )
+
 
 def enable_logging():
     """
     启用日志记录功能
 
-    该函数将启用预先配置的日志记录器，并设置日志文件的轮转机制。
-    日志格式包含时间戳、日志级别和消息内容。
-    日志文件的路径和大小限制从options配置中读取。
+    日志记录只放入队列，由日志线程批量写入轮转日志文件，工作线程不会等待磁盘写入。
+    日志文件的路径、大小限制、级别(log_level)和格式(log_format: jsonl/text)从options配置中读取。
 
     参数:
         无
@@ -24,16 +255,28 @@ def enable_logging():
     返回值:
         无
     """
+    global _queue, _writer
+
+    if _writer:
+        return
+
     # 启用日志记录器
     logger.disabled = False
-    # 创建日志格式化器
-    formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+    logger.setLevel(logging.getLevelName(options["log_level"].upper()))
+
+    if options["log_format"] == "text":
+        formatter = TextFormatter('%(asctime)s [%(levelname)s] %(message)s')
+    else:
+        formatter = JSONFormatter()
+
     # 创建轮转文件处理器，当日志文件达到指定大小时自动轮转
     handler = RotatingFileHandler(options["log_file"], maxBytes=options["log_file_size"])
-    # 设置处理器的日志级别
-    handler.setLevel(logging.DEBUG)
-    # 为处理器设置格式化器
     handler.setFormatter(formatter)
-    # 将处理器添加到日志记录器中
-    logger.addHandler(handler)
 
+    _queue = queue.SimpleQueue()
+    logger.addHandler(DeferredQueueHandler(_queue))
+
+    _writer = LogWriter(_queue, handler)
+    _writer.start()
+    # 退出时写完队列中剩余的日志
+    atexit.register(_writer.stop)
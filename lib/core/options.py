@@ -1,4 +1,3 @@
-import os
 import sys
 
 from lib.core.settings import (
@@ -15,17 +14,18 @@ from lib.utils.common import iprange, uniq
 from lib.utils.file import File, FileUtils
 
 
-def parse_options():
+def parse_options(require_urls=True):
     """解析命令行选项并进行初始化配置
 
     此函数负责处理用户输入的各种命令行参数，并根据这些参数完成程序运行所需的各项初始化工作。
     包括 URL 列表来源判断、扩展名处理、代理设置、请求头构建等关键步骤。
 
+    参数:
+        require_urls (bool): 是否必须指定扫描目标，compile-wordlists 子命令不需要
+
     返回值:
         dict: 经过处理后的所有配置项组成的字典
     """
-    os.makedirs('resources', exist_ok=True)
-    open("resources/bypass403_url.txt", 'w').close()
     opt = parse_config(parse_arguments())
 
     # 如果启用了-all选项，则将所有模块设置为"yes"
@@ -51,17 +51,13 @@ def parse_options():
         opt.urls = sys.stdin.read().splitlines(0)
     elif opt.raw_file:
         _access_file(opt.raw_file)
-    elif not opt.urls:
+    elif not opt.urls and require_urls:
         print("缺少URL目标，请尝试使用 -u <url>")
         #opt.urls="http://www.baidu.com"
         exit(1)
-    bypass403_url="".join(opt.urls)
-    with open('resources/bypass403_url.txt','w') as f:
-        f.write(bypass403_url)
-
 
     if not opt.raw_file:
-        opt.urls = uniq(opt.urls)
+        opt.urls = uniq(opt.urls or ())
 
     # 检查是否指定了扩展名
     if not opt.extensions and not opt.remove_extensions:
@@ -330,6 +326,8 @@ def parse_config(opt):
     opt.capitalization = opt.capitalization or config.safe_getboolean(
         "dictionary", "capitalization"
     )
+    if opt.wordlist_cache is None:
+        opt.wordlist_cache = config.safe_getboolean("dictionary", "wordlist-cache", True)
 
     # 请求设置
     opt.http_method = opt.http_method or config.safe_get("request", "http-method", "get")
@@ -357,6 +355,12 @@ def parse_config(opt):
 
     # 高级设置
     opt.crawl = opt.crawl or config.safe_getboolean("advanced", "crawl")
+    opt.bypass_exhaustive = opt.bypass_exhaustive or config.safe_getboolean(
+        "advanced", "bypass-exhaustive"
+    )
+    if opt.response_cache_ttl is None:
+        opt.response_cache_ttl = config.safe_getint("advanced", "response-cache-ttl", 300)
+    opt.response_cache_size = config.safe_getint("advanced", "response-cache-size", 256)
 
     # 显示设置
     opt.full_url = opt.full_url or config.safe_getboolean("view", "full-url")
@@ -365,12 +369,15 @@ def parse_config(opt):
     opt.redirects_history = opt.redirects_history or config.safe_getboolean(
         "view", "show-redirects-history"
     )
+    opt.output_history = config.safe_getint("view", "output-history", 1000)
 
     # 输出设置
     opt.output_path = config.safe_get("output", "autosave-report-folder")
     opt.autosave_report = config.safe_getboolean("output", "autosave-report")
     opt.log_file_size = config.safe_getint("output", "log-file-size")
     opt.log_file = opt.log_file or config.safe_get("output", "log-file")
+    opt.log_level = opt.log_level or config.safe_get("output", "log-level", "info")
+    opt.log_format = config.safe_get("output", "log-format", "jsonl")
     opt.output_format = opt.output_format or config.safe_get(
         "output", "report-format", "plain", OUTPUT_FORMATS
     )
@@ -0,0 +1,158 @@
+import threading
+import time
+
+from collections import defaultdict, namedtuple
+from queue import Empty, Queue
+
+from lib.view.colors import set_color
+from lib.view.terminal import output
+
+# 事件类型
+TARGET = "target"  # 扫描目标，data: 目标URL
+PATH_FOUND = "path"  # 目录扫描命中的路径，data: lib.connection.response.Response
+FORBIDDEN = "forbidden"  # 需要尝试403绕过的路径，data: (基础URL, 路径)
+JS_URL = "js_url"  # JSFinder 从JS中提取并探测过的URL，data: (URL, 状态码)
+
+# 每个阶段待处理事件的上限，队列满时发布者阻塞等待(背压)
+QUEUE_SIZE = 1000
+
+Event = namedtuple("Event", ["type", "data"])
+
+_STOP = object()
+
+
+class Stage:
+    """
+    流水线中的一个阶段
+
+    每个阶段拥有一个有界队列和一个工作线程，按到达顺序依次处理订阅的事件，
+    收到结束信号后调用 finish。设置了 tick 时，队列空闲超过 interval 秒就调用一次 tick，
+    供阶段处理按时间触发的工作。
+
+    参数:
+        name (str): 阶段名称，用于输出错误信息
+        events (tuple): 订阅的事件类型
+        handler (callable): 处理单个事件的函数，参数为 Event
+        finish (callable, optional): 所有事件处理完成后调用的函数
+        maxsize (int): 队列上限
+        tick (callable, optional): 队列空闲时定期调用的函数
+        interval (float): 调用 tick 的间隔(秒)
+    """
+
+    def __init__(self, name, events, handler, finish=None, maxsize=QUEUE_SIZE, tick=None, interval=1.0):
+        self.name = name
+        self.events = events
+        self.handler = handler
+        self.finish = finish
+        self.tick = tick
+        self.interval = interval
+        self.queue = Queue(maxsize)
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name=f"stage-{name}", daemon=True)
+
+    def _run(self):
+        timeout = self.interval if self.tick else None
+
+        while True:
+            try:
+                event = self.queue.get(timeout=timeout)
+            except Empty:
+                self._call(self.tick)
+                continue
+
+            if event is _STOP:
+                break
+
+            self._call(self.handler, event)
+
+        if self.finish:
+            self._call(self.finish)
+
+    def _call(self, func, *args):
+        # 单个事件出错不影响后续事件和其他阶段
+        try:
+            func(*args)
+        except Exception as e:
+            current_time = time.strftime("%H:%M:%S")
+            output.error(set_color(f"[{current_time}] {self.name} 阶段出错: {e}", fore="red"))
+
+
+class EventBus:
+    """
+    进程内事件总线，连接扫描的各个阶段
+
+    目录扫描、JSFinder 等生产者发布事件，下游阶段在各自线程中边接收边处理，
+    不需要等待上游全部完成，也不再通过工作目录中的文本文件交换数据。
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._subscribers = defaultdict(list)
+
+    def add_stage(self, name, events, handler, finish=None, maxsize=QUEUE_SIZE, tick=None, interval=1.0):
+        """
+        注册一个阶段
+
+        关闭时按注册顺序依次结束各阶段，因此产生事件的阶段应先于消费这些事件的阶段注册。
+
+        参数:
+            name (str): 阶段名称
+            events (tuple): 订阅的事件类型
+            handler (callable): 处理单个事件的函数
+            finish (callable, optional): 结束时调用的函数
+            maxsize (int): 队列上限
+            tick (callable, optional): 队列空闲时定期调用的函数
+            interval (float): 调用 tick 的间隔(秒)
+
+        返回:
+            Stage: 阶段对象
+        """
+        stage = Stage(name, events, handler, finish, maxsize, tick, interval)
+        self.stages.append(stage)
+
+        for event_type in events:
+            self._subscribers[event_type].append(stage)
+
+        return stage
+
+    def has_subscribers(self, event_type):
+        """
+        判断是否有阶段订阅了某类事件
+
+        参数:
+            event_type (str): 事件类型
+
+        返回:
+            bool: 是否有订阅者
+        """
+        return bool(self._subscribers.get(event_type))
+
+    def start(self):
+        """
+        启动所有阶段的工作线程
+        """
+        for stage in self.stages:
+            stage.thread.start()
+
+    def publish(self, event_type, data):
+        """
+        发布事件，订阅者的队列已满时阻塞等待
+
+        参数:
+            event_type (str): 事件类型
+            data: 事件数据
+        """
+        event = Event(event_type, data)
+
+        for stage in self._subscribers.get(event_type, ()):
+            if not stage.closed:
+                stage.queue.put(event)
+
+    def close(self):
+        """
+        按注册顺序依次结束各阶段，等待每个阶段处理完剩余事件
+        """
+        for stage in self.stages:
+            stage.queue.put(_STOP)
+            stage.thread.join()
+            stage.closed = True
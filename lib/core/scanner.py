@@ -50,7 +50,7 @@ class Scanner:
         if duplicate:
             self.content_parser = duplicate.content_parser
             self.wildcard_redirect_regex = duplicate.wildcard_redirect_regex
-            logger.debug(f'跳过"{self.context}"的第二次测试')
+            logger.debug('跳过"%s"的第二次测试', self.context)
             return
 
         second_path = self.path.replace(
@@ -66,7 +66,7 @@ class Scanner:
                 clean_path(second_response.redirect),
                 second_path,
             )
-            logger.debug(f'用于检测"{self.context}"通配符重定向的模式（正则表达式）: {self.wildcard_redirect_regex}')
+            logger.debug('用于检测"%s"通配符重定向的模式（正则表达式）: %s', self.context, self.wildcard_redirect_regex)
 
         self.content_parser = DynamicContentParser(
             first_response.content, second_response.content
@@ -127,7 +127,7 @@ class Scanner:
 
             # 如果重定向不匹配规则，则标记为已找到
             if not is_wildcard_redirect:
-                logger.debug(f'"{redirect}"不匹配正则表达式"{regex_to_compare}"，通过')
+                logger.debug('"%s"不匹配正则表达式"%s"，通过', redirect, regex_to_compare)
                 return True
 
         if self.is_wildcard(response):
@@ -0,0 +1,388 @@
+"""
+增量式会话日志
+
+会话文件是一个追加写入的 JSON Lines 文件。第一行是会话头，记录扫描选项、报告文件以及字典标识
+(字典文件的路径、大小、修改时间和生成后的条目数)，字典本身不写入会话，恢复时按相同选项重新生成。
+之后每行是一条记录：
+
+    ["result", [url, status, length, type, redirect, digest]]   报告中的一条结果
+    ["passed", url]                                      已加入过递归队列的目录
+    ["fingerprint", [url, info]]                         指纹识别结果
+    ["state", {...}]                                     扫描进度快照，后出现的覆盖先出现的
+
+工作线程只把记录放入内存队列，由后台线程定期追加写入并 fsync，不会阻塞扫描。进程被强制结束时
+最后一行可能不完整，加载时忽略即可，最多丢失一个写入周期内的进度。状态记录累计过多时整体重写
+(先写临时文件再替换)，把历史状态压缩为一条。
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from io import BytesIO
+
+from lib.core.exceptions import UnpicklingError
+from lib.core.logger import log_event
+from lib.core.settings import SESSION_COMPACT_SIZE, SESSION_FLUSH_INTERVAL
+from lib.utils.pickle import pickle, unpickle
+
+SESSION_FORMAT = "dirsearch-session"
+SESSION_VERSION = 1
+
+
+class Result:
+    """
+    报告使用的精简结果，只保留报告需要的字段和响应体摘要，不保存响应体
+
+    参数:
+        url (str): 完整URL
+        status (int): 状态码
+        length (int): 响应长度
+        type (str): 内容类型
+        redirect (str): 重定向地址
+        digest (str): 响应体的64位BLAKE2b摘要，旧会话中的结果没有摘要
+    """
+
+    __slots__ = ("url", "status", "length", "type", "redirect", "digest")
+
+    def __init__(self, url, status, length, type, redirect, digest=None):
+        self.url = url
+        self.status = status
+        self.length = length
+        self.type = type
+        self.redirect = redirect
+        self.digest = digest
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        从 Response 对象构造
+
+        参数:
+            response (Response): 响应对象
+
+        返回:
+            Result: 精简结果
+        """
+        return cls(
+            response.url,
+            response.status,
+            response.length,
+            response.type,
+            response.redirect,
+            hashlib.blake2b(response.body, digest_size=8).hexdigest(),
+        )
+
+    def to_list(self):
+        return [self.url, self.status, self.length, self.type, self.redirect, self.digest]
+
+
+def wordlist_identity(files):
+    """
+    计算字典文件的标识，文件被修改后标识随之变化
+
+    参数:
+        files (list): 字典文件路径列表
+
+    返回:
+        list: 每个文件的 [路径, 大小, 修改时间(纳秒)]
+    """
+    identity = []
+    for file in files:
+        try:
+            stat = os.stat(file)
+            identity.append([os.path.abspath(file), stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            identity.append([os.path.abspath(file), None, None])
+    return identity
+
+
+def is_session_journal(session_file):
+    """
+    判断会话文件是否为会话日志格式(旧版本的会话文件是pickle格式)
+
+    参数:
+        session_file (str): 会话文件路径
+
+    返回:
+        bool: 是会话日志返回True
+    """
+    with open(session_file, "rb") as fd:
+        return fd.read(1) == b"{"
+
+
+class SessionState:
+    """
+    从会话日志中恢复出的状态
+
+    属性:
+        header (dict): 会话头
+        options (dict): 扫描选项
+        results (list[Result]): 报告中的结果
+        passed_urls (set): 已加入过递归队列的目录
+        fingerprints (dict): 指纹识别结果
+        state (dict): 最后一次进度快照
+    """
+
+    def __init__(self, header):
+        self.header = header
+        self.options = unpickle_options(header["options"])
+        self.results = []
+        self.passed_urls = set()
+        self.fingerprints = {}
+        self.state = {}
+
+
+def pickle_options(options):
+    # 选项中包含集合、元组等JSON无法区分的类型，沿用受限pickle序列化
+    buffer = BytesIO()
+    pickle(dict(options), buffer)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def unpickle_options(data):
+    return unpickle(BytesIO(base64.b64decode(data)))
+
+
+def load_session(session_file):
+    """
+    读取会话日志，依次重放各条记录
+
+    参数:
+        session_file (str): 会话文件路径
+
+    返回:
+        SessionState: 恢复出的状态
+
+    异常:
+        UnpicklingError: 文件不是有效的会话日志
+    """
+    with open(session_file, encoding="utf-8") as fd:
+        try:
+            header = json.loads(fd.readline())
+            if header.get("format") != SESSION_FORMAT or header.get("version") != SESSION_VERSION:
+                raise ValueError
+            session = SessionState(header)
+        except (ValueError, KeyError, AttributeError):
+            raise UnpicklingError()
+
+        for line in fd:
+            try:
+                kind, value = json.loads(line)
+            except ValueError:
+                # 写入过程中被中断的最后一行
+                break
+
+            if kind == "result":
+                session.results.append(Result(*value))
+            elif kind == "passed":
+                session.passed_urls.add(value)
+            elif kind == "fingerprint":
+                session.fingerprints[value[0]] = value[1]
+            elif kind == "state":
+                session.state = value
+
+    return session
+
+
+class SessionJournal:
+    """
+    会话日志写入器
+
+    参数:
+        path (str): 会话文件路径
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._result_urls = set()
+        self._header = None
+        self._snapshot = None
+        self._last_state = None
+        self._state_bytes = 0
+        self._fd = None
+        self._closed = threading.Event()
+        self._thread = None
+
+    def open(self, header, snapshot, results=(), passed_urls=(), fingerprints=None):
+        """
+        写入完整的会话文件并启动后台写入线程
+
+        参数:
+            header (dict): 会话头(不含格式字段)，options 为扫描选项
+            snapshot (callable): 返回当前进度快照的函数，在后台线程中调用
+            results (iterable[Result]): 已有的结果
+            passed_urls (iterable[str]): 已加入过递归队列的目录
+            fingerprints (dict): 已有的指纹识别结果
+        """
+        self._header = {
+            "format": SESSION_FORMAT,
+            "version": SESSION_VERSION,
+            **header,
+            "options": pickle_options(header["options"]),
+        }
+        self._snapshot = snapshot
+
+        records = [["result", result.to_list()] for result in results]
+        records += [["passed", url] for url in passed_urls]
+        records += [["fingerprint", [url, info]] for url, info in (fingerprints or {}).items()]
+        self._result_urls.update(record[1][0] for record in records if record[0] == "result")
+
+        with self._write_lock:
+            self._rewrite(records)
+
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def add_result(self, result):
+        """
+        记录一条结果，同一URL只记录一次
+
+        恢复会话时会从略早于中断处的位置继续扫描，之前已经报告过的路径可能再次命中。
+
+        参数:
+            result (Result): 精简结果
+
+        返回:
+            bool: 是新的结果返回True
+        """
+        with self._pending_lock:
+            if result.url in self._result_urls:
+                return False
+
+            self._result_urls.add(result.url)
+            self._pending.append(["result", result.to_list()])
+            return True
+
+    def record(self, kind, value):
+        """
+        记录一条 passed/fingerprint 记录，只放入内存队列，由后台线程写入
+
+        参数:
+            kind (str): 记录类型
+            value: 记录内容
+        """
+        with self._pending_lock:
+            self._pending.append([kind, value])
+
+    def flush(self):
+        """
+        把队列中的记录和当前进度写入会话文件
+        """
+        with self._write_lock:
+            if self._fd is None:
+                return
+
+            with self._pending_lock:
+                records, self._pending = self._pending, []
+
+            state = self._snapshot()
+            lines = [json.dumps(record, separators=(",", ":")) + "\n" for record in records]
+            state_line = None
+            if self._changed(state):
+                state_line = json.dumps(["state", state], separators=(",", ":")) + "\n"
+                lines.append(state_line)
+
+            if not lines:
+                return
+
+            self._fd.write("".join(lines))
+            self._fd.flush()
+            os.fsync(self._fd.fileno())
+
+            if state_line:
+                self._last_state = state
+                self._state_bytes += len(state_line)
+
+            if self._state_bytes > SESSION_COMPACT_SIZE:
+                self._compact()
+
+    def save(self, path):
+        """
+        写入一份完整的会话文件到指定位置，之后的记录也写入该文件
+
+        参数:
+            path (str): 会话文件路径
+        """
+        self.flush()
+
+        with self._write_lock:
+            if path != self.path:
+                old_path, self.path = self.path, path
+                self._compact(old_path)
+                os.remove(old_path)
+
+    def close(self, remove=False):
+        """
+        停止后台写入线程并写入剩余记录
+
+        参数:
+            remove (bool): 是否删除会话文件(扫描完成或用户放弃保存时)
+        """
+        if self._closed.is_set():
+            return
+
+        self._closed.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+        with self._write_lock:
+            if self._fd:
+                self._fd.close()
+                self._fd = None
+
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _changed(self, state):
+        # 耗时每次都在变化，只有它变化时不必写入新的快照
+        if self._last_state is None:
+            return True
+        return any(value != self._last_state.get(key) for key, value in state.items() if key != "elapsed")
+
+    def _flush_loop(self):
+        while not self._closed.wait(SESSION_FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception as e:
+                # 磁盘写满或记录无法序列化等错误不应中断扫描和之后的检查点，下个周期重试
+                log_event(logging.ERROR, "Session checkpoint failed: %s", e, exc_info=e, event="session_error")
+
+    def _compact(self, source=None):
+        # 调用方持有 _write_lock。结果、目录和指纹从已写入的文件中读取，状态只保留最新一条
+        self._fd.flush()
+        session = load_session(source or self.path)
+
+        records = [["result", result.to_list()] for result in session.results]
+        records += [["passed", url] for url in session.passed_urls]
+        records += [["fingerprint", [url, info]] for url, info in session.fingerprints.items()]
+        self._rewrite(records)
+
+    def _rewrite(self, records):
+        if self._fd:
+            self._fd.close()
+
+        state = self._snapshot()
+        records = [self._header] + records + [["state", state]]
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as fd:
+            for record in records:
+                fd.write(json.dumps(record, separators=(",", ":")) + "\n")
+            fd.flush()
+            os.fsync(fd.fileno())
+
+        os.replace(tmp_path, self.path)
+        self._fd = open(self.path, "a", encoding="utf-8")
+        self._last_state = state
+        self._state_bytes = 0
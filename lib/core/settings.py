@@ -96,8 +96,20 @@ DEFAULT_HEADERS = {
     "cache-control": "max-age=0",
 }
 
-# 默认会话保存文件名
-DEFAULT_SESSION_FILE = "session.pickle"
+# 自动保存的会话日志目录，扫描正常结束后会话日志会被删除
+SESSIONS_PATH = FileUtils.build_path(SCRIPT_PATH, "sessions")
+
+# 会话日志后台写入的间隔(秒)，进程被强制结束时最多丢失这段时间内的进度
+SESSION_FLUSH_INTERVAL = 5
+
+# 会话日志中的进度快照累计超过该字节数时重写整个文件
+SESSION_COMPACT_SIZE = 1024 * 1024
+
+# 各扫描阶段共享的响应缓存文件
+RESPONSE_CACHE_FILE = FileUtils.build_path(SCRIPT_PATH, "cache", "responses.db")
+
+# 预编译字典缓存目录，见 lib/core/wordlist_cache.py
+WORDLIST_CACHE_PATH = FileUtils.build_path(SCRIPT_PATH, "cache", "wordlists")
 
 # 路径反射标记，在某些测试场景下用于标识反射点位置
 REFLECTED_PATH_MARKER = "__REFLECTED_PATH__"
@@ -162,6 +174,15 @@ MAX_CONSECUTIVE_REQUEST_ERRORS = 75
 # 等待暂停操作完成的最长等待时间（秒）
 PAUSING_WAIT_TIMEOUT = 7
 
+# 同一条警告/错误日志在 LOG_RATE_WINDOW 秒内最多记录 LOG_RATE_LIMIT 次，其余丢弃并计数
+LOG_RATE_LIMIT = 10
+LOG_RATE_WINDOW = 60
+# 日志线程每批最多写入的记录数，每批只 flush 一次
+LOG_BATCH_SIZE = 512
+
+# 终端刷新间隔（秒），扫描期间的状态行和进度条按该间隔批量输出
+OUTPUT_REFRESH_INTERVAL = 0.1
+
 # URL安全字符集定义（来自string模块中的标点符号）
 URL_SAFE_CHARS = string.punctuation
 
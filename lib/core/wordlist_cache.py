@@ -0,0 +1,224 @@
+"""
+预编译字典缓存
+
+展开后的字典(替换 %EXT%、追加扩展名、前后缀和大小写转换之后的结果)以二进制格式保存在缓存目录中，
+之后使用相同字典文件和相同展开选项的扫描直接映射缓存文件，不必重新读取和展开字典。
+缓存文件只读映射，同时运行的多个扫描进程共享同一份物理内存页。
+
+文件格式(本机字节序，缓存只在本机使用):
+
+    头部     4s magic | I 版本 | Q 条目数
+    偏移表   (条目数 + 1) 个 Q，第 i 个条目是字符串区中 [offsets[i], offsets[i+1]) 的UTF-8字节
+    字符串区 所有条目依次拼接
+
+缓存文件名是字典文件(路径、大小、修改时间、内容摘要)和展开选项的哈希，任何一项改变都会使用新的缓存文件。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from array import array
+
+from lib.core.data import options
+from lib.core.settings import WORDLIST_CACHE_PATH
+
+MAGIC = b"DSWL"
+VERSION = 1
+HEADER = struct.Struct("=4sIQ")
+
+# 影响字典展开结果的选项
+EXPANSION_OPTIONS = (
+    "extensions",
+    "force_extensions",
+    "overwrite_extensions",
+    "exclude_extensions",
+    "remove_extensions",
+    "prefixes",
+    "suffixes",
+    "lowercase",
+    "uppercase",
+    "capitalization",
+)
+
+
+class CompiledWordlist:
+    """
+    映射到内存中的预编译字典，按下标读取时才解码对应条目
+
+    参数:
+        path (str): 缓存文件路径
+
+    异常:
+        ValueError: 文件不是有效的预编译字典
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as fd:
+            self._mmap = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self._mmap)
+        strings_start = HEADER.size + (count + 1) * 8
+
+        # 写入不完整的文件：偏移表的最后一项应等于字符串区的长度
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or len(self._mmap) < strings_start
+            or struct.unpack_from("=Q", self._mmap, strings_start - 8)[0] != len(self._mmap) - strings_start
+        ):
+            self._mmap.close()
+            raise ValueError(f"{path} is not a compiled wordlist")
+
+        view = memoryview(self._mmap)
+        self._count = count
+        self._offsets = view[HEADER.size:strings_start].cast("Q")
+        self._strings = view[strings_start:]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError("wordlist index out of range")
+
+        return str(self._strings[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def __contains__(self, item):
+        return any(path == item for path in self)
+
+
+def file_digest(path):
+    """
+    计算字典文件内容的摘要
+
+    参数:
+        path (str): 字典文件路径
+
+    返回:
+        str: BLAKE2b 摘要
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(path, "rb") as fd:
+        for chunk in iter(lambda: fd.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def cache_key(files):
+    """
+    计算字典文件和展开选项对应的缓存键
+
+    参数:
+        files (list): 字典文件路径列表
+
+    返回:
+        str: 缓存键
+    """
+    sources = []
+    for file in files:
+        stat = os.stat(file)
+        sources.append([os.path.abspath(file), stat.st_size, stat.st_mtime_ns, file_digest(file)])
+
+    material = json.dumps(
+        {
+            "version": VERSION,
+            "files": sources,
+            "options": {name: options[name] for name in EXPANSION_OPTIONS},
+        },
+        sort_keys=True,
+        default=list,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def compile_wordlist(items, path):
+    """
+    把展开后的字典写成预编译格式，先写临时文件再替换，其他进程不会读到写了一半的文件
+
+    参数:
+        items (list[str]): 展开后的字典条目
+        path (str): 缓存文件路径
+    """
+    offsets = array("Q", [0])
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as output:
+            # 先逐条写入字符串区，再回到文件开头写入头部和偏移表
+            output.seek(HEADER.size + (len(items) + 1) * 8)
+            position = 0
+
+            for item in items:
+                position += output.write(item.encode("utf-8"))
+                offsets.append(position)
+
+            output.seek(0)
+            output.write(HEADER.pack(MAGIC, VERSION, len(items)))
+            output.write(offsets.tobytes())
+
+        # mkstemp 创建的文件只有当前用户可读
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def cache_path(files):
+    """
+    字典文件和当前展开选项对应的缓存文件路径
+
+    参数:
+        files (list): 字典文件路径列表
+
+    返回:
+        str: 缓存文件路径
+    """
+    return os.path.join(WORDLIST_CACHE_PATH, cache_key(files) + ".wordlist")
+
+
+def load_wordlist(files, generate):
+    """
+    读取预编译字典，缓存不存在或已损坏时生成并写入缓存
+
+    缓存目录不可写时直接返回生成的列表。
+
+    参数:
+        files (list): 字典文件路径列表
+        generate (callable): 生成展开后字典的函数
+
+    返回:
+        CompiledWordlist | list: 字典条目序列
+    """
+    path = cache_path(files)
+
+    try:
+        return CompiledWordlist(path)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    items = generate()
+
+    try:
+        compile_wordlist(items, path)
+        return CompiledWordlist(path)
+    except (OSError, ValueError):
+        return items
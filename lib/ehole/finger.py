@@ -0,0 +1,280 @@
+import base64
+import json
+import re
+import threading
+
+from collections import defaultdict
+from urllib.parse import urljoin
+
+from lib.core.settings import SCRIPT_PATH
+from lib.utils.automaton import KeywordAutomaton
+from lib.utils.file import FileUtils
+
+# 指纹库文件
+FINGER_FILE = FileUtils.build_path(SCRIPT_PATH, "lib", "ehole", "finger.json")
+
+# 关键字规则可以匹配的位置
+LOCATIONS = ("body", "title", "header")
+
+# 网站图标的内容类型
+FAVICON_TYPES = ("image/x-icon", "image/vnd.microsoft.icon")
+
+TITLE_REGEX = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+LINK_REGEX = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+ICON_REL_REGEX = re.compile(r"\brel\s*=\s*[\"']?[^\"'>]*\bicon\b", re.IGNORECASE)
+HREF_REGEX = re.compile(r"\bhref\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.IGNORECASE)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def mmh3_hash32(data, seed=0):
+    """
+    MurmurHash3 (x86, 32位)，与 mmh3.hash() 的结果一致
+
+    参数:
+        data (bytes): 待计算的数据
+        seed (int): 种子
+
+    返回:
+        int: 有符号32位哈希值
+    """
+    c1, c2 = 0xCC9E2D51, 0x1B873593
+    length = len(data)
+    h = seed & 0xFFFFFFFF
+    rounded_end = length & ~0x3
+
+    for i in range(0, rounded_end, 4):
+        k = int.from_bytes(data[i:i + 4], "little")
+        k = (k * c1) & 0xFFFFFFFF
+        k = ((k << 15) | (k >> 17)) & 0xFFFFFFFF
+        k = (k * c2) & 0xFFFFFFFF
+
+        h ^= k
+        h = ((h << 13) | (h >> 19)) & 0xFFFFFFFF
+        h = (h * 5 + 0xE6546B64) & 0xFFFFFFFF
+
+    k = 0
+    tail = length & 0x3
+    if tail == 3:
+        k ^= data[rounded_end + 2] << 16
+    if tail >= 2:
+        k ^= data[rounded_end + 1] << 8
+    if tail >= 1:
+        k ^= data[rounded_end]
+        k = (k * c1) & 0xFFFFFFFF
+        k = ((k << 15) | (k >> 17)) & 0xFFFFFFFF
+        k = (k * c2) & 0xFFFFFFFF
+        h ^= k
+
+    h ^= length
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    h ^= h >> 16
+
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+def favicon_hash(content):
+    """
+    计算网站图标的哈希值(Shodan/FOFA/EHole 使用的格式)
+
+    参数:
+        content (bytes): 图标文件内容
+
+    返回:
+        int: 图标哈希值
+    """
+    return mmh3_hash32(base64.encodebytes(content))
+
+
+def get_title(content):
+    """
+    提取HTML页面标题
+
+    参数:
+        content (str): 页面内容
+
+    返回:
+        str: 页面标题，不存在时返回空字符串
+    """
+    match = TITLE_REGEX.search(content or "")
+    return match.group(1).strip() if match else ""
+
+
+def favicon_url(url, content=""):
+    """
+    获取网站图标的地址
+
+    参数:
+        url (str): 页面URL
+        content (str): 页面内容
+
+    返回:
+        str: 页面中 <link rel="icon"> 声明的图标地址，没有声明时为站点根目录下的 /favicon.ico
+    """
+    for tag in LINK_REGEX.findall(content or ""):
+        if not ICON_REL_REGEX.search(tag):
+            continue
+
+        match = HREF_REGEX.search(tag)
+        href = match and next(filter(None, match.groups()), "")
+        if href and not href.startswith("data:"):
+            return urljoin(url, href.strip())
+
+    return urljoin(url, "/favicon.ico")
+
+
+def is_favicon(response):
+    """
+    判断响应是否为网站图标
+
+    参数:
+        response (Response): 响应对象
+
+    返回:
+        bool: 是否为网站图标
+    """
+    return response.path.endswith("favicon.ico") or response.type in FAVICON_TYPES
+
+
+class FingerprintEngine:
+    """
+    进程内的指纹识别引擎，替代调用外部 EHole 程序
+
+    关键字规则按位置(body/title/header)编译成多关键字自动机，一次扫描即可找出所有命中的关键字；
+    图标规则按哈希值建立索引，图标由 lib.ehole.ehole.fingerprint_root 对每个目标单独获取。
+    匹配直接作用于目录扫描时已经获取到的响应，不会发起额外请求。
+
+    参数:
+        rules (list): finger.json 中的 fingerprint 列表
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._rules = {location: [] for location in LOCATIONS}
+        self._candidates = {location: defaultdict(list) for location in LOCATIONS}
+        self._automata = {}
+        self._favicons = defaultdict(list)
+
+        keywords = {location: {} for location in LOCATIONS}
+
+        for order, rule in enumerate(rules):
+            if rule["method"] == "faviconhash":
+                for value in rule["keyword"]:
+                    self._favicons[value.strip()].append((order, rule["cms"]))
+                continue
+
+            location = rule["location"]
+            if location not in LOCATIONS or not rule["keyword"]:
+                continue
+
+            # 同一个关键字只进入自动机一次，规则只记录关键字编号
+            ids = frozenset(
+                keywords[location].setdefault(keyword, len(keywords[location]))
+                for keyword in rule["keyword"]
+            )
+            rule_index = len(self._rules[location])
+            self._rules[location].append((order, rule["cms"], ids))
+
+            for keyword_id in ids:
+                self._candidates[location][keyword_id].append(rule_index)
+
+        for location in LOCATIONS:
+            self._automata[location] = KeywordAutomaton(keywords[location])
+
+    @classmethod
+    def from_file(cls, path=FINGER_FILE):
+        """
+        从指纹库文件加载引擎
+
+        参数:
+            path (str): finger.json 路径
+
+        返回:
+            FingerprintEngine: 引擎实例
+        """
+        with open(path, encoding="utf-8") as fd:
+            return cls(json.load(fd)["fingerprint"])
+
+    def match(self, body="", title="", header="", favicon=None):
+        """
+        匹配指纹
+
+        关键字规则要求规则中的所有关键字都出现在对应位置(区分大小写)，与 EHole 的语义一致。
+
+        参数:
+            body (str): 响应内容
+            title (str): 页面标题
+            header (str): 响应头文本
+            favicon (int, optional): 图标哈希值
+
+        返回:
+            list[str]: 命中的指纹名称，按指纹库中的顺序去重
+        """
+        hits = []
+
+        for location, text in (("body", body), ("title", title), ("header", header)):
+            found = self._automata[location].search(text)
+            if not found:
+                continue
+
+            rules = self._rules[location]
+            candidates = {
+                rule_index
+                for keyword_id in found
+                for rule_index in self._candidates[location][keyword_id]
+            }
+            for rule_index in candidates:
+                order, cms, ids = rules[rule_index]
+                if ids <= found:
+                    hits.append((order, cms))
+
+        if favicon is not None:
+            hits.extend(self._favicons.get(str(favicon), ()))
+
+        names = []
+        for _, cms in sorted(hits):
+            if cms not in names:
+                names.append(cms)
+
+        return names
+
+    def match_response(self, response):
+        """
+        对 lib.connection.response.Response 对象进行指纹匹配
+
+        图标规则不在这里匹配，扫描到的图标文件归属于图标URL而不是目标，由 fingerprint_root 统一处理。
+
+        参数:
+            response (Response): 目录扫描得到的响应
+
+        返回:
+            list[str]: 命中的指纹名称
+        """
+        header = "\n".join(f"{key}: {value}" for key, value in response.headers.items())
+
+        return self.match(
+            body=response.content,
+            title=get_title(response.content),
+            header=header,
+        )
+
+
+def get_engine():
+    """
+    获取全局共享的指纹识别引擎，首次调用时加载并编译指纹库
+
+    返回:
+        FingerprintEngine: 引擎实例
+    """
+    global _engine
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = FingerprintEngine.from_file()
+
+    return _engine
@@ -22,7 +22,10 @@ def parse_arguments():
     """
 
     # 定义程序的基本用法说明
-    usage = "用法: %prog [-u|--url] 目标 [-e|--extensions] 扩展名 [选项]"
+    usage = (
+        "用法: %prog [-u|--url] 目标 [-e|--extensions] 扩展名 [选项]\n"
+        "      %prog compile-wordlists [-w 字典] [-e 扩展名] [字典设置]  预编译字典缓存"
+    )
     parser = OptionParser(usage, version=f"dirsearch v{VERSION}")
 
     # === 必需参数组 ===
@@ -202,6 +205,12 @@ def parse_arguments():
         dest="capitalization",
         help="首字母大写单词列表",
     )
+    dictionary.add_option(
+        "--no-wordlist-cache",
+        action="store_false",
+        dest="wordlist_cache",
+        help="不使用预编译字典缓存，每次重新展开字典",
+    )
 
     # === 常规设置组 ===
     general = OptionGroup(parser, "常规设置")
@@ -531,6 +540,20 @@ def parse_arguments():
         dest="crawl",
         help="在响应中爬取新路径"
     )
+    advanced.add_option(
+        "--bypass-exhaustive",
+        action="store_true",
+        dest="bypass_exhaustive",
+        help="403绕过时对每个路径发送全部变异请求，关闭自适应裁剪",
+    )
+    advanced.add_option(
+        "--response-cache-ttl",
+        action="store",
+        type="int",
+        dest="response_cache_ttl",
+        metavar="秒",
+        help="各扫描阶段共享的响应缓存有效期(默认: 300，0表示关闭缓存)",
+    )
 
     # === 显示设置组 ===
     view = OptionGroup(parser, "显示设置")
@@ -584,6 +607,15 @@ def parse_arguments():
         metavar="路径",
         help="日志文件"
     )
+    output.add_option(
+        "--log-level",
+        action="store",
+        type="choice",
+        dest="log_level",
+        metavar="级别",
+        choices=["debug", "info", "warning", "error"],
+        help="日志级别(可用: debug, info, warning, error，默认: info)",
+    )
 
     # 将各个选项组加入主解析器
     parser.add_option_group(mandatory)
@@ -1,17 +1,13 @@
 import requests
 import validators
 import os
-import tldextract
 import sys
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from queue import Queue
+from collections import defaultdict, deque
+from urllib.parse import urlparse
 from colorama import init, Fore, Style
-from pyfiglet import Figlet
 from requests.packages import urllib3
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import json
 
 # 禁用SSL警告信息
@@ -20,9 +16,21 @@ urllib3.disable_warnings()
 init()
 
 # 导入dirsearch的日志模块
+from lib.connection.transport import get_transport
 from lib.view.terminal import output
 from lib.view.colors import set_color
 
+# 原始路径请求所属的类别，作为自适应模式的响应基线
+BASELINE_FAMILY = "original"
+# 这些状态码通常意味着变异后的请求被拒绝或路由失效，不视为绕过信号
+NOISE_STATUS_CODES = (400, 404, 405)
+# 绕过请求的默认头部
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': '*/*',
+    'Connection': 'keep-alive'
+}
+
 class OptimizedArguments():
     """
     参数解析与验证类
@@ -125,6 +133,9 @@ class OptimizedPathRepository():
     路径变异处理类
     生成各种路径绕过和头部绕过的变体
 
+    每个变体都归属于一个变异类别(family)，自适应模式以类别为单位
+    判断目标主机是否对该类绕过手法有反应
+
     Args:
         path (str): 原始路径
     """
@@ -132,6 +143,7 @@ class OptimizedPathRepository():
     def __init__(self, path):
         self.path = path
         self.newPaths = []
+        self.pathFamilies = []
         self.newHeaders = []
         self.rewriteHeaders = []
         self.createNewPaths()
@@ -143,6 +155,7 @@ class OptimizedPathRepository():
         包括双斜杠、点号绕过、编码绕过等多种变体
         """
         self.newPaths.append(self.path)
+        self.pathFamilies.append(BASELINE_FAMILY)
 
         # 定义路径对组合用于绕过
         pairs = [["/", "//"], ["/.", "/./"]]
@@ -156,12 +169,15 @@ class OptimizedPathRepository():
         # 生成路径对组合
         for pair in pairs:
             self.newPaths.append(pair[0] + self.path + pair[1])
+            self.pathFamilies.append(f"pair:{pair[0]},{pair[1]}")
         # 生成前导绕过组合
         for leading in leadings:
             self.newPaths.append(leading + self.path)
+            self.pathFamilies.append(f"leading:{leading}")
         # 生成后缀绕过组合
         for trailing in trailings:
             self.newPaths.append(self.path + trailing)
+            self.pathFamilies.append(f"trailing:{trailing}")
 
     def createNewHeaders(self):
         """
@@ -189,6 +205,47 @@ class OptimizedPathRepository():
         for element in headers_overwrite:
             self.rewriteHeaders.append({element: self.path})
 
+    def iterRequests(self, families=None):
+        """
+        将变异展开为扁平的请求流
+
+        Args:
+            families (set, optional): 只生成这些类别的请求，为None时生成全部
+
+        Yields:
+            tuple: (family, method, path, headers)
+        """
+        def wanted(family):
+            return families is None or family in families
+
+        if wanted("method:POST"):
+            yield "method:POST", "POST", self.path, None
+        for family, path in zip(self.pathFamilies, self.newPaths):
+            if wanted(family):
+                yield family, "GET", path, None
+        for header in self.newHeaders:
+            family = "header:" + next(iter(header))
+            if wanted(family):
+                yield family, "GET", self.path, header
+        for header in self.rewriteHeaders:
+            family = "rewrite:" + next(iter(header))
+            if wanted(family):
+                yield family, "GET", "", header
+
+    def requestCount(self, families=None):
+        """
+        返回该路径需要发送的请求总数
+
+        Args:
+            families (set, optional): 只统计这些类别的请求
+
+        Returns:
+            int: 请求数
+        """
+        if families is None:
+            return 1 + len(self.newPaths) + len(self.newHeaders) + len(self.rewriteHeaders)
+        return sum(1 for _ in self.iterRequests(families))
+
 class OptimizedQuery():
     """
     HTTP请求查询处理类
@@ -201,60 +258,34 @@ class OptimizedQuery():
         session (requests.Session, optional): HTTP会话对象
         timeout (int): 请求超时时间，默认为5秒
         max_retries (int): 最大重试次数，默认为2次
+        families (set, optional): 只发送这些变异类别的请求，为None时发送全部
     """
 
-    def __init__(self, url, dir, dirObject, session=None, timeout=5, max_retries=2):
+    def __init__(self, url, dir, dirObject, session=None, timeout=5, max_retries=2, families=None):
         self.url = url
         self.dir = dir
         self.dirObject = dirObject
-        # 提取域名用于文件命名
-        self.domain = tldextract.extract(self.url).domain
+        self.families = families
         self.timeout = timeout
         self.max_retries = max_retries
 
-        # 创建优化的session
+        # 未传入session时单独创建，连接池仍由各阶段共享
         self.session = session or self._create_optimized_session()
 
         # 结果存储
         self.results = []
+        self.pending = dirObject.requestCount(families)
         self.lock = threading.Lock()
 
     def _create_optimized_session(self):
         """
-        创建优化的HTTP会话配置
-        包括连接池、重试策略和默认头部设置
+        创建挂载共享连接池的HTTP会话，并设置默认头部
+        重试和速率限制由共享传输层统一处理
 
         Returns:
             requests.Session: 配置好的会话对象
         """
-        session = requests.Session()
-
-        # 配置重试策略
-        retry_strategy = Retry(
-            total=self.max_retries,
-            backoff_factor=0.1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-
-        # 配置适配器
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=20,  # 连接池大小
-            pool_maxsize=100,     # 最大连接数
-            pool_block=False
-        )
-
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        # 设置默认headers
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': '*/*',
-            'Connection': 'keep-alive'
-        })
-
-        return session
+        return get_transport().session(headers=DEFAULT_HEADERS)
 
     def checkStatusCode(self, status_code):
         """
@@ -292,10 +323,12 @@ class OptimizedQuery():
             requests.Response or None: 响应对象或None(失败时)
         """
         try:
-            response = self.session.request(
+            response = get_transport().request(
                 method, url,
+                session=self.session,
+                stage="403bypass",
+                retries=self.max_retries,
                 timeout=self.timeout,
-                verify=False,
                 **kwargs
             )
             return response
@@ -350,222 +383,335 @@ class OptimizedQuery():
         except Exception:
             return None
 
-    def manipulateRequest(self):
+    def jobs(self):
         """
-        执行完整的请求处理流程
-        包括POST请求、路径变异和头部变异处理
+        将路径变异展开为扁平的请求任务流，交由全局调度器执行
+
+        Yields:
+            tuple: (query, family, method, path, headers)
         """
-        # POST请求
-        post_result = self.process_path(self.dir, 'POST')
-        if post_result:
-            self.results.append(post_result)
+        for family, method, path, headers in self.dirObject.iterRequests(self.families):
+            yield self, family, method, path, headers
 
-        # 并发处理路径变异
-        self._process_paths_concurrently()
+    def complete(self, result):
+        """
+        记录单个请求任务的结果
 
-        # 并发处理header变异
-        self._process_headers_concurrently()
+        Args:
+            result (dict or None): process_path 的返回值，附带 family 字段
 
-    def _process_paths_concurrently(self):
-        """
-        并发处理路径变异请求
-        使用线程池提高处理效率
+        Returns:
+            bool: 该URL和路径组合的所有请求是否均已完成
         """
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = []
-            for path in self.dirObject.newPaths:
-                future = executor.submit(self.process_path, path)
-                futures.append(future)
-
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    self.results.append(result)
+        with self.lock:
+            if result:
+                self.results.append(result)
+            self.pending -= 1
+            return self.pending == 0
 
-    def _process_headers_concurrently(self):
+    def lines(self):
         """
-        并发处理头部变异请求
-        分别处理普通头部和重写头部
+        将结果格式化为供去重输出的文本行
+
+        Returns:
+            list: 结果行，带自定义头部的结果以 ---Header= 追加头部
         """
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = []
+        lines = []
+        for result in self.results:
+            line = result['target'] + " " * result['remaining'] + result['info_pure']
+            if result['headers']:
+                line += f"---Header= {result['headers']}"
+            lines.append(line)
+        return lines
 
-            # 处理普通headers
-            for header in self.dirObject.newHeaders:
-                future = executor.submit(self.process_path, self.dir, 'GET', header)
-                futures.append(future)
+class OptimizedScheduler():
+    """
+    全局请求调度器
+    所有URL和路径组合的变异请求都在同一组工作线程中执行，
+    按主机限制并发数，任务从请求流中按需读取以限制内存占用
 
-            # 处理重写headers
-            for header in self.dirObject.rewriteHeaders:
-                future = executor.submit(self.process_path, '', 'GET', header)
-                futures.append(future)
+    Args:
+        max_workers (int): 工作线程总数
+        per_host (int): 单个主机的最大并发请求数
+        max_pending (int, optional): 已读取但尚未执行的任务上限
+    """
 
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    self.results.append(result)
+    def __init__(self, max_workers=50, per_host=50, max_pending=None):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.max_pending = max_pending or max_workers * 4
 
-    def writeToFile(self):
-        """
-        将结果批量写入文件
-        文件名为域名.txt
+    def run(self, jobs, handler):
         """
-        if not self.results:
-            return
+        执行请求流中的全部任务
+
+        Args:
+            jobs (iterable): 任务流，每个任务为元组，首元素提供 url 属性用于区分主机
+            handler (callable): 在工作线程中执行单个任务的函数
+        """
+        jobs = iter(jobs)
+        condition = threading.Condition()
+        queues = defaultdict(deque)
+        active = defaultdict(int)
+        state = {"queued": 0, "exhausted": False}
+
+        def refill():
+            # 调用方需持有 condition
+            while not state["exhausted"] and state["queued"] < self.max_pending:
+                try:
+                    job = next(jobs)
+                except StopIteration:
+                    state["exhausted"] = True
+                    break
+                queues[urlparse(job[0].url).netloc].append(job)
+                state["queued"] += 1
+
+        def take():
+            # 调用方需持有 condition
+            for host, queue in queues.items():
+                if queue and active[host] < self.per_host:
+                    active[host] += 1
+                    state["queued"] -= 1
+                    return host, queue.popleft()
+            return None, None
+
+        def worker():
+            while True:
+                with condition:
+                    while True:
+                        refill()
+                        host, job = take()
+                        if job is not None:
+                            break
+                        if state["exhausted"] and not state["queued"]:
+                            condition.notify_all()
+                            return
+                        condition.wait()
+
+                try:
+                    handler(job)
+                finally:
+                    with condition:
+                        active[host] -= 1
+                        condition.notify_all()
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(self.max_workers)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
 
-        filename = f"{self.domain}.txt"
-        with open(filename, "a") as file:
-            for result in self.results:
-                line = result['target'] + " " * result['remaining'] + result['info_pure']
-                if result['headers']:
-                    line += f"---Header= {result['headers']}"
-                file.write(line + "\n")
 
 class OptimizedProgram():
     """
     主程序控制类
-    负责协调整个扫描过程，包括多线程处理和资源管理
+    负责协调整个扫描过程，所有请求由一个全局调度器统一执行
 
     Args:
         urllist (list): URL列表
         dirlist (list): 目录路径列表
-        max_workers (int): 最大工作线程数，默认为20
+        max_workers (int): 最大工作线程数，默认为50
+        per_host (int): 单个主机的最大并发请求数，默认为50
+        adaptive (bool): 是否启用自适应裁剪，默认为True
+        sample_size (int): 自适应模式下每个URL用于探测的路径数，默认为3
+        results (dict, optional): URL到结果行列表的映射，由调用方持有时多次运行的结果累积在一起
+        families (dict, optional): URL到已学习的变异类别集合的映射，由调用方持有时同一URL只探测一次
+
+    Attributes:
+        results (dict): URL到结果行列表的映射，交给 pass403_qc 去重输出
+        families (dict): 自适应模式下学习到的URL到有信号的变异类别集合的映射
+        samples (dict): 尚未学习到变异类别的URL到已探测查询对象列表的映射，跨批次累计
     """
 
-    def __init__(self, urllist, dirlist, max_workers=40):
+    def __init__(self, urllist, dirlist, max_workers=50, per_host=50, adaptive=True, sample_size=3,
+                 results=None, families=None, samples=None):
         self.urllist = urllist
         self.dirlist = dirlist
         self.max_workers = max_workers
-        # 创建共享的session池
-        self.session_pool = Queue()
-        for _ in range(min(10, len(urllist))):
-            self.session_pool.put(self._create_optimized_session())
+        self.per_host = per_host
+        self.adaptive = adaptive
+        self.sample_size = sample_size
+        self.results = results if results is not None else {}
+        self.families = families if families is not None else {}
+        self.samples = samples if samples is not None else {}
+        # 所有任务共享同一个session，连接池由各阶段共享
+        self.session = self._create_optimized_session()
+        self.total = len(urllist) * len(dirlist)
+        self.completed = 0
+        self.lock = threading.Lock()
 
     def _create_optimized_session(self):
         """
-        创建优化的HTTP会话
+        创建挂载共享连接池的HTTP会话
+        连接与目录扫描等阶段复用，重试和速率限制由共享传输层统一处理
 
         Returns:
             requests.Session: 配置好的会话对象
         """
-        session = requests.Session()
+        return get_transport().session(headers=DEFAULT_HEADERS)
 
-        retry_strategy = Retry(
-            total=2,
-            backoff_factor=0.1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
+    def iter_jobs(self, pairs, families=None, queries=None):
+        """
+        按需生成URL和路径组合的请求任务
 
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=20,
-            pool_maxsize=100,
-            pool_block=False
-        )
+        Args:
+            pairs (list): (url, dir_path) 组合列表
+            families (dict, optional): URL到变异类别集合的映射，为None时发送全部变异
+            queries (list, optional): 用于收集已创建的查询对象
 
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        Yields:
+            tuple: (query, family, method, path, headers)
+        """
+        for url, dir_path in pairs:
+            dir_obj = OptimizedPathRepository(dir_path)
+            selected = None if families is None else families.get(url, set())
+            query = OptimizedQuery(url, dir_path, dir_obj, session=self.session, families=selected)
 
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': '*/*',
-            'Connection': 'keep-alive'
-        })
+            # 没有需要发送的请求时直接计为完成
+            if not query.pending:
+                with self.lock:
+                    self.completed += 1
+                continue
 
-        return session
+            if queries is not None:
+                queries.append(query)
+            yield from query.jobs()
 
-    def _get_session(self):
+    def process_job(self, job):
         """
-        从会话池中获取会话对象
+        在工作线程中执行单个请求任务
+        某个组合的全部请求完成后立即把结果加入 results
 
-        Returns:
-            requests.Session: 会话对象
+        Args:
+            job (tuple): (query, family, method, path, headers)
         """
+        query, family, method, path, headers = job
+        result = None
         try:
-            return self.session_pool.get_nowait()
-        except:
-            return self._create_optimized_session()
+            result = query.process_path(path, method, headers)
+        except Exception as e:
+            current_time = time.strftime("%H:%M:%S")
+            message = f"[{current_time}] 任务执行出错: {e}"
+            output.error(set_color(message, fore="red"))
+
+        if result:
+            result['family'] = family
+
+        if not query.complete(result):
+            return
+
+        lines = query.lines()
+        with self.lock:
+            if lines:
+                self.results.setdefault(query.url, []).extend(lines)
+            self.completed += 1
+            completed = self.completed
 
-    def _return_session(self, session):
+        if completed % 10 == 0:
+            current_time = time.strftime("%H:%M:%S")
+            message = f"[{current_time}] 进度: {completed}/{self.total} ({completed/self.total*100:.1f}%)"
+            output.new_line(set_color(message, fore="cyan"))
+
+    @staticmethod
+    def learnFamilies(queries):
         """
-        将会话对象归还到会话池
+        根据探测阶段的结果，找出对目标主机有效的变异类别
+        某个类别的任一请求的状态码与原始路径的403基线不同(且不是404等噪声状态码)即视为有信号
 
         Args:
-            session (requests.Session): 要归还的会话对象
+            queries (list): 探测阶段的查询对象
+
+        Returns:
+            dict: URL到有信号的变异类别集合的映射
         """
-        try:
-            self.session_pool.put_nowait(session)
-        except:
-            pass
+        families = {}
+        for query in queries:
+            signals = families.setdefault(query.url, set())
+            baseline = 403
+            for result in query.results:
+                if result.get('family') == BASELINE_FAMILY:
+                    baseline = result['status_code']
+                    break
+
+            for result in query.results:
+                status_code = result['status_code']
+                if status_code != baseline and status_code not in NOISE_STATUS_CODES:
+                    signals.add(result['family'])
 
-    def process_url_dir_combination(self, url, dir_path):
+        return families
+
+    def run(self, pairs, families=None, queries=None):
         """
-        处理单个URL和目录路径的组合
+        使用全局调度器执行一组URL和路径组合
 
         Args:
-            url (str): 目标URL
-            dir_path (str): 目录路径
+            pairs (list): (url, dir_path) 组合列表
+            families (dict, optional): URL到变异类别集合的映射
+            queries (list, optional): 用于收集已创建的查询对象
         """
-        session = self._get_session()
-        try:
-            if dir_path != "/":
-                dir_objname = dir_path.lstrip("/")
-            else:
-                dir_objname = "_rootPath"
-
-            dir_obj = OptimizedPathRepository(dir_path)
-            query = OptimizedQuery(url, dir_path, dir_obj, session=session)
-            query.manipulateRequest()
-            query.writeToFile()
-        finally:
-            self._return_session(session)
+        scheduler = OptimizedScheduler(self.max_workers, self.per_host)
+        scheduler.run(self.iter_jobs(pairs, families, queries), self.process_job)
 
     def initialise(self):
         """
         初始化并启动主程序执行流程
-        使用线程池并发处理所有URL和目录路径的组合
+        所有URL和路径组合的变异请求展开为一个任务流，由全局调度器执行
+
+        自适应模式下先对每个URL的前 sample_size 个路径发送全部变异，
+        剩余路径只发送在探测阶段有信号的变异类别；
+        路径较少的批次探测结果保存在 samples 中，累计满 sample_size 个路径后再学习；
+        已在 families 中的URL不再探测，直接使用之前学习到的类别
         """
         current_time = time.strftime("%H:%M:%S")
         message = f"[{current_time}] 开始处理 {len(self.urllist)} 个URL和 {len(self.dirlist)} 个路径"
         output.new_line(set_color(message, fore="green"))
-        
+
         current_time = time.strftime("%H:%M:%S")
-        message = f"[{current_time}] 使用 {self.max_workers} 个并发工作线程"
+        message = f"[{current_time}] 使用 {self.max_workers} 个并发工作线程，单主机并发上限 {self.per_host}"
         output.new_line(set_color(message, fore="green"))
 
+        if not self.total:
+            return
+
         start_time = time.time()
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
+        if self.adaptive:
+            fresh = [url for url in self.urllist if url not in self.families]
+            sample = []
+            rest = [(url, dir_path) for url in self.urllist if url not in fresh for dir_path in self.dirlist]
+            for url in fresh:
+                # 之前批次已探测过的路径计入样本，只补足剩余的数量
+                needed = max(self.sample_size - len(self.samples.get(url, ())), 0)
+                sample += [(url, dir_path) for dir_path in self.dirlist[:needed]]
+                rest += [(url, dir_path) for dir_path in self.dirlist[needed:]]
+
+            queries = []
+            self.run(sample, queries=queries)
+            for query in queries:
+                self.samples.setdefault(query.url, []).append(query)
+
+            # 样本不足 sample_size 个路径的URL暂不学习，本批路径已全部发送，样本留给后续批次
+            for url in fresh:
+                if len(self.samples.get(url, ())) < self.sample_size:
+                    continue
+                learned = self.learnFamilies(self.samples.pop(url))
+                self.families[url] = learned.get(url, set())
+                signals = sorted(self.families[url])
+                current_time = time.strftime("%H:%M:%S")
+                message = f"[{current_time}] 自适应模式: {url} 有效变异类别 {len(signals)} 个"
+                if signals:
+                    message += f" ({', '.join(signals)})"
+                output.new_line(set_color(message, fore="green"))
 
-            # 为每个URL和路径组合创建任务
-            for url in self.urllist:
-                for dir_path in self.dirlist:
-                    future = executor.submit(self.process_url_dir_combination, url, dir_path)
-                    futures.append(future)
+            self.run(rest, self.families)
+        else:
+            self.run([(url, dir_path) for url in self.urllist for dir_path in self.dirlist])
 
-            # 等待所有任务完成并显示进度
-            completed = 0
-            total = len(futures)
-            
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                    completed += 1
-                    if completed % 10 == 0:
-                        current_time = time.strftime("%H:%M:%S")
-                        message = f"[{current_time}] 进度: {completed}/{total} ({completed/total*100:.1f}%)"
-                        output.new_line(set_color(message, fore="cyan"))
-                except Exception as e:
-                    current_time = time.strftime("%H:%M:%S")
-                    message = f"[{current_time}] 任务执行出错: {e}"
-                    output.error(set_color(message, fore="red"))
-        
         end_time = time.time()
         current_time = time.strftime("%H:%M:%S")
         message = f"[{current_time}] 处理完成! 总耗时: {end_time - start_time:.2f} 秒"
         output.new_line(set_color(message, fore="green"))
-        
+
         current_time = time.strftime("%H:%M:%S")
-        message = f"[{current_time}] 平均每个任务耗时: {(end_time - start_time) / total:.2f} 秒"
+        message = f"[{current_time}] 平均每个任务耗时: {(end_time - start_time) / self.total:.2f} 秒"
         output.new_line(set_color(message, fore="green"))
@@ -2,8 +2,6 @@ import os
 import sys
 import time
 
-from jinja2 import Environment, FileSystemLoader
-
 from lib.reports.base import FileBaseReport
 from lib.utils.common import human_size
 
@@ -25,6 +23,9 @@ class HTMLReport(FileBaseReport):
         Returns:
             str: 渲染后的HTML报告字符串
         """
+        # jinja2 导入较慢，只在输出HTML报告时导入
+        from jinja2 import Environment, FileSystemLoader
+
         # 配置Jinja2模板环境，加载报告模板
         file_loader = FileSystemLoader(
             os.path.dirname(os.path.realpath(__file__)) + "/templates/"
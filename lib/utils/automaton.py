@@ -0,0 +1,106 @@
+from collections import deque
+
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
+
+
+class KeywordAutomaton:
+    """
+    多关键字匹配自动机(Aho-Corasick)
+
+    一次扫描文本即可找出所有出现的关键字。安装了 pyahocorasick 时使用其C实现，
+    否则退回到纯Python实现，两者结果一致。
+
+    参数:
+        keywords (iterable): 关键字列表，关键字的下标即其编号
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+
+        if _ahocorasick:
+            self._automaton = _ahocorasick.Automaton()
+            for index, keyword in enumerate(self.keywords):
+                if keyword:
+                    self._automaton.add_word(keyword, index)
+
+            if len(self._automaton):
+                self._automaton.make_automaton()
+            else:
+                self._automaton = None
+        else:
+            self._build()
+
+    def _build(self):
+        """
+        构建纯Python实现的转移表、失败指针和输出表
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+
+            self._output[state] += (index,)
+
+        # 按层次遍历计算失败指针，并把失败状态的输出合并进来
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] += self._output[fail]
+
+    def search(self, text):
+        """
+        找出文本中出现的所有关键字
+
+        参数:
+            text (str): 待匹配的文本
+
+        返回:
+            set[int]: 出现过的关键字编号
+        """
+        if not text:
+            return set()
+
+        if _ahocorasick:
+            if self._automaton is None:
+                return set()
+            return {index for _, index in self._automaton.iter(text)}
+
+        goto, fail, outputs = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if outputs[state]:
+                found.update(outputs[state])
+
+        return found
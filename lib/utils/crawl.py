@@ -1,6 +1,5 @@
 import re
 
-from bs4 import BeautifulSoup
 from functools import lru_cache
 
 from lib.core.settings import (
@@ -78,6 +77,9 @@ class Crawler:
         :param content: HTML内容（字节串）
         :return: 提取并过滤后的路径集合
         """
+        # bs4 导入较慢，只在启用爬虫时导入
+        from bs4 import BeautifulSoup
+
         results = []
         soup = BeautifulSoup(content, 'html.parser')
 
@@ -1,7 +1,6 @@
-import string
+import re
 
 from colorama import init, Fore, Back, Style
-from pyparsing import Literal, Word, Combine, Optional, Suppress, delimitedList, oneOf
 
 
 # 颜色映射字典，将颜色名称映射到对应的背景颜色代码
@@ -35,14 +34,9 @@ STYLES = {
     "normal": ""
 }
 
-# 定义ANSI转义序列的解析规则，用于匹配和移除颜色代码
+# 定义ANSI转义序列的匹配规则，用于匹配和移除颜色代码: ESC [ 以分号分隔的数字 字母
 # Credit: https://stackoverflow.com/a/2187024/12238982
-_escape_seq = Combine(
-    Literal("\x1b")
-    + "["
-    + Optional(delimitedList(Word(string.digits), ";"))
-    + oneOf(list(string.ascii_letters))
-)
+_escape_seq = re.compile(r"\x1b\[(?:\d+(?:;\d+)*)?[a-zA-Z]")
 
 # 初始化colorama库，使其在Windows系统上也能正常工作
 init()
@@ -90,5 +84,5 @@ def clean_color(msg):
     返回:
         str: 移除了所有颜色和样式代码的纯文本消息
     """
-    return Suppress(_escape_seq).transformString(msg)
+    return _escape_seq.sub("", msg)
 
@@ -1,10 +1,13 @@
+import atexit
 import sys
+import threading
 import time
 import shutil
 
+from collections import deque
+
 from lib.core.data import options
-from lib.core.decorators import locked
-from lib.core.settings import IS_WINDOWS
+from lib.core.settings import IS_WINDOWS, OUTPUT_REFRESH_INTERVAL
 from lib.utils.common import human_size
 from lib.view.colors import set_color, clean_color, disable_color
 
@@ -20,19 +23,39 @@ class Output:
     """
     输出管理类，用于处理控制台输出、状态报告、进度条显示等功能。
 
+    扫描期间的状态行先放入队列，由刷新线程按固定间隔一次性写出并重绘进度条，
+    工作线程不会因为终端输出而互相等待。其他输出立即写出，写出前先清空队列保证顺序。
+
     属性:
         last_in_line (bool): 标记上一次是否使用了行内输出。
-        buffer (str): 存储所有输出内容的缓冲区。
+        history (deque): 最近输出的行，条数上限由 output_history 选项决定。
     """
 
     def __init__(self):
         """初始化输出对象，并根据配置决定是否启用颜色。"""
         self.last_in_line = False
-        self.buffer = ""
+        self._history = None
+        self._lines = []
+        self._progress = None
+        self._progress_source = None
+        self._drawn = None
+        self._bar = None
+        self._lock = threading.Lock()
+        self._renderer = None
 
         if not options["color"]:
             disable_color()
 
+        atexit.register(self.flush)
+
+    @property
+    def history(self):
+        # 全局输出对象在解析选项之前创建，首次使用时再按选项确定容量
+        if self._history is None:
+            self._history = deque(maxlen=options["output_history"])
+
+        return self._history
+
     @staticmethod
     def erase():
         """
@@ -55,7 +78,18 @@ class Output:
             sys.stdout.write("\033[1K")
             sys.stdout.write("\033[0G")
 
-    @locked
+    def _write(self, text):
+        # 调用方持有 self._lock，先写出队列中的状态行
+        if self.last_in_line:
+            self.erase()
+            self.last_in_line = False
+
+        if self._lines:
+            sys.stdout.write("".join(self._lines))
+            self._lines.clear()
+
+        sys.stdout.write(text)
+
     def in_line(self, string):
         """
         行内输出字符串（覆盖当前行）。
@@ -63,39 +97,105 @@ class Output:
         参数:
             string (str): 需要输出到终端的文本。
         """
-        self.erase()
-        sys.stdout.write(string)
-        sys.stdout.flush()
-        self.last_in_line = True
+        with self._lock:
+            self._write("")
+            sys.stdout.write(string)
+            sys.stdout.flush()
+            self.last_in_line = True
+            self._bar = None
 
-    @locked
     def new_line(self, string="", do_save=True):
         """
-        换行输出字符串并保存至缓冲区。
+        换行输出字符串并保存至历史记录。
 
         参数:
             string (str): 需要输出的文本，默认为空字符串。
-            do_save (bool): 是否将输出内容保存进缓冲区，默认为 True。
+            do_save (bool): 是否将输出内容保存进历史记录，默认为 True。
         """
-        if self.last_in_line:
-            self.erase()
-
-        if IS_WINDOWS:
-            sys.stdout.write(string)
+        with self._lock:
+            self._write(string + "\n")
             sys.stdout.flush()
-            sys.stdout.write("\n")
+            self._bar = None
+
+            if do_save:
+                self.history.append(string)
+
+    def queue_line(self, string):
+        """
+        将一行放入队列，由刷新线程与其他排队的行一起写出。
+
+        参数:
+            string (str): 需要输出的文本。
+        """
+        with self._lock:
+            self._lines.append(string + "\n")
+            self.history.append(string)
+
+        self._start_renderer()
+
+    def flush(self):
+        """
+        立即写出队列中的状态行。
+        """
+        with self._lock:
+            if self._lines:
+                self._write("")
+                sys.stdout.flush()
+
+    def set_progress(self, source):
+        """
+        设置进度来源，刷新线程每次刷新时调用它获取 last_path 所需的参数。
+
+        参数:
+            source (callable): 返回 (index, length, current_job, all_jobs, rate, errors) 的函数，
+                为 None 时停止绘制进度条。
+        """
+        self._progress_source = source
+
+        if source:
+            self._start_renderer()
+
+    def render(self):
+        """
+        写出队列中的状态行，进度有变化或进度条被状态行清除时重绘进度条。
+        """
+        source = self._progress_source
+        progress = source() if source else self._progress
+
+        with self._lock:
+            if progress != self._drawn:
+                self._drawn = progress
+                self._bar = self.progress_bar(*progress) if progress and sys.stdout.isatty() else None
+            elif not self._lines:
+                return
+
+            self._write("")
+
+            if self._bar:
+                self.erase()
+                sys.stdout.write(self._bar)
+                self.last_in_line = True
+
             sys.stdout.flush()
 
-        else:
-            sys.stdout.write(string + "\n")
+    def _start_renderer(self):
+        if self._renderer:
+            return
 
-        sys.stdout.flush()
-        self.last_in_line = False
-        sys.stdout.flush()
+        with self._lock:
+            if not self._renderer:
+                self._renderer = threading.Thread(target=self._render_loop, daemon=True)
+                self._renderer.start()
+
+    def _render_loop(self):
+        while True:
+            time.sleep(OUTPUT_REFRESH_INTERVAL)
 
-        if do_save:
-            self.buffer += string
-            self.buffer += "\n"
+            try:
+                self.render()
+            except Exception:
+                # 进度来源在目标切换时可能短暂不可用，下一次刷新重试
+                pass
 
     def status_report(self, response, full_url):
         """
@@ -132,11 +232,11 @@ class Output:
         for redirect in response.history:
             message += f"\n-->  {redirect}"
 
-        self.new_line(message)
+        self.queue_line(message)
 
     def last_path(self, index, length, current_job, all_jobs, rate, errors):
         """
-        显示扫描任务的进度条和相关信息。
+        更新扫描任务的进度，进度条由刷新线程绘制。
 
         参数:
             index (int): 当前已完成的任务数。
@@ -146,6 +246,16 @@ class Output:
             rate (float): 当前扫描速率（每秒请求数）。
             errors (int): 错误计数。
         """
+        self._progress = (index, length, current_job, all_jobs, rate, errors)
+        self._start_renderer()
+
+    def progress_bar(self, index, length, current_job, all_jobs, rate, errors):
+        """
+        生成进度条文本，参数与 last_path 相同。
+
+        返回:
+            str: 进度条，超过终端宽度时返回None
+        """
         percentage = int(index / length * 100)
         task = set_color("#", fore="cyan", style="bright") * int(percentage / 5)
         task += " " * (20 - int(percentage / 5))
@@ -164,9 +274,9 @@ class Output:
 
         # 如果进度条长度超过终端宽度则跳过显示
         if len(clean_color(progress_bar)) >= shutil.get_terminal_size()[0]:
-            return
+            return None
 
-        self.in_line(progress_bar)
+        return progress_bar
 
     def new_directories(self, directories):
         """
@@ -291,6 +401,15 @@ class Output:
         """
         self.new_line(f"\nLog File: {file}")
 
+    def session_file(self, file):
+        """
+        显示会话文件路径。
+
+        参数:
+            file (str): 会话文件路径。
+        """
+        self.new_line(f"\nSession File: {file}")
+
 
 class QuietOutput(Output):
     """
@@ -313,6 +432,10 @@ class QuietOutput(Output):
         """忽略进度条更新。"""
         pass
 
+    def set_progress(*args):
+        """忽略进度来源。"""
+        pass
+
     def new_directories(*args):
         """忽略新目录通知。"""
         pass
@@ -341,6 +464,10 @@ class QuietOutput(Output):
         """忽略日志文件信息。"""
         pass
 
+    def session_file(*args):
+        """忽略会话文件信息。"""
+        pass
+
 
 # 初始化全局输出实例
 output = QuietOutput() if options["quiet"] else Output()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试脚本共用的本地模拟服务
+
+模拟服务在独立进程中运行，避免与客户端争用GIL；处理器记录服务端实际收到的请求数，
+并可按 latency 模拟每个请求的延迟。各脚本继承 BenchHandler 实现自己的响应，
+用 start_server 启动：
+
+    server, port, counter = start_server(FixtureHandler, latency=args.latency)
+    ...
+    server.terminate()
+"""
+
+import multiprocessing
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class BenchHandler(BaseHTTPRequestHandler):
+    """模拟服务处理器的基类，类属性由 serve 在服务进程中设置"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    counter = None
+
+    def count(self):
+        """
+        记录一次请求并读取请求体
+
+        返回:
+            bytes: 请求体，没有时为空
+        """
+        with self.counter.get_lock():
+            self.counter.value += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def delay(self):
+        """模拟服务端处理延迟"""
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reply(self, status, body, content_type=None):
+        """
+        发送响应，HEAD 请求不发送响应体
+
+        参数:
+            status (int): 状态码
+            body (bytes): 响应体
+            content_type (str): Content-Type，为None时不发送
+        """
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler_cls, port, **attrs):
+    """
+    在服务进程中设置处理器的类属性并启动服务，实际监听的端口写回 port
+
+    参数:
+        handler_cls (type): BenchHandler 的子类
+        port (multiprocessing.Value): 监听端口，为0时由系统分配
+        **attrs: 处理器的类属性，如 latency、counter
+    """
+    for name, value in attrs.items():
+        setattr(handler_cls, name, value)
+    server = ThreadingHTTPServer(("127.0.0.1", port.value), handler_cls)
+    server.daemon_threads = True
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def start_server(handler_cls, **attrs):
+    """
+    在独立进程中启动模拟服务，等待端口分配后返回
+
+    参数:
+        handler_cls (type): BenchHandler 的子类
+        **attrs: 处理器的类属性，counter 由本函数创建
+
+    返回:
+        tuple: (服务进程, 端口, 请求计数器)
+    """
+    port = multiprocessing.Value("i", 0)
+    counter = multiprocessing.Value("i", 0)
+    server = multiprocessing.Process(target=serve, args=(handler_cls, port), kwargs=dict(attrs, counter=counter),
+                                     daemon=True)
+    server.start()
+    while not port.value:
+        time.sleep(0.01)
+    return server, port.value, counter
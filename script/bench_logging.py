@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求日志开销基准测试
+
+在独立进程中启动一个本地站点，多个线程通过 Requester 发送请求(与扫描时相同的请求路径)，
+统计以下几种日志配置下的扫描吞吐量，以及工作线程中单次日志调用的耗时：
+  关闭: 未指定 --log
+  旧实现: 工作线程中同步写入 RotatingFileHandler，文本格式
+  info / debug: 工作线程只把日志参数放入队列，由日志线程构造记录并批量写入JSONL文件
+每种配置在独立子进程中运行。
+
+用法:
+    python script/bench_logging.py --requests 20000 --threads 25
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+MODES = (("off", "关闭"), ("legacy", "旧实现"), ("info", "info"), ("debug", "debug"))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b"not found"
+        self.send_response(404)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    sys.stdout.write(f"{server.server_address[1]}\n")
+    sys.stdout.flush()
+    server.serve_forever()
+
+
+def setup_logging(mode, log_file):
+    from lib.connection import requester
+    from lib.core.data import options
+    from lib.core.logger import enable_logging, logger
+
+    if mode == "off":
+        return
+
+    options["log_file"] = log_file
+    if mode == "legacy":
+        logger.disabled = False
+        handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=0)
+        handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+        logger.addHandler(handler)
+
+        # 旧实现在工作线程中格式化消息并同步写入
+        def legacy_log_event(level, msg, *args, exc_info=None, **fields):
+            logger.log(level, msg % args, exc_info=exc_info)
+
+        requester.log_event = legacy_log_event
+    else:
+        options["log_level"] = mode
+        enable_logging()
+
+
+def log_request(mode, i):
+    """与 Requester 中相同的日志调用"""
+    from lib.core.logger import log_event, logger
+
+    if mode == "legacy":
+        logger.info(f'"GET http://127.0.0.1/path{i}" 404 - 9B')
+    else:
+        url = f"http://127.0.0.1/path{i}"
+        log_event(logging.INFO, '"%s %s" %s - %sB%s', "GET", url, 404, 9, "",
+                  event="request", method="GET", url=url, status=404, length=9, redirect="")
+
+
+def child(mode, port, count, threads):
+    import logging.handlers  # noqa: F401
+
+    from lib.connection.requester import Requester
+    from lib.core.data import options
+
+    options["thread_count"] = threads
+    log_file = os.path.join(tempfile.mkdtemp(), "scan.log")
+    setup_logging(mode, log_file)
+
+    requester = Requester()
+    requester.set_url(f"http://127.0.0.1:{port}/")
+    requester.request("warmup")
+
+    def work(offset):
+        for i in range(offset, count, threads):
+            requester.request(f"path{i}")
+            requester.decrease_rate()
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # 工作线程中单次日志调用的耗时(与 Requester 中的调用相同)
+    calls = 20000
+    start = time.perf_counter()
+    for i in range(calls):
+        log_request(mode, i)
+    per_call = (time.perf_counter() - start) / calls
+
+    sys.stdout.write(f"{count / elapsed} {per_call}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="请求日志开销基准测试")
+    parser.add_argument("--requests", type=int, default=20000, help="每种配置发送的请求数")
+    parser.add_argument("--threads", type=int, default=25, help="工作线程数")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "server":
+        serve()
+        return
+    if args.child:
+        child(args.child, args.port, args.requests, args.threads)
+        return
+
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", "server"],
+                              stdout=subprocess.PIPE)
+    try:
+        port = int(server.stdout.readline())
+        print("%-8s %12s %20s" % ("日志", "请求/秒", "单次日志调用(us)"))
+        for mode, label in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, "--port", str(port),
+                 "--requests", str(args.requests), "--threads", str(args.threads)],
+                stdout=subprocess.PIPE, check=True,
+            ).stdout.decode().split()
+            rate, per_call = map(float, output[-2:])
+            print("%-8s %12.0f %20.2f" % (label, rate, per_call * 1e6))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
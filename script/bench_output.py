@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+终端输出CPU开销基准测试
+
+模拟扫描时的终端输出：若干工作线程以固定总速率(默认 5000 次/秒)处理响应，其中一小部分是命中的
+状态行，其余响应只更新进度。分别以两种方式输出，标准输出重定向到文件或伪终端(TTY)：
+  旧实现: 每行在全局锁内写出并多次 flush，输出累积到字符串缓冲区，每个未命中的响应都重绘进度条
+  批量刷新: 状态行排队后由刷新线程按固定间隔一次写出，进度条按相同间隔从进度来源读取并重绘
+每种组合在独立子进程中运行，输出进程消耗的CPU时间和写出的字节数。
+
+用法:
+    python script/bench_output.py --rate 5000 --seconds 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_PATH, '..'))
+
+
+class FakeResponse:
+    """status_report 使用的响应属性"""
+
+    def __init__(self, index):
+        self.status = 200 if index % 3 else 403
+        self.length = 1024 + index
+        self.full_path = f"admin/backup{index}.zip"
+        self.url = "http://example.com/" + self.full_path
+        self.redirect = ""
+        self.history = []
+
+
+def legacy_output():
+    """旧实现：全局锁、字符串缓冲区、每次调用立即写出"""
+    from lib.core.decorators import locked
+    from lib.core.settings import IS_WINDOWS
+    from lib.view.terminal import Output
+
+    class LegacyOutput(Output):
+
+        def __init__(self):
+            super().__init__()
+            self.buffer = ""
+
+        @locked
+        def in_line(self, string):
+            self.erase()
+            sys.stdout.write(string)
+            sys.stdout.flush()
+            self.last_in_line = True
+
+        @locked
+        def new_line(self, string="", do_save=True):
+            if self.last_in_line:
+                self.erase()
+
+            if IS_WINDOWS:
+                sys.stdout.write(string)
+                sys.stdout.flush()
+                sys.stdout.write("\n")
+                sys.stdout.flush()
+            else:
+                sys.stdout.write(string + "\n")
+
+            sys.stdout.flush()
+            self.last_in_line = False
+            sys.stdout.flush()
+
+            if do_save:
+                self.buffer += string
+                self.buffer += "\n"
+
+        def queue_line(self, string):
+            self.new_line(string)
+
+        def last_path(self, *args):
+            progress_bar = self.progress_bar(*args)
+            if progress_bar:
+                self.in_line(progress_bar)
+
+    return LegacyOutput()
+
+
+def worker(output, state, events, offset, step, deadline_per_event, legacy):
+    start = time.perf_counter()
+    for n, index in enumerate(range(offset, events, step)):
+        # 按固定速率发送，落后时不补偿休眠
+        delay = start + n * deadline_per_event - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        state["index"] += 1
+        if index % 50 == 0:
+            output.status_report(FakeResponse(index), False)
+        elif legacy:
+            output.last_path(state["index"], events, 1, 1, state["rate"], 0)
+
+
+def child(mode, rate, seconds, threads):
+    from lib.core.data import options
+    from lib.view import terminal
+
+    options["color"] = True
+    output = legacy_output() if mode == "legacy" else terminal.Output()
+    events = rate * seconds
+    state = {"index": 0, "rate": rate}
+
+    if mode != "legacy":
+        output.set_progress(lambda: (state["index"], events, 1, 1, state["rate"], 0))
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    workers = [
+        threading.Thread(target=worker, args=(output, state, events, i, threads, threads / rate, mode == "legacy"))
+        for i in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    output.set_progress(None)
+    output.flush()
+    sys.stdout.flush()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    sys.stderr.write(f"{cpu} {wall}\n")
+
+
+def run_child(mode, sink, args):
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--rate", str(args.rate),
+               "--seconds", str(args.seconds), "--threads", str(args.threads)]
+    env = dict(os.environ, COLUMNS="200")
+
+    if sink == "file":
+        with open(os.devnull if args.devnull else os.path.join(args.workdir, f"{mode}.out"), "wb") as fd:
+            process = subprocess.run(command, stdout=fd, stderr=subprocess.PIPE, env=env, check=True)
+        written = 0 if args.devnull else os.path.getsize(os.path.join(args.workdir, f"{mode}.out"))
+    else:
+        import pty
+
+        master, slave = pty.openpty()
+        received = []
+
+        def drain():
+            while True:
+                try:
+                    data = os.read(master, 65536)
+                except OSError:
+                    break
+                if not data:
+                    break
+                received.append(len(data))
+
+        reader = threading.Thread(target=drain, daemon=True)
+        reader.start()
+        process = subprocess.run(command, stdout=slave, stderr=subprocess.PIPE, env=env, check=True)
+        os.close(slave)
+        reader.join(2)
+        os.close(master)
+        written = sum(received)
+
+    cpu, wall = map(float, process.stderr.decode().split()[-2:])
+    return cpu, wall, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="终端输出CPU开销基准测试")
+    parser.add_argument("--rate", type=int, default=5000, help="每秒处理的响应数")
+    parser.add_argument("--seconds", type=int, default=5, help="模拟扫描的时长(秒)")
+    parser.add_argument("--threads", type=int, default=25, help="工作线程数")
+    parser.add_argument("--devnull", action="store_true", help="重定向到 /dev/null 而不是临时文件")
+    parser.add_argument("--child", choices=("legacy", "batched"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.rate, args.seconds, args.threads)
+        return
+
+    import shutil
+    import tempfile
+
+    args.workdir = tempfile.mkdtemp()
+    try:
+        print("%-6s %-10s %10s %10s %12s" % ("输出", "实现", "CPU(s)", "耗时(s)", "写出(KB)"))
+        for sink in ("file", "tty"):
+            for mode, label in (("legacy", "旧实现"), ("batched", "批量刷新")):
+                cpu, wall, written = run_child(mode, sink, args)
+                print("%-6s %-10s %10.2f %10.2f %12.1f" % (sink, label, cpu, wall, written / 1024))
+    finally:
+        shutil.rmtree(args.workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Packer-Fuzzer API提取基准测试
+
+对一组JS文件比较两种提取方式：
+  旧实现: apiCollect、getBaseurl、apiViolentCollect 各读取一次文件，每条正则对全文执行一次 re.findall，
+          逐个排除关键字检查，结果以 "路径§§§文件" 字符串存入列表
+  ApiExtractor: 每个文件读取一次，组合锚点正则单次遍历，排除关键字编译为一个正则，
+          结果为 (路径, 文件序号) 集合；可选使用进程池
+两种方式的提取结果会逐项比较，不一致时退出码为1。
+
+--corpus 指定真实JS文件所在目录；未指定时生成包含 axios 调用、接口配置和拼接路径的压缩代码。
+
+用法:
+    python script/bench_packer_apicollect.py --files 40 --size 400
+    python script/bench_packer_apicollect.py --corpus /path/to/js --processes 4
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'Packer-Fuzzer'))
+
+from lib.common.apiExtractor import API_REGXS, BASEURL_REGXS, VIOLENT_REGX, ApiExtractor, extractWorker, initWorker  # noqa: E402
+
+API_EXTS = ('*,+,=,{,},[,],(,),<,>,@,#,",\',@,:,?,!, ,^,\\,（,）,.docx,.xlsx,.jpeg,.jpg,.bmp,.png,.svg,.vue,.js,.doc,'
+            '.ppt,.pptx,.mp3,.png,.doc,.pptx,.xls,.mp4,.gif,.css,.eot,.otf,.ttf,.woff2,.woff')
+
+SNIPPETS = [
+    'function %(f)s(t){return Object(r["a"]).get("/api/%(p)s/list",{params:t})}',
+    'function %(f)s(t){return Object(r["a"]).post("/api/%(p)s/save",t)}',
+    'function %(f)s(e){return t["a"].post("/%(p)s/add",e)}',
+    'function %(f)s(e){return e&&t["a"].get("/%(p)s/tree")}',
+    '%(f)s:function(t){return n.get("/%(p)s/detail?id="+t,{})}',
+    '%(f)s:function(t){return n.post("/%(p)s/update",t)}',
+    'var %(f)s=i+"/%(p)s/export",',
+    '{method:"get",children:[{url:"/%(p)s/menu",icon:"el-icon"}]}',
+    'u.push({path:"/%(p)s",component:function(){return o.e("chunk-%(p)s").then(o.bind(null,"%(p)s"))}})',
+    'e.exports={baseUrl:"/prod-api/",host:"/gateway/",timeout:5e3}',
+    'var %(f)s="/static/img/%(p)s.png",%(f)s2="/%(p)s/upload";',
+    't.prototype.%(f)s=function(){return this.$message.error("请求失败: "+this.%(p)s)}',
+]
+
+
+def build_corpus(directory, files, size, seed=0):
+    rng = random.Random(seed)
+    words = ["user", "order", "goods", "role", "menu", "dept", "dict", "notice", "log", "config", "job", "file"]
+    for i in range(files):
+        parts = []
+        length = 0
+        while length < size * 1024:
+            # 压缩后的代码大多在一行内，偶尔有换行
+            if rng.random() < 0.002:
+                parts.append("\n")
+            snippet = rng.choice(SNIPPETS) % {
+                "f": "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(2)),
+                "p": "%s/%s" % (rng.choice(words), rng.choice(words)),
+            }
+            parts.append(snippet)
+            length += len(snippet) + 1
+        with open(os.path.join(directory, "chunk%03d.js" % i), "w", encoding="utf-8") as f:
+            f.write(";".join(parts))
+
+
+def excluded(path):
+    for apiExt in API_EXTS.split(","):
+        if apiExt in path:
+            return True
+    return False
+
+
+def legacy(paths):
+    """旧实现的三次读取与逐条正则扫描，返回 (耗时, API集合, baseurl集合, 暴力提取集合, 命中数)"""
+    start = time.perf_counter()
+    apiPaths, baseUrls, violentPaths = [], [], []
+    for filePath in paths:
+        with open(filePath, "r", encoding="utf-8", errors="ignore") as f:
+            apiStr = f.read()
+        for regx in API_REGXS:
+            for apiPath in re.findall(regx, apiStr):
+                if apiPath != '' and '/' in apiPath:
+                    if not excluded(apiPath):
+                        apiPaths.append(apiPath.split("?")[0] + "§§§" + filePath)
+                    else:
+                        for twice in API_REGXS:
+                            for twicePath in re.findall(twice, apiPath):
+                                if twicePath != '' and '/' in twicePath and not excluded(twicePath):
+                                    apiPaths.append(twicePath + "§§§" + filePath)
+        with open(filePath, "r", encoding="utf-8", errors="ignore") as f:
+            baseUrlStr = f.read()
+        for regx in BASEURL_REGXS:
+            for baseurlPath in re.findall(regx, baseUrlStr):
+                if baseurlPath != '' and '/' in baseurlPath and baseurlPath != "/" and 3 < len(baseurlPath) < 20 \
+                        and not excluded(baseurlPath):
+                    if baseurlPath[0] == "/":
+                        baseurlPath = baseurlPath[1:]
+                    baseUrls.append(baseurlPath.split("?")[0])
+        with open(filePath, "r", encoding="utf-8", errors="ignore") as f:
+            violentStr = f.read()
+        for apiPath in re.findall(VIOLENT_REGX, violentStr):
+            if apiPath != '' and '/' in apiPath and apiPath != "/" and not excluded(apiPath):
+                violentPaths.append(apiPath.split("?")[0] + "§§§" + filePath)
+    hits = len(apiPaths)
+    apis = set(tuple(item.split("§§§")) for item in set(apiPaths))
+    violent = set(tuple(item.split("§§§")) for item in set(violentPaths))
+    return time.perf_counter() - start, apis, set(baseUrls), violent, hits
+
+
+def current(paths, processes):
+    start = time.perf_counter()
+    apis, baseUrls, violent = set(), set(), set()
+    hits = 0
+    if processes > 1:
+        with ProcessPoolExecutor(processes, initializer=initWorker, initargs=(API_EXTS, True)) as pool:
+            chunksize = max(1, len(paths) // (processes * 4))
+            results = [result for result, error in pool.map(extractWorker, paths, chunksize=chunksize)]
+    else:
+        extractor = ApiExtractor(API_EXTS)
+        results = [extractor.extractFile(path) for path in paths]
+    for path, (apiPaths, fileBaseUrls, violentPaths, fileHits) in zip(paths, results):
+        apis.update((apiPath, path) for apiPath in apiPaths)
+        baseUrls.update(fileBaseUrls)
+        violent.update((apiPath, path) for apiPath in violentPaths)
+        hits += fileHits
+    return time.perf_counter() - start, apis, baseUrls, violent, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packer-Fuzzer API提取基准测试")
+    parser.add_argument("--corpus", help="真实JS文件所在目录")
+    parser.add_argument("--files", type=int, default=40, help="生成的JS文件数量")
+    parser.add_argument("--size", type=int, default=400, help="每个生成文件的大小(KB)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="进程池大小")
+    args = parser.parse_args()
+
+    workdir = None
+    if args.corpus:
+        directory = args.corpus
+    else:
+        workdir = directory = tempfile.mkdtemp()
+        build_corpus(directory, args.files, args.size)
+
+    try:
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".js"))
+        megabytes = sum(os.path.getsize(path) for path in paths) / 1024 / 1024
+        print("文件: %d, 共 %.1f MB" % (len(paths), megabytes))
+
+        runs = [("旧实现",) + legacy(paths), ("单进程",) + current(paths, 1)]
+        if args.processes > 1:
+            runs.append(("%d进程" % args.processes,) + current(paths, args.processes))
+
+        print("%-10s %8s %8s %8s %8s %10s %10s" % ("实现", "API", "baseurl", "暴力提取", "命中数", "耗时(s)", "MB/s"))
+        for label, elapsed, apis, baseUrls, violent, hits in runs:
+            print("%-10s %8d %8d %8d %8d %10.3f %10.1f" % (label, len(apis), len(baseUrls), len(violent), hits,
+                                                          elapsed, megabytes / elapsed))
+        expected = runs[0][2:]
+        mismatched = [label for label, elapsed, *result in runs[1:] if tuple(result) != expected]
+        if mismatched:
+            print("提取结果与旧实现不一致: %s" % ", ".join(mismatched))
+            sys.exit(1)
+        print("提取结果与旧实现一致")
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
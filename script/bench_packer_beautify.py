@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Packer-Fuzzer JS美化基准测试
+
+对一组JS文件比较两种美化方式：
+  旧实现: 整个文件按分号分割后逐字符追加到列表中插入缩进，文件逐个处理
+  流式实现: beautifyFile 按块读取，只在 { } ; 处插入换行与缩进；多个文件可在进程池中并行
+两种方式的输出逐字节比较，不一致时退出码为1。
+
+--corpus 指定真实打包文件所在目录(文件会被复制后处理，原文件不变)；
+未指定时生成压缩后的webpack风格代码。
+
+用法:
+    python script/bench_packer_beautify.py --files 12 --size 2048
+    python script/bench_packer_beautify.py --corpus /path/to/js --processes 4
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'Packer-Fuzzer'))
+
+from lib.common.beautyJS import beautifyFile  # noqa: E402
+
+SNIPPETS = [
+    'function %(f)s(t){return Object(r["a"])({url:"/api/%(p)s",method:"get",params:t})}',
+    '%(f)s:function(t){var e=this;this.$http.post("/%(p)s",t).then(function(t){e.list=t.data.rows,e.total=t.data.total})}',
+    'n.d(e,"a",function(){return %(f)s});var %(f)s={name:"%(p)s",data:function(){return{loading:!1,form:{}}}}',
+    'for(var %(f)s=0;%(f)s<t.length;%(f)s++)if(t[%(f)s].id===e){t.splice(%(f)s,1);break}',
+    '/*! 版权声明 %(p)s */var %(f)s="中文提示：请求失败";',
+]
+
+
+def build_corpus(directory, files, size, seed=0):
+    rng = random.Random(seed)
+    words = ["user", "order", "goods", "role", "menu", "dept", "dict", "notice"]
+    for i in range(files):
+        parts = []
+        length = 0
+        while length < size * 1024:
+            snippet = rng.choice(SNIPPETS) % {
+                "f": "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(2)),
+                "p": "%s/%s" % (rng.choice(words), rng.choice(words)),
+            }
+            parts.append(snippet)
+            length += len(snippet.encode("utf-8")) + 1
+        with open(os.path.join(directory, "bundle%03d.js" % i), "w", encoding="utf-8") as f:
+            f.write(";".join(parts))
+
+
+def legacy_beautify(filePath):
+    """旧实现 BeautyJs.beauty_js"""
+    lines = open(filePath, encoding="utf-8", errors="ignore").read().split(";")
+    indent = 0
+    formatted = []
+    for line in lines:
+        newline = []
+        for char in line:
+            newline.append(char)
+            if char == '{':
+                indent += 1
+                newline.append("\n")
+                newline.append("\t" * indent)
+            if char == "}":
+                indent -= 1
+                newline.append("\n")
+                newline.append("\t" * indent)
+        formatted.append("\t" * indent + "".join(newline))
+    open(filePath, "w", encoding="utf-8", errors="ignore").writelines(";\n".join(formatted))
+
+
+def copy_corpus(paths, directory):
+    os.makedirs(directory)
+    copies = []
+    for path in paths:
+        copy = os.path.join(directory, os.path.basename(path))
+        shutil.copyfile(path, copy)
+        copies.append(copy)
+    return copies
+
+
+def timed(func, paths, processes=1):
+    start = time.perf_counter()
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as pool:
+            list(pool.map(func, paths))
+    else:
+        for path in paths:
+            func(path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packer-Fuzzer JS美化基准测试")
+    parser.add_argument("--corpus", help="真实打包文件所在目录")
+    parser.add_argument("--files", type=int, default=12, help="生成的文件数量")
+    parser.add_argument("--size", type=int, default=2048, help="每个生成文件的大小(KB)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="进程池大小")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        if args.corpus:
+            directory = args.corpus
+        else:
+            directory = os.path.join(workdir, "corpus")
+            os.makedirs(directory)
+            build_corpus(directory, args.files, args.size)
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".js"))
+        megabytes = sum(os.path.getsize(path) for path in paths) / 1024 / 1024
+        print("文件: %d, 共 %.1f MB" % (len(paths), megabytes))
+
+        expected = copy_corpus(paths, os.path.join(workdir, "legacy"))
+        runs = [("旧实现", timed(legacy_beautify, expected), expected)]
+        copies = copy_corpus(paths, os.path.join(workdir, "stream"))
+        runs.append(("流式", timed(beautifyFile, copies), copies))
+        if args.processes > 1:
+            copies = copy_corpus(paths, os.path.join(workdir, "pool"))
+            runs.append(("%d进程" % args.processes, timed(beautifyFile, copies, args.processes), copies))
+
+        print("%-10s %10s %10s" % ("实现", "耗时(s)", "MB/s"))
+        for label, elapsed, files in runs:
+            print("%-10s %10.3f %10.1f" % (label, elapsed, megabytes / elapsed))
+
+        mismatched = []
+        for label, elapsed, files in runs[1:]:
+            for want, got in zip(expected, files):
+                with open(want, "rb") as f1, open(got, "rb") as f2:
+                    if f1.read() != f2.read():
+                        mismatched.append("%s: %s" % (label, os.path.basename(got)))
+        if mismatched:
+            print("输出与旧实现不一致: %s" % ", ".join(mismatched))
+            sys.exit(1)
+        print("输出与旧实现一致")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Packer-Fuzzer 代码分割恢复基准测试
+
+对一组 webpack 运行时文件比较两种恢复方式：
+  旧实现: readlines 后 str(list) 再匹配，每个表达式新建一个 deno_vm，每个chunk调用两次
+  ChunkMap: 直接读取文本匹配，静态求值映射表，结果按表达式缓存
+未安装 deno_vm/deno 时只统计旧实现的读取与匹配耗时。
+
+--corpus 指定真实运行时文件所在目录(如从目标站点保存的 runtime/app/manifest 文件)；
+未指定时生成 vue-cli(webpack4) 与 create-react-app(webpack5) 形式的运行时文件，
+其中部分文件内容相同，模拟多个入口包含同一份运行时的情况。
+
+用法:
+    python script/bench_packer_chunkmap.py --files 60 --chunks 400
+    python script/bench_packer_chunkmap.py --corpus /path/to/runtime-js
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'Packer-Fuzzer'))
+
+from lib.common.chunkMap import ChunkMap  # noqa: E402
+
+WEBPACK4_RUNTIME = (
+    '!function(e){function t(t){for(var n,a,i=t[0],c=t[1],l=t[2],f=0,s=[];f<i.length;f++)a=i[f],'
+    'Object.prototype.hasOwnProperty.call(o,a)&&o[a]&&s.push(o[a][0]),o[a]=0;}var r={},o={app:0};'
+    'function c(e){return l.p+"js/"+(%s[e]||e)+"."+%s[e]+".js"}'
+    'function l(t){if(r[t])return r[t].exports;var n=r[t]={i:t,l:!1,exports:{}};return e[t].call(n.exports,n,n.exports,l),n.l=!0,n.exports}'
+    'l.e=function(e){var t=[],n=o[e];if(0!==n)if(n)t.push(n[2]);else{var a=new Promise((function(t,r){n=o[e]=[t,r]}));'
+    't.push(n[2]=a);var u,i=document.createElement("script");i.charset="utf-8",i.timeout=120,l.nc&&i.setAttribute("nonce",l.nc),'
+    'i.src=c(e);}return Promise.all(t)},l.p="/";%s}([]);'
+)
+
+WEBPACK5_RUNTIME = (
+    '(()=>{"use strict";var e,r,t,o={},n={};function a(e){var r=n[e];if(void 0!==r)return r.exports;'
+    'var t=n[e]={exports:{}};return o[e].call(t.exports,t,t.exports,a),t.exports}a.m=o,'
+    'a.u=e=>"static/js/"+e+"."+%s[e]+".chunk.js",a.miniCssF=e=>"static/css/"+e+"."+%s[e]+".chunk.css",'
+    'a.o=(e,r)=>Object.prototype.hasOwnProperty.call(e,r),a.p="/";%s})();'
+)
+
+
+def js_object(mapping, rng):
+    items = []
+    for key, value in mapping.items():
+        key = key if key.isdigit() or rng.random() < 0.5 and re.match(r"^[A-Za-z_]\w*$", key) else '"%s"' % key
+        items.append('%s:"%s"' % (key, value))
+    return "{" + ",".join(items) + "}"
+
+
+def build_corpus(directory, files, chunks, seed=0):
+    """生成运行时文件，约三分之一的文件与其他文件内容相同"""
+    rng = random.Random(seed)
+    filler = "var _=function(){return %s};" % "+".join(str(i) for i in range(2000))
+    unique = max(1, files * 2 // 3)
+    sources = []
+    for i in range(unique):
+        ids = ["chunk-%08x" % rng.getrandbits(32) if rng.random() < 0.5 else str(rng.randrange(10000))
+               for _ in range(chunks)]
+        hashes = {chunk_id: "%08x" % rng.getrandbits(32) for chunk_id in ids}
+        if i % 2 == 0:
+            names = {chunk_id: chunk_id for chunk_id in ids[:chunks // 4] if not chunk_id.isdigit()}
+            source = WEBPACK4_RUNTIME % (js_object(names, rng), js_object(hashes, rng), filler)
+        else:
+            source = WEBPACK5_RUNTIME % (js_object(hashes, rng), js_object(hashes, rng), filler)
+        sources.append(source)
+    for i in range(files):
+        with open(os.path.join(directory, "runtime%03d.js" % i), "w", encoding="utf-8") as f:
+            f.write(sources[i % unique])
+
+
+def legacy(paths):
+    """旧实现，返回 (耗时, 表达式数, 文件名数, 是否包含VM求值)"""
+    try:
+        import deno_vm
+        deno_vm.eval("1")
+    except Exception:
+        deno_vm = None
+
+    start = time.perf_counter()
+    expressions = file_names = 0
+    for path in paths:
+        with open(path, "r", encoding="UTF-8", errors="ignore") as f:
+            text = str(f.readlines())
+        if "document.createElement(\"script\");" not in text:
+            continue
+        for jsCode in re.compile(r"\w\.p\+\"(.*?)\.js", re.DOTALL).findall(text):
+            if len(jsCode) >= 30000:
+                continue
+            expressions += 1
+            if deno_vm is None:
+                continue
+            jsCode = "\"" + jsCode + ".js\""
+            variable = re.findall(r'\[.*?\]', jsCode)[0].replace("[", "").replace("]", "")
+            func = "function js_compile(%s){js_url=" % variable + jsCode + "\nreturn js_url}"
+            flag = re.compile(r"\(\{\}\[(.*?)\]\|\|.\)", re.DOTALL).findall(func)
+            if flag:
+                func = func.replace("({}[%s]||%s)" % (flag[0], flag[0]), flag[0])
+            names = set(re.findall(r"\{(.*?)\:", jsCode) + re.findall(r"\,(.*?)\:", jsCode))
+            with deno_vm.VM() as vm:
+                vm.run(func)
+                for name in names:
+                    name = name.replace("\"", "")
+                    if "undefined" not in vm.call("js_compile", name):
+                        vm.call("js_compile", name)
+                        file_names += 1
+    return time.perf_counter() - start, expressions, file_names, deno_vm is not None
+
+
+def current(paths):
+    start = time.perf_counter()
+    expressions = file_names = 0
+    for path in paths:
+        with open(path, "r", encoding="UTF-8", errors="ignore") as f:
+            text = f.read()
+        for jsCode, variable in ChunkMap.findExpressions(text):
+            expressions += 1
+            file_names += len(ChunkMap.resolve(jsCode, variable))
+    return time.perf_counter() - start, expressions, file_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packer-Fuzzer 代码分割恢复基准测试")
+    parser.add_argument("--corpus", help="真实运行时文件所在目录")
+    parser.add_argument("--files", type=int, default=60, help="生成的运行时文件数量")
+    parser.add_argument("--chunks", type=int, default=400, help="每个运行时文件中的chunk数量")
+    args = parser.parse_args()
+
+    workdir = None
+    if args.corpus:
+        directory = args.corpus
+    else:
+        workdir = directory = tempfile.mkdtemp()
+        build_corpus(directory, args.files, args.chunks)
+
+    try:
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".js"))
+        size = sum(os.path.getsize(path) for path in paths)
+        distinct = len(set(hashlib.sha1(open(path, "rb").read()).hexdigest() for path in paths))
+        print("文件: %d (不同内容 %d), 共 %.1f MB" % (len(paths), distinct, size / 1024 / 1024))
+
+        legacy_time, legacy_exprs, legacy_names, with_vm = legacy(paths)
+        current_time, current_exprs, current_names = current(paths)
+
+        print("%-10s %10s %10s %10s" % ("实现", "表达式", "文件名", "耗时(s)"))
+        print("%-10s %10d %10s %10.3f%s" % ("旧实现", legacy_exprs, legacy_names if with_vm else "-", legacy_time,
+                                          "" if with_vm else "  (未安装deno_vm，仅读取与匹配)"))
+        print("%-10s %10d %10d %10.3f" % ("ChunkMap", current_exprs, current_names, current_time))
+        print("ChunkMap 求值: 静态 %(static)d, deno_vm %(vm)d, 缓存命中 %(cached)d" % ChunkMap.stats)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
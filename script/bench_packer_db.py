@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Packer-Fuzzer 项目数据库基准测试
+
+在临时目录中模拟一次扫描的数据库读写过程：登记JS文件、记录提取出的API(含重复)、
+写入探测状态、读取有效路径、写入响应内容。比较每次操作都重新打开连接并拼接SQL的旧实现
+与 DatabaseType 复用连接、批量写入的实现。
+
+用法:
+    python script/bench_packer_db.py --apis 5000 --js 50
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from html import escape
+
+PACKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'Packer-Fuzzer')
+URL = "http://bench.local/"
+
+
+class LegacyStore:
+    """与改造前 DatabaseType 相同的访问方式：每次调用都重新查询主库并打开项目库"""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def project_path(self):
+        conn = sqlite3.connect(os.getcwd() + os.sep + "main.db")
+        row = conn.execute("select host from project where tag = '" + self.tag + "'").fetchone()
+        conn.close()
+        return "tmp" + os.sep + self.tag + "_" + row[0] + os.sep
+
+    def connect(self):
+        conn = sqlite3.connect(self.project_path() + self.tag + ".db")
+        conn.isolation_level = None
+        return conn
+
+    def record_apis(self, records):
+        for js_path, api_path in records:
+            conn = self.connect()
+            row = conn.execute("select path from api_tree where path = \"" + api_path + "\"").fetchone()
+            conn.close()
+            if row is None:
+                js_conn = self.connect()
+                js_id = js_conn.execute(
+                    "select id from js_file where local = '" + js_path.split(os.sep)[-1] + "'").fetchone()[0]
+                js_conn.close()
+                conn = self.connect()
+                conn.execute("insert into api_tree(path,name,from_js) values(\"" + api_path + "\",\"" +
+                             api_path.split("/")[-1] + "\"," + str(js_id) + ")")
+                conn.close()
+
+    def mark_results(self, codes):
+        conn = self.connect()
+        for path, suc in codes.items():
+            conn.execute("UPDATE api_tree SET success=" + str(suc) + " WHERE path=\"" + path + '\"')
+        conn.close()
+
+    def all_paths(self):
+        conn = self.connect()
+        rows = conn.execute("select path from api_tree where success=1 or success=2").fetchall()
+        conn.close()
+        return ["".join(row) for row in rows]
+
+    def insert_texts(self, texts):
+        conn = self.connect()
+        for url, text in texts.items():
+            conn.execute("UPDATE api_tree SET result=\'" + escape(text) + "\' WHERE path=\"" + url + '\"')
+        conn.close()
+
+
+class PooledStore:
+    """当前的 DatabaseType"""
+
+    def __init__(self, tag):
+        from lib.Database import DatabaseType
+        self.db = DatabaseType(tag)
+
+    def record_apis(self, records):
+        self.db.apiRecordManyToDB(records)
+
+    def mark_results(self, codes):
+        self.db.insertResultFrom(codes)
+
+    def all_paths(self):
+        return self.db.allPathFromDB()
+
+    def insert_texts(self, texts):
+        self.db.insertTextFromDB(texts)
+
+
+def build_fixture(count, js_count, seed=0):
+    """生成API记录(约两成重复)、探测状态和响应内容"""
+    rng = random.Random(seed)
+    js_files = ["tmp%03d.chunk-%d.js" % (i, i) for i in range(js_count)]
+    apis = ["/api/v%d/module%d/action%d" % (i % 3 + 1, i // 20, i) for i in range(count)]
+    records = [(os.path.join("tmp", rng.choice(js_files)), rng.choice(apis) if rng.random() < 0.2 else api)
+               for api in apis]
+    codes = {api: rng.choice((0, 1, 1, 2)) for api in apis}
+    texts = {api: '{"code": 0, "msg": "ok", "data": [%d]}' % i for i, api in enumerate(apis) if codes[api]}
+    return js_files, records, codes, texts
+
+
+def create_project(tag, js_files):
+    from lib.Database import DatabaseType
+    DatabaseType(tag).createDatabase()
+    DatabaseType(tag).createProjectDatabase(URL, 1, "")
+    conn = sqlite3.connect(DatabaseType(tag).getPathfromDB() + tag + ".db")
+    conn.executemany("insert into js_file(name,path,local,success) values(?,?,?,1)",
+                     [(name.split(".", 1)[1], URL + name, name) for name in js_files])
+    conn.commit()
+    conn.close()
+
+
+def run(store, records, codes, texts):
+    timings = []
+    for name, action in (
+        ("记录API", lambda: store.record_apis(records)),
+        ("写入探测状态", lambda: store.mark_results(codes)),
+        ("读取有效路径", store.all_paths),
+        ("写入响应内容", lambda: store.insert_texts(texts)),
+    ):
+        start = time.perf_counter()
+        action()
+        timings.append((name, time.perf_counter() - start))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packer-Fuzzer 项目数据库基准测试")
+    parser.add_argument("--apis", type=int, default=5000, help="API数量")
+    parser.add_argument("--js", type=int, default=50, help="JS文件数量")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    shutil.copy(os.path.join(PACKER_PATH, "config.ini"), workdir)
+    os.makedirs(os.path.join(workdir, "logs"))
+    os.chdir(workdir)
+    # Packer-Fuzzer 的模块在导入时会解析命令行，并以工作目录读取配置
+    sys.argv = [sys.argv[0], "-u", URL, "-s", "bench"]
+    sys.path.insert(0, os.path.abspath(PACKER_PATH))
+
+    js_files, records, codes, texts = build_fixture(args.apis, args.js)
+    print("API记录: %d, 去重后: %d, JS文件: %d" % (len(records), len(set(api for _, api in records)), len(js_files)))
+
+    try:
+        results = {}
+        for label, tag, factory in (("旧实现", "legacy", LegacyStore), ("DatabaseType", "pooled", PooledStore)):
+            create_project(tag, js_files)
+            results[label] = run(factory(tag), records, codes, texts)
+
+        print("%-12s %12s %14s %8s" % ("阶段", "旧实现(s)", "DatabaseType(s)", "加速"))
+        for (name, legacy), (_, pooled) in zip(results["旧实现"], results["DatabaseType"]):
+            print("%-12s %12.3f %14.3f %7.1fx" % (name, legacy, pooled, legacy / max(pooled, 1e-9)))
+        legacy_total = sum(seconds for _, seconds in results["旧实现"])
+        pooled_total = sum(seconds for _, seconds in results["DatabaseType"])
+        print("%-12s %12.3f %14.3f %7.1fx" % ("合计", legacy_total, pooled_total, legacy_total / pooled_total))
+    finally:
+        os.chdir(os.path.dirname(workdir))
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Packer-Fuzzer 行为差异分析基准测试
+
+在独立进程中启动一个模拟站点：/api 与 /admin 开头的路径返回JSON，对路径遍历变体和 curl 返回WAF拦截页面，
+其余路径统一返回404页面。对 Controller 中的关键路径分别以三种方式运行 BehavioralDiffEngine：
+  旧实现: 逐个串行发送变体，每个请求新建会话，随机User-Agent
+  并发: 共用 ProbeClient 连接池并发发送变体
+  并发+提前结束: 前 uniformAfter 个变体响应完全一致时不再发送其余变体
+输出每个路径的平均耗时、服务端收到的请求数以及发现差异的路径数。
+
+用法:
+    python script/bench_packer_diff.py --latency 0.02
+"""
+
+import argparse
+import copy
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_common import BenchHandler, start_server
+
+PACKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'Packer-Fuzzer')
+
+KEY_PATHS = [
+    "/api", "/admin", "/login", "/register", "/upload",
+    "/user", "/users", "/profile", "/settings", "/dashboard",
+    "/config", "/admin/config", "/admin/settings", "/admin/users",
+    "/api/v1", "/api/v2", "/v1/api", "/v2/api",
+    "/auth", "/authentication", "/oauth", "/sso",
+    "/backup", "/backups", "/debug", "/logs",
+    "/test", "/testing", "/dev", "/development"
+]
+
+
+class FixtureHandler(BenchHandler):
+
+    def _reply(self):
+        self.count()
+        self.delay()
+
+        path = self.path.split("?")[0]
+        if "%2e" in path.lower() or ".." in path or "curl" in self.headers.get("User-Agent", ""):
+            status, body = 403, b"<html>Request blocked by WAF</html>"
+        elif path.startswith(("/api", "/admin")):
+            status, body = 200, b'{"code":0,"data":[1,2,3],"path":"%s"}' % path.encode()
+        else:
+            status, body = 404, b"<html><body>404 Not Found</body></html>"
+        self.reply(status, body, "text/html")
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = do_PATCH = _reply
+
+    def date_time_string(self, timestamp=None):
+        # 固定Date头，避免秒数变化造成与站点行为无关的响应头差异
+        return "Thu, 01 Jan 2026 00:00:00 GMT"
+
+
+def legacy_engine(url, options):
+    """旧实现：串行发送，每个请求新建会话并随机选择User-Agent"""
+    import requests
+    from lib.BehavioralDiffEngine import BehavioralDiffEngine
+
+    class LegacyEngine(BehavioralDiffEngine):
+
+        def send_request(self, url, method="GET", headers=None, params=None):
+            headers = headers or {}
+            params = params or {}
+            headers.setdefault('User-Agent', random.choice(self.UserAgent))
+            headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+            headers.setdefault('Accept', 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8')
+            key, value = self.options.head.split(':', 1)
+            headers[key.strip()] = value.strip()
+            s = requests.Session()
+            s.keep_alive = False
+            try:
+                if method.upper() in ("POST", "PUT", "PATCH"):
+                    response = s.request(method, url, headers=headers, data=params, timeout=6)
+                else:
+                    response = s.request(method, url, headers=headers, params=params, timeout=6)
+                content = response.text
+                return {'status_code': response.status_code, 'headers': dict(response.headers), 'content': content,
+                        'content_length': len(content), 'url': url, 'method': method}
+            except Exception as e:
+                return {'error': str(e), 'url': url, 'method': method}
+
+    engine = LegacyEngine(url, options=options)
+    engine.threads = 1
+    engine.uniform_after = 0
+    return engine
+
+
+def run(engine, counter):
+    from lib.common.probeClient import ProbeClient
+    ProbeClient.resetMemo()
+    with counter.get_lock():
+        counter.value = 0
+    found = 0
+    start = time.perf_counter()
+    for path in KEY_PATHS:
+        result = engine.send_requests_and_analyze(path)
+        if any(issue['type'] == 'waf_bypass' for issue in result['potential_issues']) or \
+                any(diff['type'] == 'status_code' for diff in result['differences']):
+            found += 1
+    return (time.perf_counter() - start) / len(KEY_PATHS), counter.value, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packer-Fuzzer 行为差异分析基准测试")
+    parser.add_argument("--latency", type=float, default=0.02, help="服务端每个请求的模拟延迟(秒)")
+    args = parser.parse_args()
+
+    server, port, counter = start_server(FixtureHandler, latency=args.latency)
+    url = "http://127.0.0.1:%d" % port
+
+    workdir = tempfile.mkdtemp()
+    shutil.copy(os.path.join(PACKER_PATH, "config.ini"), workdir)
+    shutil.copytree(os.path.join(PACKER_PATH, "doc"), os.path.join(workdir, "doc"))
+    os.makedirs(os.path.join(workdir, "logs"))
+    os.chdir(workdir)
+    # Packer-Fuzzer 的模块在导入时会解析命令行，并以工作目录读取配置
+    sys.argv = [sys.argv[0], "-u", url, "-s", "bench"]
+    sys.path.insert(0, os.path.abspath(PACKER_PATH))
+
+    try:
+        from lib.common.cmdline import CommandLines
+        from lib.BehavioralDiffEngine import BehavioralDiffEngine
+        options = CommandLines().cmd()
+
+        concurrent = BehavioralDiffEngine(url, options=options)
+        uniform_after = concurrent.uniform_after
+        concurrent.uniform_after = 0
+        early = copy.copy(concurrent)
+        early.uniform_after = uniform_after
+
+        print("%-16s %14s %10s %12s" % ("实现", "每路径耗时(s)", "请求数", "发现差异路径"))
+        for label, engine in (("旧实现", legacy_engine(url, options)), ("并发", concurrent),
+                              ("并发+提前结束", early)):
+            per_path, sent, found = run(engine, counter)
+            print("%-16s %14.3f %10d %12d" % (label, per_path, sent, found))
+    finally:
+        server.terminate()
+        os.chdir(os.path.dirname(workdir))
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Packer-Fuzzer 参数污染检测基准测试
+
+在独立进程中启动一个模拟站点：/api 与 /admin 开头的路径按查询字符串中最后一个 id 返回JSON，
+出现重复 id 时附加一段调试信息，其余路径返回404页面。对 Controller 中的关键路径分别以两种方式
+运行 ParameterPollutionDetector：
+  旧实现: 逐个串行发送变体，每个请求新建会话，每类变体各自重新请求一次原始参数作为基线
+  并发: 每个 (路径, 方法) 只请求一次基线，各类变体共用 ProbeClient 连接池并发发送
+输出每个路径的平均耗时、服务端收到的请求数以及发现问题的路径数。
+旧实现的GET请求在没有重复参数时不携带参数，因此两者发现的问题数可能不同。
+
+用法:
+    python script/bench_packer_pollution.py --latency 0.02
+"""
+
+import argparse
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from urllib.parse import parse_qsl, urlsplit
+
+from bench_common import BenchHandler, start_server
+
+PACKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'Packer-Fuzzer')
+
+KEY_PATHS = [
+    "/api", "/login", "/user", "/profile", "/admin",
+    "/api/v1", "/api/v2", "/v1/api", "/v2/api"
+]
+
+TEST_PARAMS = {"id": "1", "user": "test", "action": "view"}
+
+
+class FixtureHandler(BenchHandler):
+
+    def _reply(self):
+        self.count()
+        self.delay()
+
+        parts = urlsplit(self.path)
+        ids = [value for key, value in parse_qsl(parts.query) if key == "id"]
+        if parts.path.startswith(("/api", "/admin")):
+            status = 200
+            body = b'{"code":0,"id":"%s"}' % (ids[-1] if ids else "").encode()
+            if len(ids) > 1:
+                body += b" " + b"debug: duplicate id resolved to last value " * 4
+        else:
+            status, body = 404, b"<html><body>404 Not Found</body></html>"
+        self.reply(status, body, "text/html")
+
+    do_GET = do_POST = _reply
+
+
+def legacy_detector(url, options):
+    """旧实现：串行发送，每个请求新建会话，各类变体都包含一次原始参数"""
+    import requests
+    import urllib.parse
+    from lib.ParameterPollutionDetector import ParameterPollutionDetector
+
+    class LegacyDetector(ParameterPollutionDetector):
+
+        def send_request(self, url, method="GET", headers=None, params=None):
+            headers = dict(headers or {}, **{'User-Agent': self.user_agent})
+            repeats = []
+            for key, value in (params or {}).items():
+                for marker in ("_hpp_repeat_", "_form_repeat_", "_array_repeat_"):
+                    if key.startswith(marker):
+                        repeats.append((key[len(marker):], value))
+            if repeats:
+                pairs = [(k, v) for k, v in params.items() if not k.startswith("_")] + repeats
+                url = url + "?" + "&".join("%s=%s" % (urllib.parse.quote(str(k)), urllib.parse.quote(str(v)))
+                                           for k, v in pairs)
+            s = requests.Session()
+            s.keep_alive = False
+            try:
+                response = s.get(url, headers=headers, timeout=6)
+                content = response.text
+                return {'status_code': response.status_code, 'content': content, 'content_length': len(content),
+                        'digest': content, 'privileged': False, 'url': url, 'method': method}
+            except Exception as e:
+                return {'error': str(e), 'url': url, 'method': method}
+
+        def baseline(self, path, params, method="GET"):
+            return self.send_variant(path, method, "baseline", params)
+
+        def iter_variants(self, path, params):
+            # 每类变体各自重新请求原始参数
+            for test_type, test_params in super().iter_variants(path, params):
+                if test_type not in seen:
+                    seen.add(test_type)
+                    yield test_type, copy.deepcopy(params)
+                yield test_type, test_params
+            seen.clear()
+
+    seen = set()
+    detector = LegacyDetector(url, options=options)
+    detector.threads = 1
+    return detector
+
+
+def run(detector, counter):
+    from lib.common.probeClient import ProbeClient
+    ProbeClient.resetMemo()
+    with counter.get_lock():
+        counter.value = 0
+    found = 0
+    start = time.perf_counter()
+    for path in KEY_PATHS:
+        detector._baselines.clear()
+        if detector.detect_parameter_pollution(path, TEST_PARAMS)['vulnerabilities']:
+            found += 1
+    return (time.perf_counter() - start) / len(KEY_PATHS), counter.value, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packer-Fuzzer 参数污染检测基准测试")
+    parser.add_argument("--latency", type=float, default=0.02, help="服务端每个请求的模拟延迟(秒)")
+    args = parser.parse_args()
+
+    server, port, counter = start_server(FixtureHandler, latency=args.latency)
+    url = "http://127.0.0.1:%d" % port
+
+    workdir = tempfile.mkdtemp()
+    shutil.copy(os.path.join(PACKER_PATH, "config.ini"), workdir)
+    shutil.copytree(os.path.join(PACKER_PATH, "doc"), os.path.join(workdir, "doc"))
+    os.makedirs(os.path.join(workdir, "logs"))
+    os.chdir(workdir)
+    # Packer-Fuzzer 的模块在导入时会解析命令行，并以工作目录读取配置
+    sys.argv = [sys.argv[0], "-u", url, "-s", "bench"]
+    sys.path.insert(0, os.path.abspath(PACKER_PATH))
+
+    try:
+        from lib.common.cmdline import CommandLines
+        from lib.ParameterPollutionDetector import ParameterPollutionDetector
+        options = CommandLines().cmd()
+
+        print("%-10s %14s %10s %12s" % ("实现", "每路径耗时(s)", "请求数", "发现问题路径"))
+        for label, detector in (("旧实现", legacy_detector(url, options)),
+                                ("并发", ParameterPollutionDetector(url, options=options))):
+            per_path, sent, found = run(detector, counter)
+            print("%-10s %14.3f %10d %12d" % (label, per_path, sent, found))
+    finally:
+        server.terminate()
+        os.chdir(os.path.dirname(workdir))
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
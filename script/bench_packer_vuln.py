@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Packer-Fuzzer 漏洞检测请求缓存基准测试
+
+在独立进程中启动一个模拟API服务，在临时目录中登记N个带数字参数的GET/POST接口，
+分别在关闭和开启请求缓存的情况下运行 SqlTest、BacTest 和 SSRFTest，
+输出模块发起的请求数、服务端实际收到的请求数、节省的请求数与总耗时。
+
+用法:
+    python script/bench_packer_vuln.py --apis 40 --latency 0.01
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from urllib.parse import parse_qs, urlparse
+
+from bench_common import BenchHandler, start_server
+
+PACKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'Packer-Fuzzer')
+
+
+class FixtureHandler(BenchHandler):
+    """返回固定格式JSON的模拟API，响应长度随id参数变化"""
+
+    def _reply(self):
+        form = self.count().decode("utf-8", "replace")
+        params = parse_qs(urlparse(self.path).query or form)
+        self.delay()
+
+        body = json.dumps({"code": 0, "data": params.get("id", [""])[0][:2]}).encode()
+        self.reply(200, body, "application/json")
+
+    do_GET = do_POST = _reply
+
+
+def create_project(tag, url, count):
+    """登记接口：一半为GET、一半为POST，均带数字参数 id 与 page"""
+    from lib.Database import DatabaseType
+    DatabaseType(tag).createDatabase()
+    DatabaseType(tag).createProjectDatabase(url, 1, "")
+    rows = []
+    for i in range(count):
+        method = "get" if i % 2 == 0 else "post"
+        option = {"type": method, method: [{"name": "id", "default": "1"}]}
+        if i % 4 < 2:
+            option[method].append({"name": "page", "default": "1"})
+        rows.append((url + "api/item%d" % i, "item%d" % i, json.dumps(option), 1 if method == "get" else 2))
+    conn = sqlite3.connect(DatabaseType(tag).getPathfromDB() + tag + ".db")
+    conn.executemany("insert into api_tree(path,name,option,success,from_js) values(?,?,?,?,0)", rows)
+    conn.commit()
+    conn.close()
+
+
+def run(tag, url, options, memoize):
+    from lib.common.probeClient import ProbeClient
+    from lib.vuln.BacTest import BacTest
+    from lib.vuln.SqlTest import SqlTest
+    from lib.vuln.SSRFTest import SSRFTest
+
+    ProbeClient.resetMemo()
+    ProbeClient.memoize = memoize
+    start = time.perf_counter()
+    SqlTest(tag, options).sqlTest()
+    BacTest(tag, options).bacTest()
+    SSRFTest(tag, options).test_ssrf_vulnerability(url + "api/proxy?url=http://example.com/&id=1")
+    return time.perf_counter() - start, ProbeClient.memoStats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packer-Fuzzer 漏洞检测请求缓存基准测试")
+    parser.add_argument("--apis", type=int, default=40, help="接口数量")
+    parser.add_argument("--latency", type=float, default=0.01, help="服务端每个请求的模拟延迟(秒)")
+    args = parser.parse_args()
+
+    server, port, counter = start_server(FixtureHandler, latency=args.latency)
+    url = "http://127.0.0.1:%d/" % port
+
+    workdir = tempfile.mkdtemp()
+    shutil.copy(os.path.join(PACKER_PATH, "config.ini"), workdir)
+    shutil.copytree(os.path.join(PACKER_PATH, "doc"), os.path.join(workdir, "doc"))
+    os.makedirs(os.path.join(workdir, "logs"))
+    os.chdir(workdir)
+    # Packer-Fuzzer 的模块在导入时会解析命令行，并以工作目录读取配置
+    sys.argv = [sys.argv[0], "-u", url, "-s", "bench"]
+    sys.path.insert(0, os.path.abspath(PACKER_PATH))
+
+    try:
+        from lib.common.cmdline import CommandLines
+        options = CommandLines().cmd()
+
+        print("%-6s %10s %10s %10s %10s" % ("缓存", "模块请求", "服务端收到", "节省", "耗时(s)"))
+        for label, tag, memoize in (("关闭", "nomemo", False), ("开启", "memo", True)):
+            create_project(tag, url, args.apis)
+            with counter.get_lock():
+                counter.value = 0
+            elapsed, stats = run(tag, url, options, memoize)
+            print("%-6s %10d %10d %10d %10.3f" % (label, stats["requests"], counter.value, stats["saved"], elapsed))
+    finally:
+        server.terminate()
+        os.chdir(os.path.dirname(workdir))
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+403绕过阶段端到端耗时基准测试
+
+在独立进程中启动一个对所有请求都返回403的本地HTTP服务，对N个禁止访问的路径
+运行 OptimizedProgram，输出总耗时与服务端实际收到的请求数。
+
+用法:
+    python script/bench_pass403.py --paths 100 --latency 0.005
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from bench_common import BenchHandler, start_server
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lib.pass403_optimized import OptimizedProgram  # noqa: E402
+
+
+class ForbiddenHandler(BenchHandler):
+    """对任意方法都返回403的请求处理器"""
+
+    def _forbidden(self):
+        self.count()
+        self.delay()
+        self.reply(403, b"Forbidden")
+
+    do_GET = do_POST = do_HEAD = _forbidden
+
+
+def main():
+    parser = argparse.ArgumentParser(description="403绕过阶段基准测试")
+    parser.add_argument("--paths", type=int, default=100, help="禁止访问的路径数量")
+    parser.add_argument("--latency", type=float, default=0.005, help="服务端每个请求的模拟延迟(秒)")
+    parser.add_argument("--workers", type=int, default=50, help="OptimizedProgram 的工作线程数")
+    parser.add_argument("--per-host", type=int, default=None, help="单主机并发上限(默认与工作线程数相同)")
+    parser.add_argument("--exhaustive", action="store_true", help="关闭自适应裁剪，发送全部变异请求")
+    args = parser.parse_args()
+
+    server, port, counter = start_server(ForbiddenHandler, latency=args.latency)
+
+    url = f"http://127.0.0.1:{port}"
+    paths = [f"/admin{i}" for i in range(args.paths)]
+
+    # 采样客户端线程数峰值
+    peak = [threading.active_count()]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.05):
+            peak[0] = max(peak[0], threading.active_count())
+
+    threading.Thread(target=sample, daemon=True).start()
+
+    # 结果文件写入临时目录，避免污染工作目录
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            start = time.perf_counter()
+            kwargs = {"max_workers": args.workers, "adaptive": not args.exhaustive}
+            if args.per_host:
+                kwargs["per_host"] = args.per_host
+            OptimizedProgram([url], paths, **kwargs).initialise()
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+            done.set()
+
+    server.terminate()
+
+    print(f"\npaths={args.paths} workers={args.workers} per_host={args.per_host} "
+          f"latency={args.latency}s exhaustive={args.exhaustive}")
+    print(f"requests={counter.value} elapsed={elapsed:.2f}s "
+          f"rate={counter.value / elapsed:.0f} req/s "
+          f"threads_peak={peak[0]}")
+
+
+if __name__ == "__main__":
+    main()
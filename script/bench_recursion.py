@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+深度递归扫描内存基准测试
+
+在独立进程中启动一个本地站点，目录树每层有 --branch 个子目录、深度为 --depth，每个目录下都有若干
+命中的文件。扫描进程以 -r 递归扫描整棵目录树并输出报告，结束后输出进程的峰值RSS和耗时。
+
+--root 指定要测试的 dirsearch 代码目录，用于比较两个版本，例如:
+    git worktree add /tmp/before HEAD~1
+    python script/bench_recursion.py --root /tmp/before
+    python script/bench_recursion.py
+
+用法:
+    python script/bench_recursion.py --words 3000 --branch 3 --depth 4 --threads 25
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# 每个目录下命中的文件
+HIT_FILES = ("admin.php", "backup.zip", "config.bak", "login.php", "upload.php")
+
+
+class TreeHandler(BaseHTTPRequestHandler):
+    """
+    目录树站点：d0/ ~ d{branch-1}/ 组成的目录和其中的 HIT_FILES 返回200，其余返回404
+
+    路径不区分大小写，默认配置会把字典条目首字母大写。
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    branch = 3
+    depth = 4
+
+    def is_found(self, path):
+        path = path.lower()
+        segments = path.split("?")[0].strip("/").split("/")
+        directories = segments if path.endswith("/") else segments[:-1]
+
+        if len(directories) > self.depth or not all(
+            segment[:1] == "d" and segment[1:].isdigit() and int(segment[1:]) < self.branch
+            for segment in directories
+        ):
+            return False
+
+        return path.endswith("/") or segments[-1] in HIT_FILES
+
+    def do_GET(self):
+        if self.is_found(self.path):
+            status, body = 200, (f"<html><title>{self.path}</title><body>" + "x" * 4096 + "</body></html>").encode()
+        else:
+            status, body = 404, b"not found"
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(branch, depth):
+    TreeHandler.branch = branch
+    TreeHandler.depth = depth
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TreeHandler)
+    server.daemon_threads = True
+    sys.stdout.write(f"{server.server_address[1]}\n")
+    sys.stdout.flush()
+    server.serve_forever()
+
+
+def scan(root, port, wordlist, report, depth, threads):
+    """在 root 目录的代码中运行一次递归扫描"""
+    sys.path.insert(0, root)
+    os.chdir(root)
+
+    from lib.controller.controller import Controller
+    from lib.core.data import options
+    from lib.core.options import parse_options
+
+    sys.argv = [
+        "dirsearch", "-u", f"http://127.0.0.1:{port}/", "-w", wordlist, "-r", "-R", str(depth + 1),
+        "-t", str(threads), "-o", report, "--format", "plain", "--no-color", "-q",
+    ]
+    options.update(parse_options())
+
+    start = time.perf_counter()
+    Controller()
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss 在 Linux 上以KB为单位
+    sys.stderr.write(f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} {elapsed}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="深度递归扫描内存基准测试")
+    parser.add_argument("--root", default=os.path.dirname(SCRIPT_PATH), help="要测试的代码目录")
+    parser.add_argument("--words", type=int, default=3000, help="字典中未命中的条目数")
+    parser.add_argument("--branch", type=int, default=3, help="每层的子目录数")
+    parser.add_argument("--depth", type=int, default=4, help="目录树深度")
+    parser.add_argument("--threads", type=int, default=25, help="扫描线程数")
+    parser.add_argument("--child", choices=("server", "scan"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--wordlist", help=argparse.SUPPRESS)
+    parser.add_argument("--report", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "server":
+        serve(args.branch, args.depth)
+        return
+    if args.child == "scan":
+        scan(args.root, args.port, args.wordlist, args.report, args.depth, args.threads)
+        return
+
+    workdir = tempfile.mkdtemp()
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--child", "server",
+         "--branch", str(args.branch), "--depth", str(args.depth)],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        port = int(server.stdout.readline())
+        wordlist = os.path.join(workdir, "words.txt")
+        with open(wordlist, "w") as fd:
+            fd.writelines(f"word{i}\n" for i in range(args.words))
+            fd.writelines(f"d{i}/\n" for i in range(args.branch))
+            fd.writelines(f"{name}\n" for name in HIT_FILES)
+
+        directories = sum(args.branch ** level for level in range(args.depth + 1))
+        print(f"目录数: {directories}，每个目录 {args.words + args.branch + len(HIT_FILES)} 个请求")
+
+        with open(os.devnull, "wb") as devnull:
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", "scan", "--root", os.path.abspath(args.root),
+                 "--port", str(port), "--wordlist", wordlist, "--report", os.path.join(workdir, "report.txt"),
+                 "--depth", str(args.depth), "--threads", str(args.threads)],
+                stdout=devnull, stderr=subprocess.PIPE, check=True,
+            )
+
+        rss, elapsed = process.stderr.decode().split()[-2:]
+        with open(os.path.join(workdir, "report.txt")) as fd:
+            results = sum(1 for line in fd if line.strip() and not line.startswith("#"))
+        print(f"结果数: {results}，峰值RSS: {int(rss) / 1024:.1f} MB，耗时: {float(elapsed):.1f}s")
+    finally:
+        server.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
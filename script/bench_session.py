@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+会话保存与恢复基准测试
+
+生成一个包含N个条目的字典文件，模拟扫描进行到一半时的状态(字典游标、待扫描目录、已发现的结果)，
+分别以两种方式保存和恢复：
+  旧实现: 暂停时把整个控制器状态(展开后的字典、带响应体的结果、终端输出缓冲)整体pickle
+  会话日志: 记录字典标识和游标、精简结果，扫描期间后台线程定期追加写入，恢复时从预编译字典缓存加载字典
+输出会话文件大小、保存耗时(旧实现保存期间扫描暂停；会话日志统计每个写入周期的耗时)和恢复耗时。
+
+用法:
+    python script/bench_session.py --entries 2000000 --results 20000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from io import BytesIO
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lib.connection.response import Response  # noqa: E402
+from lib.core.dictionary import Dictionary  # noqa: E402
+from lib.core.data import options  # noqa: E402
+from lib.core import wordlist_cache  # noqa: E402
+from lib.core.session import Result, SessionJournal, load_session, wordlist_identity  # noqa: E402
+from lib.utils.pickle import pickle, unpickle  # noqa: E402
+
+
+class FakeResponse:
+    """提供 Response 构造所需属性的HTTP响应"""
+
+    def __init__(self, url, status, body):
+        self.url = url
+        self.status_code = status
+        self.headers = {"content-type": "text/html; charset=utf-8", "content-length": str(len(body))}
+        self.history = []
+        self.encoding = "utf-8"
+        self._body = body
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+
+def build_results(count, body_size):
+    body = (b"<html><body>" + b"x" * body_size + b"</body></html>")
+    return [
+        Response(FakeResponse(f"http://example.com/dir{i % 50}/word{i}", 200 if i % 3 else 403, body))
+        for i in range(count)
+    ]
+
+
+def legacy_state(dictionary, responses):
+    passed = {f"http://example.com/dir{i}/" for i in range(50)}
+    state = {
+        "dictionary": dictionary,
+        "results": responses,
+        "targets": ["http://example.com/"],
+        "start_time": time.time(),
+        "passed_urls": passed,
+        "directories": [f"dir{i}/" for i in range(25, 50)],
+        "jobs_processed": 25,
+        "errors": 0,
+        "consecutive_errors": 0,
+        "fingerprints": {},
+    }
+    buffer = "".join(f"[12:00:00] {r.status} -  {r.length}B  - /{r.url[19:]}\n" for r in responses)
+    return state, buffer
+
+
+def bench_legacy(path, dictionary, responses):
+    state, buffer = legacy_state(dictionary, responses)
+    start = time.perf_counter()
+    with open(path, "wb") as fd:
+        pickle((state, buffer, dict(options)), fd)
+    written = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open(path, "rb") as fd:
+        restored, _, _ = unpickle(fd)
+    restore = time.perf_counter() - start
+    assert restored["dictionary"].index == dictionary.index
+    return os.path.getsize(path), written, written, restore
+
+
+def bench_journal(path, wordlist, dictionary, responses, flushes):
+    state = {"targets": ["http://example.com/"], "directories": [f"dir{i}/" for i in range(25, 50)],
+             "cursor": 0, "jobs": 25, "errors": 0, "elapsed": 0.0}
+    journal = SessionJournal(path)
+    journal.open(
+        {"wordlists": wordlist_identity([wordlist]), "size": len(dictionary), "report": None, "options": options},
+        lambda: dict(state),
+    )
+
+    # 扫描期间结果陆续到达，按写入周期分批写入
+    latencies = []
+    batch = max(1, len(responses) // flushes)
+    for i, response in enumerate(responses):
+        if i % 50 == 0:
+            journal.record("passed", f"http://example.com/dir{i % 50}/")
+        journal.add_result(Result.from_response(response))
+        if (i + 1) % batch == 0:
+            state["cursor"] = dictionary.index * (i + 1) // len(responses)
+            state["elapsed"] += 5
+            start = time.perf_counter()
+            journal.flush()
+            latencies.append(time.perf_counter() - start)
+    journal.close()
+
+    # 扫描开始时已经生成了预编译字典缓存
+    Dictionary(files=[wordlist])
+
+    start = time.perf_counter()
+    session = load_session(path)
+    restored = Dictionary(files=[wordlist])
+    if session.header["wordlists"] == wordlist_identity([wordlist]):
+        restored.seek(session.state["cursor"])
+    restore = time.perf_counter() - start
+    assert restored.index == dictionary.index and len(session.results) == len(responses)
+    return os.path.getsize(path), sum(latencies) / len(latencies), max(latencies), restore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话保存与恢复基准测试")
+    parser.add_argument("--entries", type=int, default=2000000, help="字典条目数")
+    parser.add_argument("--results", type=int, default=20000, help="已发现的结果数")
+    parser.add_argument("--body", type=int, default=2048, help="每个结果的响应体大小(字节)")
+    parser.add_argument("--flushes", type=int, default=200, help="会话日志的写入周期数")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    wordlist_cache.WORDLIST_CACHE_PATH = os.path.join(workdir, "cache")
+    try:
+        wordlist = os.path.join(workdir, "words.txt")
+        with open(wordlist, "w") as fd:
+            fd.writelines(f"path{i}/word{i}\n" for i in range(args.entries))
+
+        start = time.perf_counter()
+        options["wordlist_cache"] = False
+        dictionary = Dictionary(files=[wordlist])
+        options["wordlist_cache"] = True
+        print(f"字典条目数: {len(dictionary)}，生成耗时 {time.perf_counter() - start:.2f}s")
+        dictionary.seek(len(dictionary) // 2)
+        responses = build_results(args.results, args.body)
+
+        print("%-10s %14s %16s %16s %12s" % ("实现", "文件大小(MB)", "平均保存耗时(ms)", "最长保存耗时(ms)", "恢复耗时(s)"))
+        for label, result in (
+            ("旧实现", bench_legacy(os.path.join(workdir, "session.pickle"), dictionary, responses)),
+            ("会话日志", bench_journal(os.path.join(workdir, "scan.session"), wordlist, dictionary, responses,
+                                   args.flushes)),
+        ):
+            size, average, longest, restore = result
+            print("%-10s %14.1f %16.1f %16.1f %12.2f" % (label, size / 1024 / 1024, average * 1000,
+                                                          longest * 1000, restore))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
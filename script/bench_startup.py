@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+进程启动耗时基准测试
+
+每次在新的解释器进程中运行，输出多次运行的耗时中位数，以及 -X importtime 统计的累计导入耗时最多的模块：
+  --help:   python dirsearchplus.py --help
+  扫描启动: 导入 dirsearchplus、解析扫描参数并导入扫描控制器，即发出第一个请求之前的全部导入
+  解释器:   python -c pass，作为基线
+
+--root 指定要测试的 dirsearch 代码目录，用于比较两个版本，例如:
+    git worktree add /tmp/before HEAD~1
+    python script/bench_startup.py --root /tmp/before
+    python script/bench_startup.py
+
+用法:
+    python script/bench_startup.py --runs 10 --top 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# 扫描启动：与 dirsearchplus.run() 中扫描开始前的步骤相同，但不发出请求
+SCAN_STARTUP = """
+import sys
+sys.argv = ["dirsearchplus.py", "-u", "http://127.0.0.1:1/", "-q"]
+sys.path.insert(0, ".")
+import dirsearchplus
+from lib.core.data import options
+from lib.core.options import parse_options
+options.update(parse_options())
+from lib.controller.controller import Controller
+"""
+
+CASES = (
+    ("--help", ["dirsearchplus.py", "--help"]),
+    ("扫描启动", ["-c", SCAN_STARTUP]),
+    ("解释器", ["-c", "pass"]),
+)
+
+
+def run_once(root, args, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    start = time.perf_counter()
+    process = subprocess.run(command, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    return time.perf_counter() - start, process.stderr.decode()
+
+
+def top_imports(stderr, count):
+    """解析 -X importtime 的输出，返回累计耗时最多的顶层模块"""
+    imports = []
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 缩进为两个空格的是被其他模块导入的，只统计顶层导入
+        if name.startswith("  "):
+            continue
+        imports.append((int(cumulative), name.strip()))
+
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="进程启动耗时基准测试")
+    parser.add_argument("--root", default=os.path.dirname(SCRIPT_PATH), help="要测试的代码目录")
+    parser.add_argument("--runs", type=int, default=10, help="每种情况的运行次数")
+    parser.add_argument("--top", type=int, default=10, help="列出的模块数")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+
+    print("%-10s %12s %12s" % ("情况", "中位数(ms)", "最小(ms)"))
+    for name, command in CASES:
+        # 第一次运行预热文件系统缓存和 __pycache__，不计入结果
+        run_once(root, command)
+        timings = [run_once(root, command)[0] * 1000 for _ in range(args.runs)]
+        print("%-10s %12.1f %12.1f" % (name, statistics.median(timings), min(timings)))
+
+    for name, command in CASES[:2]:
+        _, stderr = run_once(root, command, importtime=True)
+        print(f"\n{name} 累计导入耗时最多的顶层模块:")
+        for cumulative, module in top_imports(stderr, args.top):
+            print("  %8.1f ms  %s" % (cumulative / 1000, module))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Swagger接口调用基准测试
+
+生成一份包含N个接口的OpenAPI文档（混合GET/POST/PUT/DELETE、路径参数、查询参数与请求体，
+部分路径含危险关键词），在独立进程中启动一个按文档响应的本地服务，分别以两种方式运行 swagger.py：
+  旧实现: 逐个接口串行调用，每个请求使用 requests 模块级函数（不复用连接）
+  并发: 共用连接池会话并发调用，同一主机并发数受 HOST_CONCURRENCY 限制
+输出耗时、保存报告的耗时、服务端收到的请求数和写入各工作表的行数，两种方式的 JSONL 结果须完全一致。
+
+用法:
+    python script/bench_swagger.py --operations 2000 --latency 0.02
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_common import BenchHandler, start_server
+
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+
+WORDS = ["user", "order", "goods", "role", "menu", "dept", "dict", "notice", "log", "config", "job", "file",
+         "delete", "update", "upload"]
+
+
+def build_spec(operations, seed=0):
+    rng = random.Random(seed)
+    paths = {}
+    count = 0
+    while count < operations:
+        path = "/api/%s/%s/{id}/%d" % (rng.choice(WORDS), rng.choice(WORDS), count)
+        methods = {}
+        for method in rng.sample(["get", "post", "put", "delete"], rng.randint(1, 3)):
+            parameters = [{"name": "id", "in": "path", "schema": {"type": "integer"}},
+                          {"name": "page", "in": "query", "schema": {"type": "integer"}}]
+            details = {"summary": "%s %s" % (method, path), "parameters": parameters}
+            if method == "post":
+                details["requestBody"] = {"content": {"application/json": {"schema": {
+                    "properties": {"name": {"type": "string"}, "enabled": {"type": "boolean"}}}}}}
+            methods[method] = details
+            count += 1
+        paths[path] = methods
+    return {"openapi": "3.0.1", "info": {"title": "bench"}, "paths": paths}
+
+
+class StubHandler(BenchHandler):
+
+    spec = b""
+
+    def _reply(self):
+        self.count()
+        if self.path == "/v3/api-docs":
+            body = self.spec
+        else:
+            self.delay()
+            body = json.dumps({"code": 0, "path": self.path, "method": self.command}).encode()
+        self.reply(200, body, "application/json")
+
+    do_GET = do_POST = _reply
+
+
+def sidecar_records(filename):
+    # 并发时各工作表的行交错写入，按工作表分别比较
+    records = {}
+    with open(filename[:-len(".xlsx")] + ".jsonl", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            records.setdefault(record["sheet"], []).append(record)
+    return records
+
+
+def run(swagger, url, threads, counter, name):
+    swagger.setup_xlsx_headers("jsonl")
+    args = argparse.Namespace(target_url=url, force_domain=False, custom_path_prefix='', custom_headers={},
+                              threads=threads)
+    with counter.get_lock():
+        counter.value = 0
+    start = time.perf_counter()
+    swagger.run(url, args)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    filename = swagger.save_workbook(name)
+    return elapsed, time.perf_counter() - start, counter.value, dict(swagger.report.counts), sidecar_records(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swagger接口调用基准测试")
+    parser.add_argument("--operations", type=int, default=2000, help="文档中的接口数量")
+    parser.add_argument("--latency", type=float, default=0.02, help="服务端每个接口请求的模拟延迟(秒)")
+    parser.add_argument("--threads", type=int, default=16, help="并发调用的线程数")
+    args = parser.parse_args()
+
+    spec = json.dumps(build_spec(args.operations)).encode()
+    server, port, counter = start_server(StubHandler, latency=args.latency, spec=spec)
+    url = "http://127.0.0.1:%d/v3/api-docs" % port
+
+    # swagger.py 导入时在工作目录的上一级创建调试日志
+    workdir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(workdir, "run"))
+    os.chdir(os.path.join(workdir, "run"))
+    sys.path.insert(0, SCRIPT_PATH)
+
+    try:
+        import requests
+        import swagger
+        swagger.logger.remove()
+        swagger.setup_xlsx_headers()
+
+        results = []
+        session = swagger.get_session
+        swagger.get_session = lambda: requests
+        results.append(("旧实现",) + run(swagger, url, 1, counter, "serial"))
+        swagger.get_session = session
+        results.append(("并发",) + run(swagger, url, args.threads, counter, "concurrent"))
+
+        print("%-8s %10s %10s %10s %10s %10s %10s" % ("实现", "耗时(s)", "保存(s)", "请求数", "所有API", "已调用", "已过滤"))
+        for label, elapsed, saving, sent, counts, records in results:
+            print("%-8s %10.2f %10.2f %10d %10d %10d %10d" % (label, elapsed, saving, sent,
+                                                             counts["all"], counts["called"], counts["filtered"]))
+        if results[0][5] != results[1][5]:
+            print("写入的行与旧实现不一致")
+            sys.exit(1)
+        print("写入的行与旧实现一致")
+    finally:
+        server.terminate()
+        os.chdir(SCRIPT_PATH)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
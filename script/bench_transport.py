@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享传输层基准测试
+
+在独立进程中启动一个本地HTTPS站点(自签名证书，需要 openssl 命令)，模拟各阶段同时扫描同一目标：
+目录扫描、403绕过、JsFind 和 Swagger 扫描各自用自己的线程池发出请求。每种方式在独立子进程中运行，
+输出耗时以及服务端实际接受的TCP连接数：
+  各自连接: 每个阶段自己的会话和连接池，JsFind 每个请求单独调用 requests.get(改动前的方式)
+  共享传输: 所有阶段从 lib.connection.transport 获取会话，共用连接池和TLS上下文
+
+用法:
+    python script/bench_transport.py --requests 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_PATH, '..'))
+
+# 阶段名称、并发线程数、占总请求数的比例
+STAGES = (("dirsearch", 25, 0.6), ("403bypass", 50, 0.2), ("jsfind", 10, 0.1), ("swagger", 16, 0.1))
+
+MODES = (("separate", "各自连接"), ("shared", "共享传输"))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b"<html>" + b"x" * 512 + b"</html>"
+        self.send_response(404)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+    connections = None
+
+    def get_request(self):
+        sock, address = super().get_request()
+        with self.connections.get_lock():
+            self.connections.value += 1
+        return sock, address
+
+
+def serve(workdir, port, connections):
+    CountingServer.connections = connections
+    server = CountingServer(("127.0.0.1", 0), Handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(os.path.join(workdir, "cert.pem"), os.path.join(workdir, "key.pem"))
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def client(mode, url, total):
+    """在子进程中运行所有阶段，输出耗时和峰值RSS"""
+    import requests
+    import urllib3
+
+    from requests.adapters import HTTPAdapter
+
+    from lib.connection.transport import get_transport
+
+    urllib3.disable_warnings()
+
+    def separate_stage(name, threads):
+        if name == "jsfind":
+            return lambda path: requests.get(url + path, timeout=10, verify=False)
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=threads, max_retries=0)
+        session.mount("https://", adapter)
+        return lambda path: session.get(url + path, timeout=10, verify=False)
+
+    def shared_stage(name, threads):
+        transport = get_transport()
+        session = transport.session()
+        return lambda path: transport.request("GET", url + path, session=session, stage=name, timeout=10)
+
+    build = separate_stage if mode == "separate" else shared_stage
+
+    def run_stage(name, threads, share):
+        send = build(name, threads)
+        with ThreadPoolExecutor(threads) as executor:
+            for response in executor.map(send, (f"/{name}/{i}" for i in range(int(total * share)))):
+                response.close()
+
+    start = time.perf_counter()
+    stages = [threading.Thread(target=run_stage, args=stage) for stage in STAGES]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+    elapsed = time.perf_counter() - start
+
+    sys.stdout.write(f"{elapsed} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共享传输层基准测试")
+    parser.add_argument("--requests", type=int, default=2000, help="所有阶段的总请求数")
+    parser.add_argument("--child", choices=[mode for mode, _ in MODES], help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        client(args.child, args.url, args.requests)
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+             "-keyout", os.path.join(workdir, "key.pem"), "-out", os.path.join(workdir, "cert.pem")],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+        )
+
+        port = multiprocessing.Value("i", 0)
+        connections = multiprocessing.Value("i", 0)
+        server = multiprocessing.Process(target=serve, args=(workdir, port, connections), daemon=True)
+        server.start()
+        while not port.value:
+            time.sleep(0.05)
+        url = f"https://127.0.0.1:{port.value}"
+
+        print("%-10s %10s %10s %12s %14s" % ("方式", "请求数", "连接数", "耗时(s)", "峰值RSS(MB)"))
+        for mode, label in MODES:
+            with connections.get_lock():
+                connections.value = 0
+
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, "--url", url,
+                 "--requests", str(args.requests)],
+                stdout=subprocess.PIPE, check=True,
+            ).stdout.decode().split()
+            elapsed, rss = output[-2:]
+            count = sum(int(args.requests * share) for _, _, share in STAGES)
+            print("%-10s %10d %10d %12.2f %14.1f" % (label, count, connections.value, float(elapsed), int(rss) / 1024))
+
+        server.terminate()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+字典加载启动耗时基准测试
+
+分别加载自带的 db/dicc.txt 和一个生成的大字典(默认100万行，其中一部分带 %EXT%)，
+每种方式在独立子进程中运行，输出字典就绪的耗时和进程峰值RSS：
+  不缓存: 每次读取并展开字典(--no-wordlist-cache)
+  冷启动: 缓存目录为空，展开字典后写入预编译缓存
+  热启动: 直接映射已有的预编译缓存
+
+用法:
+    python script/bench_wordlist.py --lines 1000000 --extensions php,aspx,jsp,html,js
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_PATH, '..'))
+
+MODES = (("nocache", "不缓存"), ("cold", "冷启动"), ("warm", "热启动"))
+
+
+def child(mode, wordlist, cache_path, extensions):
+    start = time.perf_counter()
+
+    from lib.core import wordlist_cache
+    from lib.core.data import options
+    from lib.core.dictionary import Dictionary
+
+    wordlist_cache.WORDLIST_CACHE_PATH = cache_path
+    options.update(extensions=tuple(extensions.split(",")), capitalization=True,
+                   wordlist_cache=mode != "nocache")
+
+    dictionary = Dictionary(files=[wordlist])
+    # 扫描开始时读取第一个条目
+    next(dictionary)
+    elapsed = time.perf_counter() - start
+
+    sys.stdout.write(f"{elapsed} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} {len(dictionary)}\n")
+
+
+def run_child(mode, wordlist, cache_path, extensions):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--wordlist", wordlist,
+         "--cache", cache_path, "--extensions", extensions],
+        stdout=subprocess.PIPE, check=True,
+    ).stdout.decode().split()
+    elapsed, rss, count = output[-3:]
+    return float(elapsed), int(rss) / 1024, int(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="字典加载启动耗时基准测试")
+    parser.add_argument("--lines", type=int, default=1000000, help="生成的大字典行数")
+    parser.add_argument("--extensions", default="php,aspx,jsp,html,js", help="扩展名")
+    parser.add_argument("--child", choices=[mode for mode, _ in MODES], help=argparse.SUPPRESS)
+    parser.add_argument("--wordlist", help=argparse.SUPPRESS)
+    parser.add_argument("--cache", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.wordlist, args.cache, args.extensions)
+        return
+
+    workdir = tempfile.mkdtemp()
+    try:
+        generated = os.path.join(workdir, "large.txt")
+        with open(generated, "w") as fd:
+            fd.writelines(
+                f"path{i}/file{i}.%EXT%\n" if i % 10 == 0 else f"path{i}/word{i}\n" for i in range(args.lines)
+            )
+
+        wordlists = (("dicc.txt", os.path.join(SCRIPT_PATH, "..", "db", "dicc.txt")), (f"{args.lines}行", generated))
+
+        print("%-12s %-8s %10s %12s %12s" % ("字典", "方式", "条目数", "耗时(s)", "峰值RSS(MB)"))
+        for name, wordlist in wordlists:
+            cache_path = os.path.join(workdir, "cache", name)
+            for mode, label in MODES:
+                elapsed, rss, count = run_child(mode, wordlist, cache_path, args.extensions)
+                print("%-12s %-8s %10d %12.3f %12.1f" % (name, label, count, elapsed, rss))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from lib.pass403 import Arguments,Program
+from lib.pass403_optimized import OptimizedArguments,OptimizedProgram
 from lib.qc import pass403_qc
 import argparse
 
@@ -12,18 +12,20 @@ def bypass(url,path):
         path (str): URL路径部分
 
     返回值:
-        无返回值
+        dict: 目标URL到结果行列表的映射
 
     功能说明:
-        该函数通过创建Arguments和Program对象来初始化并执行403绕过程序，
+        该函数通过创建OptimizedArguments和OptimizedProgram对象来初始化并执行403绕过程序，
         主要用于测试目标URL的403访问限制绕过方法
     '''
+    results = {}
     try:
-        argument = Arguments(url, None, path, None)
-        program = Program(argument.return_urls(), argument.return_dirs())
+        argument = OptimizedArguments(url, None, path, None)
+        program = OptimizedProgram(argument.return_urls(), argument.return_dirs(), results=results)
         program.initialise()
     except:
         pass
+    return results
 
 
 
@@ -34,16 +36,11 @@ if __name__ == '__main__':
     parser.add_argument("-p", "--path", help="url path", default='')
     args = parser.parse_args()
 
-    # 获取并保存URL参数到文件
     url=args.url
-    with open('../resources/bypass403_url.txt', 'w') as f:
-        f.write(url)
 
     # 获取路径参数并调用绕过函数
     path=args.path
-    bypass(url,path)
+    results=bypass(url,path)
 
     # 执行403绕过质量检查
-    pass403_qc()
-
-
+    pass403_qc(results)
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import csv
 import json
 import sys
+import hashlib
 import os
 import argparse
 import requests
@@ -9,25 +11,34 @@ import re
 import random
 import time
 import urllib3
+import threading
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from http.cookiejar import DefaultCookiePolicy
 from urllib.parse import urlparse, urljoin, parse_qs
 from loguru import logger
 
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-except ImportError:
-    logger.error("Selenium library not found. Please run 'pip install selenium' to install it.")
-    sys.exit(1)
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
+    from openpyxl.utils import get_column_letter
 except ImportError:
     logger.error("openpyxl library not found. Please run 'pip install openpyxl' to install it.")
     sys.exit(1)
 
 
+try:
+    from lib.connection.cache import cached_fetch
+    from lib.connection.transport import get_transport
+except ImportError:
+    # 单独运行本脚本且项目根目录不在模块搜索路径中时不使用共享缓存和共享传输层
+    cached_fetch = None
+    get_transport = None
+
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logger.remove(); logger.add(sys.stderr, level="INFO")
 logger.add("../debug.log", level="DEBUG", format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
@@ -43,13 +54,38 @@ DANGEROUS_KEYWORDS = [
     'mod', 'patch', 'put', 'add', 'create', 'new', 'insert', 'save', 'upload'
 ]
 PATH_VARIABLE_FORMAT = "{{{param}}}"
+# 并发调用接口的线程数，以及同一主机同时进行的请求数上限（0表示不限制）
+MAX_WORKERS = 16
+HOST_CONCURRENCY = 8
+
+# 所有请求共用一个保持连接的会话
+_session = None
+_session_lock = threading.Lock()
+_host_limits = {}
+# 本次运行中请求过的API文档，以及每个主机静态发现的API文档地址
+_doc_memo = {}
+_discovered_docs = {}
+# swagger-ui 页面中可能给出API文档地址的写法：SwaggerUIBundle({url|urls|configUrl})、springfox、knife4j 等
+SPEC_HINT_PATTERNS = [
+    r'configUrl\s*:\s*["\']([^"\'<>]+)["\']',
+    r'\burl\s*:\s*["\']([^"\'<>]+)["\']',
+    r'"swaggerDocUrl"\s*:\s*"([^"\'<>]+)"',
+    r'discoveryUrl\s*:\s*["\']([^"\'<>]+)["\']',
+    r'["\']([^"\'<>\s]*?(?:api-docs|swagger\.json|openapi\.json|swagger-resources)[^"\'<>\s]*?)["\']',
+]
+SCRIPT_SRC_PATTERN = r'<script[^>]+src\s*=\s*["\']([^"\'<>]+)["\']'
+# 需要下载分析的页面脚本（swagger-initializer.js、springfox.js、knife4j 的 app.js 等），swagger-ui 本身的库文件不含配置
+BOOTSTRAP_SCRIPT_KEYWORDS = ('initializer', 'springfox', 'knife4j', 'swagger-config', 'index', 'app', 'doc', 'main')
+LIBRARY_SCRIPT_KEYWORDS = ('bundle', 'standalone-preset', 'vendor', 'chunk-vendors', 'polyfill', 'jquery')
+# 各框架的默认配置接口：springfox / knife4j 的分组列表，springdoc 的 swagger-config
+FRAMEWORK_HINTS = {
+    'springfox': ['swagger-resources'],
+    'knife4j': ['swagger-resources', 'v3/api-docs/swagger-config'],
+    'swagger-initializer': ['v3/api-docs/swagger-config'],
+}
+STANDARD_DOC_PATHS = ["/v3/api-docs", "/swagger-resources", "/v2/api-docs", "/api-docs", "/swagger.json", "/openapi.json"]
 
 
-workbook = Workbook()
-if "Sheet" in workbook.sheetnames: workbook.remove(workbook["Sheet"])
-ws_all_apis = workbook.create_sheet(title="所有API")
-ws_called_apis = workbook.create_sheet(title="已调用API")
-ws_filtered_apis = workbook.create_sheet(title="已过滤API")
 HEADER_FONT = Font(bold=True, color="FFFFFF", name="DengXian"); DATA_FONT = Font(name="DengXian")
 HEADER_FILL = PatternFill(start_color="404040", end_color="404040", fill_type="solid")
 SUCCESS_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
@@ -57,37 +93,113 @@ FILTER_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="s
 HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
 CELL_ALIGNMENT = Alignment(horizontal='left', vertical='center', wrap_text=True)
 THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+# 表格中显示的响应内容长度，完整响应按内容哈希保存在 <报告名>_bodies 目录中
+RESPONSE_PREVIEW = 200
+# 工作表: (标题, 表头, 列宽)，流式写入时无法事后按内容调整列宽
+SHEETS = {
+    "all": ("所有API", ["源API文档", "请求方法", "请求URL", "接口摘要", "状态"], [40, 10, 60, 30, 12]),
+    "called": ("已调用API", ["源API文档", "请求方法", "请求URL", "接口摘要", "请求参数", "请求头", "状态码", "响应内容", "响应哈希"],
+               [40, 10, 60, 30, 40, 30, 10, 80, 44]),
+    "filtered": ("已过滤API", ["源API文档", "请求方法", "请求URL", "接口摘要", "过滤原因"], [40, 10, 60, 30, 40]),
+}
+
+
+# -------------------------- 新增：流式写入扫描结果（XLSX + JSONL/CSV 旁路文件 + 按哈希保存的响应内容） --------------------------
+class ReportWriter:
+    """
+    扫描结果逐行写入只写模式的工作簿，内存占用不随接口数量增长；
+    样式预先注册为命名样式，每个单元格只引用样式名。
+    每行同时写入 JSONL 或 CSV 旁路文件供程序处理，完整的响应内容按sha1保存为单独的文件，表格中只保留开头部分。
+    结果先写入当前目录下的临时文件，save() 时按报告名重命名。
+    """
 
+    def __init__(self, sidecar="jsonl"):
+        """
+        :param sidecar: 旁路文件格式，jsonl、csv 或 none
+        """
+        self.sidecar = sidecar
+        self.prefix = f".swagger_{os.getpid()}_{id(self)}"
+        self.workbook = None
+        self.sheets = {}; self.counts = dict.fromkeys(SHEETS, 0); self.sidecars = {}; self.bodies = set()
+
+    def open(self):
+        # 第一次写入时才创建工作簿，只导入本模块或没有结果写入时不产生临时文件
+        self.workbook = Workbook(write_only=True)
+        for name, font, fill, alignment in (("swagger_header", HEADER_FONT, HEADER_FILL, HEADER_ALIGNMENT),
+                                            ("swagger_data", DATA_FONT, None, CELL_ALIGNMENT),
+                                            ("swagger_success", DATA_FONT, SUCCESS_FILL, CELL_ALIGNMENT),
+                                            ("swagger_filtered", DATA_FONT, FILTER_FILL, CELL_ALIGNMENT)):
+            style = NamedStyle(name=name, font=font, alignment=alignment, border=THIN_BORDER)
+            if fill: style.fill = fill
+            self.workbook.add_named_style(style)
+        for key, (title, headers, widths) in SHEETS.items():
+            ws = self.workbook.create_sheet(title=title)
+            for col, width in enumerate(widths, 1): ws.column_dimensions[get_column_letter(col)].width = width
+            self.sheets[key] = ws
+            self.append_cells(key, headers, "swagger_header")
+
+    def append_cells(self, key, values, style):
+        ws = self.sheets[key]; row = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value); cell.style = style; row.append(cell)
+        ws.append(row)
+
+    def store_body(self, text):
+        digest = hashlib.sha1(text.encode('utf-8', 'replace')).hexdigest()
+        if digest not in self.bodies:
+            body_dir = self.prefix + "_bodies"; os.makedirs(body_dir, exist_ok=True)
+            with open(os.path.join(body_dir, digest + ".txt"), 'w', encoding='utf-8', errors='replace') as f: f.write(text)
+            self.bodies.add(digest)
+        return digest
+
+    def write_sidecar(self, key, values):
+        if self.sidecar == "jsonl":
+            if "jsonl" not in self.sidecars: self.sidecars["jsonl"] = open(self.prefix + ".jsonl", 'w', encoding='utf-8')
+            record = {"sheet": key, **dict(zip(SHEETS[key][1], values))}
+            self.sidecars["jsonl"].write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif self.sidecar == "csv":
+            if key not in self.sidecars:
+                f = open(f"{self.prefix}_{key}.csv", 'w', encoding='utf-8-sig', newline='')
+                self.sidecars[key] = (f, csv.writer(f)); self.sidecars[key][1].writerow(SHEETS[key][1])
+            self.sidecars[key][1].writerow(values)
+
+    def write(self, key, values, style="swagger_data"):
+        """
+        :param key: 工作表，all、called 或 filtered
+        :param values: 一行的值，called 表最后一列为完整的响应内容，写入时替换为开头部分与内容哈希
+        :param style: 命名样式
+        """
+        if self.workbook is None: self.open()
+        values = list(values)
+        if key == "called":
+            text = values.pop() or ""
+            values += [text[:RESPONSE_PREVIEW], self.store_body(text)]
+        self.append_cells(key, values, style); self.write_sidecar(key, values); self.counts[key] += 1
+
+    def save(self, base_name):
+        """
+        保存工作簿，并将旁路文件与响应内容目录重命名为 <时间>_<报告名> 开头的文件
+        :return: 工作簿文件名
+        """
+        stem = f'{datetime.now().strftime("%Y%m%d%H%M")}_{base_name}'
+        output_filename = stem + '.xlsx'
+        if self.workbook is None: self.open()
+        self.workbook.save(output_filename)
+        for key, sink in self.sidecars.items():
+            f = sink[0] if isinstance(sink, tuple) else sink; f.close()
+            suffix = ".jsonl" if key == "jsonl" else f"_{key}.csv"
+            os.replace(self.prefix + suffix, stem + suffix)
+        if self.bodies: os.replace(self.prefix + "_bodies", stem + "_bodies")
+        return output_filename
+
+
+report = ReportWriter()
 
-def setup_xlsx_headers():
-    headers_all = ["源API文档", "请求方法", "请求URL", "接口摘要", "状态"]
-    headers_called = ["源API文档", "请求方法", "请求URL", "接口摘要", "请求参数", "请求头", "状态码", "响应内容"]  # 新增“请求头”列
-    headers_filtered = ["源API文档", "请求方法", "请求URL", "接口摘要", "过滤原因"]
-    sheets_headers = {ws_all_apis: headers_all, ws_called_apis: headers_called, ws_filtered_apis: headers_filtered}
-    for ws, headers in sheets_headers.items():
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = HEADER_FONT; cell.fill = HEADER_FILL; cell.alignment = HEADER_ALIGNMENT; cell.border = THIN_BORDER
-
-def apply_row_styles(worksheet, row_index, fill=None):
-    for cell in worksheet[row_index]:
-        cell.font = DATA_FONT; cell.alignment = CELL_ALIGNMENT; cell.border = THIN_BORDER
-        if fill: cell.fill = fill
-
-def auto_adjust_column_width(worksheet):
-    for col in worksheet.columns:
-        max_length = 0; column = col[0].column_letter
-        for cell in col:
-            try:
-                cell_len = 0
-                if cell.value:
-                    for char in str(cell.value): cell_len += 2 if '\u4e00' <= char <= '\u9fff' else 1
-                if cell_len > max_length: max_length = cell_len
-            except: pass
-        adjusted_width = max_length + 2
-        if adjusted_width > 80: adjusted_width = 80
-        if adjusted_width < 12: adjusted_width = 12
-        worksheet.column_dimensions[column].width = adjusted_width
+
+def setup_xlsx_headers(sidecar="jsonl"):
+    # 表头在创建报告时写入，重新开始一份报告
+    global report
+    report = ReportWriter(sidecar)
 
 def is_url_dangerous(url, keywords):
     try:
@@ -136,6 +248,14 @@ def parse_custom_headers(header_list):
 # -------------------------- 修改：Selenium获取动态HTML（注入自定义headers） --------------------------
 def get_dynamic_html_with_selenium(url, custom_headers):
     logger.info("使用Selenium获取动态渲染的HTML...")
+    # Selenium只在显式指定 --selenium 时作为静态发现失败后的备用手段，按需导入
+    try:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+    except ImportError:
+        logger.error("Selenium library not found. Please run 'pip install selenium' to install it.")
+        return None
     driver_filename = "chromedriver.exe" if sys.platform.startswith('win') else "chromedriver"
     driver_path = os.path.join(os.getcwd(), driver_filename)
     if not os.path.exists(driver_path):
@@ -169,6 +289,30 @@ def get_dynamic_html_with_selenium(url, custom_headers):
     finally:
         if driver: driver.quit()
 
+# -------------------------- 新增：共用连接池会话与同主机并发限制 --------------------------
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None and get_transport is not None:
+                # 与目录扫描等阶段共用连接池，响应设置的Cookie不保存
+                _session = get_transport().session()
+            elif _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+                session.mount("http://", adapter); session.mount("https://", adapter)
+                # 与逐个请求时一样不在请求之间保留响应设置的Cookie，Cookie只来自自定义headers
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                _session = session
+    return _session
+
+def host_limit(url):
+    if not HOST_CONCURRENCY: return nullcontext()
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _host_limits: _host_limits[host] = threading.BoundedSemaphore(HOST_CONCURRENCY)
+        return _host_limits[host]
+
 # -------------------------- 修改：HTTP请求（合并默认头与自定义头，自定义优先） --------------------------
 def http_req(url, method='get', custom_headers=None, **kwargs):
     custom_headers = custom_headers or {}  # 避免None值
@@ -184,10 +328,28 @@ def http_req(url, method='get', custom_headers=None, **kwargs):
     
     try:
         logger.debug(f"请求 ({method.upper()}) -> {url} | Headers: {json.dumps(final_headers, ensure_ascii=False)}")
-        conn = getattr(requests, method)(url, **kwargs)
+        with host_limit(url):
+            if get_transport is not None: conn = get_transport().request(method.upper(), url, session=get_session(), stage="swagger", **kwargs)
+            else: conn = get_session().request(method.upper(), url, **kwargs)
         return conn
     except requests.exceptions.RequestException as e: logger.error(f"请求失败 {url}: {e}"); return None
 
+# -------------------------- 新增：API文档请求走共享响应缓存（目录扫描已下载过的文档不再重复请求） --------------------------
+def fetch_doc(url, custom_headers=None):
+    if cached_fetch is None:
+        # 未接入共享缓存时，本次运行中请求过的文档直接复用（发现阶段探测过的API文档在解析时不再重复请求）
+        key = (url, json.dumps(custom_headers or {}, sort_keys=True))
+        if key not in _doc_memo: _doc_memo[key] = http_req(url, custom_headers=custom_headers)
+        return _doc_memo[key]
+
+    def fetcher():
+        conn = http_req(url, custom_headers=custom_headers)
+        if conn is None: raise requests.exceptions.RequestException(f"请求失败 {url}")
+        return conn
+
+    try: return cached_fetch("GET", url, fetcher, headers=custom_headers, stage="swagger")
+    except requests.exceptions.RequestException: return None
+
 def fill_parameters(parameters):
     filled_params = {"query": {}, "path": {}, "body": {}}
     for param in parameters:
@@ -199,28 +361,28 @@ def fill_parameters(parameters):
         if param_in in filled_params: filled_params[param_in][name] = value
     return filled_params
 
-# -------------------------- 修改：写入已调用API表格（新增“请求头”列） --------------------------
+# -------------------------- 修改：写入已调用API表格（新增“请求头”列，响应内容按哈希引用） --------------------------
 def output_to_xlsx_called(data):
     try:
-        ws_called_apis.append(data); is_success = 200 <= data[6] < 300  # 列索引调整（新增请求头后状态码列变为第7列）
-        apply_row_styles(ws_called_apis, ws_called_apis.max_row, fill=SUCCESS_FILL if is_success else None)
+        is_success = 200 <= data[6] < 300  # 列索引调整（新增请求头后状态码列变为第7列）
+        report.write("called", data, "swagger_success" if is_success else "swagger_data")
     except Exception as e: logger.error(f"写入 '已调用API' sheet页失败: {e}")
 
 def output_to_xlsx_filtered(data):
     try:
-        ws_filtered_apis.append(data); apply_row_styles(ws_filtered_apis, ws_filtered_apis.max_row, fill=FILTER_FILL)
+        report.write("filtered", data, "swagger_filtered")
     except Exception as e: logger.error(f"写入 '已过滤API' sheet页失败: {e}")
 
 def output_to_xlsx_all(data):
     try:
-        ws_all_apis.append(data); fill_color = None
-        if data[4] == "Called": fill_color = SUCCESS_FILL
-        if data[4] == "Filtered": fill_color = FILTER_FILL
-        apply_row_styles(ws_all_apis, ws_all_apis.max_row, fill=fill_color)
+        style = "swagger_data"
+        if data[4] == "Called": style = "swagger_success"
+        if data[4] == "Filtered": style = "swagger_filtered"
+        report.write("all", data, style)
     except Exception as e: logger.error(f"写入 '所有API' sheet页失败: {e}")
 
-# -------------------------- 修改：发送请求（传入自定义headers并写入表格） --------------------------
-def send_and_process_request(method, request_url, params, summary, source_url, custom_headers):
+# -------------------------- 修改：发送请求（在工作线程中执行，返回待写入表格的行） --------------------------
+def call_api(method, request_url, params, summary, source_url, custom_headers):
     # 传入自定义headers到http_req
     response = http_req(
         request_url, 
@@ -229,29 +391,53 @@ def send_and_process_request(method, request_url, params, summary, source_url, c
         json=params.get('body') if method.lower() == 'post' and params.get('body') else None,
         params=params.get('query') if method.lower() == 'post' and not params.get('body') else params.get('query')
     )
-    if response is not None:
-        params_for_output = json.dumps(params, ensure_ascii=False, separators=(',', ':'))
-        headers_for_output = json.dumps(custom_headers, ensure_ascii=False, separators=(',', ':'))  # 格式化headers为字符串
-        resp_text_for_output = ""
-        try:
-            resp_json = response.json(); resp_text_for_output = json.dumps(resp_json, ensure_ascii=False, separators=(',', ':'))
-        except json.JSONDecodeError:
-            content_type = response.headers.get('Content-Type', 'unknown').lower(); text_content = response.text
-            safe_text_types = ['text/html', 'text/plain', 'application/xml', 'text/xml', 'application/javascript']
-            is_text_safe = any(t in content_type for t in safe_text_types)
-            if text_content.startswith('PK'):
-                resp_text_for_output = f"[二进制内容: 检测到ZIP文件头(PK), Content-Type: {content_type}]"
-            elif not is_text_safe:
-                resp_text_for_output = f"[非文本内容, Content-Type: {content_type}]"
-            else:
-                resp_text_for_output = text_content.replace('\n', ' ').replace('\r', '')
-        if 200 <= response.status_code < 300: 
-            logger.success(f"成功 ({response.status_code}) on [{method.upper()}] {request_url}")
-        else: 
-            logger.warning(f"失败 ({response.status_code}) on [{method.upper()}] {request_url}")
-        
-        # 将所有被调用的API都写入表格，无论状态码如何
-        output_to_xlsx_called([source_url, method.upper(), request_url, summary, params_for_output, headers_for_output, response.status_code, resp_text_for_output[:32767]])
+    if response is None: return None
+    params_for_output = json.dumps(params, ensure_ascii=False, separators=(',', ':'))
+    headers_for_output = json.dumps(custom_headers, ensure_ascii=False, separators=(',', ':'))  # 格式化headers为字符串
+    resp_text_for_output = ""
+    try:
+        resp_json = response.json(); resp_text_for_output = json.dumps(resp_json, ensure_ascii=False, separators=(',', ':'))
+    except json.JSONDecodeError:
+        content_type = response.headers.get('Content-Type', 'unknown').lower(); text_content = response.text
+        safe_text_types = ['text/html', 'text/plain', 'application/xml', 'text/xml', 'application/javascript']
+        is_text_safe = any(t in content_type for t in safe_text_types)
+        if text_content.startswith('PK'):
+            resp_text_for_output = f"[二进制内容: 检测到ZIP文件头(PK), Content-Type: {content_type}]"
+        elif not is_text_safe:
+            resp_text_for_output = f"[非文本内容, Content-Type: {content_type}]"
+        else:
+            resp_text_for_output = text_content.replace('\n', ' ').replace('\r', '')
+    if 200 <= response.status_code < 300: 
+        logger.success(f"成功 ({response.status_code}) on [{method.upper()}] {request_url}")
+    else: 
+        logger.warning(f"失败 ({response.status_code}) on [{method.upper()}] {request_url}")
+    
+    # 将所有被调用的API都写入表格，无论状态码如何
+    return [source_url, method.upper(), request_url, summary, params_for_output, headers_for_output, response.status_code, resp_text_for_output]
+
+def send_and_process_request(method, request_url, params, summary, source_url, custom_headers):
+    row = call_api(method, request_url, params, summary, source_url, custom_headers)
+    if row is not None: output_to_xlsx_called(row)
+
+# -------------------------- 新增：并发调用接口，表格只在主线程中按接口顺序写入 --------------------------
+def exercise_operations(operations, args):
+    """
+    并发调用API文档中的接口
+    :param operations: 逐个产生 (请求方法, 请求URL, 请求参数, 接口摘要, 源API文档) 的可迭代对象，过滤在生成时完成
+    :param args: 命令行参数，使用其中的 custom_headers 与 threads
+    """
+    workers = max(1, getattr(args, 'threads', None) or MAX_WORKERS)
+    with ThreadPoolExecutor(workers) as pool:
+        # 进行中的请求数有上限，接口很多时不会一次性生成全部请求
+        pending = deque()
+        for operation in operations:
+            pending.append(pool.submit(call_api, *operation, args.custom_headers))
+            while len(pending) >= workers * 2 or (pending and pending[0].done()):
+                row = pending.popleft().result()
+                if row is not None: output_to_xlsx_called(row)
+        while pending:
+            row = pending.popleft().result()
+            if row is not None: output_to_xlsx_called(row)
 
 # -------------------------- 路径清洗工具函数（保留原功能） --------------------------
 def clean_path_components(custom_prefix, parsed_path):
@@ -290,6 +476,9 @@ def parse_and_scan_v2_v3(data, source_url, args):
     definitions = data.get('components', {}).get('schemas', {}) if is_v3 else data.get('definitions', {}); paths = data.get('paths', {})
     if not paths: logger.warning("未在API文档中发现路径."); return
     logger.info(f"发现 {len(paths)} 个路径待测试.")
+    exercise_operations(iter_operations_v2_v3(paths, definitions, is_v3, domain, base_path, source_url, args), args)
+
+def iter_operations_v2_v3(paths, definitions, is_v3, domain, base_path, source_url, args):
     for path, methods in paths.items():
         for method, details in methods.items():
             summary = details.get('summary', '无摘要'); temp_params = fill_parameters(details.get('parameters', [])); final_path = path
@@ -326,12 +515,14 @@ def parse_and_scan_v2_v3(data, source_url, args):
                             for p, d in definitions[ref_name].get('properties', {}).items(): param_definitions.append({'name': p, 'in': 'body', 'type': d.get('type')})
             params = fill_parameters(param_definitions)
             logger.info(f"测试中: [{method.upper()}] {summary} -> {request_url}")
-            # 传入自定义headers到请求函数
-            send_and_process_request(method, request_url, params, summary, source_url, args.custom_headers)
+            yield method, request_url, params, summary, source_url
 
 # -------------------------- 修改：V1 解析逻辑（传入自定义headers） --------------------------
 def parse_and_scan_v1(data, source_url, args):
     logger.info(f"处理 Swagger 1.x 资源列表: {source_url}")
+    exercise_operations(iter_operations_v1(data, source_url, args), args)
+
+def iter_operations_v1(data, source_url, args):
     doc_url_parsed = urlparse(source_url); domain = f"{doc_url_parsed.scheme}://{doc_url_parsed.netloc}"
     base_url_for_discovery = data.get('basePath', source_url)
     for api in data.get('apis', []):
@@ -339,7 +530,7 @@ def parse_and_scan_v1(data, source_url, args):
         if not api_path: continue
         declaration_url = urljoin(base_url_for_discovery, api_path.lstrip('/')); logger.info(f"获取V1 API声明从: {declaration_url}");
         # 声明URL请求也携带自定义headers
-        decl_res = http_req(declaration_url, custom_headers=args.custom_headers)
+        decl_res = fetch_doc(declaration_url, custom_headers=args.custom_headers)
         if not decl_res: continue
         try:
             decl_data = decl_res.json(); api_base_path = urlparse(decl_data.get('basePath', '/')).path
@@ -365,14 +556,13 @@ def parse_and_scan_v1(data, source_url, args):
                     output_to_xlsx_all([source_url, method.upper(), request_url, summary, "Called"])
                     params = fill_parameters(param_definitions)
                     logger.info(f"测试中: [{method.upper()}] {summary} -> {request_url}")
-                    # 传入自定义headers到请求函数
-                    send_and_process_request(method, request_url, params, summary, source_url, args.custom_headers)
+                    yield method, request_url, params, summary, source_url
         except (json.JSONDecodeError, AttributeError): logger.error(f"解析或处理V1 API声明失败: {declaration_url}")
 
 def check_url_type(url, custom_headers):
     logger.info(f"检查URL类型: {url}"); 
     # 检查URL时也携带自定义headers
-    res = http_req(url, custom_headers=custom_headers)
+    res = fetch_doc(url, custom_headers=custom_headers)
     if not res: return None, None
     text = res.text; data = None
     try: data = res.json()
@@ -391,14 +581,116 @@ def check_url_type(url, custom_headers):
         else: return "html", text
     logger.warning(f"无法确定URL类型: {url}"); return None, None
 
-# -------------------------- 修改：HTML解析（传入自定义headers） --------------------------
-def go_swagger_html(url, args):
-    logger.info(f"检测到HTML页面. 激活Selenium...")
-    # 传入自定义headers到Selenium
-    html_content = get_dynamic_html_with_selenium(url, args.custom_headers)
-    if not html_content: logger.error(f"获取动态HTML失败 {url}. 中止HTML解析."); return
-    api_doc_urls = find_api_docs_aggressively(url, html_content)
+# -------------------------- 新增：不依赖浏览器的 swagger-ui 静态发现 --------------------------
+def probe_api_doc(url, custom_headers):
+    """
+    探测候选地址是否为API文档
+    :return: ("spec" | "resources" | "config", 解析后的JSON)，不是API文档时为 (None, None)
+    """
+    res = fetch_doc(url, custom_headers=custom_headers)
+    if not res or res.status_code != 200: return None, None
+    try: data = res.json()
+    except (ValueError, AttributeError): return None, None
+    if isinstance(data, dict):
+        if ('openapi' in data or 'swagger' in data) and ('paths' in data or 'apis' in data): return "spec", data
+        if 'url' in data or 'urls' in data: return "config", data
+    elif isinstance(data, list) and data and isinstance(data[0], dict) and ('location' in data[0] or 'url' in data[0]):
+        return "resources", data
+    return None, None
+
+def extract_spec_hints(page_url, text):
+    hints = []
+    for pattern in SPEC_HINT_PATTERNS:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            match = match.strip()
+            if match and len(match) > 1 and 'petstore' not in match and not match.startswith(('javascript:', 'data:', '#')):
+                hints.append(urljoin(page_url, match))
+    return hints
+
+def probe_candidates(candidates, custom_headers, workers=MAX_WORKERS):
+    """并发探测候选地址，返回与 candidates 顺序一致的 (地址, 类型, 数据) 列表"""
+    candidates = list(dict.fromkeys(candidates))
+    if not candidates: return []
+    with ThreadPoolExecutor(min(workers, len(candidates))) as pool:
+        results = list(pool.map(lambda url: probe_api_doc(url, custom_headers), candidates))
+    return [(url, doc_type, data) for url, (doc_type, data) in zip(candidates, results)]
+
+def resolve_api_docs(candidates, custom_headers):
+    """探测候选地址，swagger-config 中的 url/urls 再探测一轮，返回API文档与 swagger-resources 地址"""
+    found = []; configs = []
+    for url, doc_type, data in probe_candidates(candidates, custom_headers):
+        if doc_type in ("spec", "resources"): found.append(url)
+        elif doc_type == "config":
+            entries = ([{'url': data['url']}] if data.get('url') else []) + [u for u in data.get('urls') or [] if isinstance(u, dict)]
+            configs += [urljoin(url, entry['url']) for entry in entries if entry.get('url')]
+    for url, doc_type, data in probe_candidates([u for u in configs if u not in found], custom_headers):
+        if doc_type in ("spec", "resources"): found.append(url)
+    return list(dict.fromkeys(found))
+
+def discover_api_docs(page_url, html_content, custom_headers):
+    """
+    从 swagger-ui 页面静态发现API文档地址
+    依次使用: URL中的 configUrl/url 参数；页面与引导脚本(swagger-initializer.js 等)中的 SwaggerUIBundle 配置、
+    springfox/knife4j 的 swagger-resources 与 v2/api-docs?group= 地址；最后按目录逐级探测标准路径。候选地址并发探测。
+    """
+    parsed = urlparse(page_url)
+    logger.info("阶段 1: 检查URL查询参数与页面中的swagger-ui配置...")
+    candidates = []
+    query_params = parse_qs(parsed.query)
+    for key in ['configUrl', 'url', 'urls.primaryName']:
+        if key in query_params: candidates.append(urljoin(page_url, query_params[key][0]))
+    candidates += extract_spec_hints(page_url, html_content)
+
+    scripts = []
+    for src in re.findall(SCRIPT_SRC_PATTERN, html_content, re.IGNORECASE):
+        name = urlparse(src).path.rsplit('/', 1)[-1].lower()
+        if any(k in name for k in BOOTSTRAP_SCRIPT_KEYWORDS) and not any(k in name for k in LIBRARY_SCRIPT_KEYWORDS):
+            scripts.append(urljoin(page_url, src))
+    texts = [html_content]
+    if scripts:
+        logger.info(f"下载 {len(scripts)} 个swagger-ui引导脚本进行分析...")
+        with ThreadPoolExecutor(min(MAX_WORKERS, len(scripts))) as pool:
+            for res in pool.map(lambda url: fetch_doc(url, custom_headers=custom_headers), scripts):
+                if res is not None and res.status_code == 200: texts.append(res.text)
+    # 脚本中的相对地址由 swagger-ui 在页面中请求，按页面地址解析
+    for text in texts[1:]: candidates += extract_spec_hints(page_url, text)
+    page_base = urljoin(page_url, './')
+    for keyword, paths in FRAMEWORK_HINTS.items():
+        if any(keyword in text.lower() for text in texts) or any(keyword in url.lower() for url in [page_url] + scripts):
+            for path in paths:
+                candidates += [urljoin(page_base, path), urljoin(f"{parsed.scheme}://{parsed.netloc}/", path)]
+
+    found = resolve_api_docs(candidates, custom_headers)
+    if found:
+        logger.success(f"静态解析成功, 发现 {len(found)} 个API文档入口."); return found
+
+    logger.warning("页面中未发现API文档配置, 启动阶段 2: 逐级回溯探测...")
+    path_parts = parsed.path.strip('/').split('/')
+    if path_parts and '.' in path_parts[-1]: path_parts = path_parts[:-1]
+    base_url_root = f"{parsed.scheme}://{parsed.netloc}/"
+    probe_bases = sorted({urljoin(base_url_root, '/'.join(path_parts[:i]) + '/') for i in range(len(path_parts), -1, -1)},
+                         key=len, reverse=True)
+    probes = [urljoin(base, path.lstrip('/')) for base in probe_bases for path in STANDARD_DOC_PATHS]
+    # 并发探测，按原有的优先顺序取第一个
+    for url, doc_type, data in probe_candidates(probes, custom_headers):
+        if doc_type in ("spec", "resources"):
+            logger.success(f"探测成功! 发现API定义入口: {url}"); return [url]
+    return []
+
+# -------------------------- 修改：HTML解析（静态发现，Selenium仅作为显式指定的备用手段） --------------------------
+def go_swagger_html(url, html_content, args):
+    host = urlparse(url).netloc
+    if host in _discovered_docs:
+        logger.info(f"主机 {host} 的API文档已发现并处理过: {', '.join(_discovered_docs[host])}"); return
+    logger.info(f"检测到HTML页面. 静态解析swagger-ui配置...")
+    api_doc_urls = discover_api_docs(url, html_content, args.custom_headers)
+    if not api_doc_urls and getattr(args, 'selenium', False):
+        logger.warning("静态发现失败, 激活Selenium...")
+        # 传入自定义headers到Selenium
+        rendered_html = get_dynamic_html_with_selenium(url, args.custom_headers)
+        if rendered_html: api_doc_urls = find_api_docs_aggressively(url, rendered_html)
     if api_doc_urls:
+        _discovered_docs[host] = api_doc_urls
         logger.success(f"从HTML页面共发现 {len(api_doc_urls)} 个API文档入口.")
         for doc_url in api_doc_urls:
             logger.info(f"--- 开始处理入口: {doc_url} ---"); run(doc_url, args)
@@ -419,7 +711,7 @@ def run(target_url, args):
     if url_type == "api_docs_v2_v3": parse_and_scan_v2_v3(data, target_url, args)
     elif url_type == "resource_v1": parse_and_scan_v1(data, target_url, args)
     elif url_type == "resource_v2": go_resources(data, target_url, args)
-    elif url_type == "html": go_swagger_html(target_url, args)
+    elif url_type == "html": go_swagger_html(target_url, data, args)
     else: logger.error(f"URL {target_url} 不支持或处理失败.")
 
 def find_api_docs_aggressively(base_url, html_content):
@@ -431,7 +723,7 @@ def find_api_docs_aggressively(base_url, html_content):
         if key in query_params:
             config_path = query_params[key][0]; config_url = urljoin(base_url, config_path)
             logger.success(f"在URL参数 '{key}' 中直接发现配置URL: {config_url}")
-            res = http_req(config_url)
+            res = fetch_doc(config_url)
             if res and res.status_code == 200:
                 try:
                     config_data = res.json()
@@ -468,7 +760,7 @@ def find_api_docs_aggressively(base_url, html_content):
             probe_url = urljoin(base, path.lstrip('/'))
             if probe_url in found_urls: continue
             logger.info(f"探测中 -> {probe_url}")
-            res = http_req(probe_url)
+            res = fetch_doc(probe_url)
             if res and res.status_code == 200:
                 try:
                     res.json(); logger.success(f"探测成功! 发现API定义入口: {probe_url}"); found_urls.add(probe_url)
@@ -487,6 +779,11 @@ if __name__ == '__main__':
     # -------------------------- 新增：自定义headers参数 --------------------------
     parser.add_argument('-H', '--header', dest='header_list', 
                         action='append', default=[], help='自定义HTTP请求头（支持多个，格式：key:value）。示例：-H token:123456 -H "User-Agent:MyAgent"')
+    parser.add_argument('-t', '--threads', dest='threads', type=int, default=MAX_WORKERS,
+                        help=f'并发调用接口的线程数（默认 {MAX_WORKERS}），同一主机同时最多 {HOST_CONCURRENCY} 个请求')
+    parser.add_argument('--sidecar', dest='sidecar', choices=['jsonl', 'csv', 'none'], default='jsonl',
+                        help='与Excel报告一同输出的结果文件格式（默认 jsonl）')
+    parser.add_argument('--selenium', action='store_true', help='静态解析swagger-ui页面未发现API文档时，使用Selenium渲染页面后再查找')
     args = parser.parse_args()
     
     # -------------------------- 解析自定义headers并挂载到args --------------------------
@@ -495,18 +792,13 @@ if __name__ == '__main__':
 # -------------------------- 保存Excel文件的函数 --------------------------
 def save_workbook(base_name="ScanReport"):
     try:
-        logger.info("正在进行最后的格式美化，请稍候...")
-        auto_adjust_column_width(ws_all_apis); auto_adjust_column_width(ws_called_apis); auto_adjust_column_width(ws_filtered_apis)
-        now_time = datetime.now(); filename_time = now_time.strftime("%Y%m%d%H%M")
-        output_filename = f'{filename_time}_{base_name}.xlsx'
-        workbook.save(output_filename)
+        output_filename = report.save(base_name)
         logger.success(f"所有任务完成. 报告已保存至 {output_filename}")
         return output_filename
     except Exception as e:
         logger.error(f"保存Excel文件失败: {e}")
         return None
 
-
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Swagger/OpenAPI通用扫描工具（支持自定义路径前缀+自定义headers）")
     parser.add_argument('-u', '--url', dest='target_url', help='swagger-ui, api-docs, 或 swagger-resources 的URL')
@@ -518,13 +810,18 @@ if __name__ == '__main__':
     # -------------------------- 新增：自定义headers参数 --------------------------
     parser.add_argument('-H', '--header', dest='header_list', 
                         action='append', default=[], help='自定义HTTP请求头（支持多个，格式：key:value）。示例：-H token:123456 -H "User-Agent:MyAgent"')
+    parser.add_argument('-t', '--threads', dest='threads', type=int, default=MAX_WORKERS,
+                        help=f'并发调用接口的线程数（默认 {MAX_WORKERS}），同一主机同时最多 {HOST_CONCURRENCY} 个请求')
+    parser.add_argument('--sidecar', dest='sidecar', choices=['jsonl', 'csv', 'none'], default='jsonl',
+                        help='与Excel报告一同输出的结果文件格式（默认 jsonl）')
+    parser.add_argument('--selenium', action='store_true', help='静态解析swagger-ui页面未发现API文档时，使用Selenium渲染页面后再查找')
     args = parser.parse_args()
     
     # -------------------------- 解析自定义headers并挂载到args --------------------------
     args.custom_headers = parse_custom_headers(args.header_list)
     
     if args.debug: logger.add(sys.stderr, level="DEBUG")
-    setup_xlsx_headers()
+    setup_xlsx_headers(args.sidecar)
     try:
         if args.target_url: run(args.target_url, args)
         elif args.url_file:
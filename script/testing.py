@@ -20,16 +20,31 @@
 
 import unittest
 
+from tests.connection.test_cache import TestResponseCache  # noqa: F401
 from tests.connection.test_dns import TestDNS  # noqa: F401
+from tests.connection.test_transport import TestTransport  # noqa: F401
+from tests.core.test_logger import TestLogger  # noqa: F401
+from tests.core.test_pipeline import TestEventBus  # noqa: F401
+from tests.core.test_session import TestSessionJournal  # noqa: F401
+from tests.core.test_wordlist_cache import TestWordlistCache  # noqa: F401
+from tests.ehole.test_finger import TestFavicon, TestFingerprintEngine, TestKeywordAutomaton  # noqa: F401
+from tests.packer_fuzzer.test_api_extractor import TestApiExtractor  # noqa: F401
+from tests.packer_fuzzer.test_beauty_js import TestBeautifyFile, TestRewriteJs  # noqa: F401
+from tests.packer_fuzzer.test_chunk_map import TestChunkMap  # noqa: F401
+from tests.packer_fuzzer.test_database import TestDatabaseType  # noqa: F401
+from tests.packer_fuzzer.test_probe_client import TestProbeClient  # noqa: F401
+from tests.packer_fuzzer.test_scheduler import TestTestScheduler  # noqa: F401
 from tests.parse.test_headers import TestHeadersParser  # noqa: F401
 from tests.parse.test_url import TestURLParsers  # noqa: F401
 from tests.reports.test_reports import TestReports  # noqa: F401
+from tests.test_pass403_optimized import TestAdaptiveBypass  # noqa: F401
 from tests.utils.test_common import TestCommonUtils  # noqa: F401
 from tests.utils.test_crawl import TestCrawl  # noqa: F401
 from tests.utils.test_diff import TestDiff  # noqa: F401
 from tests.utils.test_mimetype import TestMimeTypeUtils  # noqa: F401
 from tests.utils.test_random import TestRandom  # noqa: F401
 from tests.utils.test_schemedet import TestSchemedet  # noqa: F401
+from tests.view.test_terminal import TestOutput  # noqa: F401
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+import os
+import tempfile
+import threading
+import time
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.connection.cache import CachedResponse, ResponseCache
+
+URL = "http://example.com/app.js"
+
+
+class FakeResponse:
+    def __init__(self, content=b"console.log(1)", status_code=200):
+        self.url = URL
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/javascript; charset=utf-8"}
+        self.content = content
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "responses.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_and_get(self):
+        cache = ResponseCache(self.path)
+        cache.put("GET", URL, 200, {"Content-Type": "text/plain; charset=gbk"}, "中文".encode("gbk"))
+
+        response = cache.get("get", URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "中文")
+        self.assertIsNone(cache.get("POST", URL))
+
+    def test_key_depends_only_on_relevant_headers(self):
+        key = ResponseCache.key("GET", URL, {"User-Agent": "a", "Cookie": "sid=1"})
+
+        self.assertEqual(key, ResponseCache.key("GET", URL, {"user-agent": "b", "cookie": "sid=1"}))
+        self.assertNotEqual(key, ResponseCache.key("GET", URL, {"Cookie": "sid=2"}))
+        self.assertNotEqual(key, ResponseCache.key("GET", URL))
+
+    def test_expired_entries_are_ignored(self):
+        cache = ResponseCache(self.path, ttl=60)
+        cache.put("GET", URL, 200, {}, b"old")
+
+        with patch("lib.connection.cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("GET", URL))
+
+    def test_transient_errors_are_not_cached(self):
+        cache = ResponseCache(self.path)
+        cache.put("GET", URL, 503, {}, b"busy")
+
+        self.assertIsNone(cache.get("GET", URL))
+
+    def test_eviction_keeps_recently_used_entries(self):
+        cache = ResponseCache(self.path, max_size=100 * 1024)
+        for i in range(20):
+            cache.put("GET", f"{URL}?{i}", 200, {}, os.urandom(8 * 1024))
+            time.sleep(0.001)
+
+        self.assertIsNone(cache.get("GET", f"{URL}?0"))
+        self.assertIsNotNone(cache.get("GET", f"{URL}?19"))
+        self.assertLessEqual(cache._size, 100 * 1024)
+
+    def test_concurrent_fetches_are_coalesced(self):
+        cache = ResponseCache(self.path)
+        calls = []
+        started = threading.Event()
+
+        def fetcher():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return FakeResponse()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.fetch("GET", URL, fetcher, stage="js")))
+            for _ in range(8)
+        ]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({response.content for response in results}, {b"console.log(1)"})
+
+        # 之后的请求直接命中磁盘缓存
+        cache.fetch("GET", URL, fetcher, stage="js")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["js"], {"requests": 9, "hits": 8, "bytes_saved": 8 * 14})
+
+    def test_failed_fetch_is_not_cached(self):
+        cache = ResponseCache(self.path)
+
+        def fetcher():
+            raise ConnectionError("down")
+
+        with self.assertRaises(ConnectionError):
+            cache.fetch("GET", URL, fetcher)
+
+        response = cache.fetch("GET", URL, FakeResponse)
+        self.assertEqual(response.content, b"console.log(1)")
+
+    def test_stats_are_shared_between_instances_of_a_run(self):
+        first = ResponseCache(self.path, run="scan")
+        second = ResponseCache(self.path, run="scan")
+        first.fetch("GET", URL, FakeResponse, stage="jsfind")
+        second.fetch("GET", URL, FakeResponse, stage="packer_fuzzer")
+        second.save_stats()
+
+        stats = first.stats()
+        self.assertEqual(stats["jsfind"]["hits"], 0)
+        self.assertEqual(stats["packer_fuzzer"]["hits"], 1)
+
+    def test_cached_response_truthiness(self):
+        self.assertTrue(CachedResponse(URL, 200, {}, b""))
+        self.assertFalse(CachedResponse(URL, 404, {}, b""))
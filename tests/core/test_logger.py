@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+import json
+import logging
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.core.logger import JSONFormatter, LogWriter, RateLimitFilter
+
+
+def make_record(level, msg, *args, exc_info=None, **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLogger(TestCase):
+    def test_json_formatter_writes_extra_fields(self):
+        try:
+            raise ValueError("boom")
+        except ValueError as e:
+            record = make_record(
+                logging.ERROR, "Request failed: %s", "http://example.com/",
+                exc_info=(type(e), e, e.__traceback__), event="request_error", status=500,
+            )
+
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry["message"], "Request failed: http://example.com/")
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["event"], "request_error")
+        self.assertEqual(entry["status"], 500)
+        self.assertIn("ValueError: boom", entry["exc"])
+
+    def test_rate_limit_counts_suppressed_records(self):
+        log_filter = RateLimitFilter(limit=3, window=60)
+
+        with patch("lib.core.logger.time.monotonic", return_value=0):
+            passed = [log_filter.filter(make_record(logging.ERROR, "failed: %s", i)) for i in range(10)]
+            # 信息日志和不同的消息模板不受影响
+            self.assertTrue(log_filter.filter(make_record(logging.INFO, "failed: %s", 0)))
+            self.assertTrue(log_filter.filter(make_record(logging.ERROR, "other")))
+
+        self.assertEqual(passed, [True] * 3 + [False] * 7)
+
+        with patch("lib.core.logger.time.monotonic", return_value=61):
+            record = make_record(logging.ERROR, "failed: %s", 10)
+            self.assertTrue(log_filter.filter(record))
+
+        self.assertEqual(record.suppressed, 7)
+
+    def test_log_event_builds_record_in_writer(self):
+        record = LogWriter.to_record(
+            (0.5, "Thread-3", logging.INFO, '"%s %s" %s', ("GET", "http://example.com/", 200), None,
+             {"event": "request", "status": 200})
+        )
+
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry["message"], '"GET http://example.com/" 200')
+        self.assertEqual(entry["thread"], "Thread-3")
+        self.assertEqual(entry["event"], "request")
+        self.assertEqual(entry["status"], 200)
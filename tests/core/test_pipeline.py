@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+import threading
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.core.pipeline import EventBus, FORBIDDEN, PATH_FOUND, TARGET
+
+
+class TestEventBus(TestCase):
+    def test_events_reach_subscribers_in_order(self):
+        bus = EventBus()
+        forbidden, paths, finished = [], [], []
+        bus.add_stage("forbidden", (FORBIDDEN,), lambda event: forbidden.append(event.data))
+        bus.add_stage(
+            "paths", (PATH_FOUND, FORBIDDEN), lambda event: paths.append(event.type),
+            finish=lambda: finished.append(True),
+        )
+        bus.start()
+
+        for i in range(100):
+            bus.publish(FORBIDDEN, i)
+        bus.publish(PATH_FOUND, "admin")
+        bus.publish(TARGET, "http://example.com/")
+        bus.close()
+
+        self.assertEqual(forbidden, list(range(100)))
+        self.assertEqual(paths, [FORBIDDEN] * 100 + [PATH_FOUND])
+        self.assertEqual(finished, [True])
+        self.assertFalse(bus.has_subscribers(TARGET))
+
+    def test_close_lets_earlier_stages_feed_later_ones(self):
+        bus = EventBus()
+        received = []
+        bus.add_stage("producer", (TARGET,), lambda event: bus.publish(FORBIDDEN, event.data))
+        bus.add_stage("consumer", (FORBIDDEN,), lambda event: received.append(event.data))
+        bus.start()
+
+        bus.publish(TARGET, "http://example.com/")
+        bus.close()
+
+        self.assertEqual(received, ["http://example.com/"])
+
+    def test_publish_blocks_when_queue_is_full(self):
+        bus = EventBus()
+        release = threading.Event()
+        bus.add_stage("slow", (FORBIDDEN,), lambda event: release.wait(), maxsize=1)
+        bus.start()
+
+        # 第一个事件被处理中，第二个占满队列，第三个应当阻塞
+        bus.publish(FORBIDDEN, 1)
+        bus.publish(FORBIDDEN, 2)
+        publisher = threading.Thread(target=bus.publish, args=(FORBIDDEN, 3))
+        publisher.start()
+        publisher.join(0.2)
+        self.assertTrue(publisher.is_alive())
+
+        release.set()
+        publisher.join(1)
+        self.assertFalse(publisher.is_alive())
+        bus.close()
+
+    def test_handler_errors_do_not_stop_stage(self):
+        bus = EventBus()
+        received = []
+
+        def handler(event):
+            if event.data == 1:
+                raise ValueError("boom")
+            received.append(event.data)
+
+        bus.add_stage("flaky", (FORBIDDEN,), handler)
+        bus.start()
+
+        with patch("lib.core.pipeline.output") as output:
+            for i in range(3):
+                bus.publish(FORBIDDEN, i)
+            bus.close()
+
+        self.assertEqual(received, [0, 2])
+        output.error.assert_called_once()
+
+    def test_tick_runs_while_queue_is_idle(self):
+        bus = EventBus()
+        ticked = threading.Event()
+        bus.add_stage("timer", (FORBIDDEN,), lambda event: None, tick=ticked.set, interval=0.05)
+        bus.start()
+
+        bus.publish(FORBIDDEN, 1)
+        self.assertTrue(ticked.wait(1))
+        bus.close()
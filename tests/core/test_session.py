@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+import os
+import shutil
+import tempfile
+import threading
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.core.exceptions import UnpicklingError
+from lib.core.session import (
+    Result,
+    SessionJournal,
+    is_session_journal,
+    load_session,
+    wordlist_identity,
+)
+
+
+class TestSessionJournal(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "scan.session")
+        self.state = {"targets": ["http://example.com/"], "directories": [""], "cursor": 0,
+                      "jobs": 0, "errors": 0, "elapsed": 0.0}
+        self.options = {"urls": ["http://example.com/"], "extensions": ("php",), "recursion_status_codes": {200}}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def open_journal(self, **kwargs):
+        journal = SessionJournal(self.path)
+        journal.open(
+            {"wordlists": [], "size": 10, "report": None, "options": self.options},
+            lambda: dict(self.state),
+            **kwargs,
+        )
+        return journal
+
+    def test_records_are_replayed(self):
+        journal = self.open_journal(results=[Result("http://example.com/a", 200, 5, "text/html", "")])
+        self.assertTrue(journal.add_result(Result("http://example.com/b", 403, 0, "unknown", "")))
+        self.assertFalse(journal.add_result(Result("http://example.com/a", 200, 5, "text/html", "")))
+        journal.record("passed", "http://example.com/admin/")
+        journal.record("fingerprint", ["http://example.com/", {"cms": ["nginx"], "status": 200}])
+        self.state.update(cursor=7, directories=["", "admin/"])
+        journal.close()
+
+        self.assertTrue(is_session_journal(self.path))
+        session = load_session(self.path)
+        self.assertEqual(session.options, self.options)
+        self.assertEqual([result.url for result in session.results],
+                         ["http://example.com/a", "http://example.com/b"])
+        self.assertEqual(session.passed_urls, {"http://example.com/admin/"})
+        self.assertEqual(session.fingerprints["http://example.com/"]["cms"], ["nginx"])
+        self.assertEqual(session.state["cursor"], 7)
+        self.assertEqual(session.state["directories"], ["", "admin/"])
+
+    def test_truncated_tail_is_ignored(self):
+        journal = self.open_journal()
+        self.state["cursor"] = 3
+        journal.flush()
+        journal.close()
+
+        with open(self.path, "a") as fd:
+            fd.write('["state",{"cursor":')
+
+        self.assertEqual(load_session(self.path).state["cursor"], 3)
+
+    def test_compaction_keeps_records(self):
+        with patch("lib.core.session.SESSION_COMPACT_SIZE", 500):
+            journal = self.open_journal()
+            journal.add_result(Result("http://example.com/a", 200, 5, "text/html", ""))
+            for cursor in range(1, 50):
+                self.state["cursor"] = cursor
+                journal.flush()
+            journal.close()
+
+        with open(self.path) as fd:
+            self.assertLess(len(fd.readlines()), 20)
+
+        session = load_session(self.path)
+        self.assertEqual(session.state["cursor"], 49)
+        self.assertEqual(len(session.results), 1)
+
+    def test_checkpoint_errors_do_not_stop_flushing(self):
+        flushed = threading.Event()
+        calls = []
+
+        def flush():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ValueError("not serializable")
+            flushed.set()
+
+        with patch("lib.core.session.SESSION_FLUSH_INTERVAL", 0.01), \
+                patch("lib.core.session.log_event") as log_event:
+            journal = self.open_journal()
+            with patch.object(journal, "flush", side_effect=flush):
+                self.assertTrue(flushed.wait(1))
+            journal.close()
+
+        log_event.assert_called_once()
+        self.assertEqual(log_event.call_args.kwargs["event"], "session_error")
+
+    def test_save_moves_journal(self):
+        journal = self.open_journal()
+        journal.add_result(Result("http://example.com/a", 200, 5, "text/html", ""))
+        saved = os.path.join(self.directory, "saved.session")
+        journal.save(saved)
+        journal.close()
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(len(load_session(saved).results), 1)
+
+    def test_close_removes_journal(self):
+        self.open_journal().close(remove=True)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_invalid_session(self):
+        with open(self.path, "w") as fd:
+            fd.write('{"format": "other"}\n')
+
+        with self.assertRaises(UnpicklingError):
+            load_session(self.path)
+
+    def test_wordlist_identity_changes(self):
+        wordlist = os.path.join(self.directory, "words.txt")
+        with open(wordlist, "w") as fd:
+            fd.write("admin\n")
+        identity = wordlist_identity([wordlist])
+
+        with open(wordlist, "a") as fd:
+            fd.write("login\n")
+        self.assertNotEqual(wordlist_identity([wordlist]), identity)
+
+    def test_result_digest(self):
+        journal = self.open_journal()
+        journal.add_result(Result("http://example.com/a", 200, 5, "text/html", "", "0123456789abcdef"))
+        journal.close()
+
+        # 旧会话中的结果记录没有摘要
+        with open(self.path, "a") as fd:
+            fd.write('["result", ["http://example.com/b", 200, 5, "text/html", ""]]\n')
+
+        results = load_session(self.path).results
+        self.assertEqual([result.digest for result in results], ["0123456789abcdef", None])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.core.data import options
+from lib.core.dictionary import Dictionary
+from lib.core.wordlist_cache import CompiledWordlist, cache_key, compile_wordlist
+
+
+class TestWordlistCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.wordlist = os.path.join(self.directory, "words.txt")
+        with open(self.wordlist, "w") as fd:
+            fd.write("admin\nindex.%EXT%\n# comment\nstatic/\nréservé\n")
+
+        self.patches = [
+            patch("lib.core.wordlist_cache.WORDLIST_CACHE_PATH", os.path.join(self.directory, "cache")),
+            patch.dict(options, {"extensions": ("php", "jsp"), "wordlist_cache": True}),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in reversed(self.patches):
+            patcher.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_compiled_wordlist_matches_generated(self):
+        with patch.dict(options, {"wordlist_cache": False}):
+            expected = list(Dictionary(files=[self.wordlist]))
+
+        # 第一次生成并写入缓存，第二次直接映射缓存
+        for _ in range(2):
+            dictionary = Dictionary(files=[self.wordlist])
+            self.assertIsInstance(dictionary._items, CompiledWordlist)
+            self.assertEqual(list(dictionary), expected)
+            self.assertEqual(len(dictionary), len(expected))
+            self.assertEqual([next(dictionary) for _ in range(len(expected))], expected)
+            self.assertRaises(StopIteration, next, dictionary)
+
+    def test_cache_key_changes(self):
+        key = cache_key([self.wordlist])
+
+        with patch.dict(options, {"extensions": ("php",)}):
+            self.assertNotEqual(cache_key([self.wordlist]), key)
+
+        with open(self.wordlist, "a") as fd:
+            fd.write("login\n")
+        self.assertNotEqual(cache_key([self.wordlist]), key)
+
+    def test_truncated_cache_is_rejected(self):
+        path = os.path.join(self.directory, "words.wordlist")
+        compile_wordlist(["admin", "login"], path)
+
+        with open(path, "r+b") as fd:
+            fd.truncate(os.path.getsize(path) - 1)
+
+        with self.assertRaises(ValueError):
+            CompiledWordlist(path)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+import random
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.connection.cache import CachedResponse
+from lib.ehole.ehole import fingerprint_root
+from lib.ehole.finger import FingerprintEngine, favicon_hash, favicon_url, mmh3_hash32
+from lib.utils import automaton
+from lib.utils.automaton import KeywordAutomaton
+
+
+def naive_match(rules, body="", title="", header="", favicon=None):
+    # EHole 的原始语义：逐条规则检查所有关键字是否都出现
+    texts = {"body": body, "title": title, "header": header}
+    names = []
+    for rule in rules:
+        if rule["method"] == "faviconhash":
+            matched = favicon is not None and str(favicon) in rule["keyword"]
+        else:
+            matched = all(keyword in texts[rule["location"]] for keyword in rule["keyword"])
+
+        if matched and rule["cms"] not in names:
+            names.append(rule["cms"])
+
+    return names
+
+
+class TestFingerprintEngine(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = FingerprintEngine.from_file()
+        cls.rules = cls.engine.rules
+
+    def test_every_rule_matches(self):
+        for rule in self.rules:
+            if rule["method"] == "faviconhash":
+                names = self.engine.match(favicon=int(rule["keyword"][0]))
+            else:
+                text = "<x>" + "</x><x>".join(rule["keyword"]) + "</x>"
+                names = self.engine.match(**{rule["location"]: text})
+
+            self.assertIn(rule["cms"], names, f"Rule not matched: {rule}")
+
+    def test_parity_with_naive_matcher(self):
+        keywords = [
+            keyword for rule in self.rules if rule["method"] == "keyword"
+            for keyword in rule["keyword"]
+        ]
+        rng = random.Random(0)
+
+        for _ in range(200):
+            body = " ".join(rng.sample(keywords, 8))
+            title = " ".join(rng.sample(keywords, 2))
+            header = " ".join(rng.sample(keywords, 3))
+
+            self.assertEqual(
+                self.engine.match(body=body, title=title, header=header),
+                naive_match(self.rules, body=body, title=title, header=header),
+            )
+
+    def test_rule_requires_all_keywords(self):
+        engine = FingerprintEngine([
+            {"cms": "A", "method": "keyword", "location": "body", "keyword": ["foo", "bar"]},
+        ])
+        self.assertEqual(engine.match(body="foo"), [])
+        self.assertEqual(engine.match(body="bar foo"), ["A"])
+        self.assertEqual(engine.match(title="bar foo"), [])
+
+
+class TestFavicon(TestCase):
+    def test_favicon_url(self):
+        self.assertEqual(favicon_url("http://example.com/app/"), "http://example.com/favicon.ico")
+        self.assertEqual(
+            favicon_url("http://example.com/app/", '<link href="static/logo.png" rel="shortcut icon">'),
+            "http://example.com/app/static/logo.png",
+        )
+        self.assertEqual(
+            favicon_url("http://example.com/", "<link rel=stylesheet href=a.css><link rel=icon href=/i.ico>"),
+            "http://example.com/i.ico",
+        )
+        self.assertEqual(
+            favicon_url("http://example.com/", '<link rel="icon" href="data:,">'), "http://example.com/favicon.ico"
+        )
+
+    def test_favicon_match_is_attributed_to_target(self):
+        icon = b"\x00\x00\x01\x00icon"
+        engine = FingerprintEngine([
+            {"cms": "Icon", "method": "faviconhash", "location": "body", "keyword": [str(favicon_hash(icon))]},
+        ])
+        responses = {
+            "http://example.com/": CachedResponse(
+                "http://example.com/", 200, {}, b'<title>Home</title><link rel="icon" href="/static/i.ico">'
+            ),
+            "http://example.com/static/i.ico": CachedResponse("http://example.com/static/i.ico", 200, {}, icon),
+        }
+
+        with patch("lib.ehole.ehole.fetch", side_effect=responses.__getitem__) as fetch, \
+                patch("lib.ehole.ehole.get_engine", return_value=engine):
+            results = fingerprint_root("http://example.com/")
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(list(results), ["http://example.com/"])
+        self.assertEqual(results["http://example.com/"]["cms"], ["Icon"])
+        self.assertEqual(results["http://example.com/"]["title"], "Home")
+
+
+class TestKeywordAutomaton(TestCase):
+    def test_pure_python_fallback(self):
+        with patch.object(automaton, "_ahocorasick", None):
+            matcher = KeywordAutomaton(["he", "she", "his", "hers", ""])
+            self.assertEqual(matcher.search("ushers"), {0, 1, 3})
+            self.assertEqual(matcher.search("xyz"), set())
+
+    def test_mmh3_hash32(self):
+        self.assertEqual(mmh3_hash32(b""), 0)
+        self.assertEqual(mmh3_hash32(b"foo"), -156908512)
+        self.assertEqual(mmh3_hash32(b"Hello, world!"), -1070186941)
+        self.assertEqual(mmh3_hash32(b"abcde"), -392455434)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import importlib
+import os
+import sys
+import threading
+
+PACKER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "lib", "Packer-Fuzzer"))
+
+_modules = {}
+_lock = threading.Lock()
+
+
+def _pop_lib():
+    return {name: sys.modules.pop(name) for name in list(sys.modules) if name == "lib" or name.startswith("lib.")}
+
+
+def import_packer(name):
+    """
+    导入 Packer-Fuzzer 的模块
+
+    Packer-Fuzzer 自身的包也叫 lib，导入期间临时移开 dirsearch 的 lib 包，导入后恢复；
+    已导入的 Packer-Fuzzer 模块在多次调用之间共享，各测试看到的是同一份类状态。
+    也可以导入依赖 Packer-Fuzzer 的基准脚本，脚本导入时对 sys.path 的修改会被撤销。
+    """
+    with _lock:
+        saved = _pop_lib()
+        path = list(sys.path)
+        sys.modules.update(_modules)
+        sys.path.insert(0, PACKER_PATH)
+        try:
+            return importlib.import_module(name)
+        finally:
+            sys.path[:] = path
+            _modules.update(_pop_lib())
+            sys.modules.update(saved)
+
+
+class StubConfig:
+    """代替 readConfig.ReadConfig，返回测试指定的配置，不读取工作目录中的 config.ini"""
+
+    values = {}
+
+    def getValue(self, section, key):
+        self.res = [str(self.values[section, key])]
+        return self.res
+
+
+class StubLog:
+    """代替 CreatLog.creatLog，不解析命令行也不创建日志文件"""
+
+    def get_logger(self):
+        return _logger
+
+
+class _Logger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+_logger = _Logger()
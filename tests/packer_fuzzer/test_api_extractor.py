@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import random
+import re
+
+from unittest import TestCase
+
+from tests.packer_fuzzer import import_packer
+
+apiExtractor = import_packer("lib.common.apiExtractor")
+ApiExtractor = apiExtractor.ApiExtractor
+
+API_EXTS = "{,},.png,.js, "
+# 随机拼接的片段，覆盖各条正则的开头、结尾、换行和排除关键字
+FRAGMENTS = [
+    'a.get("', 'b.post("', 'e+"', ':{url:"', 'return ', 'return\n', 'return\t', '["a"].post("', '["x"].get("',
+    'url:"', 'baseUrl = "', 'apiUrl+"', 'host:"', '"', '",', ',', '/api/', '/v1/user', '?id=1', '.png', '.js',
+    '/', '{', '}', '(', ')', ' ', '\n', 'x', 'list', 't', '=',
+]
+
+
+def excluded(path, apiExts):
+    for apiExt in apiExts.split(","):
+        if apiExt in path:
+            return True
+    return False
+
+
+def legacy_extract(text, apiExts, baseUrl=True):
+    """重构前 Apicollect 的逐条正则 re.findall 实现"""
+    apiPaths = set()
+    baseUrls = []
+    violentPaths = set()
+    hits = 0
+    for regx in apiExtractor.API_REGXS:
+        for apiPath in re.findall(regx, text):
+            if apiPath != '' and '/' in apiPath:
+                if not excluded(apiPath, apiExts):
+                    apiPaths.add(apiPath.split("?")[0])
+                    hits += 1
+                else:
+                    for twice in apiExtractor.API_REGXS:
+                        for twicePath in re.findall(twice, apiPath):
+                            if twicePath != '' and '/' in twicePath and not excluded(twicePath, apiExts):
+                                apiPaths.add(twicePath)
+                                hits += 1
+    if baseUrl:
+        for regx in apiExtractor.BASEURL_REGXS:
+            for baseurlPath in re.findall(regx, text):
+                if baseurlPath != '' and '/' in baseurlPath and baseurlPath != "/" and 3 < len(baseurlPath) < 20 \
+                        and not excluded(baseurlPath, apiExts):
+                    if baseurlPath[0] == "/":
+                        baseurlPath = baseurlPath[1:]
+                    baseUrls.append(baseurlPath.split("?")[0])
+    for apiPath in re.findall(apiExtractor.VIOLENT_REGX, text):
+        if apiPath != '' and '/' in apiPath and apiPath != "/" and not excluded(apiPath, apiExts):
+            violentPaths.add(apiPath.split("?")[0])
+    return apiPaths, baseUrls, violentPaths, hits
+
+
+class TestApiExtractor(TestCase):
+    def assertSameAsLegacy(self, extractor, text, apiExts=API_EXTS, baseUrl=True):
+        self.assertEqual(extractor.extract(text), legacy_extract(text, apiExts, baseUrl), repr(text))
+
+    def test_random_texts_match_legacy(self):
+        rng = random.Random(0)
+        extractor = ApiExtractor(API_EXTS)
+        noBaseUrl = ApiExtractor(API_EXTS, baseUrl=False)
+        for _ in range(2000):
+            text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 60)))
+            self.assertSameAsLegacy(extractor, text)
+            self.assertSameAsLegacy(noBaseUrl, text, baseUrl=False)
+
+    def test_return_across_lines(self):
+        extractor = ApiExtractor(API_EXTS)
+        cases = [
+            'function f(t){return\nr["a"].post("/api/save",t)}',
+            'function f(t){return\n\nr["a"].post("/api/save",t)}',
+            'function f(t){return t&&\nr["a"].get("/api/list")}',
+            'return x;return r["a"].get("/a/b");\nreturn r["b"].post("/c/d")',
+            'return\treturn\nreturn r["a"].get("/e/f")',
+        ]
+        for text in cases:
+            self.assertSameAsLegacy(extractor, text)
+
+        apiPaths = extractor.extract(cases[0])[0]
+        self.assertIn("/api/save", apiPaths)
+        self.assertNotIn("/api/save", extractor.extract(cases[1])[0])
+
+    def test_overlapping_matches(self):
+        extractor = ApiExtractor(API_EXTS)
+        text = ('n.get("/a/b",{});n.get("/c/d");t.post("/e/f",x);'
+                'i+"/g/h",i+"/j/k",:{url:"/l/m",x},return r["a"].get("/n/o",1)')
+        self.assertSameAsLegacy(extractor, text)
+
+        apiPaths, baseUrls, violentPaths, hits = extractor.extract(text)
+        self.assertLessEqual({"/a/b", "/c/d", "/g/h", "/j/k", "/l/m", "/n/o"}, apiPaths)
+        # \w\.get\(\"(.*?)\"\, 跨过下一个调用匹配到最近的 ", ，与原正则一致
+        self.assertIn('/c/d");t.post("/e/f', apiPaths)
+        # 同一位置被多条正则匹配时分别计数
+        self.assertGreater(hits, len(apiPaths))
+
+    def test_excluded_matches_are_extracted_again(self):
+        extractor = ApiExtractor(API_EXTS)
+        text = 'e+"{t.get("/in/ner"x",a.get("/logo.png",b.post("/x/{id}/y",'
+        self.assertSameAsLegacy(extractor, text)
+        self.assertIn("/in/ner", extractor.extract(text)[0])
+
+        # 同一个提取器重复使用时结果不变
+        self.assertEqual(extractor.extract(text), extractor.extract(text))
+        self.assertSameAsLegacy(extractor, text)
+
+    def test_custom_excluded_extensions(self):
+        apiExts = ".json,admin"
+        extractor = ApiExtractor(apiExts)
+        text = 'a.get("/api/data.json",{});a.get("/admin/x",{});a.get("/api/ok?x=1",{});url:"/prod-api/"'
+        self.assertSameAsLegacy(extractor, text, apiExts)
+
+        apiPaths, baseUrls, _, _ = extractor.extract(text)
+        self.assertEqual(apiPaths, {"/api/ok"})
+        self.assertEqual(baseUrls, ["prod-api/"])
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from tests.packer_fuzzer import StubConfig, StubLog, import_packer
+
+beautyJS = import_packer("lib.common.beautyJS")
+database = import_packer("lib.Database")
+bench = import_packer("script.bench_packer_beautify")
+
+TAG = "beautytest"
+SOURCE = (
+    '}leading;;!function(e){var t={};function n(r){if(t[r])return t[r].exports;}'
+    'n.d=function(e,t){return{a:"中文;提示",b:[1,2]}};\n'
+    'for(var i=0;i<3;i++){if(x){break}}/*! 版权 */var s="{};";'
+    '{{}}trailing'
+)
+
+
+class TestBeautifyFile(TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, True)
+
+    def beautify(self, text, chunkSize):
+        current = os.path.join(self.workdir, "current.js")
+        legacy = os.path.join(self.workdir, "legacy.js")
+        for filePath in (current, legacy):
+            with open(filePath, "w", encoding="utf-8") as f:
+                f.write(text)
+
+        with patch.object(beautyJS, "CHUNK_SIZE", chunkSize):
+            digest = beautyJS.beautifyFile(current)
+        bench.legacy_beautify(legacy)
+
+        with open(current, "rb") as f:
+            output = f.read()
+        with open(legacy, "rb") as f:
+            expected = f.read()
+        self.assertEqual(output, expected, "chunk size %d: %r" % (chunkSize, text))
+        self.assertEqual(digest, hashlib.sha1(output).hexdigest())
+        self.assertFalse(os.path.exists(current + ".tmp"))
+
+    def test_chunk_boundaries_match_legacy(self):
+        for chunkSize in range(1, 65):
+            self.beautify(SOURCE, chunkSize)
+
+    def test_random_texts_match_legacy(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            text = "".join(rng.choice("{};;ab中\n ") for _ in range(rng.randint(0, 80)))
+            self.beautify(text, rng.randint(1, 16))
+
+
+class TestRewriteJs(TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+        StubConfig.values = {("beautyJs", "processes"): 1, ("beautyJs", "processBytes"): 1 << 30}
+        patches = (
+            patch.object(database, "creatLog", StubLog),
+            patch.object(beautyJS, "creatLog", StubLog),
+            patch.object(beautyJS.readConfig, "ReadConfig", StubConfig),
+        )
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.database = database.DatabaseType(TAG)
+        self.database.createDatabase()
+        self.database.createProjectDatabase("http://example.com/", 1, "")
+        self.projectPath = self.database.getPathfromDB()
+        for name, text in (("a.js", "function a(){return 1;}"), ("b.js", "function a(){return 1;}"),
+                           ("c.js", "var c={x:1};")):
+            self.write(name, text)
+
+    def tearDown(self):
+        database.DatabaseType.closeConnections()
+        database.DatabaseType._projectPaths.pop(TAG, None)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def write(self, name, text):
+        with open(os.path.join(self.projectPath, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def read(self, name):
+        with open(os.path.join(self.projectPath, name), encoding="utf-8") as f:
+            return f.read()
+
+    def rewrite(self):
+        with patch.object(beautyJS, "beautifyWorker", wraps=beautyJS.beautifyWorker) as worker:
+            beautyJS.BeautyJs(TAG).rewrite_js()
+        return sorted(os.path.basename(call.args[0]) for call in worker.call_args_list)
+
+    def test_beautified_files_are_skipped_by_hash(self):
+        # 内容相同的文件只美化一次，结果复制给其余文件
+        self.assertEqual(len(self.rewrite()), 2)
+        self.assertEqual(self.read("a.js"), "\tfunction a(){\n\treturn 1;\n}\n")
+        self.assertEqual(self.read("b.js"), self.read("a.js"))
+        beautified = json.loads(self.database.getInfo(beautyJS.BEAUTIFIED_INFO))
+        self.assertEqual(len(beautified), 2)
+
+        # 再次执行时已美化的文件不再处理
+        self.assertEqual(self.rewrite(), [])
+
+        # 只有内容变化的文件重新美化
+        self.write("c.js", "var c={y:2};")
+        self.assertEqual(self.rewrite(), ["c.js"])
+        self.assertEqual(len(json.loads(self.database.getInfo(beautyJS.BEAUTIFIED_INFO))), 3)
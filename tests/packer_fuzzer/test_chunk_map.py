@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import sys
+
+from types import ModuleType
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from tests.packer_fuzzer import import_packer
+
+chunkMap = import_packer("lib.common.chunkMap")
+ChunkMap = chunkMap.ChunkMap
+ChunkMapError = chunkMap.ChunkMapError
+
+WEBPACK4_RUNTIME = (
+    'var s=document.createElement("script");'
+    's.src=o.p+"js/"+({1:"about","2":"user"}[e]||e)+"."+{1:"31a5e9f2",2:"0c1d",3:"77ab"}[e]+".js";'
+)
+WEBPACK5_ARROW_RUNTIME = 'o.u=e=>"static/js/"+e+"."+{123:"aa11",456:"bb22"}[e]+".chunk.js",o.miniCssF=e=>{}'
+WEBPACK5_FUNCTION_RUNTIME = 'r.u=function(t){return"js/"+t+"-"+{7:"x9"}[t]+".js"},r.g=function(){}'
+
+
+class StubVM:
+    """代替 deno_vm.VM，记录执行的脚本，js_compile_batch 返回可预期的结果"""
+
+    instances = []
+
+    def __init__(self):
+        self.scripts = []
+        self.calls = []
+        StubVM.instances.append(self)
+
+    def create(self):
+        pass
+
+    def run(self, script):
+        self.scripts.append(script)
+
+    def call(self, name, names):
+        self.calls.append((name, list(names)))
+        return ["js/" + chunk + ".js" for chunk in names] + ["js/undefined.js"]
+
+    def destroy(self):
+        pass
+
+
+class TestChunkMap(TestCase):
+    def setUp(self):
+        StubVM.instances = []
+        denoVM = ModuleType("deno_vm")
+        denoVM.VM = StubVM
+        self.atexit = Mock()
+        patches = (
+            patch.dict(sys.modules, {"deno_vm": denoVM}),
+            patch.object(chunkMap, "atexit", self.atexit),
+            patch.object(ChunkMap, "_vm", None),
+            patch.object(ChunkMap, "_cache", {}),
+            patch.object(ChunkMap, "stats", {"static": 0, "vm": 0, "cached": 0}),
+        )
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_webpack4_expression(self):
+        expressions = ChunkMap.findExpressions(WEBPACK4_RUNTIME)
+
+        self.assertEqual(expressions, [(
+            '"js/"+({1:"about","2":"user"}[e]||e)+"."+{1:"31a5e9f2",2:"0c1d",3:"77ab"}[e]+".js"', None
+        )])
+        self.assertEqual(ChunkMap.evaluate(expressions[0][0]), [
+            "js/about.31a5e9f2.js", "js/user.0c1d.js", "js/3.77ab.js",
+        ])
+
+    def test_webpack4_marker_is_required(self):
+        self.assertEqual(ChunkMap.findExpressions(WEBPACK4_RUNTIME.replace("document.createElement", "x")), [])
+
+    def test_webpack5_arrow_expression(self):
+        expressions = ChunkMap.findExpressions(WEBPACK5_ARROW_RUNTIME)
+
+        self.assertEqual(expressions, [('"static/js/"+e+"."+{123:"aa11",456:"bb22"}[e]+".chunk.js"', "e")])
+        self.assertEqual(ChunkMap.evaluate(expressions[0][0]), [
+            "static/js/123.aa11.chunk.js", "static/js/456.bb22.chunk.js",
+        ])
+
+    def test_webpack5_function_expression(self):
+        expressions = ChunkMap.findExpressions(WEBPACK5_FUNCTION_RUNTIME)
+
+        self.assertEqual(expressions, [('"js/"+t+"-"+{7:"x9"}[t]+".js"', "t")])
+        self.assertEqual(ChunkMap.evaluate(expressions[0][0]), ["js/7-x9.js"])
+
+    def test_numeric_keys_are_normalised(self):
+        self.assertEqual(ChunkMap.evaluate('"c/"+e+"."+{1.0:"a",2.5:"b","3":"c"}[e]+".js"'), [
+            "c/1.a.js", "c/2.5.b.js", "c/3.c.js",
+        ])
+
+    def test_minified_booleans(self):
+        self.assertEqual(ChunkMap.evaluate('"c/"+e+"."+{1:!0,2:!1}[e]+".js"'), ["c/1.true.js", "c/2.false.js"])
+
+    def test_escape_sequences(self):
+        self.assertEqual(ChunkMap.evaluate('"js\\/"+e+"."+{1:"a\\u0062\\x63",\'2\':\'d\\\'e\'}[e]+".js"'), [
+            "js/1.abc.js", "js/2.d'e.js",
+        ])
+
+    def test_undefined_names_are_dropped(self):
+        self.assertEqual(ChunkMap.evaluate('"js/"+{1:"a",2:"b"}[e]+{1:"x"}[e]+".js"'), ["js/ax.js"])
+
+    def test_unsupported_expressions_raise(self):
+        for jsCode in ('"js/"+e.toString()+".js"', '"js/"+{1:"a"}[e]+{1:"b"}[t]+".js"', '"js/"+f(e)+".js"'):
+            with self.assertRaises(ChunkMapError, msg=jsCode):
+                ChunkMap.evaluate(jsCode)
+
+    def test_resolve_caches_by_expression(self):
+        jsCode = '"js/"+e+"."+{1:"a"}[e]+".js"'
+        with patch.object(ChunkMap, "evaluate", wraps=ChunkMap.evaluate) as evaluate:
+            first = ChunkMap.resolve(jsCode)
+            second = ChunkMap.resolve(jsCode)
+
+        self.assertEqual(first, ["js/1.a.js"])
+        self.assertEqual(second, first)
+        self.assertEqual(evaluate.call_count, 1)
+        self.assertEqual(ChunkMap.stats, {"static": 1, "vm": 0, "cached": 1})
+
+    def test_resolve_falls_back_to_vm(self):
+        jsCode = '"js/"+e.toString()+"."+{"a":"1f",b:"2e"}[e]+".js"'
+
+        self.assertEqual(ChunkMap.resolve(jsCode, "e"), ["js/a.js", "js/b.js"])
+        self.assertEqual(ChunkMap.resolve(jsCode, "e"), ["js/a.js", "js/b.js"])
+        self.assertEqual(ChunkMap.stats, {"static": 0, "vm": 1, "cached": 1})
+        self.assertEqual(len(StubVM.instances[0].calls), 1)
+
+    def test_vm_evaluate_infers_variable_and_names(self):
+        jsCode = '"js/"+n.toString()+"."+{"a":"1f",b:"2e","a":"3d"}[n]+".js"'
+
+        self.assertEqual(ChunkMap.vmEvaluate(jsCode), ["js/a.js", "js/b.js"])
+
+        vm, = StubVM.instances
+        self.assertEqual(vm.scripts[0][:len("function js_compile_batch(names)")], "function js_compile_batch(names)")
+        self.assertEqual(vm.scripts[1], "function js_compile(n){js_url=" + jsCode + "\nreturn js_url}")
+        self.assertEqual(vm.calls, [("js_compile_batch", ["a", "b"])])
+
+    def test_vm_evaluate_unwraps_empty_lookup(self):
+        jsCode = '"js/"+({}[t]||t)+".js"'
+
+        ChunkMap.vmEvaluate(jsCode)
+
+        self.assertEqual(StubVM.instances[0].scripts[1], 'function js_compile(t){js_url="js/"+t+".js"\nreturn js_url}')
+
+    def test_vm_is_created_once(self):
+        ChunkMap.vmEvaluate('{1:"a"}[e]+".js"', "e")
+        ChunkMap.vmEvaluate('{2:"b"}[e]+".js"', "e")
+
+        vm, = StubVM.instances
+        self.assertEqual([name for name, _ in vm.calls], ["js_compile_batch", "js_compile_batch"])
+        self.assertEqual(sum(script.startswith("function js_compile_batch") for script in vm.scripts), 1)
+        self.atexit.register.assert_called_once_with(vm.destroy)
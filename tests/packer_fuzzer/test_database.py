@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import os
+import shutil
+import tempfile
+
+from html import escape
+from unittest import TestCase
+from unittest.mock import patch
+
+from tests.packer_fuzzer import StubConfig, StubLog, import_packer
+
+database = import_packer("lib.Database")
+DatabaseType = database.DatabaseType
+
+TAG = "dbtest"
+
+
+class TestDatabaseType(TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+        StubConfig.values = {("blacklist", "apiExts"): ".css,.png"}
+        patches = (
+            patch.object(database, "creatLog", StubLog),
+            patch.object(database, "ReadConfig", StubConfig),
+        )
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.database = DatabaseType(TAG)
+        self.database.createDatabase()
+        self.database.createProjectDatabase("http://example.com/", 1, "")
+        self.conn = self.database.getConnection()
+        self.conn.execute("insert into js_file(name,path,local) values('app.js','http://example.com/app.js','x.app.js')")
+        self.js_id = self.database.getJsIDFromDB("x.app.js", self.database.getPathfromDB())
+
+    def tearDown(self):
+        DatabaseType.closeConnections()
+        DatabaseType._projectPaths.pop(TAG, None)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def add_api(self, path, success=1):
+        self.conn.execute("insert into api_tree(path,name,success,from_js) values(?,?,?,?)",
+                          (path, path.split("/")[-1], success, self.js_id))
+
+    def api_rows(self):
+        return self.conn.execute("select path,success,result from api_tree order by id").fetchall()
+
+    def test_api_record_many_skips_known_and_repeated_paths(self):
+        self.add_api("/api/old")
+        js_path = os.path.join("tmp", "project", "x.app.js")
+
+        written = self.database.apiRecordManyToDB([
+            (js_path, "/api/old"),
+            (js_path, "/api/new"),
+            (js_path, "/api/new"),
+            (os.path.join("tmp", "project", "missing.js"), "/api/orphan"),
+        ])
+
+        self.assertEqual(written, 1)
+        self.assertEqual([row[0] for row in self.api_rows()], ["/api/old", "/api/new"])
+        self.assertEqual(self.database.apiIdFromDB("/api/new")[1], self.js_id)
+
+    def test_insert_text_marks_blacklisted_and_empty_results_failed(self):
+        for path in ("/api/list", "/static/site.css", "/api/page", "/api/empty", "/favicon.ico"):
+            self.add_api(path)
+
+        self.database.insertTextFromDB({
+            "/api/list": '{"rows": [1]}',
+            "/static/site.css": "body{}",
+            "/api/page": "<html><body></body></html>",
+            "/api/empty": "",
+            "/favicon.ico": "icon",
+        })
+
+        self.assertEqual(self.api_rows(), [
+            ("/api/list", 1, escape('{"rows": [1]}')),
+            ("/static/site.css", 0, None),
+            ("/api/page", 0, None),
+            ("/api/empty", 0, None),
+            ("/favicon.ico", 0, None),
+        ])
+
+    def test_quotes_in_paths_and_options_are_stored_verbatim(self):
+        path = "/api/it's\"quoted\""
+        self.add_api(path)
+        api_id, from_js = self.database.apiIdFromDB(path)
+
+        option = '{"type": "get", "get": [{"name": "q", "default": "it\'s"}]}'
+        self.database.updateApiOption(api_id, option)
+
+        self.assertEqual(from_js, self.js_id)
+        self.assertEqual(self.database.apiOptionFromDB(api_id), [option])
+        self.assertEqual([row[1] for row in self.database.apiByOptionFromDB(option)], [path])
+        self.assertIsNone(self.database.apiIdFromDB("/api/missing"))
+
+    def test_is_database_file_covers_wal_files(self):
+        for filename in (TAG + ".db", TAG + ".db-wal", TAG + ".db-shm", TAG + ".db-journal"):
+            self.assertTrue(DatabaseType.isDatabaseFile(TAG, filename), filename)
+        for filename in (TAG + ".db.js", "other.db", "other.db-wal", "x.app.js"):
+            self.assertFalse(DatabaseType.isDatabaseFile(TAG, filename), filename)
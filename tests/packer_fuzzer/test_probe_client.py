@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import threading
+
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from tests.packer_fuzzer import StubConfig, StubLog, import_packer
+
+probeClient = import_packer("lib.common.probeClient")
+ProbeClient = probeClient.ProbeClient
+RequestBudget = probeClient.RequestBudget
+RequestBudgetExceeded = probeClient.RequestBudgetExceeded
+
+OPTIONS = SimpleNamespace(proxy=None, cookie=None, head="X-Test:1", contenttype=None, ssl_flag=1)
+
+
+class StubTransport:
+    """代替 SharedTransport，记录请求并返回以URL为内容的响应"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+        self.release.set()
+        self.error = None
+
+    def request(self, method, url, **kwargs):
+        with self.lock:
+            self.calls.append((method, url, kwargs))
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(status_code=200, text=url, url=url)
+
+
+class TestProbeClient(TestCase):
+    def setUp(self):
+        self.transport = StubTransport()
+        StubConfig.values = {("probe", "threads"): 4, ("probe", "timeout"): 1, ("probe", "memoSize"): 2}
+        patches = (
+            patch.object(probeClient, "SharedTransport", self.transport),
+            patch.object(probeClient.readConfig, "ReadConfig", StubConfig),
+            patch.object(probeClient, "creatLog", StubLog),
+        )
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        ProbeClient.resetMemo()
+        ProbeClient.memoize = True
+        RequestBudget.setLimit(0)
+        self.client = ProbeClient(OPTIONS)
+
+    def tearDown(self):
+        ProbeClient.resetMemo()
+        RequestBudget.setLimit(0)
+
+    def test_concurrent_identical_requests_are_sent_once(self):
+        self.transport.release.clear()
+        responses = []
+        threads = [
+            threading.Thread(target=lambda: responses.append(self.client.fetch("GET", "http://a/x")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # 等待所有调用者都进入请求或开始等待同一个请求
+        while ProbeClient.memoStats()["requests"] < 8:
+            threading.Event().wait(0.01)
+        self.transport.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.transport.calls), 1)
+        self.assertEqual(len({id(response) for response in responses}), 1)
+        self.assertEqual(ProbeClient.memoStats(), {"requests": 8, "sent": 1, "saved": 7})
+
+    def test_errors_are_shared_but_not_cached(self):
+        self.transport.error = ConnectionError("reset")
+        with self.assertRaises(ConnectionError):
+            self.client.fetch("GET", "http://a/x")
+
+        self.transport.error = None
+        self.assertEqual(self.client.fetch("GET", "http://a/x").text, "http://a/x")
+        self.assertEqual(len(self.transport.calls), 2)
+
+    def test_least_recently_used_response_is_evicted(self):
+        for url in ("http://a/1", "http://a/2", "http://a/1", "http://a/3"):
+            self.client.fetch("GET", url)
+        self.assertEqual(len(self.transport.calls), 3)
+
+        # memoSize 为2，/1 最近被使用过而保留，/2 被淘汰
+        self.client.fetch("GET", "http://a/1")
+        self.assertEqual(len(self.transport.calls), 3)
+        self.client.fetch("GET", "http://a/2")
+        self.assertEqual(len(self.transport.calls), 4)
+
+    def test_key_includes_body_and_relevant_headers(self):
+        self.client.fetch("POST", "http://a/x", data={"id": 1})
+        self.client.fetch("POST", "http://a/x", data={"id": 2})
+        self.client.fetch("POST", "http://a/x", data={"id": 1}, headers={"User-Agent": "other"})
+        self.client.fetch("POST", "http://a/x", data={"id": 1}, headers={"Cookie": "a=b"})
+
+        self.assertEqual(len(self.transport.calls), 3)
+
+    def test_budget_counts_sent_requests_only(self):
+        RequestBudget.setLimit(2)
+        self.client.fetch("GET", "http://a/1")
+        self.client.fetch("GET", "http://a/1")
+        self.client.fetch("GET", "http://a/2")
+
+        with self.assertRaises(RequestBudgetExceeded):
+            self.client.fetch("GET", "http://a/3")
+        self.assertEqual(self.client.get("http://a/4").status, None)
+        self.assertEqual(RequestBudget.used(), 2)
+
+    def test_payload_retries_and_budget_are_passed_to_transport(self):
+        self.client.fetch("GET", "http://a/x?id=1'", retries=0)
+        kwargs = self.transport.calls[0][2]
+
+        self.assertEqual(kwargs["retries"], 0)
+        self.assertEqual(kwargs["canRetry"], RequestBudget.tryTake)
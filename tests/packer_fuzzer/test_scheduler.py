@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import threading
+import time
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from tests.packer_fuzzer import StubConfig, StubLog, import_packer
+
+scheduler = import_packer("lib.common.scheduler")
+probeClient = import_packer("lib.common.probeClient")
+RequestBudget = probeClient.RequestBudget
+
+
+class Concurrency:
+    """记录同时执行的任务数的峰值"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def run(self, delay=0.02):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(delay)
+        with self.lock:
+            self.active -= 1
+
+
+class TestTestScheduler(TestCase):
+    def setUp(self):
+        patches = (
+            patch.object(scheduler.readConfig, "ReadConfig", StubConfig),
+            patch.object(scheduler, "creatLog", StubLog),
+        )
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        RequestBudget.setLimit(0)
+        probeClient.ProbeClient.hostThreads = 0
+
+    def create(self, threads=4, hostThreads=2, timeThreads=1, budget=0):
+        StubConfig.values = {
+            ("scheduler", "threads"): threads,
+            ("scheduler", "hostThreads"): hostThreads,
+            ("scheduler", "timeThreads"): timeThreads,
+            ("scheduler", "budget"): budget,
+        }
+        runner = scheduler.TestScheduler()
+        self.addCleanup(runner.close)
+        return runner
+
+    def test_join_waits_for_tasks_submitted_by_tasks(self):
+        runner = self.create()
+        done = []
+
+        def time_based(name):
+            time.sleep(0.05)
+            done.append(name)
+
+        # 与 SqlTest.scheduleTest 相同：内容检测任务在 time 通道中提交时间盲注任务
+        def content(name):
+            runner.submit("SqlTest", time_based, name, url="http://a/", lane="time")
+
+        for name in ("x", "y", "z"):
+            runner.submit("SqlTest", content, name, url="http://a/")
+        runner.join()
+
+        self.assertEqual(sorted(done), ["x", "y", "z"])
+        self.assertEqual(runner.stats["SqlTest"], [6, 0])
+
+    def test_budget_stops_new_tasks(self):
+        runner = self.create(threads=1, budget=2)
+        started = []
+
+        def task(index):
+            started.append(index)
+            RequestBudget.take()
+
+        for index in range(5):
+            runner.submit("Test", task, index, url="http://a/")
+        runner.join()
+
+        # 前两个任务用完预算，之后的任务不再启动，记为失败
+        self.assertEqual(started, [0, 1])
+        self.assertEqual(runner.stats["Test"], [5, 3])
+
+    def test_per_host_limit(self):
+        runner = self.create(threads=8, hostThreads=2)
+        hosts = {"a": Concurrency(), "b": Concurrency()}
+        total = Concurrency()
+
+        def task(host):
+            with total.lock:
+                total.active += 1
+                total.peak = max(total.peak, total.active)
+            hosts[host].run()
+            with total.lock:
+                total.active -= 1
+
+        for _ in range(6):
+            for host in hosts:
+                runner.submit("Test", task, host, url=f"http://{host}/path")
+        runner.join()
+
+        self.assertEqual(hosts["a"].peak, 2)
+        self.assertEqual(hosts["b"].peak, 2)
+        self.assertGreater(total.peak, 2)
+        # 任务内部经 ProbeClient 发出的请求同样按主机限制
+        self.assertEqual(probeClient.ProbeClient.hostThreads, 2)
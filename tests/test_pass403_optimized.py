@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+
+import threading
+
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.pass403_optimized import OptimizedPathRepository, OptimizedProgram, OptimizedQuery
+
+URL = "http://example.com"
+SIGNAL_FAMILY = "rewrite:X-Original-URL"
+# 每个路径发送全部变异时的请求数
+FULL_REQUESTS = OptimizedPathRepository("/admin").requestCount()
+
+
+def canned_response(method, url, headers):
+    """模拟目标：只有 X-Original-URL 能绕过，部分变异返回噪声状态码"""
+    if headers and "X-Original-URL" in headers:
+        return 200
+    if method == "POST":
+        return 405
+    if url.endswith("%20"):
+        return 404
+    if url.endswith(".json"):
+        return 400
+    return 403
+
+
+class TestAdaptiveBypass(TestCase):
+    def setUp(self):
+        self.requests = []
+        lock = threading.Lock()
+
+        def send_request(query, method, url, headers=None):
+            with lock:
+                self.requests.append((method, url, headers))
+            status = canned_response(method, url, headers)
+            return SimpleNamespace(status_code=status, content=b"x" * status)
+
+        patches = (
+            patch.object(OptimizedQuery, "send_request", send_request),
+            patch("lib.pass403_optimized.get_transport"),
+            patch("lib.pass403_optimized.output"),
+        )
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def run_program(self, paths, **kwargs):
+        program = OptimizedProgram([URL], paths, max_workers=4, **kwargs)
+        program.initialise()
+        return program
+
+    def test_learn_families_keeps_signal_and_prunes_noise(self):
+        query = SimpleNamespace(url=URL, results=[
+            {"family": "original", "status_code": 403},
+            {"family": SIGNAL_FAMILY, "status_code": 200},
+            {"family": "trailing:%20", "status_code": 404},
+            {"family": "trailing:.json", "status_code": 400},
+            {"family": "method:POST", "status_code": 405},
+            {"family": "trailing:?", "status_code": 403},
+        ])
+
+        self.assertEqual(OptimizedProgram.learnFamilies([query]), {URL: {SIGNAL_FAMILY}})
+
+    def test_learn_families_uses_original_response_as_baseline(self):
+        query = SimpleNamespace(url=URL, results=[
+            {"family": "trailing:/", "status_code": 401},
+            {"family": "original", "status_code": 401},
+            {"family": "header:X-Real-IP", "status_code": 200},
+        ])
+
+        self.assertEqual(OptimizedProgram.learnFamilies([query]), {URL: {"header:X-Real-IP"}})
+
+    def test_adaptive_prunes_paths_after_sample(self):
+        families = {}
+        program = self.run_program(["/a", "/b", "/c", "/d", "/e"], families=families)
+
+        self.assertEqual(families, {URL: {SIGNAL_FAMILY}})
+        # 前3个路径发送全部变异，其余路径只发送有信号的类别
+        self.assertEqual(len(self.requests), 3 * FULL_REQUESTS + 2)
+        self.assertIn(("GET", URL, {"X-Original-URL": "/e"}), self.requests)
+        self.assertEqual(program.completed, 5)
+
+    def test_known_families_skip_sample(self):
+        families = {URL: {SIGNAL_FAMILY}}
+        self.run_program(["/a", "/b", "/c", "/d"], families=families)
+
+        self.assertEqual(len(self.requests), 4)
+        self.assertTrue(all(headers for _, _, headers in self.requests))
+
+    def test_small_batch_is_sent_in_full_and_kept_as_sample(self):
+        families = {}
+        samples = {}
+        self.run_program(["/a", "/b"], families=families, samples=samples)
+
+        self.assertEqual(len(self.requests), 2 * FULL_REQUESTS)
+        self.assertEqual(families, {})
+        self.assertEqual([query.dir for query in samples[URL]], ["/a", "/b"])
+
+        # 下一批补足样本后学习，剩余路径只发送有信号的类别
+        self.requests.clear()
+        self.run_program(["/c", "/d", "/e"], families=families, samples=samples)
+
+        self.assertEqual(families, {URL: {SIGNAL_FAMILY}})
+        self.assertEqual(samples, {})
+        self.assertEqual(len(self.requests), FULL_REQUESTS + 2)
+
+    def test_single_path_batches_learn_after_sample_size_paths(self):
+        families = {}
+        samples = {}
+        counts = []
+        for path in ("/a", "/b", "/c", "/d", "/e"):
+            self.requests.clear()
+            self.run_program([path], families=families, samples=samples)
+            counts.append(len(self.requests))
+
+        self.assertEqual(counts, [FULL_REQUESTS] * 3 + [1, 1])
+        self.assertEqual(families, {URL: {SIGNAL_FAMILY}})
+        self.assertEqual(samples, {})
+
+    def test_exhaustive_sends_every_variant(self):
+        families = {}
+        results = {}
+        self.run_program(["/a", "/b", "/c", "/d", "/e"], adaptive=False, families=families, results=results)
+
+        self.assertEqual(len(self.requests), 5 * FULL_REQUESTS)
+        self.assertEqual(families, {})
+        # 结果行留在内存中，403以外的结果都会交给 pass403_qc
+        self.assertTrue(any("STATUS: 200" in line for line in results[URL]))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+
+import io
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from lib.core.data import options
+from lib.view.terminal import Output
+
+
+class TestOutput(TestCase):
+    def setUp(self):
+        self.stdout = io.StringIO()
+        patcher = patch("sys.stdout", self.stdout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_queued_lines_are_written_together_in_order(self):
+        output = Output()
+        output._start_renderer = lambda: None
+        output.queue_line("first")
+        output.queue_line("second")
+        self.assertEqual(self.stdout.getvalue(), "")
+
+        output.new_line("third")
+        self.assertEqual(self.stdout.getvalue(), "first\nsecond\nthird\n")
+
+        output.queue_line("fourth")
+        output.render()
+        self.assertEqual(self.stdout.getvalue(), "first\nsecond\nthird\nfourth\n")
+
+    def test_progress_is_not_drawn_when_redirected(self):
+        output = Output()
+        output._start_renderer = lambda: None
+        output.set_progress(lambda: (5, 10, 1, 1, 100, 0))
+        output.render()
+        self.assertEqual(self.stdout.getvalue(), "")
+
+    def test_history_is_bounded(self):
+        with patch.dict(options, output_history=3):
+            output = Output()
+            for i in range(10):
+                output.new_line(str(i))
+
+        self.assertEqual(list(output.history), ["7", "8", "9"])